@@ -0,0 +1,5 @@
+"""Benchmarks for Eagle Terminal.
+
+Each module in this package is a standalone benchmark meant to be run
+with ``python -m benchmarks.<name>`` from the repository root.
+"""
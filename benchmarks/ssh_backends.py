@@ -0,0 +1,155 @@
+"""SSH backend benchmark for Eagle Terminal.
+
+Streams a large file through an interactive shell with every available
+``SSHConnection`` backend and reports per-chunk read latency, throughput
+and CPU time, so the paramiko and asyncssh paths can be compared on the
+same host.
+
+Usage:
+    python -m benchmarks.ssh_backends HOST -u USER [-p PASSWORD] [--size-mb 50]
+"""
+
+import argparse
+import asyncio
+import getpass
+import json
+import statistics
+import time
+import uuid
+
+from utils.ssh_backends import BACKENDS, asyncssh
+from utils.ssh_utils import SSHConnection
+
+
+def percentile(values, pct):
+    """Return the ``pct`` percentile of ``values`` (nearest-rank)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def run_backend(backend, args, password):
+    """Benchmark one backend.
+
+    Args:
+        backend (str): The backend name.
+        args (argparse.Namespace): Parsed command-line arguments.
+        password (str): The SSH password, if any.
+
+    Returns:
+        dict: The measured metrics for the backend.
+    """
+    connection = SSHConnection(
+        args.host,
+        args.username,
+        password=password,
+        key_filename=args.key_filename,
+        port=args.port,
+        backend=backend,
+    )
+    await connection.backend.connect()
+    try:
+        size = args.size_mb * 1024 * 1024
+        remote_file = f"/tmp/eagle_bench_{uuid.uuid4().hex}.txt"
+        marker = f"EAGLE_BENCH_{uuid.uuid4().hex}"
+        await connection.write_input(
+            f"stty -echo; head -c {size * 3 // 4} /dev/urandom | base64 > {remote_file}; "
+            f'echo {marker}_"READY"\n'
+        )
+        await drain_until(connection, f"{marker}_READY".encode())
+
+        await connection.write_input(
+            f'cat {remote_file}; rm -f {remote_file}; echo {marker}_"DONE"\n'
+        )
+        latencies = []
+        total = 0
+        tail = b""
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        while True:
+            read_start = time.perf_counter()
+            chunk = await connection.backend.read(args.chunk_size, timeout=30)
+            latencies.append(time.perf_counter() - read_start)
+            if not chunk:
+                break
+            total += len(chunk)
+            tail = (tail + chunk)[-256:]
+            if f"{marker}_DONE".encode() in tail:
+                break
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+    finally:
+        await connection.close()
+
+    return {
+        "backend": backend,
+        "bytes": total,
+        "chunks": len(latencies),
+        "seconds": round(wall, 3),
+        "mb_per_s": round(total / wall / 1e6, 2) if wall else 0.0,
+        "cpu_seconds": round(cpu, 3),
+        "cpu_percent": round(100 * cpu / wall, 1) if wall else 0.0,
+        "chunk_latency_ms": {
+            "mean": round(statistics.mean(latencies) * 1000, 3),
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "max": round(max(latencies) * 1000, 3),
+        },
+    }
+
+
+async def drain_until(connection, marker):
+    """Discard shell output until ``marker`` has been seen."""
+    tail = b""
+    while marker not in tail:
+        chunk = await connection.backend.read(65536, timeout=120)
+        if chunk is None or chunk == b"":
+            raise RuntimeError("Shell closed while preparing the benchmark file")
+        tail = (tail + chunk)[-4096:]
+
+
+async def main(args):
+    password = args.password
+    if password is None and not args.key_filename:
+        password = getpass.getpass(f"Password for {args.username}@{args.host}: ")
+
+    backends = args.backend or [
+        name for name in BACKENDS if name != "asyncssh" or asyncssh is not None
+    ]
+    results = [await run_backend(name, args, password) for name in backends]
+
+    for result in results:
+        latency = result["chunk_latency_ms"]
+        print(
+            f"{result['backend']:>9}: {result['mb_per_s']:8.2f} MB/s  "
+            f"cpu {result['cpu_percent']:5.1f}%  "
+            f"chunk p50 {latency['p50']:.3f} ms  p99 {latency['p99']:.3f} ms  "
+            f"({result['chunks']} chunks)"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("host")
+    parser.add_argument("-u", "--username", required=True)
+    parser.add_argument("-p", "--password")
+    parser.add_argument("-i", "--key-filename")
+    parser.add_argument("--port", type=int, default=22)
+    parser.add_argument("--size-mb", type=int, default=50)
+    parser.add_argument(
+        "--chunk-size", type=int, help="fixed read size (adaptive when omitted)"
+    )
+    parser.add_argument(
+        "--backend", action="append", choices=sorted(BACKENDS), help="repeatable"
+    )
+    parser.add_argument("-o", "--output", help="write results as JSON")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
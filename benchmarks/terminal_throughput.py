@@ -0,0 +1,444 @@
+"""Terminal throughput benchmark for Eagle Terminal.
+
+Feeds synthetic and recorded output through the terminal paths of the GUI
+and reports how fast they keep up, without a display (Qt runs on the
+``offscreen`` platform):
+
+- targets: ``ssh_tab`` (``SSHTab.update_terminal``: output worker, frames
+  and the renderer), ``console`` (``SSHConsole.append_output``: render
+  scheduler and renderer) and ``highlighter`` (the console with keyword
+  highlighting on);
+- streams: ``plain`` (log lines), ``ansi`` (colored output), ``long_lines``
+  (16 KiB lines), ``top`` (a full-screen redraw loop) and any asciicast
+  recording given with ``--recording``.
+
+Each target/stream case runs in a fresh process, so peak RSS is its own.
+Per case it reports MB/s, frame paint time percentiles, peak RSS and the
+time the GUI thread was blocked: a 1 ms heartbeat timer runs alongside,
+and every tick that comes late adds its delay.
+
+Usage:
+    python -m benchmarks.terminal_throughput [--size-mb 8] [--recording FILE.cast] \
+        [-o results.json] [--baseline previous.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+TARGETS = ("ssh_tab", "console", "highlighter")
+STREAMS = ("plain", "ansi", "long_lines", "top")
+HEARTBEAT_MS = 1
+# A fixed keyword set, so highlighter results do not depend on local settings.
+BENCHMARK_KEYWORDS = {
+    "state": {"color": "#00ff00", "words": ["up", "ok", "established", "full"]},
+    "alert": {"color": "#ff5555", "words": ["down", "ERROR", "failed", "denied"]},
+    "interface": {
+        "color": "#87cefa",
+        "words": [
+            f"{name}0/{port}"
+            for name in ("GigabitEthernet", "TenGigabitEthernet", "Gi", "Te")
+            for port in range(48)
+        ]
+        + ["eth0", "vlan10", "Loopback0"],
+    },
+}
+
+
+def percentile(values, pct):
+    """Return the ``pct`` percentile of ``values`` (nearest-rank)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process in MB, if known."""
+    try:
+        import resource
+    except ImportError:
+        import psutil
+
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / 1e6, 1)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere.
+    return round(peak / 1e6 if sys.platform == "darwin" else peak / 1e3, 1)
+
+
+# -- streams ----------------------------------------------------------------
+
+
+def plain_stream(size, rng):
+    """Syslog-style lines."""
+    sent = 0
+    sequence = 0
+    while sent < size:
+        sequence += 1
+        line = (
+            f"*Mar  1 00:{sequence // 60 % 60:02d}:{sequence % 60:02d}.{sequence % 1000:03d}: "
+            f"%LINEPROTO-5-UPDOWN: Line protocol on Interface "
+            f"GigabitEthernet0/{rng.randrange(48)}, changed state to "
+            f"{rng.choice(('up', 'down'))}\r\n"
+        )
+        sent += len(line)
+        yield line
+
+
+def ansi_stream(size, rng):
+    """Colored output, e.g. ``ls --color`` or a colorized log."""
+    sent = 0
+    while sent < size:
+        words = []
+        for _ in range(12):
+            color = rng.choice(
+                (f"\x1b[{rng.randrange(31, 37)}m", f"\x1b[1;38;5;{rng.randrange(256)}m")
+            )
+            words.append(f"{color}{rng.choice(('eth0', 'vlan10', 'ok', 'ERROR', 'up'))}\x1b[0m")
+        line = " ".join(words) + "\r\n"
+        sent += len(line)
+        yield line
+
+
+def long_lines_stream(size, rng):
+    """Lines much wider than the screen, e.g. minified JSON."""
+    pool = [
+        "".join(rng.choice('abcdef0123456789{}:," ') for _ in range(16384)) + "\r\n"
+        for _ in range(8)
+    ]
+    sent = 0
+    while sent < size:
+        line = rng.choice(pool)
+        sent += len(line)
+        yield line
+
+
+def top_stream(size, rng, rows=24):
+    """A full-screen program redrawing in place, like ``top``."""
+    sent = 0
+    frame = 0
+    while sent < size:
+        frame += 1
+        lines = [f"\x1b[H\x1b[7mtop - frame {frame:6d}  load average: {rng.random():.2f}\x1b[0m\x1b[K"]
+        for row in range(1, rows):
+            lines.append(
+                f"\x1b[{row + 1};1H{rng.randrange(1, 65535):5d} root      20   0 "
+                f"{rng.randrange(10 ** 6):8d} {rng.random() * 100:5.1f} "
+                f"{rng.random() * 10:4.1f} process-{row}\x1b[K"
+            )
+        chunk = "".join(lines)
+        sent += len(chunk)
+        yield chunk
+
+
+def recording_stream(path, size):
+    """The output of an asciicast recording, replayed as fast as possible."""
+    from utils.recording import iter_events
+
+    sent = 0
+    while sent < size:
+        for _time, kind, data, _offset in iter_events(path):
+            if kind == "o":
+                sent += len(data)
+                yield data
+        if not sent:
+            return
+
+
+def make_stream(name, size, seed=1):
+    rng = random.Random(seed)
+    generators = {
+        "plain": plain_stream,
+        "ansi": ansi_stream,
+        "long_lines": long_lines_stream,
+        "top": top_stream,
+    }
+    if name in generators:
+        return generators[name](size, rng)
+    return recording_stream(name, size)
+
+
+def chunked(stream, chunk_size):
+    """Cut a stream into reads of ``chunk_size`` characters."""
+    buffer = ""
+    for text in stream:
+        buffer += text
+        while len(buffer) >= chunk_size:
+            yield buffer[:chunk_size]
+            buffer = buffer[chunk_size:]
+    if buffer:
+        yield buffer
+
+
+# -- targets ----------------------------------------------------------------
+
+
+class Target:
+    """Wraps one terminal path: ``write`` feeds it, ``idle`` says it caught up."""
+
+    def __init__(self, widget, frame_times):
+        self.widget = widget
+        self.frame_times = frame_times
+
+    def timed(self, render):
+        def timed_render(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return render(*args, **kwargs)
+            finally:
+                self.frame_times.append(time.perf_counter() - start)
+
+        return timed_render
+
+
+class SSHTabTarget(Target):
+    def __init__(self, frame_times):
+        from ui.tabs.ssh_tab import SSHTab
+
+        tab = SSHTab({"hostname": "benchmark", "username": "benchmark"}, None)
+        super().__init__(tab, frame_times)
+        tab.terminal.render = self.timed(tab.terminal.render)
+
+    def write(self, text):
+        self.widget.update_terminal(text)
+
+    def idle(self):
+        tab = self.widget
+        if tab.output_worker.backlog or tab.frame_timer.isActive():
+            return False
+        # Whatever the worker finished since the last frame.
+        tab.output_worker.wait_idle()
+        tab.render_frame()
+        return True
+
+    def close(self):
+        self.widget.output_worker.close()
+
+
+class ConsoleTarget(Target):
+    def __init__(self, frame_times, highlight=False):
+        from ui.elements.ssh_console import SSHConsole
+
+        console = SSHConsole({"hostname": "benchmark"}, None)
+        super().__init__(console, frame_times)
+        console.render_scheduler.render = self.timed(console.render_scheduler.render)
+        if highlight:
+            from ui.elements.keyword_highlighter import KeywordMatcher
+
+            console.set_keywords(KeywordMatcher(BENCHMARK_KEYWORDS))
+
+    def write(self, text):
+        self.widget.append_output(text)
+
+    def idle(self):
+        return not self.widget.render_scheduler.pending
+
+    def close(self):
+        self.widget.render_scheduler.clear()
+
+
+def make_target(name, frame_times):
+    if name == "ssh_tab":
+        return SSHTabTarget(frame_times)
+    return ConsoleTarget(frame_times, highlight=name == "highlighter")
+
+
+# -- running ----------------------------------------------------------------
+
+
+def run_case(target_name, stream_name, size, chunk_size):
+    """Run one case in this process.
+
+    Returns:
+        dict: The measured metrics.
+    """
+    from PyQt5.QtCore import QEventLoop, QTimer
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    frame_times = []
+    target = make_target(target_name, frame_times)
+    target.widget.resize(900, 600)
+    target.widget.show()
+    app.processEvents()
+    frame_times.clear()
+    # Generated up front, so only the terminal is timed.
+    chunks = iter(list(chunked(make_stream(stream_name, size), chunk_size)))
+
+    loop = QEventLoop()
+    state = {"bytes": 0, "blocked": 0.0, "max_gap": 0.0, "last_beat": None, "fed": False}
+
+    def beat():
+        now = time.perf_counter()
+        if state["last_beat"] is not None:
+            late = now - state["last_beat"] - HEARTBEAT_MS / 1000
+            if late > 0:
+                state["blocked"] += late
+                state["max_gap"] = max(state["max_gap"], late)
+        state["last_beat"] = now
+
+    def feed():
+        # One read per event loop pass, like a socket notifier would deliver.
+        chunk = next(chunks, None)
+        if chunk is None:
+            state["fed"] = True
+        else:
+            state["bytes"] += len(chunk.encode("utf-8"))
+            target.write(chunk)
+        if not state["fed"]:
+            feeder.start()
+        elif target.idle():
+            loop.quit()
+        else:
+            feeder.start(1)
+
+    heartbeat = QTimer()
+    heartbeat.setInterval(HEARTBEAT_MS)
+    heartbeat.timeout.connect(beat)
+    feeder = QTimer()
+    feeder.setSingleShot(True)
+    feeder.setInterval(0)
+    feeder.timeout.connect(feed)
+
+    start = time.perf_counter()
+    heartbeat.start()
+    feeder.start()
+    loop.exec_()
+    seconds = time.perf_counter() - start
+    heartbeat.stop()
+    target.close()
+
+    return {
+        "target": target_name,
+        "stream": stream_name,
+        "bytes": state["bytes"],
+        "seconds": round(seconds, 3),
+        "mb_per_s": round(state["bytes"] / seconds / 1e6, 2) if seconds else 0.0,
+        "frames": len(frame_times),
+        "frame_ms": {
+            "p50": round(percentile(frame_times, 50) * 1000, 3),
+            "p95": round(percentile(frame_times, 95) * 1000, 3),
+            "p99": round(percentile(frame_times, 99) * 1000, 3),
+            "max": round(max(frame_times, default=0.0) * 1000, 3),
+        },
+        "gui_blocked_ms": round(state["blocked"] * 1000, 1),
+        "gui_max_stall_ms": round(state["max_gap"] * 1000, 1),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_isolated(target_name, stream_name, args):
+    """Run one case in a child process and return its metrics."""
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.terminal_throughput",
+        "--case",
+        target_name,
+        stream_name,
+        "--size-mb",
+        str(args.size_mb),
+        "--chunk-size",
+        str(args.chunk_size),
+    ]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(
+            f"{target_name}/{stream_name} failed:\n{completed.stderr.strip()}"
+        )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def environment():
+    """Describe what the results were measured on."""
+    from PyQt5.QtCore import QT_VERSION_STR
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "qt": QT_VERSION_STR,
+        "platform": platform.platform(),
+    }
+
+
+def compare(results, baseline_path):
+    """Print the change of each case against a previous results file."""
+    with open(baseline_path) as f:
+        baseline = {
+            (result["target"], result["stream"]): result for result in json.load(f)["results"]
+        }
+    for result in results:
+        before = baseline.get((result["target"], result["stream"]))
+        if not before or not before["mb_per_s"]:
+            continue
+        change = 100 * (result["mb_per_s"] - before["mb_per_s"]) / before["mb_per_s"]
+        print(
+            f"{result['target']:>11} {os.path.basename(result['stream']):>12}: "
+            f"{change:+6.1f}% MB/s  frame p95 {before['frame_ms']['p95']:.2f} -> "
+            f"{result['frame_ms']['p95']:.2f} ms"
+        )
+
+
+def main(args):
+    if args.case:
+        result = run_case(*args.case, int(args.size_mb * 1024 * 1024), args.chunk_size)
+        print(json.dumps(result))
+        return
+
+    streams = (args.stream or list(STREAMS)) + (args.recording or [])
+    results = []
+    for target_name in args.target or TARGETS:
+        for stream_name in streams:
+            result = run_isolated(target_name, stream_name, args)
+            results.append(result)
+            frame = result["frame_ms"]
+            print(
+                f"{target_name:>11} {os.path.basename(stream_name):>12}: "
+                f"{result['mb_per_s']:7.2f} MB/s  frame p50 {frame['p50']:.2f} "
+                f"p95 {frame['p95']:.2f} p99 {frame['p99']:.2f} ms  "
+                f"blocked {result['gui_blocked_ms']:.0f} ms "
+                f"(max {result['gui_max_stall_ms']:.0f})  rss {result['peak_rss_mb']} MB"
+            )
+    if args.baseline:
+        compare(results, args.baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--target", action="append", choices=TARGETS, help="repeatable")
+    parser.add_argument("--stream", action="append", choices=STREAMS, help="repeatable")
+    parser.add_argument(
+        "--recording", action="append", help="asciicast file to replay; repeatable"
+    )
+    parser.add_argument("--size-mb", type=float, default=8, help="output per case")
+    parser.add_argument("--chunk-size", type=int, default=4096, help="characters per read")
+    parser.add_argument("-o", "--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--case", nargs=2, metavar=("TARGET", "STREAM"), help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
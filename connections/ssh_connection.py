@@ -1,13 +1,16 @@
 import platform
 import shlex
 import socket
-import time
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import paramiko
 
 from ai.chief import Chief
+from utils.exec_channel import analyze_exec_result, run_exec
 from utils.logger import logger
+from utils.prompt_detector import CommandWaiter, PromptDetector, read_until
+from utils.transport_pool import (JumpHosts, PooledTransport, make_pool_params,
+                                  transport_pool)
 
 
 class SSHConnection:
@@ -20,6 +23,8 @@ class SSHConnection:
         port: int = 22,
         timeout: int = 10,
         chief: Optional[Chief] = None,
+        connection_profile: Optional[str] = None,
+        jump_hosts: JumpHosts = None,
     ):
         self.hostname = hostname
         self.username = username
@@ -27,37 +32,57 @@ class SSHConnection:
         self.key_filename = key_filename
         self.port = port
         self.timeout = timeout
+        self.connection_profile = connection_profile
+        self.jump_hosts = jump_hosts
         self.client: Optional[paramiko.SSHClient] = None
+        self.transport: Optional[PooledTransport] = None
         self.shell: Optional[paramiko.Channel] = None
+        self.prompt_detector = PromptDetector()
         self.chief = chief
         self.session_history: List[str] = []
 
     def connect(self) -> bool:
         try:
-            self.client = paramiko.SSHClient()
-            self.client.load_system_host_keys()
-            # Use RejectPolicy instead of AutoAddPolicy
-            self.client.set_missing_host_key_policy(paramiko.RejectPolicy())
-
             logger.debug(f"Connecting to {self.hostname} as {self.username}")
-            self.client.connect(
-                hostname=self.hostname,
-                port=self.port,
-                username=self.username,
-                password=self.password,
-                key_filename=self.key_filename,
-                timeout=self.timeout,
-                allow_agent=False,
-                look_for_keys=False,
+            # Shared transport, under the same pool key as tabs and polling
+            self.transport = transport_pool.acquire(
+                **make_pool_params(
+                    self.hostname,
+                    self.port,
+                    self.username,
+                    self.password,
+                    self.key_filename,
+                    self.connection_profile,
+                    self.jump_hosts,
+                    timeout=self.timeout,
+                )
             )
-            self.shell = self.client.invoke_shell()
+            self.client = self.transport.client
+            self.shell = self.transport.open_shell()
             logger.debug("SSH client connected successfully.")
             return True
         except Exception as e:
             logger.error(f"Failed to connect: {str(e)}")
             return False
 
-    import ssl
+    def run(
+        self,
+        command: str,
+        timeout: int = 30,
+        on_stdout: Optional[Callable[[str], None]] = None,
+        on_stderr: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, Any]:
+        if not self.transport:
+            raise ConnectionError("No active connection")
+        result = run_exec(
+            self.transport,
+            command,
+            timeout,
+            on_stdout=on_stdout,
+            on_stderr=on_stderr,
+        )
+        self.session_history.append(command)
+        return result
 
     def execute_command(
         self, command: str, timeout: int = 30
@@ -67,143 +92,67 @@ class SSHConnection:
             return None, "No active connection"
 
         try:
-            sanitized_command = shlex.quote(command)
             if command.strip() == "history":
                 return self._get_history(), None
             elif command.strip() == "ll":
                 return self.execute_command("ls -la")[0], None
 
-            if self.chief:
-                device_info = self.get_device_info()
-                impact = self.chief.explain_command_impact(command, device_info)
-                logger.info(f"Command impact: {impact}")
-
-            # Creating a secure SSL context
-            ssl_context = ssl.create_default_context()  # Verified SSL context
-            # Assume self.client is modified to use this ssl_context
-            stdin, stdout, stderr = self.client.exec_command(
-                sanitized_command, timeout=timeout
-            )
-            output = stdout.read().decode()
-            error = stderr.read().decode()
-
-            self.session_history.append(command)
-
-            if self.chief:
-                analysis = self.chief.analyze_command_output(command, output)
-                logger.info(f"Command analysis: {analysis}")
-
-            return output, error
+            result = self.run(command, timeout)
+            if result["timed_out"]:
+                return result["stdout"], f"Command timed out after {timeout}s"
+            return result["stdout"], result["stderr"]
         except Exception as e:
             logger.error(f"Failed to execute command: {str(e)}")
             return None, str(e)
 
+    async def analyze_command(
+        self, result: Dict[str, Any], os_type: str = "unknown"
+    ) -> Optional[Dict[str, Any]]:
+        analysis = await analyze_exec_result(self.chief, result, os_type)
+        if analysis is not None:
+            logger.info(f"Command analysis: {analysis}")
+        return analysis
+
     def _get_history(self) -> str:
         history = "\n".join(
             f"{i + 1}  {cmd}" for i, cmd in enumerate(self.session_history)
         )
         return history
 
-    import ssl
-
-    # Assuming previous code context within a class for SSH connection
+    def get_device_info(self) -> Dict[str, Any]:
+        if not self.transport:
+            logger.error("No active connection. Cannot retrieve device info.")
+            return {}
 
-    class SSHClient:
-        def __init__(self, hostname: str):
-            self.hostname = hostname
-            self.client = None
-
-        def connect(self):
-            try:
-                context = ssl.create_default_context()  # Create a secure SSL context
-                # Assuming Paramiko or an equivalent library is used for SSH connections.
-                self.client = paramiko.SSHClient()
-                self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                self.client.connect(
-                    self.hostname,
-                    username="username",
-                    password="password",
-                    ssl_context=context,
-                )
-            except Exception as e:
-                logger.error(f"Cannot establish connection: {str(e)}")
-
-        import ssl
-        
-        class DeviceInfoFetcher:
-            def __init__(self, hostname: str, client: Optional[Any] = None):
-                self.hostname = hostname
-                self.client = client
-                self.ssl_context = ssl.create_default_context()
-        
-            def get_device_info(self) -> Dict[str, Any]:
-                if not self.client:
-                    logger.error("No active connection. Cannot retrieve device info.")
-                    return {}
-        
-                try:
-                    stdin, stdout, stderr = self.client.exec_command("uname -a")
-                    uname_output = stdout.read().decode().strip()
-        
-                    stdin, stdout, stderr = self.client.exec_command("cat /etc/os-release")
-                    os_release = stdout.read().decode().strip()
-        
-                    device_info = {
-                        "hostname": self.hostname,
-                        "ip_address": socket.gethostbyname(self.hostname),
-                        "uname": uname_output,
-                        "os_release": os_release,
-                        "local_system": platform.system(),
-                        "local_release": platform.release(),
-                    }
-        
-                    return device_info
-                except Exception as e:
-                    logger.error(f"Failed to get device info: {str(e)}")
-                    return {}
-
-    import ssl
+        try:
+            uname_output = run_exec(self.transport, "uname -a", self.timeout)["stdout"]
+            os_release = run_exec(self.transport, "cat /etc/os-release", self.timeout)[
+                "stdout"
+            ]
+            return {
+                "hostname": self.hostname,
+                "ip_address": socket.gethostbyname(self.hostname),
+                "os": uname_output.split(" ", 1)[0] or "Unknown",
+                "uname": uname_output.strip(),
+                "os_release": os_release.strip(),
+                "local_system": platform.system(),
+                "local_release": platform.release(),
+            }
+        except Exception as e:
+            logger.error(f"Failed to get device info: {str(e)}")
+            return {}
 
     def suggest_command_completion(self, partial_command: str) -> List[str]:
-        if not self.client:
+        if not self.transport:
             return []
 
         try:
-            context = ssl.create_default_context()
-            stdin, stdout, stderr = self.client.exec_command(
-                f"compgen -c {partial_command}",
-                get_pty=True,
-                environment=None,
-                timeout=None,
-                banner_timeout=2.0,
-                auth_timeout=2.0,
-                compress=True,
-                term="xterm",
-                pkey=None,
-                key_filename=None,
-                password=None,
-                ciphers=None,
-                disabled_algorithms=None,
-                kex="diffie-hellman-group-exchange-sha256",
-                min_dh_group_size=None,
-                gss_auth=None,
-                gss_kex=None,
-                gss_deleg_creds=False,
-                gss_host=None,
-                gss_trust_dns=False,
-                banner_timeout=2.0,
-                redirect_stderr=None,
-                window_size=None,
-                client_mapping=None,
-                forwarded_channels=None,
-                disabled_algorithms=None,
-                ca_certs=None,
-                capath=None,
-                cadata=None,
-                context=context,
+            result = run_exec(
+                self.transport,
+                f"compgen -c {shlex.quote(partial_command)}",
+                self.timeout,
             )
-            completions = stdout.read().decode().splitlines()
-            return completions
+            return result["stdout"].splitlines()
         except Exception as e:
             logger.error(f"Failed to get command completions: {str(e)}")
             return []
@@ -232,27 +181,34 @@ class SSHConnection:
             return None
 
         try:
+            if not self.prompt_detector.learned:
+                greeting = []
+
+                def learn(chunk: str) -> bool:
+                    greeting.append(chunk)
+                    return self.prompt_detector.at_prompt("".join(greeting))
+
+                if read_until(self.shell, learn, timeout=min(timeout, 5)):
+                    self.prompt_detector.learn("".join(greeting))
+
             sanitized_command = shlex.quote(command)
+            waiter = CommandWaiter(self.prompt_detector, sanitized_command)
             self.shell.send(sanitized_command + "\n")
-            time.sleep(0.5)  # Give some time for the command to be processed
-            output = ""
-            start_time = time.time()
-            while (time.time() - start_time) < timeout:
-                if self.shell.recv_ready():
-                    chunk = self.shell.recv(4096).decode("utf-8")
-                    output += chunk
-                    if command in output and "\n" in output[output.index(command):]:
-                        break
-                time.sleep(0.1)
-            return output
+            if not read_until(self.shell, waiter.feed, timeout=timeout):
+                logger.warning(f"Timed out waiting for the prompt after: {command}")
+                return waiter.buffer
+            return waiter.output
         except Exception as e:
             logger.error(f"Failed to get shell output: {str(e)}")
             return None
 
     def close(self) -> None:
         if self.client:
-            self.client.close()
+            # The transport is pooled; only release this connection's shell.
+            if self.shell:
+                self.shell.close()
             self.client = None
+            self.transport = None
             self.shell = None
             logger.info(f"Closed connection to {self.hostname}")
 
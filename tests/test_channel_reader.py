@@ -0,0 +1,114 @@
+import asyncio
+import os
+
+import pytest
+
+from utils.channel_reader import (AdaptiveReadSize, ChannelReader,
+                                  drain_channel)
+
+
+class FakeChannel:
+    """Minimal paramiko-like channel whose fileno() is a real pipe."""
+
+    def __init__(self):
+        self.buffer = []
+        self.stderr = []
+        self.closed = False
+        self.eof_received = False
+        self._read_fd, self._write_fd = os.pipe()
+
+    def fileno(self):
+        return self._read_fd
+
+    def feed(self, data):
+        self.buffer.append(data)
+        os.write(self._write_fd, b"x")
+
+    def feed_stderr(self, data):
+        self.stderr.append(data)
+        os.write(self._write_fd, b"x")
+
+    def close(self):
+        self.closed = True
+        os.write(self._write_fd, b"x")
+
+    def recv_ready(self):
+        return bool(self.buffer)
+
+    def recv(self, max_bytes):
+        os.read(self._read_fd, 1)
+        return self.buffer.pop(0)[:max_bytes]
+
+    def recv_stderr_ready(self):
+        return bool(self.stderr)
+
+    def recv_stderr(self, max_bytes):
+        os.read(self._read_fd, 1)
+        return self.stderr.pop(0)[:max_bytes]
+
+
+def test_drain_channel_reports_eof():
+    channel = FakeChannel()
+    channel.feed(b"abc")
+    channel.eof_received = True
+    assert drain_channel(channel) == ([b"abc"], True)
+
+
+def test_drain_channel_takes_stderr_too():
+    channel = FakeChannel()
+    channel.feed_stderr(b"ls: cannot access\n")
+    channel.eof_received = True
+    assert drain_channel(channel) == ([b"ls: cannot access\n"], True)
+
+
+@pytest.mark.asyncio
+async def test_reader_consumes_pending_stderr():
+    channel = FakeChannel()
+    reader = ChannelReader(channel, asyncio.get_event_loop())
+    reader.start()
+
+    channel.feed_stderr(b"error\n")
+    channel.feed(b"out\n")
+    assert await reader.read(timeout=1) == b"out\nerror\n"
+    assert channel.stderr == []
+    # Nothing is left buffered, so the descriptor is no longer readable.
+    assert await reader.read(timeout=0.05) is None
+    reader.stop()
+
+
+@pytest.mark.asyncio
+async def test_reader_pushes_chunks_and_eof():
+    channel = FakeChannel()
+    reader = ChannelReader(channel, asyncio.get_event_loop())
+    reader.start()
+
+    assert await reader.read(timeout=0.05) is None
+
+    channel.feed(b"hello ")
+    channel.feed(b"world")
+    await asyncio.sleep(0.05)
+    assert await reader.read(timeout=1) == b"hello world"
+
+    channel.close()
+    assert await reader.read(timeout=1) == b""
+    assert await reader.read(timeout=1) == b""
+
+
+@pytest.mark.asyncio
+async def test_feed_eof_wakes_pending_reader():
+    reader = ChannelReader(FakeChannel(), asyncio.get_event_loop())
+    reader.start()
+    pending = asyncio.ensure_future(reader.read())
+    await asyncio.sleep(0)
+    reader.feed_eof()
+    assert await asyncio.wait_for(pending, 1) == b""
+
+
+def test_adaptive_read_size_grows_and_shrinks():
+    sizer = AdaptiveReadSize(minimum=4096, maximum=65536)
+    for _ in range(10):
+        sizer.update(sizer.size)
+    assert sizer.size == 65536
+    for _ in range(10):
+        sizer.update(80)
+    assert sizer.size == 4096
@@ -0,0 +1,85 @@
+import socket
+from unittest.mock import patch
+
+import paramiko
+import pytest
+
+from utils.connection_profiles import (CONNECTION_PROFILES, asyncssh,
+                                       asyncssh_connect_kwargs,
+                                       benchmark_profile, open_socket,
+                                       paramiko_connect_kwargs,
+                                       recommend_profile)
+
+
+def test_paramiko_kwargs_restrict_to_profile():
+    kwargs = paramiko_connect_kwargs("lan")
+    assert kwargs["compress"] is False
+    disabled = kwargs["disabled_algorithms"]
+    allowed = [
+        c for c in paramiko.Transport._preferred_ciphers if c not in disabled["ciphers"]
+    ]
+    assert allowed and set(allowed) <= set(CONNECTION_PROFILES["lan"]["ciphers"])
+
+
+def test_paramiko_kwargs_skip_unsupported_and_default():
+    assert paramiko_connect_kwargs(None) == {"compress": False}
+    assert paramiko_connect_kwargs("no-such-profile") == {"compress": False}
+    satellite = paramiko_connect_kwargs("satellite")
+    assert satellite["compress"] is True
+    # paramiko has no chacha20, the AES fallbacks of the profile stay enabled
+    assert "aes128-ctr" not in satellite["disabled_algorithms"]["ciphers"]
+
+
+@pytest.mark.skipif(asyncssh is None, reason="asyncssh is not installed")
+def test_asyncssh_kwargs_keep_profile_order():
+    kwargs = asyncssh_connect_kwargs("satellite")
+    assert kwargs["encryption_algs"][0] == "chacha20-poly1305@openssh.com"
+    assert kwargs["compression_algs"][0] == "zlib@openssh.com"
+    assert kwargs["tcp_keepalive"] is True
+
+
+def test_recommend_profile_prefers_throughput_then_handshake():
+    results = [
+        {"profile": "default", "mb_per_s": 10.0, "handshake_ms": 20.0, "error": None},
+        {"profile": "lan", "mb_per_s": 9.8, "handshake_ms": 5.0, "error": None},
+        {"profile": "legacy", "mb_per_s": 3.0, "handshake_ms": 1.0, "error": None},
+        {"profile": "satellite", "mb_per_s": None, "handshake_ms": None, "error": "x"},
+    ]
+    assert recommend_profile(results)["profile"] == "lan"
+    assert recommend_profile(results[3:]) is None
+
+
+def test_open_socket_sets_nodelay_and_keepalive():
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    try:
+        sock = open_socket("127.0.0.1", server.getsockname()[1], timeout=5)
+        assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+        assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+        sock.close()
+    finally:
+        server.close()
+
+
+@pytest.mark.skipif(asyncssh is None, reason="asyncssh is not installed")
+@pytest.mark.asyncio
+async def test_asyncssh_benchmark_checks_the_host_key(tmp_path):
+    known_hosts = tmp_path / "known_hosts"
+    known_hosts.write_text("")
+    params = {
+        "hostname": "router1",
+        "username": "admin",
+        "known_hosts": str(known_hosts),
+        "host_key_policy": paramiko.RejectPolicy(),
+    }
+    with patch(
+        "utils.connection_profiles.asyncssh.connect", side_effect=OSError("refused")
+    ) as connect:
+        result = await benchmark_profile(params, "default", backend="asyncssh")
+
+    assert result["error"] == "refused"
+    kwargs = connect.call_args.kwargs
+    assert kwargs["known_hosts"] == str(known_hosts)
+    client = kwargs["client_factory"]()
+    assert not client.validate_host_public_key("router1", "10.0.0.1", 22, None)
@@ -0,0 +1,107 @@
+import os
+import threading
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from utils.exec_channel import analyze_exec_result, collect_exec
+
+
+class FakeChannel:
+    """Exec channel whose stderr is written first and only drained concurrently."""
+
+    def __init__(self, stdout_chunks, stderr_chunks, exit_status=0):
+        self.stdout_chunks = list(stdout_chunks)
+        self.stderr_chunks = list(stderr_chunks)
+        self.exit_status = exit_status
+        self.status_event = threading.Event()
+        self.closed = False
+        self._read_fd, self._write_fd = os.pipe()
+        os.write(self._write_fd, b"x")
+        self._finish_if_drained()
+
+    @property
+    def eof_received(self):
+        return not self.stdout_chunks and not self.stderr_chunks
+
+    def _finish_if_drained(self):
+        if self.eof_received:
+            self.status_event.set()
+
+    def fileno(self):
+        return self._read_fd
+
+    def recv_ready(self):
+        # Like a remote that blocks on a full stderr window, stdout only
+        # becomes readable once stderr has been drained.
+        return bool(self.stdout_chunks) and not self.stderr_chunks
+
+    def recv_stderr_ready(self):
+        return bool(self.stderr_chunks)
+
+    def recv(self, size):
+        data = self.stdout_chunks.pop(0)
+        self._finish_if_drained()
+        return data
+
+    def recv_stderr(self, size):
+        data = self.stderr_chunks.pop(0)
+        self._finish_if_drained()
+        return data
+
+    def close(self):
+        self.closed = True
+        os.close(self._read_fd)
+        os.close(self._write_fd)
+
+
+def test_collect_exec_drains_both_streams_and_reports_status():
+    channel = FakeChannel([b"caf\xc3", b"\xa9\n"], [b"warn\n"] * 3, exit_status=2)
+    streamed = []
+
+    result = collect_exec(channel, "cmd", timeout=5, on_stderr=streamed.append)
+
+    assert result["stdout"] == "café\n"
+    assert result["stderr"] == "warn\n" * 3
+    assert streamed == ["warn\n"] * 3
+    assert result["exit_status"] == 2
+    assert not result["timed_out"]
+    assert (
+        result["first_byte"] is not None and result["elapsed"] >= result["first_byte"]
+    )
+    channel.close()
+
+
+def test_collect_exec_times_out_and_closes_channel():
+    channel = MagicMock()
+    channel.recv_ready.return_value = False
+    channel.recv_stderr_ready.return_value = False
+    channel.eof_received = False
+    channel.closed = False
+    read_fd, write_fd = os.pipe()
+    channel.fileno.return_value = read_fd
+
+    result = collect_exec(channel, "sleep 10", timeout=0.05)
+
+    assert result["timed_out"]
+    assert result["exit_status"] is None
+    channel.close.assert_called_once()
+    os.close(read_fd)
+    os.close(write_fd)
+
+
+@pytest.mark.asyncio
+async def test_analysis_is_opt_in_and_needs_a_working_chief():
+    result = {"command": "uptime", "stdout": "up 3 days", "stderr": ""}
+    assert await analyze_exec_result(None, result) is None
+
+    chief = MagicMock()
+    chief.is_functional.return_value = False
+    assert await analyze_exec_result(chief, result) is None
+
+    chief.is_functional.return_value = True
+    chief.analyze_command_output = AsyncMock(return_value={"summary": "ok"})
+    assert await analyze_exec_result(chief, result, "linux") == {"summary": "ok"}
+    chief.analyze_command_output.assert_awaited_once_with(
+        "uptime", "up 3 days", "linux"
+    )
@@ -0,0 +1,134 @@
+import csv
+import json
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from utils.fanout import (FanoutEngine, ResultExporter, run_host_commands,
+                          select_devices)
+
+DEVICES = [
+    {"name": f"sw{i}", "hostname": f"10.0.0.{i}", "username": "admin"}
+    for i in range(10)
+]
+
+
+def make_runner(delay=0.05, fail_hosts=(), hang_hosts=(), slow_hosts=()):
+    state = {"active": 0, "peak": 0, "calls": 0}
+    lock = threading.Lock()
+
+    def runner(device, commands, timeout):
+        with lock:
+            state["active"] += 1
+            state["calls"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        try:
+            if device["name"] in hang_hosts:
+                time.sleep(timeout * 2)
+            if device["name"] in slow_hosts:
+                raise TimeoutError(f"'{commands[0]}' did not finish within {timeout}s")
+            time.sleep(delay)
+            if device["name"] in fail_hosts:
+                raise ConnectionError("refused")
+            return [
+                {
+                    "command": c,
+                    "stdout": f"{device['name']}\n",
+                    "stderr": "",
+                    "exit_status": 0,
+                }
+                for c in commands
+            ]
+        finally:
+            with lock:
+                state["active"] -= 1
+
+    return runner, state
+
+
+def test_select_devices_by_pattern():
+    devices = DEVICES + [
+        {"name": "serial", "hostname": "", "connection_type": "Serial"}
+    ]
+    assert [d["name"] for d in select_devices(devices, pattern="sw1*")] == ["sw1"]
+    assert len(select_devices(devices)) == 10
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_and_streaming():
+    runner, state = make_runner()
+    engine = FanoutEngine(concurrency=3, timeout=5, retries=0, runner=runner)
+    results = await engine.run(DEVICES, ["show version"])
+
+    assert len(results) == 10
+    assert state["peak"] == 3
+    assert all(r["status"] == "ok" for r in results)
+    assert results[0]["outputs"][0]["command"] == "show version"
+
+
+@pytest.mark.asyncio
+async def test_timeouts_and_retries():
+    runner, state = make_runner(fail_hosts={"sw1"}, hang_hosts={"sw2"})
+    engine = FanoutEngine(
+        concurrency=10, timeout=0.2, retries=2, retry_delay=0.01, runner=runner
+    )
+    results = {r["device"]: r for r in await engine.run(DEVICES[:3], ["uptime"])}
+
+    assert results["sw0"]["status"] == "ok"
+    assert results["sw1"]["status"] == "error"
+    assert results["sw1"]["attempts"] == 3
+    assert results["sw2"]["status"] == "timeout"
+    # The hung runner's thread is still busy, so it was not started again.
+    assert results["sw2"]["attempts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_runner_timeouts_are_retried():
+    runner, state = make_runner(slow_hosts={"sw0"})
+    engine = FanoutEngine(timeout=5, retries=2, retry_delay=0.01, runner=runner)
+    (result,) = await engine.run(DEVICES[:1], ["uptime"])
+
+    assert result["status"] == "timeout"
+    assert result["attempts"] == 3
+    assert state["calls"] == 3
+
+
+def test_commands_share_the_host_budget():
+    budgets = []
+
+    def run_on_host(params, command, timeout):
+        budgets.append((params["timeout"], timeout))
+        time.sleep(0.1)
+        return {
+            "command": command,
+            "stdout": "",
+            "stderr": "",
+            "exit_status": 0,
+            "timed_out": False,
+        }
+
+    with patch("utils.fanout.run_on_host", side_effect=run_on_host):
+        run_host_commands(DEVICES[0], ["a", "b"], 0.5)
+        with pytest.raises(TimeoutError):
+            run_host_commands(DEVICES[0], ["a", "b", "c", "d", "e", "f"], 0.3)
+
+    assert budgets[0][0] == budgets[0][1] <= 0.5
+    assert budgets[1][1] <= 0.4
+
+
+@pytest.mark.asyncio
+async def test_exporters(tmp_path):
+    runner, _ = make_runner(delay=0)
+    engine = FanoutEngine(concurrency=5, runner=runner)
+    for name in ("out.jsonl", "out.csv"):
+        with ResultExporter(str(tmp_path / name)) as exporter:
+            await engine.run(DEVICES[:2], ["a", "b"], on_result=exporter.write)
+
+    lines = (tmp_path / "out.jsonl").read_text().splitlines()
+    assert {json.loads(line)["device"] for line in lines} == {"sw0", "sw1"}
+    with open(tmp_path / "out.csv", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 4
+    assert rows[0]["status"] == "ok"
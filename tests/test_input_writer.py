@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+
+from utils.input_writer import InputWriter
+
+
+@pytest.mark.asyncio
+async def test_keystrokes_are_coalesced_while_a_write_is_in_flight():
+    written = []
+
+    async def write(data):
+        written.append(data)
+        await asyncio.sleep(0.02)
+
+    writer = InputWriter(write, delay=0.01)
+    writer.send("l")
+    writer.send("s")
+    await asyncio.sleep(0.005)
+    for char in " -la\r":
+        writer.send(char)
+    assert writer.pending == 5
+    await writer.flush()
+
+    assert written == ["ls", " -la\r"]
+    assert writer.writes == 2 and writer.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_write_drops_the_rest():
+    async def write(data):
+        raise OSError("closed")
+
+    writer = InputWriter(write)
+    writer.send("x")
+    await writer.flush()
+    assert writer.writes == 0 and writer.pending == 0
@@ -0,0 +1,21 @@
+from PyQt5.QtCore import Qt
+
+from utils.key_encoder import encode_key
+
+
+def test_keys_encode_like_xterm():
+    assert encode_key(Qt.Key_A, Qt.NoModifier, "a") == "a"
+    assert encode_key(Qt.Key_C, Qt.ControlModifier, "\x03") == "\x03"
+    assert encode_key(Qt.Key_B, Qt.AltModifier, "b") == "\x1bb"
+    assert encode_key(Qt.Key_Return, Qt.NoModifier, "\r") == "\r"
+    assert encode_key(Qt.Key_Backspace, Qt.NoModifier, "\x08") == "\x7f"
+    assert encode_key(Qt.Key_Delete, Qt.NoModifier) == "\x1b[3~"
+    assert encode_key(Qt.Key_F1, Qt.NoModifier) == "\x1bOP"
+    assert encode_key(Qt.Key_Shift, Qt.ShiftModifier) is None
+
+
+def test_cursor_keys_follow_decckm_and_modifiers():
+    assert encode_key(Qt.Key_Up, Qt.NoModifier) == "\x1b[A"
+    assert encode_key(Qt.Key_Up, Qt.NoModifier, application_cursor=True) == "\x1bOA"
+    assert encode_key(Qt.Key_Up, Qt.ControlModifier) == "\x1b[1;5A"
+    assert encode_key(Qt.Key_PageUp, Qt.ShiftModifier) == "\x1b[5;2~"
@@ -0,0 +1,15 @@
+from ui.elements.keyword_highlighter import KeywordMatcher
+
+KEYWORDS = {
+    "errors": {"color": "#ff0000", "words": ["err", "error", "err-disabled"]},
+    "states": {"color": "#00ff00", "words": ["up", "down", "c++"]},
+}
+
+
+def test_matcher_finds_whole_words_in_one_pass():
+    matcher = KeywordMatcher(KEYWORDS)
+    spans = matcher.spans("Gi0/1 err-disabled, error: up/down upload c++ x")
+    assert [word for _, _, word in spans] == ["err-disabled", "error", "up", "down", "c++"]
+    assert spans[0][:2] == (6, 12)
+    assert KeywordMatcher({}).spans("error") == []
+
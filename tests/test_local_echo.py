@@ -0,0 +1,58 @@
+from utils.local_echo import EchoPredictor, is_password_prompt
+
+
+def screen(lines):
+    return lambda number: lines.get(number)
+
+
+def test_echo_confirms_predictions_and_measures_rtt():
+    predictor = EchoPredictor(threshold=0.1)
+    predictor.predict(5, 2, "ls -l", cells_left=78, columns=80, now=0.0)
+    assert predictor.pending() == [(5, 2, "ls -l")]
+    assert not predictor.active  # no round trip measured yet
+
+    assert predictor.check(screen({5: "$ ls"}), now=0.2)
+    assert predictor.pending() == [(5, 4, " -l")]
+    predictor.check(screen({5: "$ ls -l"}), now=0.3)
+    assert predictor.pending() == []
+    assert predictor.srtt == 0.3
+    assert predictor.active
+
+    # A fast link turns it off again, below half the threshold.
+    for _ in range(30):
+        predictor.predict(6, 2, "x", 78, 80, now=1.0)
+        predictor.check(screen({6: "$ x"}), now=1.01)
+    assert predictor.srtt < 0.05
+    assert not predictor.active
+
+
+def test_predictions_wrap_and_chain():
+    predictor = EchoPredictor()
+    predictor.predict(0, 6, "abcdef", cells_left=4, columns=10, now=0.0)
+    predictor.predict(0, 6, "gh", cells_left=4, columns=10, now=0.0)
+    assert predictor.pending() == [(0, 6, "abcd"), (1, 0, "ef"), (1, 2, "gh")]
+
+
+def test_mismatch_and_silence_roll_back():
+    predictor = EchoPredictor(mode="always")
+    predictor.predict(0, 0, "show run", 80, 80, now=0.0)
+    assert predictor.check(screen({0: "% Invalid"}), now=0.1)
+    assert predictor.pending() == []
+    assert predictor.echoing
+
+    predictor.predict(0, 10, "secret", 70, 80, now=1.0)
+    assert not predictor.check(screen({0: "Password: "}), now=1.5)
+    assert predictor.check(screen({0: "Password: "}), now=3.0)
+    assert not predictor.echoing and not predictor.active
+
+    predictor.predict(1, 0, "ok", 80, 80, now=4.0)
+    predictor.check(screen({1: "ok"}), now=4.1)
+    assert predictor.active
+
+
+def test_password_prompts_are_recognised():
+    assert is_password_prompt("[sudo] password for admin: ")
+    assert is_password_prompt("Enter passphrase for key '/root/.ssh/id_rsa':")
+    assert is_password_prompt("Password:")
+    assert not is_password_prompt("router#")
+    assert not is_password_prompt("user@host:~$ ")
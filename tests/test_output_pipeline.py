@@ -0,0 +1,71 @@
+import threading
+
+from utils.output_pipeline import (AnsiFilter, ByteRing, OutputPipeline,
+                                   ThroughputMeter)
+
+
+def test_ring_wraps_and_bounds_writes():
+    ring = ByteRing(8)
+    assert ring.write(b"abcdef") == 6
+    assert ring.read(4) == b"abcd"
+    assert ring.write(b"1234567") == 6  # only the free space is written
+    assert [bytes(view) for view in ring.peek()] == [b"ef12", b"3456"]
+    assert ring.read() == b"ef123456"
+    assert len(ring) == 0
+
+
+def test_pipeline_keeps_multibyte_characters_split_across_chunks():
+    seen = []
+    pipeline = OutputPipeline()
+    pipeline.add_stage(lambda view: seen.append(bytes(view)))
+    data = "naïve € ✓\n".encode()
+    text = "".join(pipeline.feed(data[i : i + 1]) for i in range(len(data)))
+
+    assert text == "naïve € ✓\n"
+    assert b"".join(seen) == data
+    pipeline.feed(b"\xe2\x82")
+    assert pipeline.flush() == "�"
+
+
+def test_ansi_filter_carries_partial_sequences():
+    ansi = AnsiFilter()
+    assert ansi.feed("\x1b[01;3") == ""
+    assert ansi.feed("2muser\x1b[0m@host\x1b]0;title\x07:~$ ") == "user@host:~$ "
+    assert ansi.feed("> continued\n") == "continued\n"
+
+
+def test_throughput_meter_uses_a_sliding_window():
+    now = [0.0]
+    meter = ThroughputMeter(window=2.0, clock=lambda: now[0])
+    for _ in range(4):
+        meter(memoryview(b"x" * 500_000))
+        now[0] += 0.5
+    assert meter.mb_per_s() == 1.0
+    now[0] += 10
+    assert meter.rate() == 0
+    assert meter.total == 2_000_000
+
+
+def test_throughput_meter_is_safe_across_threads():
+    meter = ThroughputMeter(window=0.001)
+    errors = []
+    done = threading.Event()
+
+    def read():
+        while not done.is_set():
+            try:
+                assert meter.rate() >= 0
+            except Exception as e:
+                errors.append(e)
+                return
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    for _ in range(100_000):
+        meter.add(10)
+    done.set()
+    reader.join()
+
+    assert not errors
+    assert meter.total == 1_000_000
+    assert meter._window_bytes == sum(count for _, count in meter._samples)
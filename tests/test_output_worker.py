@@ -0,0 +1,81 @@
+import threading
+
+from utils.output_worker import OutputWorker, merge_frames
+from utils.terminal_screen import TerminalScreen
+
+
+def test_worker_decodes_feeds_and_notifies_once_per_frame():
+    screen = TerminalScreen(20, 3)
+    ready = threading.Event()
+    notified, heard, fed = [], [], []
+    worker = OutputWorker(screen, on_frame=lambda: (notified.append(1), ready.set()))
+    worker.text_listeners.append(heard.append)
+    worker.add_screen_listener(fed.append)
+
+    worker.submit("héllo\r\n".encode()[:2])
+    worker.submit("héllo\r\n".encode()[2:] + b"\x1b[1mok")
+    worker.submit_text(" [local]")
+    worker.wait_idle()
+    assert ready.is_set() and worker.backlog == 0
+    assert "".join(heard) == "héllo\r\n\x1b[1mok"
+    assert "".join(fed) == "héllo\r\n\x1b[1mok [local]"
+
+    frame = worker.take_frame()
+    assert frame["rows"][0] == [("héllo", 0)]
+    assert [text for text, _ in frame["rows"][1]] == ["ok [local]"]
+    assert frame["cursor"] == (1, 10)
+    assert len(notified) == 1
+    worker.close()
+
+
+def test_merged_frames_shift_rows_and_keep_history():
+    screen = TerminalScreen(10, 3)
+    screen.feed("a\r\nb\r\nc")
+    first = screen.take_frame(10)
+    screen.feed("\r\nd\r\ne")
+    second = screen.take_frame(10)
+
+    merged = merge_frames(first, second, 10)
+    assert merged["scrolled"] == 2
+    assert [line.text() for line in merged["history"]] == ["a", "b"]
+    assert {row: runs[0][0] for row, runs in merged["rows"].items()} == {
+        0: "c",
+        1: "d",
+        2: "e",
+    }
+    assert merge_frames(first, second, 1)["history"][0].text() == "b"
+
+
+def test_suspended_worker_feeds_without_frames_and_catches_up():
+    screen = TerminalScreen(10, 3)
+    notified = []
+    worker = OutputWorker(screen, on_frame=lambda: notified.append(1), history_limit=0)
+    worker.suspend()
+    worker.submit_text("".join(f"{i}\r\n" for i in range(50)))
+    worker.wait_idle()
+    assert screen.display()[1] == "49"
+    assert notified == []
+    assert len(screen._dirty) <= screen.rows
+
+    worker.submit_text("\x1b[6n")  # a query is answered even while hidden
+    worker.wait_idle()
+    assert notified == [1]
+
+    worker.resume()
+    frame = worker.take_frame()
+    assert frame["scrolled"] == 48
+    assert {row: runs[0][0] for row, runs in frame["rows"].items() if runs} == {
+        0: "48",
+        1: "49",
+    }
+    worker.close()
+
+
+def test_resume_cuts_the_background_wait_short():
+    worker = OutputWorker(TerminalScreen(10, 3), background_budget=1)
+    worker.suspend()
+    worker.submit_text("x" * 100)  # 100 s at this budget
+    threading.Timer(0.1, worker.resume).start()
+    worker.wait_idle()
+    assert not worker.suspended
+    worker.close()
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from utils.paste_engine import (BRACKETED_PASTE_END, BRACKETED_PASTE_START,
+                                PasteEngine, paste_lines)
+
+
+def test_lines_end_in_carriage_returns():
+    assert paste_lines("a\r\nb\nc") == ["a\r", "b\r", "c"]
+    assert paste_lines("a\n\n") == ["a\r", "\r"]
+
+
+class Device:
+    """Echoes each line and a prompt, taking ``delay`` per line."""
+
+    def __init__(self, engine, delay=0.01, echo=True):
+        self.engine = engine
+        self.delay = delay
+        self.echo = echo
+        self.received = []
+        self.backlog = 0
+        self.peak = 0
+
+    async def write(self, data):
+        self.received.append(data)
+        self.backlog += 1
+        self.peak = max(self.peak, self.backlog)
+        asyncio.get_running_loop().call_later(self.delay, self.process, data)
+
+    def process(self, data):
+        self.backlog -= 1
+        if self.echo:
+            self.engine.output(data.rstrip("\r") + "\r\nrouter(config)#")
+
+
+@pytest.mark.asyncio
+async def test_lines_wait_for_their_echo():
+    engine = PasteEngine(None, max_window=4)
+    device = Device(engine)
+    engine.write = device.write
+    sent = []
+
+    text = "".join(f"interface Gi0/{i}\n" for i in range(20))
+    assert await engine.paste(text, progress=lambda done, total: sent.append(done))
+
+    assert "".join(device.received) == text.replace("\n", "\r")
+    assert sent[-1] == engine.total == len(text)
+    assert device.peak <= 4 and engine.window == 4
+    assert engine.srtt < 0.1
+
+
+@pytest.mark.asyncio
+async def test_silent_device_is_not_waited_for():
+    engine = PasteEngine(None)
+    device = Device(engine, echo=False)
+    engine.write = device.write
+    engine.srtt = 0.01
+    start = asyncio.get_running_loop().time()
+    assert await engine.paste("a\nb\nc\n")
+    assert not engine.echoing
+    assert asyncio.get_running_loop().time() - start < 1.5
+
+
+@pytest.mark.asyncio
+async def test_bracketed_paste_is_chunked_and_closed_on_abort():
+    written = []
+
+    async def write(data):
+        written.append(data)
+        if len(written) == 3:
+            engine.abort()
+
+    engine = PasteEngine(write, chunk_size=4)
+    assert not await engine.paste("line1\nline2\n" + BRACKETED_PASTE_END, bracketed=True)
+    assert written == [BRACKETED_PASTE_START, "line", "1\rli", BRACKETED_PASTE_END]
+    assert not engine.running
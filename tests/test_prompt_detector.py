@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+from utils.prompt_detector import CommandWaiter, PromptDetector
+
+
+@pytest.mark.parametrize(
+    "greeting, family, later_prompt",
+    [
+        ("Welcome\r\n\x1b[?2004htester@web01:~$ ", "linux", "tester@web01:/var/log$ "),
+        ("Last login\r\n[root@db1 ~]# ", "linux", "[root@db1 /etc]# "),
+        ("\r\nRouter1>", "cisco", "Router1(config-if)#"),
+        ("--- JUNOS 21.4R1\r\nadmin@mx480> ", "juniper", "{master:0}\r\nadmin@mx480# "),
+        ("\r\n# ", "root", "# "),
+    ],
+)
+def test_learns_prompt_families(greeting, family, later_prompt):
+    detector = PromptDetector()
+    assert detector.learn(greeting)
+    assert detector.family == family
+    assert detector.at_prompt("output\r\n" + later_prompt)
+
+
+def test_learned_prompt_rejects_other_hosts():
+    detector = PromptDetector()
+    detector.learn("Router1#")
+    assert not detector.at_prompt("Switch2#")
+    assert not detector.at_prompt("Router1#\r\nstill running\r\n")
+
+
+def test_waiter_completes_at_prompt():
+    detector = PromptDetector()
+    detector.learn("tester@web01:~$ ")
+    waiter = CommandWaiter(detector, "ls")
+    assert not waiter.feed("ls\r\n\x1b[?2004l\rfile1  file")
+    assert waiter.feed("2\r\n\x1b[?2004htester@web01:~$ ")
+    assert waiter.output == "file1  file2"
+
+
+def test_waiter_uses_sentinel_and_exit_status():
+    detector = PromptDetector()
+    detector.learn("tester@web01:~$ ")
+    command, token = detector.wrap_command("false")
+    waiter = CommandWaiter(detector, command, token)
+    echo = command.replace("\n", "") + "\r\n"
+    assert not waiter.feed(echo)
+    assert waiter.feed(f"{token}:1\r\ntester@web01:~$ ")
+    assert waiter.exit_status == 1
+    assert waiter.output == ""
+
+
+def test_waiter_stays_linear_on_large_output():
+    detector = PromptDetector()
+    detector.learn("tester@web01:~$ ")
+    command, token = detector.wrap_command("cat big.log")
+    waiter = CommandWaiter(detector, command, token)
+    waiter.feed(command.replace("\n", "") + "\r\n")
+    chunk = "\x1b[32m" + "x" * 4000 + "\x1b[0m\r\n"
+    start = time.perf_counter()
+    for _ in range(2000):  # 8 MB
+        assert not waiter.feed(chunk)
+    assert time.perf_counter() - start < 5
+    assert not waiter.feed(f"{token}:")
+    assert not waiter.feed("0")  # the status may go on
+    assert waiter.feed("\r\n\x1b[?2004htester@web01:~$ ")
+    assert waiter.exit_status == 0
+    assert len(waiter.output) == 2000 * 4001 - 1
+
+
+def test_waiter_keeps_escape_sequences_cut_between_chunks():
+    detector = PromptDetector()
+    detector.learn("Router1#")
+    waiter = CommandWaiter(detector, "show clock")
+    assert not waiter.feed("show clock\r\n12:00:00\r\n\x1b[")
+    assert waiter.feed("0mRouter1#")
+    assert waiter.output == "12:00:00"
@@ -0,0 +1,64 @@
+import json
+
+from utils.recording import Recording, SessionRecorder, apply_event, iter_events
+from utils.terminal_screen import TerminalScreen
+
+
+def test_snapshot_restores_screen_modes_and_alternate_buffer():
+    screen = TerminalScreen(20, 4)
+    screen.feed("one\r\n\x1b[1;31mtwo\x1b[0m\r\n\x1b[?1049h\x1b[2;3r\x1b[3;5Hfull")
+    copy = TerminalScreen(20, 4)
+    copy.restore(json.loads(json.dumps(screen.snapshot())))
+    for target in (screen, copy):
+        target.feed("\x1b[?1049lback")
+    assert copy.display() == screen.display()
+    assert [line.attrs for line in copy.buffer] == [line.attrs for line in screen.buffer]
+    assert (copy.cursor_x, copy.cursor_y) == (screen.cursor_x, screen.cursor_y)
+
+
+def test_recording_roundtrip_and_seek_matches_full_replay(tmp_path):
+    recorder = SessionRecorder(
+        "core/1", 30, 5, str(tmp_path), keyframe_interval=0.0, keyframe_chars=40
+    )
+    for i in range(60):
+        recorder.write(f"line {i} \x1b[32mé漢\x1b[0m\r\n")
+        if i == 30:
+            recorder.resize(24, 6)
+    recorder.resize(24, 6)
+    recorder.close()
+    assert recorder.path.startswith(str(tmp_path / "core_1-"))
+
+    events = list(iter_events(recorder.path))
+    assert recorder.events_written == len(events) == 61
+    assert [event[1:3] for event in events if event[1] == "r"] == [("r", "24x6")]
+
+    recording = Recording(recorder.path)
+    assert len(recording.keyframes) > 10
+    assert recording.duration == events[-1][0]
+    for position in (0.0, events[20][0], events[45][0], recording.duration):
+        seeked = recording.new_screen()
+        offset = recording.seek(position, seeked)
+        replayed = recording.new_screen()
+        for event_time, kind, data, next_offset in events:
+            if event_time > position:
+                break
+            apply_event(replayed, kind, data)
+        assert seeked.display() == replayed.display()
+        assert (seeked.columns, seeked.rows) == (replayed.columns, replayed.rows)
+        assert [event[:3] for event in iter_events(recorder.path, offset)] == [
+            event[:3] for event in events if event[0] > position
+        ]
+
+
+def test_cast_without_keyframes_is_indexed_on_open(tmp_path):
+    path = tmp_path / "plain.cast"
+    lines = [json.dumps({"version": 2, "width": 10, "height": 2})]
+    lines += [json.dumps([i * 3.0, "o", f"{i}\r\n"]) for i in range(6)]
+    path.write_text("\n".join(lines) + "\n")
+
+    recording = Recording(str(path))
+    assert (tmp_path / "plain.cast.idx").exists()
+    assert recording.duration == 15.0
+    screen = recording.new_screen()
+    recording.seek(7.0, screen)
+    assert screen.display() == ["2", ""]
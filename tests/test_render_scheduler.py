@@ -0,0 +1,32 @@
+from utils.render_scheduler import RenderScheduler
+
+
+def test_chunks_are_coalesced_into_one_render_per_frame(qapp):
+    fed, frames = [], []
+    scheduler = RenderScheduler(fed.append, lambda: frames.append("".join(fed)))
+    for chunk in ("a", "b", "c"):
+        scheduler.write(chunk)
+    assert frames == []
+    assert scheduler.pending == 3
+
+    scheduler.flush()
+    assert frames == ["abc"]
+    assert scheduler.pending == 0
+
+
+def test_flood_is_spread_over_frames_by_budget(qapp):
+    fed, frames = [], []
+    scheduler = RenderScheduler(
+        fed.append, lambda: frames.append(len("".join(fed))), frame_budget=4
+    )
+    scheduler.write("0123456789")
+
+    scheduler.flush()
+    assert frames == [4]
+    assert scheduler.pending == 6
+    assert scheduler._timer.isActive()  # the rest waits for the next frame
+
+    scheduler.flush_all()
+    assert frames == [4, 8, 10]
+    assert "".join(fed) == "0123456789"
+    assert not scheduler._timer.isActive()
@@ -0,0 +1,50 @@
+from utils.scrollback import ScrollbackStore, decode_line, encode_line
+
+
+def test_records_round_trip_runs_and_wrap_flag():
+    plain = encode_line([("show version", 0)])
+    assert len(plain) == len("show version") + 3
+    assert decode_line(plain).runs() == [("show version", 0)]
+
+    styled = decode_line(encode_line([("up", 513), (" ✓ ", 0)], wrapped=True))
+    assert styled.runs() == [("up", 513), (" ✓ ", 0)]
+    assert styled.wrapped
+    assert decode_line(encode_line([])).text() == ""
+
+
+def test_line_and_byte_caps_drop_the_oldest_lines():
+    store = ScrollbackStore(max_lines=5, page_bytes=16)
+    for number in range(12):
+        store.append([(f"line {number}", 0)])
+    assert (store.first, store.end, len(store)) == (7, 12, 5)
+    assert [line.text() for line in store] == [f"line {n}" for n in range(7, 12)]
+    assert store.line(9).text() == "line 9"
+
+    store = ScrollbackStore(max_bytes=100, page_bytes=32)
+    for number in range(100):
+        store.append([(f"line {number:03}", 0)])
+    assert store.total_bytes <= 100
+    assert store.line(store.end - 1).text() == "line 099"
+
+    store.clear()
+    assert len(store) == 0 and store.end == 100
+
+
+def test_full_pages_spill_to_disk_and_read_back(tmp_path):
+    store = ScrollbackStore(
+        max_bytes=40_000,
+        spill=True,
+        memory_bytes=2_000,
+        spill_dir=str(tmp_path),
+        page_bytes=512,
+    )
+    for number in range(5_000):
+        store.append([(f"Gi0/{number} is up", 0)])
+
+    assert store.memory_bytes <= 2_000
+    assert store.total_bytes <= 40_000
+    lines = store.lines(store.first, store.end)
+    assert lines[0].text() == f"Gi0/{store.first} is up"
+    assert lines[-1].text() == "Gi0/4999 is up"
+    assert store.line(store.first + 1).text() == f"Gi0/{store.first + 1} is up"
+    store.close()
@@ -0,0 +1,54 @@
+from utils.scrollback import ScrollbackStore
+from utils.scrollback_search import ScrollbackSearch, required_literals
+
+
+def _store(lines):
+    store = ScrollbackStore(page_bytes=512)
+    for text in lines:
+        store.append([(text, 0)])
+    return store
+
+
+def test_search_skips_pages_and_maps_matches_to_lines_and_columns():
+    store = _store([f"Gi0/{i} up" for i in range(1000)] + ["  日本 Error: disk"])
+    search = ScrollbackSearch(store, background=False)
+
+    assert search.search("gi0/123 ") == [(123, 0, 8)]
+    assert search.search("gi0/123 ", case_sensitive=True) == []
+    assert search.search("error", backwards=True) == [(1000, 5, 5)]
+    assert search.search(r"Gi0/99\d", regex=True, limit=3) == [
+        (990, 0, 7),
+        (991, 0, 7),
+        (992, 0, 7),
+    ]
+    search.close()
+
+
+def test_pagination_and_find_next_in_both_directions():
+    store = _store(["match a", "miss", "match b", "match c"])
+    search = ScrollbackSearch(store, background=True)
+    search.wait_indexed()
+
+    first = search.search("match", limit=2)
+    assert first == [(0, 0, 5), (2, 0, 5)]
+    assert search.search("match", after=first[-1]) == [(3, 0, 5)]
+    assert search.find_next("match", after=(3, 0, 5), backwards=True) == (2, 0, 5)
+    assert search.find_next("match", after=(3, 0, 5)) is None
+    search.close()
+
+
+def test_required_literals():
+    assert required_literals(r"error: \d+ drops") == ["error: ", " drops"]
+    assert required_literals("colou?r") == ["colo", "r"]
+    assert required_literals("up|down") == []
+
+
+def test_regex_matches_keep_to_their_line():
+    store = _store(["line one", "Gi0/1 is up", "Gi0/2 is down", "  line two up"])
+    search = ScrollbackSearch(store, background=False)
+
+    assert search.search("Gi0/.*up", regex=True) == [(1, 0, 11)]
+    assert search.search("^line", regex=True) == [(0, 0, 4)]
+    assert search.search("up$", regex=True) == [(1, 9, 2), (3, 11, 2)]
+    assert search.search("^Gi.*n$", regex=True, backwards=True) == [(2, 0, 13)]
+    search.close()
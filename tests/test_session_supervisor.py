@@ -0,0 +1,57 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from utils.session_supervisor import (SessionSupervisor, backoff_delay,
+                                      reconnect_with_backoff)
+
+
+def test_backoff_delay_grows_with_jitter_and_cap():
+    for attempt in range(8):
+        delay = backoff_delay(attempt, base_delay=1, max_delay=20, jitter=0.5)
+        ceiling = min(20, 2**attempt)
+        assert ceiling / 2 <= delay <= ceiling
+
+
+@pytest.mark.asyncio
+async def test_reconnect_with_backoff_retries_until_success():
+    outcomes = [ConnectionError("down"), False, True]
+    retries = []
+
+    async def connect():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert await reconnect_with_backoff(
+        connect, base_delay=0.001, on_retry=lambda *args: retries.append(args)
+    )
+    assert [attempt for attempt, _, _ in retries] == [1, 2]
+    assert isinstance(retries[0][2], ConnectionError)
+
+
+@pytest.mark.asyncio
+async def test_reconnect_with_backoff_gives_up():
+    async def connect():
+        return False
+
+    assert not await reconnect_with_backoff(connect, max_attempts=3, base_delay=0.001)
+
+
+@pytest.mark.asyncio
+async def test_supervisor_warms_pins_and_backs_off():
+    pool = MagicMock()
+    pool.is_warm.return_value = False
+    pool.acquire.side_effect = OSError("unreachable")
+    supervisor = SessionSupervisor(base_delay=10, pool=pool)
+    params = {"hostname": "router1", "username": "admin", "password": "pw"}
+    supervisor.favorites[supervisor._key(params)] = params
+    supervisor._state[supervisor._key(params)] = {"attempt": 0, "next_try": 0.0}
+
+    await supervisor.check_once()
+    await supervisor.check_once()
+    assert pool.acquire.call_count == 1  # second check is inside the backoff window
+
+    supervisor.remove_favorite(params)
+    pool.unpin.assert_called_once_with(supervisor._key(params))
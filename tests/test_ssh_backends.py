@@ -0,0 +1,76 @@
+import asyncio
+from unittest.mock import patch
+
+import asyncssh
+import paramiko
+import pytest
+
+from utils.host_keys import accept_unknown_host_key
+from utils.ssh_backends import AsyncSSHBackend, ParamikoBackend, create_backend
+
+PARAMS = {"hostname": "router1", "port": 22, "username": "admin"}
+
+
+def test_default_backend_is_paramiko():
+    assert isinstance(create_backend(None, PARAMS), ParamikoBackend)
+
+
+def test_unknown_backend_falls_back_to_paramiko():
+    assert isinstance(create_backend("telnet", PARAMS), ParamikoBackend)
+
+
+def test_asyncssh_backend_selected():
+    assert isinstance(create_backend("asyncssh", PARAMS), AsyncSSHBackend)
+
+
+def test_asyncssh_missing_falls_back_to_paramiko():
+    with patch("utils.ssh_backends.asyncssh", None):
+        assert isinstance(create_backend("asyncssh", PARAMS), ParamikoBackend)
+
+
+def test_unknown_host_keys_follow_the_paramiko_policy(tmp_path):
+    known_hosts = tmp_path / "known_hosts"
+    key = asyncssh.generate_private_key("ssh-ed25519").export_public_key().decode()
+    known_hosts.write_text(f"router1 {key}")
+    path = str(known_hosts)
+
+    # A host listed with another key is refused whatever the policy.
+    assert not accept_unknown_host_key(
+        paramiko.AutoAddPolicy(), path, "router1", "10.0.0.1", 22
+    )
+    assert not accept_unknown_host_key(None, path, "router2", "10.0.0.2", 22)
+    assert not accept_unknown_host_key(
+        paramiko.RejectPolicy(), path, "router2", "10.0.0.2", 22
+    )
+    assert accept_unknown_host_key(
+        paramiko.AutoAddPolicy(), path, "router2", "10.0.0.2", 22
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_connects_share_one_dial():
+    dials = []
+
+    class FakeConn:
+        def is_closed(self):
+            return False
+
+        def close(self):
+            pass
+
+    async def connect(host, **kwargs):
+        dials.append(host)
+        await asyncio.sleep(0.01)
+        return FakeConn()
+
+    with patch("utils.ssh_backends.asyncssh.connect", connect):
+        first, second = await asyncio.gather(
+            AsyncSSHBackend._shared_connection(PARAMS),
+            AsyncSSHBackend._shared_connection(PARAMS),
+        )
+    key = AsyncSSHBackend._connection_key(PARAMS)
+    assert first is second and dials == ["router1"]
+    assert AsyncSSHBackend._connections[key][1] == 2
+    AsyncSSHBackend._release(key)
+    AsyncSSHBackend._release(key)
+    assert key not in AsyncSSHBackend._connections
@@ -0,0 +1,77 @@
+from unittest.mock import patch
+
+import pytest
+
+from utils.device_status import device_pool_params
+from utils.fanout import run_host_commands
+from utils.local_echo import is_password_prompt
+from utils.ssh_backends import SSHBackend
+from utils.ssh_utils import SSHConnection
+from utils.transport_pool import pool_key
+
+
+class FakeBackend(SSHBackend):
+    name = "fake"
+
+    def __init__(self, chunks, os_name="Linux\n"):
+        super().__init__({})
+        self.chunks = list(chunks)
+        self.os_name = os_name
+        self.written = []
+        self.executed = []
+
+    async def connect(self, **kwargs):
+        self.channel = object()
+
+    async def read(self, max_bytes=None, timeout=None):
+        return self.chunks.pop(0) if self.chunks else None
+
+    async def write(self, data):
+        self.written.append(data)
+
+    async def exec_command(self, command, timeout=None):
+        self.executed.append(command)
+        return self.os_name
+
+
+@pytest.mark.asyncio
+async def test_login_output_is_kept_and_the_os_probe_stays_off_the_shell():
+    connection = SSHConnection("router1", "admin")
+    connection.backend = FakeBackend([b"Welcome to router1\r\n", b"admin@router1:~$ "])
+
+    assert await connection.async_connect() == (True, "linux")
+    assert connection.login_output == "Welcome to router1\r\nadmin@router1:~$ "
+    assert connection.backend.executed == ["uname -s"]
+    assert connection.backend.written == []
+
+
+def test_tabs_status_polls_and_fanout_share_one_pool_key():
+    device = {"name": "sw1", "hostname": "sw1", "username": "admin", "password": "pw"}
+    tab = SSHConnection("sw1", "admin", password="pw").pool_params()
+    fanout = []
+
+    def run_on_host(params, command, timeout):
+        fanout.append(params)
+        return {
+            "command": command,
+            "stdout": "",
+            "stderr": "",
+            "exit_status": 0,
+            "timed_out": False,
+        }
+
+    with patch("utils.fanout.run_on_host", side_effect=run_on_host):
+        run_host_commands(device, ["uptime"], 5)
+
+    assert pool_key(tab) == pool_key(device_pool_params(device)) == pool_key(fanout[0])
+
+
+@pytest.mark.asyncio
+async def test_wait_for_line_sees_a_prompt_split_across_chunks():
+    connection = SSHConnection("router1", "admin")
+    connection.backend = FakeBackend([b"sudo ls\r\n[sudo] pass", b"word for admin: "])
+    connection.backend.channel = object()
+
+    assert await connection.wait_for_line(is_password_prompt, "sudo ls\n", timeout=1)
+    assert connection.backend.written == ["sudo ls\n"]
+    assert not await connection.wait_for_line(is_password_prompt, timeout=0.05)
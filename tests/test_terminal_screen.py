@@ -0,0 +1,79 @@
+from utils.terminal_screen import (BOLD, TRUECOLOR, TerminalScreen, attr_bg,
+                                   attr_fg, attr_flags)
+
+
+def test_sgr_attributes_and_escapes_split_across_chunks():
+    screen = TerminalScreen(20, 4)
+    screen.feed("\x1b[1;3")
+    screen.feed("1mok\x1b[0m \x1b[38;5;196mx\x1b[38:2::10:20:30my\x1b[48;2;1;2;3mz")
+
+    runs = screen.line(0).runs()
+    assert [text for text, _ in runs] == ["ok", " ", "x", "y", "z"]
+    assert attr_flags(runs[0][1]) == BOLD and attr_fg(runs[0][1]) == 2
+    assert attr_fg(runs[2][1]) == 197
+    assert attr_fg(runs[3][1]) == TRUECOLOR | 0x0A141E
+    assert attr_bg(runs[4][1]) == TRUECOLOR | 0x010203
+
+
+def test_scrolling_feeds_scrollback_and_only_new_rows_are_dirty():
+    screen = TerminalScreen(10, 3, scrollback_lines=2)
+    screen.feed("a\r\nb\r\nc")
+    screen.take_changes()
+    screen.feed("\r\nd\r\ne\r\nf")
+
+    changes = screen.take_changes()
+    assert changes["scrolled"] == 3
+    assert changes["dirty"] == [0, 1, 2]
+    assert screen.display() == ["d", "e", "f"]
+    assert [line.text() for line in screen.scrollback] == ["b", "c"]
+
+    screen.feed("\n")
+    assert screen.take_changes()["dirty"] == [2]
+
+
+def test_alternate_screen_restores_main_screen_and_cursor():
+    screen = TerminalScreen(10, 3)
+    screen.feed("$ top")
+    screen.feed("\x1b[?1049h\x1b[H\x1b[2Jload 0.1\r\n\x1b[7mPID\x1b[m")
+    assert screen.alternate_screen
+    assert screen.display() == ["load 0.1", "PID", ""]
+
+    screen.feed("\x1b[?1049l")
+    assert not screen.alternate_screen
+    assert screen.display() == ["$ top", "", ""]
+    assert (screen.cursor_y, screen.cursor_x) == (0, 5)
+    assert not screen.scrollback
+
+
+def test_scroll_region_and_line_editing():
+    screen = TerminalScreen(10, 5)
+    screen.feed("0\r\n1\r\n2\r\n3\r\n4")
+    screen.feed("\x1b[2;4r\x1b[4;1H\n")  # scroll rows 2-4 only
+    assert screen.display() == ["0", "2", "3", "", "4"]
+    assert not screen.scrollback
+
+    screen.feed("\x1b[r\x1b[1;1H\x1b[2Pab\x1b[1@\x1b[K")
+    assert screen.line(0).text() == "ab"
+
+
+def test_wrapping_wide_characters_and_line_drawing():
+    screen = TerminalScreen(4, 3)
+    screen.feed("abcde日本\x1b(0qx\x1b(B")
+    assert screen.display() == ["abcd", "e日", "本─│"]
+    assert screen.line(0).wrapped
+
+
+def test_reports_are_queued_as_responses():
+    screen = TerminalScreen(10, 5)
+    screen.feed("\x1b[3;4H\x1b[6n\x1b[c")
+    assert screen.take_responses() == "\x1b[3;4R\x1b[?1;2c"
+    assert screen.take_responses() == ""
+
+
+def test_resize_pushes_rows_above_the_cursor_to_scrollback():
+    screen = TerminalScreen(10, 4)
+    screen.feed("a\r\nb\r\nc\r\nd")
+    screen.resize(6, 2)
+    assert screen.display() == ["c", "d"]
+    assert [line.text() for line in screen.scrollback] == ["a", "b"]
+    assert screen.take_changes()["rebuild"]
@@ -0,0 +1,114 @@
+from PyQt5 import QtCore
+from PyQt5.QtGui import QKeyEvent
+
+from ui.elements.terminal_view import TerminalView, cell_count, cell_to_index
+from utils.scrollback import ScrollbackStore
+from utils.terminal_screen import TerminalScreen
+
+
+def make_view(qapp, lines=0):
+    view = TerminalView(screen=TerminalScreen(40, 5, scrollback=ScrollbackStore()))
+    view.resize(400, 200)
+    view.show()
+    view.screen.feed("".join(f"line {i}\r\n" for i in range(lines)))
+    view.render()
+    return view
+
+
+def test_wide_characters_take_two_cells():
+    assert cell_count("ab") == 2
+    assert cell_count("a漢b") == 4
+    assert cell_to_index("a漢b", 1) == 1
+    assert cell_to_index("a漢b", 2) == 1
+    assert cell_to_index("a漢b", 3) == 2
+    assert cell_to_index("ab", 9) == 2
+
+
+def test_history_is_read_back_from_the_store(qapp):
+    view = make_view(qapp, lines=1000)
+    assert view._end == view.screen.scrollback.end == 996
+    assert view._line_count() == 1001
+    bar = view.verticalScrollBar()
+    assert bar.value() == bar.maximum()
+
+    bar.setValue(0)
+    assert view.line_at(0) == 0
+    view._selection = ((0, 0), (1, 10))
+    assert view.selected_text() == "line 0\nline 1"
+
+
+def test_frames_drop_only_the_rows_they_change(qapp):
+    view = make_view(qapp)
+    view.screen.feed("one\r\ntwo")
+    view.render()
+    view.viewport().grab()
+    cached = dict(view._cache)
+
+    view.screen.feed("!")
+    view.render()
+    assert view._rows[1] == [("two!", 0)]
+    assert 1 not in view._cache
+    assert view._cache[0] is cached[0]
+
+
+def test_view_stays_put_while_output_scrolls(qapp):
+    view = make_view(qapp, lines=100)
+    bar = view.verticalScrollBar()
+    bar.setValue(0)
+    view.screen.feed("".join(f"more {i}\r\n" for i in range(50)))
+    view.render()
+    assert bar.value() == 0
+    assert view.line_at(0) == 0
+
+
+def test_typed_text_is_edited_locally(qapp):
+    view = make_view(qapp)
+    view.screen.feed("$ ")
+    view.render()
+    for key, text in ((QtCore.Qt.Key_L, "l"), (QtCore.Qt.Key_S, "s")):
+        view.keyPressEvent(QKeyEvent(QtCore.QEvent.KeyPress, key, QtCore.Qt.NoModifier, text))
+    view.keyPressEvent(
+        QKeyEvent(QtCore.QEvent.KeyPress, QtCore.Qt.Key_Left, QtCore.Qt.NoModifier)
+    )
+    view.keyPressEvent(
+        QKeyEvent(QtCore.QEvent.KeyPress, QtCore.Qt.Key_Backspace, QtCore.Qt.NoModifier)
+    )
+    assert view.typed_text() == "s"
+    assert view._cursor == (0, 2)
+
+    view.replace_typed_text("")
+    assert view.typed_text() == ""
+
+
+def test_append_writes_lines_like_a_text_edit(qapp):
+    view = make_view(qapp)
+    view.screen.feed("partial")
+    view.append("hello\nworld")
+    view.render()
+    assert view.screen.display()[:3] == ["partial", "hello", "world"]
+
+    view.clear()
+    assert view._line_count() == view.screen.rows
+    assert view.screen.display()[0] == ""
+
+
+def test_hidden_view_draws_once_shown(qapp):
+    view = make_view(qapp)
+    view.hide()
+    view.screen.feed("".join(f"line {i}\r\n" for i in range(20)))
+    view.render()
+    assert view._end == 0
+
+    view.show()
+    assert view._end == 16
+    assert view._rows[0] == [("line 16", 0)]
+
+
+def test_read_only_view_ignores_typing(qapp):
+    view = make_view(qapp)
+    view.setReadOnly(True)
+    view.keyPressEvent(
+        QKeyEvent(QtCore.QEvent.KeyPress, QtCore.Qt.Key_A, QtCore.Qt.NoModifier, "a")
+    )
+    assert view.isReadOnly()
+    assert view.typed_text() == ""
@@ -0,0 +1,48 @@
+import threading
+
+from utils.transcript import TranscriptWriter, read_transcript
+
+
+def read_all(writer):
+    return [chunk for path in writer.files for _, chunk in read_transcript(path)]
+
+
+def test_transcript_roundtrip_and_rotation(tmp_path):
+    writer = TranscriptWriter(
+        "router 1", str(tmp_path), compression="gzip", max_bytes=100, max_files=2
+    )
+    chunks = [b"line %d\r\n" % i for i in range(60)]
+    for chunk in chunks:
+        writer(memoryview(chunk))
+    writer.close()
+
+    assert writer.bytes_dropped == 0
+    assert len(writer.files) == 2
+    assert all(path.endswith(".log.gz") for path in writer.files)
+    assert writer.current_file.startswith(str(tmp_path / "router_1-"))
+    # Older files were rotated away; what is left is the tail, in order.
+    kept = read_all(writer)
+    assert kept == chunks[-len(kept) :]
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_full_queue_drops_without_blocking_and_marks_the_gap(tmp_path):
+    writer = TranscriptWriter("sw1", str(tmp_path), compression="gzip", queue_size=1)
+    release = threading.Event()
+    write_record = writer._write_record
+
+    def slow_write(timestamp, data):
+        release.wait(5)
+        write_record(timestamp, data)
+
+    writer._write_record = slow_write
+    results = [writer.write(b"x" * 10) for _ in range(20)]
+    release.set()
+    writer.close()
+
+    assert not all(results)
+    assert writer.bytes_dropped == 10 * results.count(False)
+    chunks = read_all(writer)
+    assert f"[transcript: {writer.bytes_dropped} bytes dropped]".encode() in b"".join(
+        chunks
+    )
@@ -0,0 +1,202 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import paramiko
+import pytest
+
+from utils.transport_pool import (PoolExhaustedError, TransportPool,
+                                  make_pool_key, normalize_jump_hosts)
+
+
+def make_client():
+    """Create a mocked, connected paramiko SSHClient."""
+    client = MagicMock()
+    transport = client.get_transport.return_value
+    transport.is_active.return_value = True
+    transport.is_authenticated.return_value = True
+    transport.open_session.side_effect = lambda **kwargs: MagicMock(closed=False)
+    transport.open_channel.side_effect = lambda *args, **kwargs: MagicMock(closed=False)
+    return client
+
+
+@pytest.fixture
+def ssh_client_class():
+    with patch("utils.transport_pool.paramiko.SSHClient") as client_class:
+        client_class.side_effect = make_client
+        yield client_class
+
+
+@pytest.fixture
+def pool():
+    pool = TransportPool(max_channels_per_transport=2, idle_timeout=0)
+    pool._ensure_janitor = MagicMock()
+    yield pool
+    pool.close_all()
+
+
+def test_pool_key_hides_credentials():
+    key = make_pool_key("router1", 22, "admin", password="secret")
+    assert "secret" not in "".join(str(part) for part in key)
+    assert key != make_pool_key("router1", 22, "admin", password="other")
+
+
+def test_channels_share_one_transport(pool, ssh_client_class):
+    shell = pool.open_shell("router1", username="admin", password="secret")
+    pool.exec_command("router1", "uptime", username="admin", password="secret")
+
+    assert ssh_client_class.call_count == 1
+    assert shell.invoke_shell.called
+    assert pool.stats() == {"admin@router1:22": [2]}
+
+
+def test_full_transport_opens_a_second_one(pool, ssh_client_class):
+    for _ in range(3):
+        pool.open_exec("router1", "uptime", username="admin", password="secret")
+
+    assert ssh_client_class.call_count == 2
+    assert sorted(pool.stats()["admin@router1:22"]) == [1, 2]
+
+
+def test_max_transports_per_key(ssh_client_class):
+    pool = TransportPool(max_channels_per_transport=1, max_transports_per_key=1)
+    pool._ensure_janitor = MagicMock()
+    pool.open_exec("router1", "uptime", username="admin")
+    with pytest.raises(PoolExhaustedError):
+        pool.open_exec("router1", "uptime", username="admin")
+
+
+def test_concurrent_acquires_stay_within_the_channel_limit(ssh_client_class):
+    pool = TransportPool(max_channels_per_transport=2, max_transports_per_key=1)
+    pool._ensure_janitor = MagicMock()
+    pool.acquire("router1", username="admin", reserve=False)
+
+    def acquire(_):
+        try:
+            return pool.acquire("router1", username="admin")
+        except PoolExhaustedError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        granted = [t for t in executor.map(acquire, range(8)) if t is not None]
+    assert len(granted) == 2
+
+    # Opening the channels takes the reserved slots rather than adding to them.
+    for transport in granted:
+        transport.open_exec("uptime")
+    assert pool.stats() == {"admin@router1:22": [2]}
+    with pytest.raises(PoolExhaustedError):
+        pool.acquire("router1", username="admin")
+
+
+def test_channels_opened_during_a_prune_are_counted(pool, ssh_client_class):
+    transport = pool.acquire("router1", username="admin", reserve=False)
+    transport.open_exec("uptime")
+    opener = threading.Thread(target=transport.open_exec, args=("uptime",))
+
+    class PrunedChannels(list):
+        def __iter__(self):
+            yield from list.__iter__(self)
+            # A channel opens after the open ones were listed, before the
+            # pruned list replaces this one.
+            if opener.ident is None:
+                opener.start()
+                opener.join(timeout=0.2)
+
+    transport.channels = PrunedChannels(transport.channels)
+    transport.active_channels
+    opener.join()
+    assert transport.active_channels == 2
+
+
+def test_health_checks_run_outside_the_pool_lock(pool, ssh_client_class):
+    transport = pool.acquire("router1", username="admin", reserve=False)
+    pool.health_check_interval = 0
+    blocked = []
+
+    def send_ignore():
+        locker = threading.Thread(target=pool.stats)
+        locker.start()
+        locker.join(timeout=1)
+        blocked.append(locker.is_alive())
+
+    transport.transport.send_ignore.side_effect = send_ignore
+    pool.check_health()
+    assert blocked == [False]
+
+
+def test_idle_and_dead_transports_are_evicted(pool, ssh_client_class):
+    channel = pool.open_exec("router1", "uptime", username="admin")
+    pool.open_exec("router2", "uptime", username="admin")
+    dead = pool.acquire("router2", username="admin")
+    dead.transport.is_active.return_value = False
+
+    pool.check_health()
+    assert list(pool.stats()) == ["admin@router1:22"]
+
+    channel.closed = True
+    pool.check_health()
+    assert pool.stats() == {}
+
+
+def test_pinned_transports_survive_idle_eviction(pool, ssh_client_class):
+    transport = pool.acquire("router1", username="admin")
+    pool.pin(transport.key)
+    pool.check_health()
+    assert pool.is_warm(transport.key)
+
+    pool.unpin(transport.key)
+    pool.check_health()
+    assert not pool.is_warm(transport.key)
+
+
+def test_normalize_jump_hosts():
+    assert normalize_jump_hosts(None) == []
+    assert normalize_jump_hosts("admin@bastion, ops@[2001:db8::1]:2222") == [
+        {"hostname": "bastion", "port": 22, "username": "admin"},
+        {"hostname": "2001:db8::1", "port": 2222, "username": "ops"},
+    ]
+    assert normalize_jump_hosts(
+        [{"hostname": "bastion", "name": "B", "password": "pw"}]
+    ) == [{"hostname": "bastion", "password": "pw", "port": 22}]
+    with pytest.raises(ValueError):
+        normalize_jump_hosts("admin@bastion:ssh")
+    assert make_pool_key("10.0.0.1", jump_hosts="site-a") != make_pool_key(
+        "10.0.0.1", jump_hosts="site-b"
+    )
+
+
+def test_devices_behind_a_bastion_share_its_transport(pool, ssh_client_class):
+    bastion = {"hostname": "bastion", "username": "jump", "password": "pw"}
+    for host in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+        pool.open_exec(host, "uptime", username="admin", jump_hosts=[bastion])
+
+    # One bastion transport plus one per device, each tunnelled through it.
+    assert ssh_client_class.call_count == 4
+    bastion_transport = pool.acquire(**bastion)
+    assert bastion_transport.active_channels == 0
+    assert bastion_transport.active_tunnels == 3
+    destinations = [
+        c.args[1] for c in bastion_transport.transport.open_channel.call_args_list
+    ]
+    assert destinations == [("10.0.0.1", 22), ("10.0.0.2", 22), ("10.0.0.3", 22)]
+    assert (
+        pool.acquire(
+            "10.0.0.1", username="admin", jump_hosts=[bastion]
+        ).client.connect.call_args.kwargs["sock"]
+        in bastion_transport.tunnels
+    )
+
+    # Open tunnels keep the bastion from being evicted as idle.
+    pool.check_health()
+    assert pool.is_warm(bastion_transport.key)
+
+
+def test_transports_are_not_shared_across_host_key_policies(pool, ssh_client_class):
+    pool.acquire("router1", username="admin", host_key_policy=paramiko.AutoAddPolicy())
+    pool.acquire("router1", username="admin", host_key_policy=paramiko.RejectPolicy())
+    pool.acquire("router1", username="admin")
+    assert ssh_client_class.call_count == 2
+
+    assert make_pool_key("router1", look_for_keys=False) != make_pool_key("router1")
+    assert make_pool_key("router1", allow_agent=False) != make_pool_key("router1")
@@ -0,0 +1,259 @@
+import asyncio
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import (QDialog, QFileDialog, QFormLayout, QHBoxLayout,
+                             QHeaderView, QLabel, QLineEdit, QListWidget,
+                             QListWidgetItem, QMessageBox, QPlainTextEdit,
+                             QPushButton, QSpinBox, QSplitter, QTableWidget,
+                             QTableWidgetItem, QVBoxLayout, QWidget)
+
+from utils.fanout import (DEFAULT_CONCURRENCY, DEFAULT_RETRIES,
+                          DEFAULT_TIMEOUT, FanoutEngine, ResultExporter,
+                          select_devices)
+from utils.logger import logger
+
+
+class FanoutDialog(QDialog):
+    """Runs commands on a selection of inventory devices and streams the results."""
+
+    STATUS_COLORS = {
+        "ok": Qt.darkGreen,
+        "failed": Qt.darkYellow,
+        "error": Qt.red,
+        "timeout": Qt.red,
+        "cancelled": Qt.gray,
+    }
+
+    def __init__(self, devices, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Run Command on Devices")
+        self.resize(900, 600)
+        self.devices = select_devices(devices)
+        self.engine = None
+        self.exporter = None
+        self.run_task = None
+        self.results = []
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        splitter = QSplitter(Qt.Horizontal)
+
+        # Device selection
+        device_panel = QWidget()
+        device_layout = QVBoxLayout(device_panel)
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filter, e.g. core-sw-*")
+        self.filter_input.textChanged.connect(self.apply_filter)
+        device_layout.addWidget(self.filter_input)
+        self.device_list = QListWidget()
+        for device in self.devices:
+            item = QListWidgetItem(f"{device.get('name')} ({device['hostname']})")
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked)
+            item.setData(Qt.UserRole, device)
+            self.device_list.addItem(item)
+        device_layout.addWidget(self.device_list)
+        toggle_layout = QHBoxLayout()
+        select_all = QPushButton("All")
+        select_all.clicked.connect(lambda: self.set_all_checked(Qt.Checked))
+        select_none = QPushButton("None")
+        select_none.clicked.connect(lambda: self.set_all_checked(Qt.Unchecked))
+        toggle_layout.addWidget(select_all)
+        toggle_layout.addWidget(select_none)
+        device_layout.addLayout(toggle_layout)
+        splitter.addWidget(device_panel)
+
+        # Commands, options and results
+        run_panel = QWidget()
+        run_layout = QVBoxLayout(run_panel)
+        run_layout.addWidget(QLabel("Commands (one per line):"))
+        self.commands_input = QPlainTextEdit()
+        self.commands_input.setFont(QFont("Consolas", 10))
+        self.commands_input.setMaximumHeight(100)
+        run_layout.addWidget(self.commands_input)
+
+        options = QFormLayout()
+        self.concurrency_input = QSpinBox()
+        self.concurrency_input.setRange(1, 1000)
+        self.concurrency_input.setValue(DEFAULT_CONCURRENCY)
+        options.addRow("Concurrent hosts:", self.concurrency_input)
+        self.timeout_input = QSpinBox()
+        self.timeout_input.setRange(1, 3600)
+        self.timeout_input.setValue(DEFAULT_TIMEOUT)
+        self.timeout_input.setSuffix(" s")
+        options.addRow("Timeout per host:", self.timeout_input)
+        self.retries_input = QSpinBox()
+        self.retries_input.setRange(0, 10)
+        self.retries_input.setValue(DEFAULT_RETRIES)
+        options.addRow("Retries:", self.retries_input)
+        export_layout = QHBoxLayout()
+        self.export_input = QLineEdit()
+        self.export_input.setPlaceholderText("Optional .jsonl or .csv file")
+        browse_button = QPushButton("Browse")
+        browse_button.clicked.connect(self.browse_export)
+        export_layout.addWidget(self.export_input)
+        export_layout.addWidget(browse_button)
+        options.addRow("Export to:", export_layout)
+        run_layout.addLayout(options)
+
+        self.results_table = QTableWidget(0, 4)
+        self.results_table.setHorizontalHeaderLabels(
+            ["Device", "Status", "Time (s)", "Output"]
+        )
+        self.results_table.horizontalHeader().setSectionResizeMode(
+            3, QHeaderView.Stretch
+        )
+        self.results_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.results_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.results_table.itemSelectionChanged.connect(self.show_selected_result)
+        run_layout.addWidget(self.results_table)
+
+        self.output_view = QPlainTextEdit()
+        self.output_view.setReadOnly(True)
+        self.output_view.setFont(QFont("Consolas", 9))
+        run_layout.addWidget(self.output_view)
+        splitter.addWidget(run_panel)
+        splitter.setSizes([250, 650])
+        layout.addWidget(splitter)
+
+        button_layout = QHBoxLayout()
+        self.progress_label = QLabel("")
+        self.run_button = QPushButton("Run")
+        self.run_button.clicked.connect(self.start_run)
+        self.stop_button = QPushButton("Stop")
+        self.stop_button.setEnabled(False)
+        self.stop_button.clicked.connect(self.stop_run)
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.reject)
+        button_layout.addWidget(self.progress_label)
+        button_layout.addStretch()
+        button_layout.addWidget(self.run_button)
+        button_layout.addWidget(self.stop_button)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+    def apply_filter(self, text):
+        matching = select_devices(self.devices, pattern=f"*{text}*" if text else None)
+        for row in range(self.device_list.count()):
+            item = self.device_list.item(row)
+            item.setHidden(item.data(Qt.UserRole) not in matching)
+
+    def set_all_checked(self, state):
+        for row in range(self.device_list.count()):
+            item = self.device_list.item(row)
+            if not item.isHidden():
+                item.setCheckState(state)
+
+    def browse_export(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Results", "", "JSON Lines (*.jsonl);;CSV (*.csv)"
+        )
+        if path:
+            self.export_input.setText(path)
+
+    def selected_devices(self):
+        return [
+            self.device_list.item(row).data(Qt.UserRole)
+            for row in range(self.device_list.count())
+            if self.device_list.item(row).checkState() == Qt.Checked
+            and not self.device_list.item(row).isHidden()
+        ]
+
+    def start_run(self):
+        devices = self.selected_devices()
+        commands = [
+            line.strip()
+            for line in self.commands_input.toPlainText().splitlines()
+            if line.strip()
+        ]
+        if not devices or not commands:
+            QMessageBox.warning(
+                self, "Run Command", "Select at least one device and enter a command."
+            )
+            return
+
+        export_path = self.export_input.text().strip()
+        try:
+            self.exporter = ResultExporter(export_path) if export_path else None
+        except OSError as e:
+            QMessageBox.critical(
+                self, "Export Error", f"Cannot write results: {str(e)}"
+            )
+            return
+
+        self.results = []
+        self.results_table.setRowCount(0)
+        self.output_view.clear()
+        self.engine = FanoutEngine(
+            concurrency=self.concurrency_input.value(),
+            timeout=self.timeout_input.value(),
+            retries=self.retries_input.value(),
+        )
+        self.run_button.setEnabled(False)
+        self.stop_button.setEnabled(True)
+        self.progress_label.setText(f"0 / {len(devices)} hosts")
+        self.run_task = asyncio.ensure_future(self.run_fanout(devices, commands))
+
+    async def run_fanout(self, devices, commands):
+        try:
+            await self.engine.run(devices, commands, on_result=self.add_result)
+        except Exception as e:
+            logger.error(f"Fan-out run failed: {str(e)}")
+            QMessageBox.critical(self, "Run Command", f"Run failed: {str(e)}")
+        finally:
+            if self.exporter:
+                self.exporter.close()
+                self.exporter = None
+            self.run_button.setEnabled(True)
+            self.stop_button.setEnabled(False)
+            failed = sum(1 for result in self.results if result["status"] != "ok")
+            self.progress_label.setText(
+                f"{len(self.results)} / {len(devices)} hosts, {failed} not ok"
+            )
+
+    def add_result(self, result):
+        self.results.append(result)
+        if self.exporter:
+            self.exporter.write(result)
+
+        row = self.results_table.rowCount()
+        self.results_table.insertRow(row)
+        first_line = ""
+        if result["outputs"]:
+            text = result["outputs"][0]["stdout"] or result["outputs"][0]["stderr"]
+            first_line = text.strip().splitlines()[0] if text.strip() else ""
+        status_item = QTableWidgetItem(result["status"])
+        status_item.setForeground(self.STATUS_COLORS.get(result["status"], Qt.black))
+        self.results_table.setItem(row, 0, QTableWidgetItem(result["device"]))
+        self.results_table.setItem(row, 1, status_item)
+        self.results_table.setItem(row, 2, QTableWidgetItem(f"{result['elapsed']:.2f}"))
+        self.results_table.setItem(
+            row, 3, QTableWidgetItem(result["error"] or first_line)
+        )
+        self.progress_label.setText(f"{len(self.results)} hosts done")
+
+    def show_selected_result(self):
+        rows = self.results_table.selectionModel().selectedRows()
+        if not rows:
+            return
+        result = self.results[rows[0].row()]
+        lines = [f"# {result['device']} ({result['hostname']}) - {result['status']}"]
+        if result["error"]:
+            lines.append(result["error"])
+        for entry in result["outputs"]:
+            lines.append(f"$ {entry['command']}  [exit {entry['exit_status']}]")
+            lines.append(entry["stdout"].rstrip())
+            if entry["stderr"]:
+                lines.append(entry["stderr"].rstrip())
+        self.output_view.setPlainText("\n".join(lines))
+
+    def stop_run(self):
+        if self.engine:
+            self.engine.cancel()
+        self.stop_button.setEnabled(False)
+
+    def reject(self):
+        self.stop_run()
+        super().reject()
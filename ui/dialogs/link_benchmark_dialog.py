@@ -0,0 +1,171 @@
+import asyncio
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import (QComboBox, QDialog, QFormLayout, QHBoxLayout,
+                             QHeaderView, QLabel, QMessageBox, QPushButton,
+                             QSpinBox, QTableWidget, QTableWidgetItem,
+                             QVBoxLayout)
+
+from utils.connection_profiles import (CONNECTION_PROFILES, recommend_profile,
+                                       run_link_benchmark)
+from utils.fanout import select_devices
+from utils.logger import logger
+from utils.ssh_utils import session_pool_params
+
+
+class LinkBenchmarkDialog(QDialog):
+    """Benchmarks every connection profile against a device and applies the fastest."""
+
+    COLUMNS = ["Backend", "Profile", "Handshake (ms)", "MB/s", "Cipher", "Compression"]
+
+    def __init__(self, devices, parent=None, device=None, on_apply=None):
+        super().__init__(parent)
+        self.setWindowTitle("Link Benchmark")
+        self.resize(750, 450)
+        self.devices = select_devices(devices)
+        self.on_apply = on_apply
+        self.run_task = None
+        self.results = []
+        self.recommended = None
+        self.setup_ui()
+        if device in self.devices:
+            self.device_combo.setCurrentIndex(self.devices.index(device))
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        options = QFormLayout()
+        self.device_combo = QComboBox()
+        for device in self.devices:
+            self.device_combo.addItem(f"{device.get('name')} ({device['hostname']})")
+        options.addRow("Device:", self.device_combo)
+        self.size_input = QSpinBox()
+        self.size_input.setRange(1, 512)
+        self.size_input.setValue(4)
+        self.size_input.setSuffix(" MB")
+        options.addRow("Payload per profile:", self.size_input)
+        layout.addLayout(options)
+
+        self.results_table = QTableWidget(0, len(self.COLUMNS))
+        self.results_table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.results_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.results_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.results_table)
+        self.recommendation_label = QLabel("")
+        layout.addWidget(self.recommendation_label)
+
+        button_layout = QHBoxLayout()
+        self.run_button = QPushButton("Run")
+        self.run_button.clicked.connect(self.start_run)
+        self.apply_button = QPushButton("Apply to Device")
+        self.apply_button.setEnabled(False)
+        self.apply_button.clicked.connect(self.apply_recommendation)
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.reject)
+        button_layout.addStretch()
+        button_layout.addWidget(self.run_button)
+        button_layout.addWidget(self.apply_button)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+    def current_device(self):
+        index = self.device_combo.currentIndex()
+        return self.devices[index] if index >= 0 else None
+
+    def start_run(self):
+        device = self.current_device()
+        if device is None:
+            QMessageBox.warning(self, "Link Benchmark", "Select a device first.")
+            return
+        self.results = []
+        self.recommended = None
+        self.results_table.setRowCount(0)
+        self.recommendation_label.setText("Benchmarking...")
+        self.run_button.setEnabled(False)
+        self.apply_button.setEnabled(False)
+        self.device_combo.setEnabled(False)
+        self.run_task = asyncio.ensure_future(self.run_benchmark(device))
+
+    async def run_benchmark(self, device):
+        params = session_pool_params(
+            device["hostname"],
+            device["username"],
+            device.get("password"),
+            device.get("key_filename"),
+            device.get("port", 22),
+        )
+        try:
+            await run_link_benchmark(
+                params,
+                payload_bytes=self.size_input.value() * 1024 * 1024,
+                on_result=self.add_result,
+            )
+        except Exception as e:
+            logger.error(f"Link benchmark failed: {str(e)}")
+            QMessageBox.critical(self, "Link Benchmark", f"Benchmark failed: {str(e)}")
+        finally:
+            self.run_button.setEnabled(True)
+            self.device_combo.setEnabled(True)
+            self.show_recommendation()
+
+    def add_result(self, result):
+        self.results.append(result)
+        row = self.results_table.rowCount()
+        self.results_table.insertRow(row)
+        if result["error"]:
+            values = [
+                result["backend"],
+                result["profile"],
+                "-",
+                "-",
+                result["error"],
+                "",
+            ]
+        else:
+            values = [
+                result["backend"],
+                result["profile"],
+                f"{result['handshake_ms']:.1f}",
+                f"{result['mb_per_s']:.2f}",
+                result["cipher"],
+                result["compression"],
+            ]
+        for column, value in enumerate(values):
+            item = QTableWidgetItem(str(value))
+            item.setToolTip(CONNECTION_PROFILES[result["profile"]]["description"])
+            self.results_table.setItem(row, column, item)
+
+    def show_recommendation(self):
+        self.recommended = recommend_profile(self.results)
+        if self.recommended is None:
+            self.recommendation_label.setText("No profile could connect.")
+            return
+        self.recommendation_label.setText(
+            f"Recommended: '{self.recommended['profile']}' profile on the "
+            f"{self.recommended['backend']} backend "
+            f"({self.recommended['mb_per_s']:.2f} MB/s, "
+            f"{self.recommended['handshake_ms']:.1f} ms handshake)"
+        )
+        self.apply_button.setEnabled(True)
+        for row, result in enumerate(self.results):
+            if result is self.recommended:
+                for column in range(self.results_table.columnCount()):
+                    self.results_table.item(row, column).setBackground(Qt.green)
+
+    def apply_recommendation(self):
+        device = self.current_device()
+        if device is None or self.recommended is None:
+            return
+        device["connection_profile"] = self.recommended["profile"]
+        device["ssh_backend"] = self.recommended["backend"]
+        logger.info(
+            f"Connection profile '{device['connection_profile']}' "
+            f"({device['ssh_backend']}) applied to {device.get('name')}"
+        )
+        if self.on_apply:
+            self.on_apply(device)
+        self.apply_button.setEnabled(False)
+
+    def reject(self):
+        if self.run_task and not self.run_task.done():
+            self.run_task.cancel()
+        super().reject()
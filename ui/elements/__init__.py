@@ -1,5 +1,11 @@
 from .menu_bar import create_menu_bar
 from .ssh_console import SSHConsole
+from .terminal_view import TerminalView
 from .toolbar import create_toolbar
 
-__all__ = ["create_menu_bar", "create_toolbar", "SSHConsole"]
+__all__ = [
+    "create_menu_bar",
+    "create_toolbar",
+    "SSHConsole",
+    "TerminalView",
+]
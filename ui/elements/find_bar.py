@@ -0,0 +1,83 @@
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtWidgets import (QCheckBox, QHBoxLayout, QLabel, QLineEdit,
+                             QPushButton, QWidget)
+
+
+class FindBar(QWidget):
+    """Incremental find-in-terminal bar.
+
+    Emits ``find_requested(query, regex, case_sensitive, backwards, restart)``.
+    ``restart`` is True when the query or its options changed, so the search
+    starts over from the newest output instead of continuing from the
+    current match.
+    """
+
+    find_requested = pyqtSignal(str, bool, bool, bool, bool)
+    closed = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.query = QLineEdit()
+        self.query.setPlaceholderText("Find in terminal...")
+        self.query.textChanged.connect(lambda: self.request(backwards=True, restart=True))
+        self.query.returnPressed.connect(self.find_previous)
+        layout.addWidget(self.query)
+
+        self.regex = QCheckBox("Regex")
+        self.regex.toggled.connect(lambda: self.request(backwards=True, restart=True))
+        layout.addWidget(self.regex)
+        self.case_sensitive = QCheckBox("Match case")
+        self.case_sensitive.toggled.connect(
+            lambda: self.request(backwards=True, restart=True)
+        )
+        layout.addWidget(self.case_sensitive)
+
+        previous_button = QPushButton("Older")
+        previous_button.clicked.connect(self.find_previous)
+        layout.addWidget(previous_button)
+        next_button = QPushButton("Newer")
+        next_button.clicked.connect(self.find_next)
+        layout.addWidget(next_button)
+
+        self.status = QLabel("")
+        layout.addWidget(self.status)
+
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.close_bar)
+        layout.addWidget(close_button)
+
+    def open(self):
+        self.show()
+        self.query.setFocus()
+        self.query.selectAll()
+
+    def close_bar(self):
+        self.hide()
+        self.closed.emit()
+
+    def find_previous(self):
+        self.request(backwards=True)
+
+    def find_next(self):
+        self.request(backwards=False)
+
+    def request(self, backwards, restart=False):
+        self.find_requested.emit(
+            self.query.text(),
+            self.regex.isChecked(),
+            self.case_sensitive.isChecked(),
+            backwards,
+            restart,
+        )
+
+    def set_status(self, text):
+        self.status.setText(text)
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_Escape:
+            self.close_bar()
+        else:
+            super().keyPressEvent(event)
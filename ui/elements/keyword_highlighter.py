@@ -1,49 +1,73 @@
 import json
 import os
+import re
 
-from PyQt5.QtCore import QRegExp
-from PyQt5.QtGui import QColor, QSyntaxHighlighter, QTextCharFormat
+from PyQt5.QtGui import QColor, QTextCharFormat
 
+from utils.logger import logger
 
-class KeywordHighlighter(QSyntaxHighlighter):
-    def __init__(self, parent, chief):
-        super().__init__(parent)
-        self.chief = chief
-        self.highlighting_rules = []
-        self.load_keywords()
 
-    def load_keywords(self):
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        keywords_file = os.path.join(script_dir, "keywords.json")
+def _trie_pattern(words):
+    """Return a regex alternation of ``words`` factored into a prefix tree.
 
+    Shared prefixes are matched once, so a long keyword list costs about one
+    step per character of the text instead of one attempt per keyword.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node):
+        ends = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if ends:
+            # Longer keywords first; the word may also stop here.
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+def load_keywords():
+    """Return the keyword categories from ``keywords.json``, or none if it is missing."""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    keywords_file = os.path.join(script_dir, "keywords.json")
+    try:
         with open(keywords_file, "r") as f:
-            keywords_data = json.load(f)
-
-        for category, words in keywords_data.items():
-            color = QColor(keywords_data[category]["color"])
-            for word in words["words"]:
-                pattern = r"\b" + word + r"\b"
-                rule = HighlightingRule(pattern, self.create_format(color))
-                self.highlighting_rules.append(rule)
-
-    def create_format(self, color):
-        text_format = QTextCharFormat()
-        text_format.setForeground(color)
-        return text_format
-
-    def highlightBlock(self, text):
-        for rule in self.highlighting_rules:
-            expression = QRegExp(rule.pattern)
-            index = expression.indexIn(text)
-            while index >= 0:
-                length = expression.matchedLength()
-                self.setFormat(index, length, rule.format)
-                index = expression.indexIn(text, index + length)
-
-        self.setCurrentBlockState(0)
-
-
-class HighlightingRule:
-    def __init__(self, pattern, format):
-        self.pattern = pattern
-        self.format = format
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"No keywords loaded from {keywords_file}: {str(e)}")
+        return {}
+
+
+class KeywordMatcher:
+    """All keywords compiled into one pattern, matched in a single pass."""
+
+    def __init__(self, keywords_data):
+        self.formats = {}
+        for category in keywords_data.values():
+            text_format = QTextCharFormat()
+            text_format.setForeground(QColor(category["color"]))
+            for word in category["words"]:
+                self.formats.setdefault(word, text_format)
+        self.pattern = None
+        if self.formats:
+            # Keywords are whole words: no word character may touch either end.
+            self.pattern = re.compile(
+                r"(?<!\w)(?:" + _trie_pattern(self.formats) + r")(?!\w)"
+            )
+
+    def spans(self, text):
+        """Return ``(start, length, word)`` for every keyword in ``text``."""
+        if self.pattern is None:
+            return []
+        return [
+            (match.start(), match.end() - match.start(), match.group())
+            for match in self.pattern.finditer(text)
+        ]
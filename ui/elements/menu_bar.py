@@ -118,6 +118,13 @@ def create_menu_bar(parent: Any) -> QMenuBar:
         tools_menu,
         parent.tools_actions,
         [
+            "run_command_on_devices",
+            "link_benchmark",
+            "toggle_transcript",
+            "toggle_recording",
+            "replay_recording",
+            "toggle_raw_input",
+            None,  # Separator
             "keymap_editor",
             "create_public_key",
             "convert_private_key",
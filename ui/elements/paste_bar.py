@@ -0,0 +1,36 @@
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtWidgets import QHBoxLayout, QLabel, QProgressBar, QPushButton, QWidget
+
+
+class PasteBar(QWidget):
+    """Progress of a paste into the session, with a button to abort it.
+
+    Emits ``abort_requested`` when the user stops the paste.
+    """
+
+    abort_requested = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.label = QLabel("Pasting")
+        layout.addWidget(self.label)
+
+        self.progress = QProgressBar()
+        self.progress.setFormat("%p%")
+        layout.addWidget(self.progress)
+
+        abort_button = QPushButton("Abort")
+        abort_button.clicked.connect(self.abort_requested.emit)
+        layout.addWidget(abort_button)
+
+    def start(self, total, mode):
+        self.label.setText(f"Pasting {total} characters ({mode})")
+        self.progress.setRange(0, max(total, 1))
+        self.progress.setValue(0)
+        self.show()
+
+    def set_progress(self, sent, total):
+        self.progress.setValue(sent)
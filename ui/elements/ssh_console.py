@@ -1,18 +1,19 @@
-import re
-import threading
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from PyQt5.QtCore import Qt, pyqtSignal
-    from PyQt5.QtGui import QTextCursor
-    from PyQt5.QtWidgets import QTextEdit
 else:
     from PyQt5.QtCore import Qt, pyqtSignal
-    from PyQt5.QtGui import QTextCursor
-    from PyQt5.QtWidgets import QTextEdit
 
+from utils.channel_reader import QtChannelReader
+from utils.output_pipeline import OutputPipeline
+from utils.render_scheduler import RenderScheduler
+from utils.terminal_screen import TerminalScreen
 
-class SSHConsole(QTextEdit):
+from .terminal_view import TerminalView
+
+
+class SSHConsole(TerminalView):
     command_executed = pyqtSignal(str, str)  # command, output
 
     def __init__(self, session_data, chief):
@@ -21,42 +22,56 @@ class SSHConsole(QTextEdit):
         self.chief = chief
         self.ssh_client = None
         self.shell = None
-        self.setReadOnly(False)
-        self.setLineWrapMode(QTextEdit.NoWrap)
-        self.setUndoRedoEnabled(False)
         self.prompt = ""
         self.current_command = ""
         self.command_history = []
         self.history_index = 0
-        self.ansi_escape = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
+        self.reader = None
+        self.output_pipeline = OutputPipeline()
+        self.set_screen(TerminalScreen())
+        self.render_scheduler = RenderScheduler(
+            self.screen.feed, self.render_frame, parent=self
+        )
 
     def set_ssh_client(self, ssh_client):
         self.ssh_client = ssh_client
 
     def set_shell(self, shell):
+        if self.reader:
+            self.reader.stop()
+            self.reader = None
         self.shell = shell
+        self.output_pipeline.reset()
         if self.shell:
             self.read_output()
 
     def read_output(self):
-        def _read():
-            while self.shell:
-                if self.shell.recv_ready():
-                    data = self.shell.recv(1024).decode("utf-8")
-                    cleaned_data = self.ansi_escape.sub("", data)
-                    self.append_output(cleaned_data)
-                    if cleaned_data.strip().endswith("$"):
-                        self.prompt = cleaned_data.strip()
-
-        threading.Thread(target=_read, daemon=True).start()
+        # Woken by a socket notifier only when the shell has data, on the GUI thread
+        self.reader = QtChannelReader(self.shell, self)
+        self.reader.data_received.connect(self.handle_output)
+        self.reader.channel_closed.connect(self.handle_channel_closed)
+        self.reader.start()
+
+    def handle_output(self, data):
+        self.render_scheduler.write(self.output_pipeline.feed(data))
+
+    def render_frame(self):
+        self.render()
+        responses = self.screen.take_responses()
+        if responses and self.shell:
+            self.shell.send(responses)
+        # Whatever the remote side drew left of the cursor, usually the prompt.
+        line = self.screen.line(self.screen.cursor_y)
+        self.prompt = "".join(line.chars[: self.screen.cursor_x])
+
+    def handle_channel_closed(self):
+        self.reader = None
+        self.shell = None
 
     def keyPressEvent(self, event):
         if self.shell:
             if event.key() == Qt.Key_Return:
                 self.execute_command()
-            elif event.key() == Qt.Key_Backspace:
-                if self.textCursor().positionInBlock() > len(self.prompt):
-                    super().keyPressEvent(event)
             elif event.key() == Qt.Key_Up:
                 self.show_previous_command()
             elif event.key() == Qt.Key_Down:
@@ -67,17 +82,15 @@ class SSHConsole(QTextEdit):
             super().keyPressEvent(event)
 
     def execute_command(self):
-        cursor = self.textCursor()
-        cursor.movePosition(QTextCursor.End)
-        cursor.movePosition(QTextCursor.StartOfBlock, QTextCursor.KeepAnchor)
-        command = cursor.selectedText()[len(self.prompt):].strip()
+        command = self.typed_text().strip()
 
         if command:
-            self.append("")  # Move to the next line
+            # The remote echo replaces the typed text on the screen.
             self.shell.send(command + "\n")
             self.command_history.append(command)
             self.history_index = len(self.command_history)
             self.current_command = ""
+            self.replace_typed_text("")
 
             # Ask Chief for assistance
             self.get_chief_assistance(command)
@@ -101,20 +114,22 @@ class SSHConsole(QTextEdit):
             self.clear_current_command()
 
     def show_command_from_history(self):
-        self.clear_current_command()
         if 0 <= self.history_index < len(self.command_history):
-            self.insertPlainText(self.command_history[self.history_index])
+            self.replace_typed_text(
+                self.command_history[self.history_index]
+            )
 
     def clear_current_command(self):
-        cursor = self.textCursor()
-        cursor.movePosition(QTextCursor.End)
-        cursor.movePosition(QTextCursor.StartOfBlock, QTextCursor.KeepAnchor)
-        cursor.removeSelectedText()
-        self.insertPlainText(self.prompt)
+        self.replace_typed_text("")
 
     def append_output(self, text):
-        cursor = self.textCursor()
-        cursor.movePosition(QTextCursor.End)
-        cursor.insertText(text)
-        self.setTextCursor(cursor)
-        self.ensureCursorVisible()
+        # Local text goes through the screen too, so it stays in the grid.
+        self.render_scheduler.write(text.replace("\r\n", "\n").replace("\n", "\r\n"))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.render_scheduler.flush_all()
+        columns, rows = self.fit_to_view()
+        self.render()
+        if self.shell:
+            self.shell.resize_pty(width=columns, height=rows)
@@ -0,0 +1,687 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from PyQt5.QtCore import QEvent, QRect, Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import (QColor, QFont, QFontDatabase, QFontMetrics,
+                         QGuiApplication, QKeySequence, QPainter, QPixmap)
+from PyQt5.QtWidgets import QAbstractScrollArea, QMenu
+
+from utils.render_scheduler import FRAME_INTERVAL_MS
+from utils.terminal_screen import (BOLD, DIM, HIDDEN, ITALIC, REVERSE, STRIKE,
+                                   UNDERLINE, TerminalScreen, attr_bg,
+                                   attr_fg, attr_flags, char_width, color_rgb)
+
+ROW_CACHE_SIZE = 4096
+MATCH_FOREGROUND = "#1e1e1e"
+MATCH_BACKGROUND = "#d7ba7d"
+SELECTION_COLOR = QColor(38, 79, 120, 150)
+
+Runs = List[Tuple[str, int]]
+Position = Tuple[int, int]
+
+
+def cell_count(text: str) -> int:
+    """Return the number of cells ``text`` takes on the grid."""
+    if text.isascii():
+        return len(text)
+    return sum(char_width(char) for char in text)
+
+
+def cell_to_index(text: str, cell: int) -> int:
+    """Return the index of the character at ``cell`` (or after the text)."""
+    if text.isascii():
+        return min(cell, len(text))
+    cells = 0
+    for index, char in enumerate(text):
+        cells += char_width(char)
+        if cells > cell:
+            return index
+    return len(text)
+
+
+class TerminalView(QAbstractScrollArea):
+    """Paints a ``TerminalScreen`` straight onto a grid of monospace cells.
+
+    Lines are numbered as in the scrollback store; screen row 0 is line
+    ``scrollback.end``. Each line is drawn once into a row pixmap that is
+    cached until the line changes, so a repaint only copies the pixmaps of
+    the lines in the viewport, however long the scrollback is. A frame
+    marks just the rows it changed as damaged, and scrolling is by pixel.
+
+    The view draws frames (:meth:`render`), fits the screen to its size
+    (:meth:`fit_to_view`), keeps text typed locally after the cursor
+    (:meth:`typed_text`) and highlights search matches (:meth:`show_match`).
+    Without a screen it makes its own, and :meth:`append` writes lines of
+    text to it, like ``QTextEdit.append``.
+
+    Emits ``paste_requested`` from its context menu; the menu offers Paste
+    only when something is connected to it.
+    """
+
+    paste_requested = pyqtSignal()
+
+    def __init__(
+        self,
+        parent=None,
+        screen: Optional[TerminalScreen] = None,
+        lock=None,
+        foreground: str = "#d4d4d4",
+        background: str = "#1e1e1e",
+    ):
+        super().__init__(parent)
+        self.foreground = QColor(foreground)
+        self.background = QColor(background)
+        self.matcher = None
+        self._cache: "OrderedDict[int, QPixmap]" = OrderedDict()
+        self._styles: Dict[int, Tuple[QColor, Optional[QColor], QFont]] = {}
+        self._typed = ""
+        self._caret = 0
+        self._read_only = False
+        self._predictions: List[Tuple[int, int, str]] = []
+        self._match: Optional[Tuple[int, int, int]] = None
+        self._selection: Optional[Tuple[Position, Position]] = None
+        # The screen as of the last frame drawn: row runs, cursor (row,
+        # characters before it), scrollback end and oldest line kept.
+        self._rows: List[Runs] = []
+        self._cursor = (0, 0)
+        self._end = self._first = 0
+        self._stale = False
+        self._append_timer = QTimer(self)
+        self._append_timer.setSingleShot(True)
+        self._append_timer.setInterval(FRAME_INTERVAL_MS)
+        self._append_timer.timeout.connect(self.render)
+
+        font = QFontDatabase.systemFont(QFontDatabase.FixedFont)
+        font.setPointSize(10)
+        self.setFont(font)
+        self._update_metrics()
+        self.setFocusPolicy(Qt.StrongFocus)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.viewport().setCursor(Qt.IBeamCursor)
+        self.viewport().setAttribute(Qt.WA_OpaquePaintEvent)
+        self.set_screen(screen or TerminalScreen(), lock)
+
+    def set_screen(self, screen: TerminalScreen, lock=None) -> None:
+        """Show ``screen`` from now on.
+
+        Args:
+            screen (TerminalScreen): The screen to draw.
+            lock (threading.RLock, optional): Guards the screen against the
+                thread feeding it. Defaults to a private lock.
+        """
+        self.screen = screen
+        self.lock = lock if lock is not None else threading.RLock()
+        self._rows = [[] for _ in range(screen.rows)]
+        self._cursor = (0, 0)
+        self._end = screen.scrollback.end
+        self._first = screen.scrollback.first
+        self._cache.clear()
+        with self.lock:
+            frame = screen.take_frame(0)
+            # Whatever the screen already shows is drawn too.
+            frame["rows"] = {row: screen.line(row).runs() for row in range(screen.rows)}
+            frame["rebuild"] = True
+        self.render(frame)
+
+    def set_colors(self, foreground: str, background: str) -> None:
+        """Change the default text and background colors."""
+        self.foreground = QColor(foreground)
+        self.background = QColor(background)
+        self._styles.clear()
+        self._cache.clear()
+        self.viewport().update()
+
+    def set_keywords(self, matcher) -> None:
+        """Color keywords found by a ``KeywordMatcher``; None turns it off."""
+        self.matcher = matcher
+        self._cache.clear()
+        self.viewport().update()
+
+    # -- geometry ---------------------------------------------------------
+
+    def _update_metrics(self) -> None:
+        metrics = QFontMetrics(self.font())
+        self._cell_width = max(1, metrics.horizontalAdvance("M"))
+        self._line_height = max(1, metrics.lineSpacing())
+        self._ascent = metrics.ascent()
+        self._styles.clear()
+        self._cache.clear()
+
+    def changeEvent(self, event):
+        if event.type() == QEvent.FontChange:
+            self._update_metrics()
+            self._update_scrollbar(self._following())
+            self.viewport().update()
+        super().changeEvent(event)
+
+    def fit_to_view(self) -> Tuple[int, int]:
+        """Resize the screen to the number of cells that fit in the view.
+
+        Returns:
+            Tuple[int, int]: The screen's ``(columns, rows)`` afterwards.
+        """
+        viewport = self.viewport()
+        columns = viewport.width() // self._cell_width
+        rows = viewport.height() // self._line_height
+        with self.lock:
+            if columns > 0 and rows > 0:
+                # A view that is not laid out yet keeps the current size.
+                self.screen.resize(columns, rows)
+            return self.screen.columns, self.screen.rows
+
+    def _line_count(self) -> int:
+        return self._end - self._first + len(self._rows)
+
+    def _following(self) -> bool:
+        scrollbar = self.verticalScrollBar()
+        return scrollbar.value() >= scrollbar.maximum() - 2
+
+    def _update_scrollbar(self, follow: bool) -> None:
+        scrollbar = self.verticalScrollBar()
+        height = self.viewport().height()
+        scrollbar.setPageStep(height)
+        scrollbar.setSingleStep(self._line_height)
+        scrollbar.setRange(0, max(0, self._line_count() * self._line_height - height))
+        if follow:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def resizeEvent(self, event):
+        follow = self._following()
+        super().resizeEvent(event)
+        self._update_scrollbar(follow)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._stale:
+            self._stale = False
+            self.render()
+
+    def scrollContentsBy(self, dx, dy):
+        self.viewport().scroll(dx, dy)
+
+    def wheelEvent(self, event):
+        pixels = event.pixelDelta().y()
+        if pixels:
+            # Touchpads report exact distances: scroll by those.
+            scrollbar = self.verticalScrollBar()
+            scrollbar.setValue(scrollbar.value() - pixels)
+            event.accept()
+        else:
+            super().wheelEvent(event)
+
+    def line_at(self, y: int) -> int:
+        """Return the number of the line shown at viewport height ``y``."""
+        return self._first + (self.verticalScrollBar().value() + y) // self._line_height
+
+    def _line_top(self, number: int) -> int:
+        return (number - self._first) * self._line_height - self.verticalScrollBar().value()
+
+    # -- frames -----------------------------------------------------------
+
+    def render(self, frame: Optional[Dict[str, Any]] = None) -> None:
+        """Bring the view up to date with the screen.
+
+        Args:
+            frame (Dict[str, Any], optional): What changed, from
+                :meth:`TerminalScreen.take_frame`. Defaults to a frame taken
+                from the screen now, or once the view is shown if it is hidden.
+        """
+        if frame is None:
+            if not self.isVisible():
+                # The screen keeps collecting changes meanwhile.
+                self._stale = True
+                return
+            with self.lock:
+                # Scrolled-off lines are read back from the store when shown.
+                frame = self.screen.take_frame(0)
+        follow = self._following()
+        old_end = self._end
+        if frame["history_cleared"]:
+            self._cache.clear()
+        scrolled = frame["scrolled"]
+        size = frame["size"]
+        rows = [] if frame["rebuild"] else self._rows[scrolled:]
+        rows = rows[:size] + [[] for _ in range(size - len(rows[:size]))]
+        self._end = frame["end"]
+        # Lines may have changed right before they scrolled off; the store
+        # has their final state.
+        self._forget(old_end, self._end)
+        damaged = []
+        for row, runs in frame["rows"].items():
+            if row < size:
+                rows[row] = runs
+                self._cache.pop(self._end + row, None)
+                damaged.append(row)
+        self._rows = rows
+        self._cursor = frame["cursor"]
+
+        # An int, read without the lock; lines it drops are drawn blank.
+        first = min(self.screen.scrollback.first, self._end)
+        scrollbar = self.verticalScrollBar()
+        value = scrollbar.value()
+        moved = first != self._first
+        if moved and not follow:
+            # Keep the lines on screen where they are.
+            value -= (first - self._first) * self._line_height
+        self._first = first
+        self._update_scrollbar(follow)
+        if not follow:
+            scrollbar.setValue(value)
+        if scrolled or moved or frame["rebuild"] or frame["history_cleared"]:
+            self.viewport().update()
+            return
+        width = self.viewport().width()
+        for row in damaged:
+            self.viewport().update(
+                QRect(0, self._line_top(self._end + row), width, self._line_height)
+            )
+
+    def _forget(self, start: int, stop: int) -> None:
+        """Drop the cached pixmaps of lines ``start`` to ``stop - 1``."""
+        if stop - start > len(self._cache):
+            for number in [n for n in self._cache if start <= n < stop]:
+                del self._cache[number]
+        else:
+            for number in range(start, stop):
+                self._cache.pop(number, None)
+
+    def append(self, text: str) -> None:
+        """Write ``text`` on a line of its own below what is shown."""
+        text = text.replace("\r\n", "\n").replace("\n", "\r\n") + "\r\n"
+        with self.lock:
+            if self.screen.cursor_x or self.screen.wrap_next:
+                text = "\r\n" + text
+            self.screen.feed(text)
+        if not self._append_timer.isActive():
+            self._append_timer.start()
+
+    def clear(self) -> None:
+        """Erase the screen and the scrollback."""
+        with self.lock:
+            self.screen.reset()
+            self.screen.erase_in_display(3)
+        self._typed, self._caret = "", 0
+        self._predictions = []
+        self._selection = self._match = None
+        self.render()
+
+    # -- painting ---------------------------------------------------------
+
+    def _style(self, attr: int) -> Tuple[QColor, Optional[QColor], QFont]:
+        style = self._styles.get(attr)
+        if style is not None:
+            return style
+        flags = attr_flags(attr)
+        fg, bg = color_rgb(attr_fg(attr)), color_rgb(attr_bg(attr))
+        fg = QColor(*fg) if fg else self.foreground
+        bg = QColor(*bg) if bg else None
+        if flags & REVERSE:
+            fg, bg = bg or self.background, fg
+        if flags & DIM:
+            fg = fg.darker(150)
+        if flags & HIDDEN:
+            fg = bg or self.background
+        font = QFont(self.font())
+        font.setBold(bool(flags & BOLD))
+        font.setItalic(bool(flags & ITALIC))
+        font.setUnderline(bool(flags & UNDERLINE))
+        font.setStrikeOut(bool(flags & STRIKE))
+        style = self._styles[attr] = (fg, bg, font)
+        return style
+
+    def _segments(self, runs: Runs):
+        """Split runs where keywords start and end: ``(text, attr, keyword color)``."""
+        if self.matcher is None or self.matcher.pattern is None:
+            return [(text, attr, None) for text, attr in runs]
+        spans = self.matcher.spans("".join(text for text, _ in runs))
+        if not spans:
+            return [(text, attr, None) for text, attr in runs]
+        colors = [None] * sum(len(text) for text, _ in runs)
+        for start, length, word in spans:
+            color = self.matcher.formats[word].foreground().color()
+            colors[start : start + length] = [color] * length
+        segments = []
+        offset = 0
+        for text, attr in runs:
+            start = 0
+            while start < len(text):
+                color = colors[offset + start]
+                stop = start + 1
+                while stop < len(text) and colors[offset + stop] is color:
+                    stop += 1
+                segments.append((text[start:stop], attr, color))
+                start = stop
+            offset += len(text)
+        return segments
+
+    def _draw_text(self, painter: QPainter, x: int, y: int, text: str) -> int:
+        """Draw ``text`` from cell ``x`` on; returns the cells it took."""
+        cells = cell_count(text)
+        width = self._cell_width
+        if painter.fontMetrics().horizontalAdvance(text) == cells * width:
+            painter.drawText(x * width, y + self._ascent, text)
+            return cells
+        # Glyphs from a fallback font do not fit the grid: one cell at a time.
+        column = x
+        for char in text:
+            painter.drawText(column * width, y + self._ascent, char)
+            column += char_width(char)
+        return cells
+
+    def _row_pixmap(self, number: int, runs: Runs) -> QPixmap:
+        pixmap = self._cache.get(number)
+        if pixmap is not None:
+            self._cache.move_to_end(number)
+            return pixmap
+        segments = self._segments(runs)
+        cells = max(self.screen.columns, sum(cell_count(text) for text, _, _ in segments))
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(
+            int(cells * self._cell_width * ratio) or 1, int(self._line_height * ratio)
+        )
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(self.background)
+        painter = QPainter(pixmap)
+        x = 0
+        for text, attr, keyword_color in segments:
+            fg, bg, font = self._style(attr)
+            width = cell_count(text)
+            if bg is not None:
+                painter.fillRect(
+                    x * self._cell_width, 0, width * self._cell_width, self._line_height, bg
+                )
+            painter.setFont(font)
+            painter.setPen(keyword_color or fg)
+            self._draw_text(painter, x, 0, text)
+            x += width
+        painter.end()
+        self._cache[number] = pixmap
+        if len(self._cache) > ROW_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return pixmap
+
+    def _line_runs(self, number: int, stored: Dict[int, Runs]) -> Runs:
+        if number >= self._end:
+            row = number - self._end
+            return self._rows[row] if row < len(self._rows) else []
+        return stored.get(number, [])
+
+    def _visible_lines(self, rect: QRect) -> Tuple[int, int]:
+        first = max(self._first, self.line_at(rect.top()))
+        stop = min(self._end + len(self._rows), self.line_at(rect.bottom()) + 1)
+        return first, stop
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        rect = event.rect()
+        painter.fillRect(rect, self.background)
+        first, stop = self._visible_lines(rect)
+        missing = [
+            number for number in range(first, min(stop, self._end)) if number not in self._cache
+        ]
+        stored: Dict[int, Runs] = {}
+        if missing:
+            with self.lock:
+                lines = self.screen.scrollback.lines(missing[0], missing[-1] + 1)
+                start = max(missing[0], self.screen.scrollback.first)
+            stored = {start + index: line.runs() for index, line in enumerate(lines)}
+        for number in range(first, stop):
+            pixmap = self._row_pixmap(number, self._line_runs(number, stored))
+            painter.drawPixmap(0, self._line_top(number), pixmap)
+        self._paint_overlays(painter, first, stop, stored)
+        painter.end()
+
+    def _column_cells(self, number: int, column: int, stored=None) -> int:
+        """Return the cell where character ``column`` of a line starts."""
+        text = "".join(text for text, _ in self._line_runs(number, stored or {}))
+        if column <= len(text):
+            return cell_count(text[:column])
+        return cell_count(text) + column - len(text)
+
+    def _paint_overlays(self, painter: QPainter, first: int, stop: int, stored) -> None:
+        width, height = self._cell_width, self._line_height
+        if self._match is not None:
+            number, column, length = self._match
+            if first <= number < stop:
+                runs = self._line_runs(number, stored)
+                text = "".join(text for text, _ in runs)[column : column + length]
+                x = self._column_cells(number, column, stored)
+                top = self._line_top(number)
+                painter.fillRect(
+                    x * width, top, cell_count(text) * width, height, QColor(MATCH_BACKGROUND)
+                )
+                painter.setFont(self.font())
+                painter.setPen(QColor(MATCH_FOREGROUND))
+                self._draw_text(painter, x, top, text)
+
+        if self._selection is not None:
+            (start_line, start_cell), (end_line, end_cell) = sorted(self._selection)
+            for number in range(max(first, start_line), min(stop, end_line + 1)):
+                left = start_cell if number == start_line else 0
+                right = end_cell if number == end_line else self.viewport().width() // width
+                painter.fillRect(
+                    left * width, self._line_top(number), (right - left) * width, height,
+                    SELECTION_COLOR,
+                )
+
+        cursor_line = self._end + self._cursor[0]
+        cursor_x = None
+        if self._predictions:
+            font = QFont(self.font())
+            font.setUnderline(True)
+            painter.setFont(font)
+            painter.setPen(self.foreground)
+            for number, column, text in self._predictions:
+                if first <= number < stop:
+                    x = self._column_cells(number, column, stored)
+                    top = self._line_top(number)
+                    cells = cell_count(text)
+                    painter.fillRect(x * width, top, cells * width, height, self.background)
+                    self._draw_text(painter, x, top, text)
+            # The cursor goes where the last prediction ends.
+            number, column, text = self._predictions[-1]
+            cursor_line = number
+            cursor_x = self._column_cells(number, column, stored) + cell_count(text)
+
+        number = cursor_line
+        if first <= number < stop:
+            x = self._column_cells(number, self._cursor[1]) if cursor_x is None else cursor_x
+            top = self._line_top(number)
+            if self._typed:
+                painter.fillRect(
+                    x * width, top, cell_count(self._typed) * width, height, self.background
+                )
+                painter.setFont(self.font())
+                painter.setPen(self.foreground)
+                self._draw_text(painter, x, top, self._typed)
+            if self.screen.cursor_visible:
+                caret = x + cell_count(self._typed[: self._caret])
+                cursor_rect = QRect(caret * width, top, width, height)
+                if self.hasFocus():
+                    color = QColor(self.foreground)
+                    color.setAlpha(140)
+                    painter.fillRect(cursor_rect, color)
+                else:
+                    painter.setPen(self.foreground)
+                    painter.drawRect(cursor_rect.adjusted(0, 0, -1, -1))
+
+    def _update_cursor_row(self) -> None:
+        top = self._line_top(self._end + self._cursor[0])
+        self.viewport().update(QRect(0, top, self.viewport().width(), self._line_height))
+
+    def focusInEvent(self, event):
+        super().focusInEvent(event)
+        self._update_cursor_row()
+
+    def focusOutEvent(self, event):
+        super().focusOutEvent(event)
+        self._update_cursor_row()
+
+    # -- local input ------------------------------------------------------
+
+    def line_text(self, number: int) -> Optional[str]:
+        """Return the text of a line as last drawn, or None if it is no longer kept."""
+        if number >= self._end:
+            return "".join(text for text, _ in self._line_runs(number, {}))
+        with self.lock:
+            lines = self.screen.scrollback.lines(number, number + 1)
+        return lines[0].text() if lines else None
+
+    def cursor_position(self) -> Tuple[int, int, int]:
+        """Return the cursor's line number, character column and cell, as last drawn."""
+        number = self._end + self._cursor[0]
+        return number, self._cursor[1], self._column_cells(number, self._cursor[1])
+
+    def set_predictions(self, segments: List[Tuple[int, int, str]]) -> None:
+        """Show predicted echo, underlined, as ``(line, column, text)`` segments."""
+        if segments != self._predictions:
+            self._predictions = list(segments)
+            self.viewport().update()
+
+    def typed_text(self) -> str:
+        """Return what was typed after the remote output on the cursor row."""
+        return self._typed
+
+    def replace_typed_text(self, text: str) -> None:
+        """Replace what was typed, e.g. with a history entry or nothing once sent."""
+        self._typed = text
+        self._caret = len(text)
+        self._update_cursor_row()
+
+    def setReadOnly(self, read_only: bool) -> None:
+        """Ignore typing in a view that only shows output.
+
+        Like ``QTextEdit.setReadOnly``; selecting and copying still work.
+        """
+        self._read_only = read_only
+        if read_only:
+            self.replace_typed_text("")
+
+    def isReadOnly(self) -> bool:
+        return self._read_only
+
+    def keyPressEvent(self, event):
+        key = event.key()
+        if self._read_only:
+            if event.matches(QKeySequence.Copy):
+                self.copy()
+            else:
+                super().keyPressEvent(event)
+            return
+        if event.matches(QKeySequence.Copy) and self._selection is not None:
+            self.copy()
+        elif key == Qt.Key_Backspace:
+            if self._caret:
+                self._typed = self._typed[: self._caret - 1] + self._typed[self._caret :]
+                self._caret -= 1
+        elif key == Qt.Key_Delete:
+            self._typed = self._typed[: self._caret] + self._typed[self._caret + 1 :]
+        elif key == Qt.Key_Left:
+            self._caret = max(0, self._caret - 1)
+        elif key == Qt.Key_Right:
+            self._caret = min(len(self._typed), self._caret + 1)
+        elif key == Qt.Key_Home:
+            self._caret = 0
+        elif key == Qt.Key_End:
+            self._caret = len(self._typed)
+        elif event.text() and event.text().isprintable():
+            text = event.text()
+            self._typed = self._typed[: self._caret] + text + self._typed[self._caret :]
+            self._caret += len(text)
+        else:
+            super().keyPressEvent(event)
+            return
+        self.scroll_to_bottom()
+        self._update_cursor_row()
+
+    def scroll_to_bottom(self) -> None:
+        """Scroll to the screen, e.g. when the user types."""
+        scrollbar = self.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
+
+    # -- search and selection ---------------------------------------------
+
+    def show_match(self, number: int, column: int, length: int) -> bool:
+        """Highlight a search match and scroll it into view.
+
+        Args:
+            number (int): Absolute line number; lines from
+                ``scrollback.end`` on are screen rows.
+            column (int): Character offset in the line.
+            length (int): Characters to highlight.
+
+        Returns:
+            bool: False if the line is no longer kept.
+        """
+        if number < self.screen.scrollback.first:
+            return False
+        self._match = (number, column, length)
+        scrollbar = self.verticalScrollBar()
+        scrollbar.setValue(
+            (number - self._first) * self._line_height - self.viewport().height() // 2
+        )
+        self.viewport().update()
+        return True
+
+    def clear_match(self) -> None:
+        """Remove the highlight set by :meth:`show_match`."""
+        if self._match is not None:
+            self._match = None
+            self.viewport().update()
+
+    def _position_at(self, point) -> Position:
+        cell = (point.x() + self._cell_width // 2) // self._cell_width
+        return (self.line_at(point.y()), max(0, cell))
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            position = self._position_at(event.pos())
+            self._selection = (position, position)
+            self.viewport().update()
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if self._selection is not None and event.buttons() & Qt.LeftButton:
+            self._selection = (self._selection[0], self._position_at(event.pos()))
+            self.viewport().update()
+
+    def mouseReleaseEvent(self, event):
+        if self._selection is not None and self._selection[0] == self._selection[1]:
+            self._selection = None
+        super().mouseReleaseEvent(event)
+
+    def selected_text(self) -> str:
+        """Return the selected text, one line per row."""
+        if self._selection is None:
+            return ""
+        (start_line, start_cell), (end_line, end_cell) = sorted(self._selection)
+        start_line = max(start_line, self.screen.scrollback.first)
+        with self.lock:
+            stored = {
+                start_line + index: line.runs()
+                for index, line in enumerate(
+                    self.screen.scrollback.lines(start_line, min(end_line + 1, self._end))
+                )
+            }
+        lines = []
+        for number in range(start_line, end_line + 1):
+            text = "".join(text for text, _ in self._line_runs(number, stored))
+            left = cell_to_index(text, start_cell) if number == start_line else 0
+            right = cell_to_index(text, end_cell) if number == end_line else len(text)
+            lines.append(text[left:right].rstrip(" "))
+        return "\n".join(lines)
+
+    def copy(self) -> None:
+        """Put the selected text on the clipboard."""
+        text = self.selected_text()
+        if text:
+            QGuiApplication.clipboard().setText(text)
+
+    def contextMenuEvent(self, event):
+        menu = QMenu(self)
+        copy_action = menu.addAction("Copy", self.copy)
+        copy_action.setEnabled(self._selection is not None)
+        if self.receivers(self.paste_requested):
+            menu.addAction("Paste", self.paste_requested.emit)
+        menu.exec_(event.globalPos())
@@ -11,6 +11,9 @@ from PyQt5.QtWidgets import (QAction, QInputDialog, QMenu, QMessageBox,
 from ui.widgets.device_list import DeviceListWidget
 from ui.widgets.device_status_widget import DeviceStatusWidget
 from utils.logger import logger
+from utils.session_supervisor import session_supervisor
+from utils.ssh_utils import session_pool_params
+from utils.transport_pool import normalize_jump_hosts
 
 
 class DeviceManagement(QObject):
@@ -46,6 +49,34 @@ class DeviceManagement(QObject):
         else:
             self.devices = []
         self.update_device_list()
+        for device in self.devices:
+            if device.get("favorite"):
+                session_supervisor.add_favorite(self.session_params(device))
+
+    def session_params(self, device):
+        return session_pool_params(
+            device["hostname"],
+            device["username"],
+            device.get("password"),
+            device.get("key_filename"),
+            device.get("port", 22),
+            device.get("connection_profile"),
+            device.get("jump_hosts"),
+        )
+
+    def toggle_favorite(self, device_id):
+        """Start or stop keeping a device's SSH transport warm in the background."""
+        device = self.get_device(device_id)
+        if not device:
+            return
+        device["favorite"] = not device.get("favorite", False)
+        if device["favorite"]:
+            session_supervisor.add_favorite(self.session_params(device))
+            self.main_window.update_status(f"Keeping '{device['name']}' connected")
+        else:
+            session_supervisor.remove_favorite(self.session_params(device))
+            self.main_window.update_status(f"'{device['name']}' no longer kept connected")
+        self.save_devices()
 
     def save_devices(self):
         encrypted_data = self.fernet.encrypt(json.dumps(self.devices).encode())
@@ -110,6 +141,38 @@ class DeviceManagement(QObject):
                     self.update_device_list()
                     self.main_window.update_status(f"Device '{name}' updated")
 
+    def edit_jump_hosts(self, device_id):
+        """Set the ProxyJump route (e.g. "admin@bastion,admin@inner:2222") of a device."""
+        device = self.get_device(device_id)
+        if not device:
+            return
+        current = device.get("jump_hosts") or ""
+        if not isinstance(current, str):
+            hops = []
+            for hop in normalize_jump_hosts(current):
+                user = f"{hop['username']}@" if hop.get("username") else ""
+                hops.append(f"{user}{hop['hostname']}:{hop['port']}")
+            current = ",".join(hops)
+        spec, ok = QInputDialog.getText(
+            self.main_window,
+            "Jump Hosts",
+            "Jump hosts, nearest first ([user@]host[:port], comma separated):",
+            text=current,
+        )
+        if not ok:
+            return
+        try:
+            normalize_jump_hosts(spec)
+        except ValueError as e:
+            QMessageBox.warning(self.main_window, "Jump Hosts", str(e))
+            return
+        device["jump_hosts"] = spec.strip() or None
+        self.save_devices()
+        self.main_window.update_status(
+            f"Device '{device['name']}' now connects "
+            + (f"through {device['jump_hosts']}" if device["jump_hosts"] else "directly")
+        )
+
     def delete_device(self, device_id):
         device = self.get_device(device_id)
         if device:
@@ -155,6 +218,11 @@ class DeviceManagement(QObject):
         edit_action = context_menu.addAction("Edit")
         delete_action = context_menu.addAction("Delete")
         connect_action = context_menu.addAction("Connect")
+        favorite_action = context_menu.addAction("Keep Connected")
+        favorite_action.setCheckable(True)
+        favorite_action.setChecked(bool(device and device.get("favorite")))
+        benchmark_action = context_menu.addAction("Link Benchmark...")
+        jump_action = context_menu.addAction("Jump Hosts...")
 
         action = context_menu.exec_(self.main_window.device_list.mapToGlobal(position))
 
@@ -165,6 +233,12 @@ class DeviceManagement(QObject):
         elif action == connect_action:
             # Use QTimer to schedule the async operation
             QTimer.singleShot(0, lambda: self.connect_to_device(device_id))
+        elif action == favorite_action:
+            self.toggle_favorite(device_id)
+        elif action == benchmark_action:
+            self.main_window.tools_actions.link_benchmark(device)
+        elif action == jump_action:
+            self.edit_jump_hosts(device_id)
 
     def add_device(self, device_data):
         print(f"Adding device to list: {device_data}")
@@ -176,6 +250,7 @@ class DeviceManagement(QObject):
             "password": device_data.get("password", ""),
             "port": device_data.get("port", 22),
             "connection_type": device_data.get("connection_type", "SSH"),
+            "jump_hosts": device_data.get("jump_hosts"),
         }
         self.devices.append(new_device)
         self.save_devices()
@@ -52,6 +52,10 @@ class EditActions:
     def find(self) -> None:
         """Open find dialog."""
         logger.info("Find action triggered")
+        current_tab = self.main_window.tab_widget.currentWidget()
+        if hasattr(current_tab, "show_find_bar"):
+            current_tab.show_find_bar()
+            return
         text, ok = QInputDialog.getText(self.main_window, "Find", "Enter text to find:")
         if ok and text:
             current_tab = self.main_window.tab_widget.currentWidget()
@@ -11,6 +11,7 @@ from PyQt5.QtWidgets import (QAction, QDialog, QFileDialog, QInputDialog,
 from qasync import asyncSlot
 
 from utils.logger import logger
+from utils.transport_pool import transport_pool
 
 
 class RemoteFileBrowserDialog(QDialog):
@@ -223,9 +224,11 @@ class FileActions(QObject):
     def open_file_browser(self):
         logger.info("Opening file browser for current session")
         current_tab = self.main_window.tab_widget.currentWidget()
-        if hasattr(current_tab, "ssh_client") and current_tab.ssh_client:
+        if getattr(current_tab, "ssh_connection", None):
             try:
-                sftp = current_tab.ssh_client.open_sftp()
+                sftp = transport_pool.open_sftp(
+                    **current_tab.ssh_connection.pool_params()
+                )
                 dialog = RemoteFileBrowserDialog(sftp, self.main_window)
                 dialog.exec_()
 
@@ -25,8 +25,11 @@ from ui.ui_setup import setup_main_window
 from ui.widgets.device_list import DeviceListWidget
 from utils.logger import logger
 from utils.script_runner import ScriptRunner
+from utils.session_supervisor import session_supervisor
 from utils.settings_manager import SettingsManager
 from utils.theme_manager import ThemeManager
+from utils.transcript import DEFAULT_TRANSCRIPT_DIR
+from utils.transport_pool import transport_pool
 
 from .device_management import DeviceManagement
 from .device_status_management import DeviceStatusManagement
@@ -239,7 +242,27 @@ class MainWindow(QMainWindow):
 
     async def create_ssh_tab(self, session_data):
         try:
+            default_backend = self.settings_manager.get_setting("ssh_backend")
+            if default_backend and "ssh_backend" not in session_data:
+                session_data = {**session_data, "ssh_backend": default_backend}
+            for key in ("scrollback_lines", "scrollback_max_mb", "scrollback_spill"):
+                value = self.settings_manager.get_setting(key)
+                if value is not None and key not in session_data:
+                    session_data = {**session_data, key: value}
             ssh_tab = SSHTab(session_data, self.chief)
+            if self.settings_manager.get_setting("session_transcripts"):
+                ssh_tab.start_transcript(
+                    self.settings_manager.get_setting(
+                        "transcript_dir", DEFAULT_TRANSCRIPT_DIR
+                    )
+                )
+            if hasattr(self, "plugin_manager"):
+                # Plugins see the raw bytes as a memoryview; copy to keep them.
+                ssh_tab.output_pipeline.add_stage(
+                    lambda view: self.plugin_manager.trigger_hook(
+                        "on_output", ssh_tab, view
+                    )
+                )
             index = self.tab_widget.addTab(ssh_tab, f"SSH: {session_data['hostname']}")
             self.tab_widget.setCurrentIndex(index)
             ThemeManager.set_terminal_theme(ssh_tab.terminal)
@@ -316,6 +339,14 @@ class MainWindow(QMainWindow):
         logger.info("Opening settings dialog")
         self.settings_actions.open_settings_dialog()
 
+    def changeEvent(self, event):
+        """Stop drawing sessions while the window is minimized."""
+        if event.type() == QtCore.QEvent.WindowStateChange:
+            # Tabs in split views included.
+            for tab in self.findChildren(SSHTab):
+                tab.update_rendering()
+        super().changeEvent(event)
+
     def closeEvent(self, event):
         """Handle the window close event."""
         logger.info("Closing application")
@@ -324,6 +355,7 @@ class MainWindow(QMainWindow):
 
     async def shutdown(self):
         """Perform asynchronous shutdown operations."""
+        session_supervisor.stop()
         for task in self.tasks:
             if isinstance(task, asyncio.Task) and not task.done():
                 try:
@@ -418,7 +450,9 @@ class MainWindow(QMainWindow):
         current_tab = self.tab_widget.currentWidget()
         if isinstance(current_tab, SSHTab) and current_tab.ssh_connection:
             try:
-                sftp = current_tab.ssh_connection.open_sftp()
+                sftp = transport_pool.open_sftp(
+                    **current_tab.ssh_connection.pool_params()
+                )
                 dialog = RemoteFileBrowserDialog(sftp, self)
                 dialog.exec_()
 
@@ -1,11 +1,13 @@
 from PyQt5 import QtGui, QtWidgets
 
+from ui.elements.terminal_view import TerminalView
+
 
 class TerminalWidget(QtWidgets.QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.layout = QtWidgets.QVBoxLayout(self)
-        self.text_edit = QtWidgets.QTextEdit(self)
+        self.text_edit = TerminalView(self)
         self.text_edit.setReadOnly(True)
         self.text_edit.setFont(QtGui.QFont("Courier", 10))
         self.layout.addWidget(self.text_edit)
@@ -5,7 +5,14 @@ if TYPE_CHECKING:
 else:
     from PyQt5.QtWidgets import QMessageBox, QAction, QMenu
 
+from PyQt5.QtWidgets import QFileDialog
+
+from ui.dialogs.fanout_dialog import FanoutDialog
+from ui.dialogs.link_benchmark_dialog import LinkBenchmarkDialog
+from ui.tabs.replay_tab import ReplayTab
 from utils.logger import logger
+from utils.recording import DEFAULT_RECORDING_DIR
+from utils.transcript import DEFAULT_TRANSCRIPT_DIR
 
 
 class ToolsActions:
@@ -72,8 +79,121 @@ class ToolsActions:
             self.main_window, "Info", "Import Settings not implemented yet"
         )
 
+    def run_command_on_devices(self):
+        logger.info("Run Command on Devices action triggered")
+        device_management = getattr(self.main_window, "device_management", None)
+        devices = device_management.devices if device_management else []
+        if not devices:
+            QMessageBox.information(
+                self.main_window, "Info", "Add devices to the inventory first"
+            )
+            return
+        dialog = FanoutDialog(devices, self.main_window)
+        dialog.show()
+
+    def link_benchmark(self, device=None):
+        logger.info("Link Benchmark action triggered")
+        device_management = getattr(self.main_window, "device_management", None)
+        devices = device_management.devices if device_management else []
+        if not devices:
+            QMessageBox.information(
+                self.main_window, "Info", "Add devices to the inventory first"
+            )
+            return
+        dialog = LinkBenchmarkDialog(
+            devices,
+            self.main_window,
+            device=device,
+            on_apply=lambda _: device_management.save_devices(),
+        )
+        dialog.show()
+
+    def toggle_transcript(self):
+        logger.info("Toggle Transcript action triggered")
+        current_tab = self.main_window.tab_widget.currentWidget()
+        if not hasattr(current_tab, "start_transcript"):
+            QMessageBox.information(
+                self.main_window, "Info", "Open an SSH session to record a transcript"
+            )
+            return
+        if current_tab.transcript is None:
+            writer = current_tab.start_transcript(
+                self.main_window.settings_manager.get_setting(
+                    "transcript_dir", DEFAULT_TRANSCRIPT_DIR
+                )
+            )
+            self.main_window.update_status(f"Recording transcript to {writer.directory}")
+        else:
+            current_tab.stop_transcript()
+            self.main_window.update_status("Transcript stopped")
+
+    def toggle_recording(self):
+        logger.info("Toggle Recording action triggered")
+        current_tab = self.main_window.tab_widget.currentWidget()
+        if not hasattr(current_tab, "start_recording"):
+            QMessageBox.information(
+                self.main_window, "Info", "Open an SSH session to record it"
+            )
+            return
+        if current_tab.recorder is None:
+            recorder = current_tab.start_recording(
+                self.main_window.settings_manager.get_setting(
+                    "recording_dir", DEFAULT_RECORDING_DIR
+                )
+            )
+            self.main_window.update_status(f"Recording session to {recorder.path}")
+        else:
+            path = current_tab.stop_recording()
+            self.main_window.update_status(f"Recording saved to {path}")
+
+    def toggle_raw_input(self):
+        logger.info("Toggle Raw Input action triggered")
+        current_tab = self.main_window.tab_widget.currentWidget()
+        if not hasattr(current_tab, "set_raw_input"):
+            QMessageBox.information(
+                self.main_window, "Info", "Open an SSH session to change its input mode"
+            )
+            return
+        current_tab.set_raw_input(not current_tab.raw_input)
+        self.main_window.update_status(
+            "Keys go straight to the remote side"
+            if current_tab.raw_input
+            else "Lines are edited locally and sent on Return"
+        )
+
+    def replay_recording(self):
+        logger.info("Replay Recording action triggered")
+        path, _ = QFileDialog.getOpenFileName(
+            self.main_window,
+            "Replay Recording",
+            self.main_window.settings_manager.get_setting(
+                "recording_dir", DEFAULT_RECORDING_DIR
+            ),
+            "Session recordings (*.cast)",
+        )
+        if not path:
+            return
+        try:
+            replay_tab = ReplayTab(path)
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to open recording {path}: {str(e)}")
+            QMessageBox.warning(
+                self.main_window, "Error", f"Failed to open recording: {str(e)}"
+            )
+            return
+        index = self.main_window.tab_widget.addTab(
+            replay_tab, f"Replay: {replay_tab.recording.header.get('title', path)}"
+        )
+        self.main_window.tab_widget.setCurrentIndex(index)
+
     def setup_menu(self, menu: QMenu):
         actions = [
+            ("Run Command on Devices", self.run_command_on_devices),
+            ("Link Benchmark", self.link_benchmark),
+            ("Toggle Transcript", self.toggle_transcript),
+            ("Toggle Recording", self.toggle_recording),
+            ("Replay Recording", self.replay_recording),
+            ("Toggle Raw Input", self.toggle_raw_input),
             ("Keymap Editor", self.keymap_editor),
             ("Create Public Key", self.create_public_key),
             ("Convert Private Key to OpenSSH Format", self.convert_private_key),
@@ -6,18 +6,17 @@ autocompletion.
 """
 
 from PyQt5.QtCore import QStringListModel, Qt, QThread, pyqtSignal
-from PyQt5.QtGui import QTextCursor
 from PyQt5.QtWidgets import QCompleter, QHBoxLayout, QLabel, QWidget
 
 from connections.serial_connection import SerialConnection
 from connections.ssh_connection import SSHConnection
-from ui.elements.keyword_highlighter import KeywordHighlighter
+from ui.elements.keyword_highlighter import KeywordMatcher, load_keywords
 from utils.input_validation import validate_connection_params
 from utils.macro_manager import MacroManager
 from utils.session_manager import SessionManager
 
 from .connection_handlers import connect, send_command, update_terminal
-from .event_handlers import handle_key_press, on_terminal_change
+from .event_handlers import handle_key_press
 from .macro_handlers import play_macro, toggle_macro_recording
 from .meshtastic_handlers import toggle_meshtastic_chat
 from .ui_setup import setup_ui
@@ -61,9 +60,7 @@ class ConnectionTab(QWidget):
         layout = QHBoxLayout(self)
         self = setup_ui(self)
 
-        self.highlighter = KeywordHighlighter(
-            self.terminal.document(), self.parent.chief
-        )
+        self.terminal.set_keywords(KeywordMatcher(load_keywords()))
 
         self.connect_button.clicked.connect(self.connect)
         self.command_input.returnPressed.connect(self.send_command)
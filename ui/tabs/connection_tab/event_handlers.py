@@ -23,15 +23,3 @@ def show_context_menu(self, pos):
     context_menu = self.create_context_menu()
     context_menu.exec_(self.mapToGlobal(pos))
 
-
-def on_terminal_change(self):
-    cursor = self.terminal.textCursor()
-    if cursor.position() < self.command_start_position:
-        cursor.setPosition(self.terminal.document().characterCount())
-        self.terminal.setTextCursor(cursor)
-
-    current_command = self.terminal.toPlainText()[self.command_start_position:]
-    if self.chief_enabled:
-        self.chief.analyze_command(current_command)
-
-    self.update_syntax_highlighting()
@@ -1,5 +1,7 @@
 from PyQt5.QtWidgets import (QComboBox, QHBoxLayout, QLabel, QLineEdit,
-                             QPushButton, QTextEdit, QVBoxLayout)
+                             QPushButton, QVBoxLayout)
+
+from ui.elements.terminal_view import TerminalView
 
 
 def setup_ui(self):
@@ -39,7 +41,7 @@ def setup_ui(self):
     layout.addWidget(self.connect_button)
 
     # Terminal
-    self.terminal = QTextEdit()
+    self.terminal = TerminalView()
     self.terminal.setReadOnly(True)
     layout.addWidget(self.terminal)
 
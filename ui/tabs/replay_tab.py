@@ -0,0 +1,135 @@
+import time
+
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import (QComboBox, QHBoxLayout, QLabel, QPushButton,
+                             QSlider, QVBoxLayout, QWidget)
+
+from ui.elements.terminal_view import TerminalView
+from utils.recording import Recording, apply_event, iter_events
+
+PLAYBACK_INTERVAL_MS = 16
+SPEEDS = (0.5, 1.0, 2.0, 4.0, 8.0, 16.0)
+# Longer pauses in the recording are shortened to this when playing.
+MAX_IDLE = 2.0
+SLIDER_STEPS_PER_SECOND = 10
+
+
+class ReplayTab(QWidget):
+    """Plays back a recorded session, with pause, speed and a seek slider.
+
+    Seeking restores the nearest keyframe of the recording and replays only
+    the output after it, so scrubbing stays quick in long recordings.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.recording = Recording(path)
+        self.screen = self.recording.new_screen()
+        self.position = 0.0
+        self.speed = 1.0
+        self._events = None
+        self._next_event = None
+        self._last_tick = None
+        self.init_ui()
+        self.timer = QTimer(self)
+        self.timer.setInterval(PLAYBACK_INTERVAL_MS)
+        self.timer.timeout.connect(self.advance)
+        self.seek(0.0)
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.terminal = TerminalView(screen=self.screen)
+        self.terminal.setReadOnly(True)
+        font = QFont("Consolas", 10)
+        font.setStyleHint(QFont.Monospace)
+        self.terminal.setFont(font)
+        layout.addWidget(self.terminal)
+
+        controls = QHBoxLayout()
+        self.play_button = QPushButton("Play")
+        self.play_button.clicked.connect(self.toggle_playback)
+        controls.addWidget(self.play_button)
+
+        self.speed_box = QComboBox()
+        for speed in SPEEDS:
+            self.speed_box.addItem(f"{speed:g}x", speed)
+        self.speed_box.setCurrentIndex(SPEEDS.index(1.0))
+        self.speed_box.currentIndexChanged.connect(
+            lambda index: setattr(self, "speed", self.speed_box.itemData(index))
+        )
+        controls.addWidget(self.speed_box)
+
+        self.slider = QSlider(Qt.Horizontal)
+        self.slider.setRange(
+            0, int(self.recording.duration * SLIDER_STEPS_PER_SECOND) + 1
+        )
+        self.slider.sliderMoved.connect(
+            lambda value: self.seek(value / SLIDER_STEPS_PER_SECOND)
+        )
+        controls.addWidget(self.slider)
+
+        self.time_label = QLabel("")
+        controls.addWidget(self.time_label)
+        layout.addLayout(controls)
+
+    def toggle_playback(self):
+        if self.timer.isActive():
+            self.pause()
+        else:
+            self.play()
+
+    def play(self):
+        if self.position >= self.recording.duration:
+            self.seek(0.0)
+        self._last_tick = time.monotonic()
+        self.timer.start()
+        self.play_button.setText("Pause")
+
+    def pause(self):
+        self.timer.stop()
+        self.play_button.setText("Play")
+
+    def seek(self, position):
+        """Show the screen as it was ``position`` seconds into the recording."""
+        self.position = min(max(0.0, position), self.recording.duration)
+        offset = self.recording.seek(self.position, self.screen)
+        self._events = iter_events(self.recording.path, offset)
+        self._next_event = next(self._events, None)
+        self._last_tick = time.monotonic()
+        self.update_view()
+
+    def advance(self):
+        now = time.monotonic()
+        self.position += (now - self._last_tick) * self.speed
+        self._last_tick = now
+        event = self._next_event
+        if event is not None and event[0] - self.position > MAX_IDLE:
+            # Skip the rest of a long pause.
+            self.position = event[0] - MAX_IDLE
+        while event is not None and event[0] <= self.position:
+            apply_event(self.screen, event[1], event[2])
+            event = next(self._events, None)
+        self._next_event = event
+        if event is None:
+            self.position = self.recording.duration
+            self.pause()
+        self.update_view()
+
+    def update_view(self):
+        self.terminal.render()
+        if not self.slider.isSliderDown():
+            self.slider.setValue(int(self.position * SLIDER_STEPS_PER_SECOND))
+        self.time_label.setText(
+            f"{_clock(self.position)} / {_clock(self.recording.duration)}"
+        )
+
+    def hideEvent(self, event):
+        self.pause()
+        super().hideEvent(event)
+
+
+def _clock(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}:{seconds:02d}"
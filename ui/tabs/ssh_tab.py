@@ -2,15 +2,41 @@ import asyncio
 import re
 
 from PyQt5.QtCore import QObject, Qt, QTimer, pyqtSignal
-from PyQt5.QtGui import QColor, QFont, QTextCursor
-from PyQt5.QtWidgets import (QApplication, QHBoxLayout, QInputDialog,
-                             QLineEdit, QMessageBox, QPushButton, QSplitter,
-                             QTextEdit, QVBoxLayout, QWidget)
+from PyQt5.QtGui import QFont, QGuiApplication
+from PyQt5.QtWidgets import (QHBoxLayout, QInputDialog, QLabel, QLineEdit,
+                             QMessageBox, QPushButton, QSplitter, QTextEdit,
+                             QVBoxLayout, QWidget)
 
 from ai.chief import Chief
+from ui.elements.find_bar import FindBar
+from ui.elements.paste_bar import PasteBar
+from ui.elements.terminal_view import TerminalView
+from utils.input_writer import InputWriter
+from utils.key_encoder import encode_key
+from utils.local_echo import (DEFAULT_RTT_THRESHOLD, EchoPredictor,
+                              is_password_prompt)
 from utils.logger import logger
+from utils.output_pipeline import OutputPipeline, ThroughputMeter
+from utils.output_worker import DEFAULT_BACKGROUND_BUDGET, OutputWorker
+from utils.paste_engine import DEFAULT_MAX_RATE, PasteEngine
+from utils.recording import DEFAULT_RECORDING_DIR, SessionRecorder
+from utils.render_scheduler import FRAME_INTERVAL_MS
+from utils.scrollback import (DEFAULT_SCROLLBACK_BYTES,
+                              DEFAULT_SCROLLBACK_LINES, ScrollbackStore)
+from utils.scrollback_search import ScrollbackSearch
+from utils.session_supervisor import reconnect_with_backoff
+from utils.terminal_screen import TerminalScreen
+from utils.transcript import DEFAULT_TRANSCRIPT_DIR, TranscriptWriter
 from utils.ssh_utils import SSHConnection
 
+RECONNECT_MAX_DELAY = 30
+# Past this much unprocessed output the channel is not read, so the SSH
+# window holds the device back instead of memory filling up.
+MAX_OUTPUT_BACKLOG = 32 * 1024 * 1024
+BACKLOG_POLL_INTERVAL = 0.05
+# Seconds sudo has to ask for the password before it is not sent.
+SUDO_PROMPT_TIMEOUT = 10
+
 
 class SSHWorker(QObject):
     output_ready = pyqtSignal(str, str)
@@ -29,6 +55,9 @@ class SSHWorker(QObject):
 
 
 class SSHTab(QWidget):
+    # Emitted by the output worker thread when a frame is ready to paint.
+    frame_ready = pyqtSignal()
+
     def __init__(self, session_data, chief: Chief):
         super().__init__()
         self.session_data = session_data
@@ -38,14 +67,33 @@ class SSHTab(QWidget):
         self.history_index = -1
         self.os_type = session_data.get("os_type", "unknown")
         self.is_cisco = "cisco" in self.os_type.lower()
+        self.output_pipeline = OutputPipeline()
+        self.throughput = ThroughputMeter()
+        self.output_pipeline.add_stage(self.throughput)
         self.init_ui()
         self.is_connected = False
         self.insights_visible = True
         self.setup_chief_interaction()
-        self.last_prompt_position = 0
-        self.output_buffer = ""
+        self.throughput_timer = QTimer(self)
+        self.throughput_timer.timeout.connect(self.update_throughput)
+        self.transcript = None
+        self.recorder = None
+        self.find_match = None
         self.read_output_task = None
+        self.reconnect_task = None
         self.sudo_in_progress = False
+        self.raw_input = session_data.get("input_mode") == "raw"
+        # Keystrokes sent in the same tick, or while a write is in flight,
+        # share one channel write.
+        self.input_writer = InputWriter(self.write_channel)
+        # Pasted text is paced by the echo of each line, or sent as a
+        # bracketed paste when the remote side asks for one.
+        paste_rate_kb = session_data.get("paste_rate_kb")
+        self.paste_engine = PasteEngine(
+            self.write_channel,
+            at_prompt=self.at_prompt,
+            max_rate=int(paste_rate_kb * 1024) if paste_rate_kb else DEFAULT_MAX_RATE,
+        )
 
     def init_ui(self):
         layout = QVBoxLayout(self)
@@ -54,20 +102,61 @@ class SSHTab(QWidget):
         self.splitter = QSplitter(Qt.Vertical)
 
         # Terminal
-        self.terminal = QTextEdit()
-        self.terminal.setFont(QFont("Consolas", 10))
-        self.terminal.setStyleSheet(
-            """
-            QTextEdit {
-                background-color: #1e1e1e;
-                color: #d4d4d4;
-                border: none;
-                padding: 5px;
-            }
-        """
-        )
+        self.terminal = TerminalView()
+        font = QFont("Consolas", 10)
+        font.setStyleHint(QFont.Monospace)
+        self.terminal.setFont(font)
         self.terminal.keyPressEvent = self.terminal_key_press
+        self.terminal.resizeEvent = self.terminal_resize
+        self.terminal.paste_requested.connect(self.paste_clipboard)
         self.splitter.addWidget(self.terminal)
+        # Output is interpreted by a VT100/xterm screen model; the view only
+        # redraws the rows it changed.
+        max_mb = self.session_data.get("scrollback_max_mb")
+        self.screen = TerminalScreen(
+            scrollback=ScrollbackStore(
+                max_lines=int(
+                    self.session_data.get("scrollback_lines", DEFAULT_SCROLLBACK_LINES)
+                ),
+                max_bytes=(
+                    int(max_mb * 1024 * 1024) if max_mb else DEFAULT_SCROLLBACK_BYTES
+                ),
+                spill=bool(self.session_data.get("scrollback_spill", False)),
+            )
+        )
+        # Decoding and interpreting the output happen on a worker thread;
+        # this thread only paints the frames it prepares, at most one per
+        # frame interval.
+        # The view reads scrolled-off lines from the store as they are shown,
+        # so frames carry no history. While the tab is hidden the worker only
+        # keeps the screen up to date, within its background budget.
+        budget_kb = self.session_data.get("background_budget_kb")
+        self.output_worker = OutputWorker(
+            self.screen,
+            self.output_pipeline,
+            on_frame=self.frame_ready.emit,
+            history_limit=0,
+            background_budget=(
+                int(budget_kb * 1024) if budget_kb else DEFAULT_BACKGROUND_BUDGET
+            ),
+        )
+        self.terminal.set_screen(self.screen, lock=self.output_worker.lock)
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setSingleShot(True)
+        self.frame_timer.setInterval(FRAME_INTERVAL_MS)
+        self.frame_timer.timeout.connect(self.render_frame)
+        self.frame_ready.connect(self.schedule_frame)
+        # Commands are shown as sent until their echo arrives, on slow links.
+        self.echo_predictor = EchoPredictor(
+            threshold=float(
+                self.session_data.get("local_echo_threshold", DEFAULT_RTT_THRESHOLD)
+            ),
+            mode=self.session_data.get("local_echo", "auto"),
+        )
+        self.echo_timer = QTimer(self)
+        self.echo_timer.setSingleShot(True)
+        self.echo_timer.timeout.connect(self.check_echo)
+        self.update_rendering()
 
         # Chief's analysis output
         self.chief_output = QTextEdit()
@@ -90,23 +179,66 @@ class SSHTab(QWidget):
 
         layout.addWidget(self.splitter)
 
+        # Find in terminal, over the indexed scrollback and the screen
+        self.scrollback_search = ScrollbackSearch(self.screen.scrollback)
+        self.find_bar = FindBar()
+        self.find_bar.find_requested.connect(self.on_find_requested)
+        self.find_bar.closed.connect(self.terminal.clear_match)
+        self.find_bar.hide()
+        layout.addWidget(self.find_bar)
+
+        # Progress of a paste, while one is sent
+        self.paste_bar = PasteBar()
+        self.paste_bar.abort_requested.connect(self.abort_paste)
+        self.paste_bar.hide()
+        layout.addWidget(self.paste_bar)
+
+        # Output rate of the session, refreshed while connected
+        self.throughput_label = QLabel("")
+        self.throughput_label.setAlignment(Qt.AlignRight)
+        self.throughput_label.setFont(QFont("Consolas", 8))
+        layout.addWidget(self.throughput_label)
+
+    async def open_connection(self):
+        """Open the SSH session and start streaming its output.
+
+        Returns:
+            bool: True if the session was established.
+        """
+        port = int(self.session_data.get("port", 22))
+        self.output_pipeline.reset()
+        self.ssh_connection = SSHConnection(
+            hostname=self.session_data["hostname"],
+            username=self.session_data["username"],
+            password=self.session_data.get("password"),
+            key_filename=self.session_data.get("key_filename"),
+            port=port,
+            backend=self.session_data.get("ssh_backend"),
+            connection_profile=self.session_data.get("connection_profile"),
+            jump_hosts=self.session_data.get("jump_hosts"),
+            output_pipeline=self.output_pipeline,
+        )
+        connected, os_type = await self.ssh_connection.async_connect()
+        if not connected:
+            return False
+        self.output_worker.text_listeners = [
+            self.ssh_connection.dispatch_output,
+            self.paste_engine.output,
+        ]
+        self.is_connected = True
+        self.os_type = os_type
+        self.is_cisco = os_type == "cisco"
+        # The banner and first prompt were read while the prompt was learned.
+        if self.ssh_connection.login_output:
+            self.output_worker.submit_text(self.ssh_connection.login_output)
+        await self.ssh_connection.resize_terminal(self.screen.columns, self.screen.rows)
+        self.read_output_task = asyncio.create_task(self.read_output_loop())
+        self.throughput_timer.start(1000)
+        return True
+
     async def connect_async(self):
         try:
-            port = int(self.session_data.get("port", 22))
-            self.ssh_connection = SSHConnection(
-                hostname=self.session_data["hostname"],
-                username=self.session_data["username"],
-                password=self.session_data.get("password"),
-                key_filename=self.session_data.get("key_filename"),
-                port=port,
-            )
-            connected, os_type = await self.ssh_connection.async_connect()
-            if connected:
-                self.is_connected = True
-                self.os_type = os_type
-                self.is_cisco = os_type == "cisco"
-                self.show_prompt()
-                self.read_output_task = asyncio.create_task(self.read_output_loop())
+            if await self.open_connection():
                 return True
             else:
                 raise Exception(
@@ -122,55 +254,309 @@ class SSHTab(QWidget):
             return False
 
     async def read_output_loop(self):
-        while self.is_connected:
-            try:
-                output = await asyncio.wait_for(
-                    self.ssh_connection.read_output(), timeout=0.1
+        try:
+            async for data in self.ssh_connection.read_output_generator(decode=False):
+                if not self.is_connected:
+                    break
+                self.output_worker.submit(data)
+                while (
+                    self.output_worker.backlog > MAX_OUTPUT_BACKLOG and self.is_connected
+                ):
+                    await asyncio.sleep(BACKLOG_POLL_INTERVAL)
+        except Exception as e:
+            logger.error(f"Error in read_output_loop: {str(e)}")
+        self.output_worker.finish()
+        if self.is_connected:
+            # The channel closed without the tab being closed: the link dropped.
+            self.is_connected = False
+            self.write_local("Connection lost. Reconnecting...")
+            self.reconnect()
+
+    def update_throughput(self):
+        if not self.is_connected:
+            self.throughput_timer.stop()
+            self.throughput_label.setText("")
+            return
+        self.throughput_label.setText(
+            f"{self.throughput.mb_per_s():.2f} MB/s  "
+            f"({self.throughput.total / 1e6:.1f} MB received)"
+        )
+
+    def start_transcript(self, directory=DEFAULT_TRANSCRIPT_DIR, **kwargs):
+        """Record the session's raw output to compressed, rotating transcript files.
+
+        Args:
+            directory (str, optional): Where the transcripts go. Defaults to "logs/transcripts".
+            **kwargs: Further ``TranscriptWriter`` options (compression, max_bytes...).
+
+        Returns:
+            TranscriptWriter: The running writer.
+        """
+        if self.transcript is None:
+            self.transcript = TranscriptWriter(
+                self.session_data["hostname"], directory, **kwargs
+            )
+            self.output_pipeline.add_stage(self.transcript)
+            logger.info(f"Recording transcript of {self.session_data['hostname']}")
+        return self.transcript
+
+    def stop_transcript(self):
+        if self.transcript is None:
+            return
+        self.output_pipeline.remove_stage(self.transcript)
+        # Closing waits for the writer to drain; keep that off the GUI thread.
+        asyncio.get_event_loop().run_in_executor(None, self.transcript.close)
+        self.transcript = None
+
+    def start_recording(self, directory=DEFAULT_RECORDING_DIR, **kwargs):
+        """Record the session as an asciicast file that can be replayed and scrubbed.
+
+        Args:
+            directory (str, optional): Where recordings go. Defaults to "logs/recordings".
+            **kwargs: Further ``SessionRecorder`` options (keyframe_interval...).
+
+        Returns:
+            SessionRecorder: The running recorder.
+        """
+        if self.recorder is None:
+            with self.output_worker.lock:
+                # Start from what is on screen now, so the replay is not blank.
+                self.recorder = SessionRecorder(
+                    self.session_data["hostname"],
+                    self.screen.columns,
+                    self.screen.rows,
+                    directory,
+                    **kwargs,
                 )
-                if output:
-                    self.output_buffer += output
-                    self.update_terminal()
-            except asyncio.TimeoutError:
-                continue
-            except Exception as e:
-                logger.error(f"Error in read_output_loop: {str(e)}")
-                break
-            await asyncio.sleep(0.01)
+                self.recorder.write(self.screen_state_text())
+                self.output_worker.add_screen_listener(self.recorder)
+            logger.info(f"Recording session {self.session_data['hostname']}")
+        return self.recorder
 
-    def update_terminal(self):
-        cursor = self.terminal.textCursor()
-        cursor.movePosition(QTextCursor.End)
+    def stop_recording(self, discard=False):
+        """Stop recording.
 
-        # Updated ANSI escape sequence pattern
-        ansi_escape = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
+        Args:
+            discard (bool, optional): Delete the recording instead of keeping it. Defaults to False.
 
-        # Remove ANSI escape sequences and other control characters
-        clean_text = ansi_escape.sub("", self.output_buffer)
-        clean_text = re.sub(
-            r"^\s*[=>]\s*", "", clean_text, flags=re.MULTILINE
-        )  # Remove leading '=' or '>'
+        Returns:
+            str or None: The path of the kept recording.
+        """
+        if self.recorder is None:
+            return None
+        recorder, self.recorder = self.recorder, None
+        self.output_worker.remove_screen_listener(recorder)
+        # Closing waits for the writer to drain; keep that off the GUI thread.
+        asyncio.get_event_loop().run_in_executor(
+            None, recorder.discard if discard else recorder.close
+        )
+        return None if discard else recorder.path
+
+    def screen_state_text(self):
+        """Return escape sequences that redraw the current screen rows."""
+        lines = ["\x1b[H\x1b[2J"]
+        for row in range(self.screen.rows):
+            text = self.screen.line(row).text()
+            if text:
+                lines.append(f"\x1b[{row + 1};1H{text}")
+        lines.append(f"\x1b[{self.screen.cursor_y + 1};{self.screen.cursor_x + 1}H")
+        return "".join(lines)
+
+    def update_terminal(self, output):
+        self.output_worker.submit_text(output)
+
+    def schedule_frame(self):
+        if not self.frame_timer.isActive():
+            self.frame_timer.start()
+
+    def render_frame(self):
+        self.frame_timer.stop()
+        if not self.output_worker.suspended:
+            self.terminal.render(self.output_worker.take_frame())
+            self.check_echo()
+        # Cursor position and device attribute queries need an answer.
+        with self.output_worker.lock:
+            responses = self.screen.take_responses()
+        if responses and self.ssh_connection:
+            asyncio.ensure_future(self.ssh_connection.write_input(responses))
+
+    def predict_echo(self, text):
+        """Show ``text``, about to be sent, where its echo is expected."""
+        if self.screen.alternate_screen:
+            return
+        line, column, cell = self.terminal.cursor_position()
+        if is_password_prompt((self.terminal.line_text(line) or "")[:column]):
+            return
+        self.echo_predictor.predict(
+            line, column, text, self.screen.columns - cell, self.screen.columns
+        )
+        self.check_echo()
+
+    def check_echo(self):
+        """Confirm or roll back predicted echo against what the screen shows."""
+        predictor = self.echo_predictor
+        predictor.check(self.terminal.line_text)
+        self.terminal.set_predictions(predictor.pending() if predictor.active else [])
+        if predictor.waiting:
+            # Looked at again when the oldest prediction would time out.
+            self.echo_timer.start(int(predictor.timeout * 1000) + FRAME_INTERVAL_MS)
+
+    def update_rendering(self):
+        """Draw output only while the tab can be seen.
+
+        A hidden tab, or one in a minimized window, leaves its output to the
+        worker; once it is shown again, one frame brings it up to date.
+        """
+        hidden = not self.isVisible() or self.window().isMinimized()
+        if hidden == self.output_worker.suspended:
+            return
+        if hidden:
+            self.output_worker.suspend()
+        else:
+            self.output_worker.resume()
+            self.render_frame()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_rendering()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.update_rendering()
+
+    def show_find_bar(self):
+        self.find_bar.open()
 
-        cursor.insertText(clean_text)
-        self.terminal.setTextCursor(cursor)
-        self.terminal.ensureCursorVisible()
-        self.output_buffer = ""
-        QApplication.processEvents()
+    def find_text(self, text):
+        """Select the newest occurrence of ``text``; used by Edit > Find.
+
+        Returns:
+            bool: True if it was found.
+        """
+        return self.find(text, backwards=True) is not None
+
+    def on_find_requested(self, query, regex, case_sensitive, backwards, restart):
+        if restart:
+            self.find_match = None
+        try:
+            match = self.find(query, regex, case_sensitive, backwards)
+        except re.error as e:
+            self.find_bar.set_status(f"Invalid pattern: {e}")
+            return
+        if not query:
+            self.find_bar.set_status("")
+        elif match is None:
+            self.find_bar.set_status("Not found")
+        else:
+            self.find_bar.set_status(f"Line {match[0] + 1}")
+
+    def find(self, query, regex=False, case_sensitive=False, backwards=False):
+        """Find the next match after the current one and highlight it.
+
+        The scrollback is searched through its index, the screen rows
+        directly; both share the store's absolute line numbers. The search
+        wraps around at either end.
+
+        Args:
+            query (str): The text or regular expression.
+            regex (bool, optional): Treat ``query`` as a regular expression. Defaults to False.
+            case_sensitive (bool, optional): Match case exactly. Defaults to False.
+            backwards (bool, optional): Search towards older output. Defaults to False.
+
+        Returns:
+            tuple or None: The ``(line, column, length)`` match.
+
+        Raises:
+            re.error: If ``regex`` is set and the pattern is invalid.
+        """
+        self.terminal.clear_match()
+        if not query:
+            self.find_match = None
+            return None
+        options = {"regex": regex, "case_sensitive": case_sensitive}
+        # Output keeps arriving on the worker thread; hold it back until the
+        # match is drawn, so the line numbers stay valid.
+        with self.output_worker.lock:
+            self.render_frame()
+            match = self._find_from(query, self.find_match, backwards, options)
+            if match is None and self.find_match is not None:
+                match = self._find_from(query, None, backwards, options)
+            self.find_match = match
+            if match is not None:
+                self.terminal.show_match(*match)
+        return match
+
+    def _find_from(self, query, after, backwards, options):
+        pattern = re.compile(
+            query if options["regex"] else re.escape(query),
+            0 if options["case_sensitive"] else re.IGNORECASE,
+        )
+        end = self.screen.scrollback.end
+        on_screen = [
+            (end + row, found.start(), found.end() - found.start())
+            for row in range(self.screen.rows)
+            if not self.screen.alternate_screen
+            for found in pattern.finditer(self.screen.line(row).text())
+            if found.end() > found.start()
+        ]
+        if backwards:
+            candidates = [match for match in on_screen if after is None or match < after]
+            if candidates:
+                return candidates[-1]
+            return self.scrollback_search.find_next(
+                query, after=after, backwards=True, **options
+            )
+        match = self.scrollback_search.find_next(query, after=after, **options)
+        if match is not None:
+            return match
+        candidates = [match for match in on_screen if after is None or match > after]
+        return candidates[0] if candidates else None
+
+    def clear_scrollback(self):
+        with self.output_worker.lock:
+            self.screen.erase_in_display(3)
+        self.echo_predictor.reset()
+        self.render_frame()
+
+    def write_local(self, text):
+        """Show a message from Eagle Terminal itself on a line of its own."""
+        # Queued behind pending output, so the line it ends up on is unknown.
+        if self.output_worker.backlog or self.screen.cursor_x or self.screen.wrap_next:
+            text = "\n" + text
+        self.output_worker.submit_text(text.replace("\n", "\r\n") + "\r\n")
+
+    def terminal_resize(self, event):
+        TerminalView.resizeEvent(self.terminal, event)
+        columns, rows = self.terminal.fit_to_view()
+        # Lines rewrap: predicted positions no longer hold.
+        self.echo_predictor.reset()
+        self.render_frame()
+        if self.recorder is not None:
+            self.recorder.resize(columns, rows)
+        if self.is_connected:
+            asyncio.ensure_future(self.ssh_connection.resize_terminal(columns, rows))
 
     def terminal_key_press(self, event):
-        if event.key() == Qt.Key_Return:
-            cursor = self.terminal.textCursor()
-            cursor.movePosition(QTextCursor.End)
-            cursor.movePosition(QTextCursor.StartOfLine, QTextCursor.KeepAnchor)
-            line = cursor.selectedText()
-            command = line.split("$ ", 1)[-1].strip()
+        modifiers = event.modifiers() & (Qt.ControlModifier | Qt.ShiftModifier)
+        if (
+            event.key() == Qt.Key_V
+            and modifiers == Qt.ControlModifier | Qt.ShiftModifier
+        ) or (event.key() == Qt.Key_Insert and modifiers == Qt.ShiftModifier):
+            self.paste_clipboard()
+        # Full-screen programs need every key, whatever the input mode.
+        elif self.raw_input or self.screen.alternate_screen:
+            self.send_key(event)
+        elif event.key() == Qt.Key_Return:
+            command = self.terminal.typed_text().strip()
             if command:
                 self.last_command = command
                 self.command_history.append(command)
                 self.history_index = -1
-                self.terminal.insertPlainText("\n")  # Add a new line after the command
+                self.terminal.replace_typed_text("")
+                self.predict_echo(command)
                 asyncio.create_task(self.send_command(command))
-            else:
-                self.show_prompt()
+            elif self.ssh_connection:
+                asyncio.ensure_future(self.ssh_connection.write_input("\n"))
         elif event.key() == Qt.Key_Up:
             self.show_previous_command()
         elif event.key() == Qt.Key_Down:
@@ -178,20 +564,101 @@ class SSHTab(QWidget):
         elif event.key() == Qt.Key_C and (event.modifiers() & Qt.ControlModifier):
             asyncio.create_task(self.send_ctrl_c())
         else:
-            QTextEdit.keyPressEvent(self.terminal, event)
+            TerminalView.keyPressEvent(self.terminal, event)
+
+    def send_key(self, event):
+        """Send a key press to the remote side as an xterm would."""
+        modifiers = event.modifiers()
+        copy = Qt.ControlModifier | Qt.ShiftModifier
+        if event.key() == Qt.Key_C and (modifiers & copy) == copy:
+            # Ctrl-C itself goes to the remote side.
+            self.terminal.copy()
+            return
+        data = encode_key(
+            event.key(), modifiers, event.text(), self.screen.application_cursor_keys
+        )
+        if data is None or not self.is_connected:
+            return
+        self.predict_echo(data)
+        self.input_writer.send(data)
+        self.terminal.scroll_to_bottom()
+
+    def set_raw_input(self, enabled):
+        """Send every key press to the remote side instead of editing lines locally.
+
+        In raw mode the remote shell does its own line editing, completion
+        and history, and full-screen programs get their keys.
+        """
+        self.raw_input = enabled
+        self.terminal.replace_typed_text("")
+
+    def paste_clipboard(self):
+        self.paste_text(QGuiApplication.clipboard().text())
+
+    def copy_and_paste(self):
+        text = self.terminal.selected_text()
+        self.terminal.copy()
+        self.paste_text(text)
+
+    def paste_text(self, text):
+        """Paste ``text`` into the session.
+
+        A single line typed into the local line editor is added to it;
+        anything else goes to the remote side through the paste engine.
+        """
+        if not text:
+            return
+        local = not (self.raw_input or self.screen.alternate_screen)
+        if local and "\n" not in text and "\r" not in text:
+            typed = self.terminal.typed_text()
+            self.terminal.replace_typed_text(typed + text)
+            return
+        if not self.is_connected:
+            return
+        if self.paste_engine.running:
+            self.write_local("A paste is already in progress.")
+            return
+        if local:
+            # What was typed so far is the start of the first line.
+            text = self.terminal.typed_text() + text
+            self.terminal.replace_typed_text("")
+        asyncio.ensure_future(self.run_paste(text))
+
+    async def run_paste(self, text):
+        await self.input_writer.flush()
+        bracketed = self.screen.bracketed_paste
+        self.paste_bar.start(len(text), "bracketed" if bracketed else "line by line")
+        try:
+            if not await self.paste_engine.paste(
+                text, bracketed=bracketed, progress=self.paste_bar.set_progress
+            ):
+                self.write_local(
+                    f"Paste aborted after {self.paste_engine.sent} characters."
+                )
+        except Exception as e:
+            logger.error(f"Error pasting into {self.session_data['hostname']}: {str(e)}")
+        finally:
+            self.paste_bar.hide()
+        self.terminal.scroll_to_bottom()
+
+    def abort_paste(self):
+        self.paste_engine.abort()
+
+    def at_prompt(self, text):
+        return bool(
+            self.ssh_connection and self.ssh_connection.prompt_detector.at_prompt(text)
+        )
+
+    async def write_channel(self, data):
+        if self.ssh_connection:
+            await self.ssh_connection.write_input(data)
 
     async def send_command(self, command):
         if self.ssh_connection and self.ssh_connection.channel:
             try:
-                # Don't echo the command locally
-                await self.ssh_connection.write_input(command + "\n")
-
-                # Wait for the command output
-                output = await self.read_command_output(command)
-                if output:
-                    self.terminal.insertPlainText(output)
-                    self.terminal.moveCursor(QTextCursor.End)
-                    QApplication.processEvents()
+                # The read loop renders the output; this only waits for the
+                # prompt so the finished output can be analysed.
+                output = await self.ssh_connection.run_command(command)
 
                 if self.chief and self.chief.is_functional():
                     analysis = await self.chief.analyze_command_output(
@@ -212,7 +679,7 @@ class SSHTab(QWidget):
                     self.chief_output.append(f"{next_command}")
                     self.chief_output.append(f"Risk Level: {risk_level}")
             except Exception as e:
-                self.terminal.append(f"Error: {str(e)}")
+                self.write_local(f"Error: {str(e)}")
                 if "SSH connection closed" in str(e):
                     self.reconnect()
                 else:
@@ -222,58 +689,7 @@ class SSHTab(QWidget):
                         f"An error occurred while executing the command: {str(e)}",
                     )
         else:
-            self.terminal.append("Not connected to SSH server.")
-
-    async def read_command_output(self, command):
-        output = ""
-        command_echo_received = False
-        prompt_received = False
-        while not prompt_received:
-            chunk = await self.ssh_connection.read_output()
-            if not chunk:
-                await asyncio.sleep(0.1)
-                continue
-
-            # Remove the echoed command from the output
-            if not command_echo_received:
-                if command in chunk:
-                    chunk = chunk.replace(command + "\r\n", "", 1)
-                    command_echo_received = True
-
-            output += chunk
-
-            # Check if we've received the prompt, indicating the command has finished
-            if self.session_data["username"] in chunk and (
-                "$ " in chunk or "# " in chunk
-            ):
-                prompt_received = True
-
-        # Clean up the output
-        output = self.clean_ansi_escape_sequences(output)
-        output = output.strip()
-
-        # Remove the final prompt from the output
-        prompt = f"{self.session_data['username']}@{self.session_data['hostname']}:~$ "
-        output = output.rsplit(prompt, 1)[0]
-
-        return output.strip()
-
-    def clean_ansi_escape_sequences(self, text):
-        ansi_escape = re.compile(
-            r"""
-            \x1B  # ESC
-            (?:   # 7-bit C1 Fe (except CSI)
-                [@-Z\\-_]
-            |     # or [ for CSI, followed by a control sequence
-                \[
-                [0-?]*  # Parameter bytes
-                [ -/]*  # Intermediate bytes
-                [@-~]   # Final byte
-            )
-        """,
-            re.VERBOSE,
-        )
-        return ansi_escape.sub("", text)
+            self.write_local("Not connected to SSH server.")
 
     async def handle_sudo_command(self, command):
         if self.sudo_in_progress:
@@ -285,36 +701,17 @@ class SSHTab(QWidget):
                 self, "Sudo Password", "Enter sudo password:", QLineEdit.Password
             )
             if not ok:
-                self.terminal.append("Sudo command cancelled")
+                self.write_local("Sudo command cancelled")
                 return
 
-            # Send the sudo command
-            await self.ssh_connection.write_input(f"{command}\n")
-
-            # Wait for password prompt
-            while True:
-                output = await self.ssh_connection.read_output()
-                if output:
-                    self.terminal.insertPlainText(output)
-                    self.terminal.moveCursor(QTextCursor.End)
-                    QApplication.processEvents()
-                if "[sudo] password for" in output:
-                    break
+            # The read loop shows the output; this only waits for sudo to ask.
+            if not await self.ssh_connection.wait_for_line(
+                is_password_prompt, f"{command}\n", timeout=SUDO_PROMPT_TIMEOUT
+            ):
+                self.write_local("sudo did not ask for a password.")
+                return
 
-            # Send the password
             await self.ssh_connection.write_input(f"{password}\n")
-
-            # Read and display the output
-            while True:
-                output = await self.ssh_connection.read_output()
-                if output:
-                    # Mask the password in the output
-                    output = output.replace(password, "*" * len(password))
-                    self.terminal.insertPlainText(output)
-                    self.terminal.moveCursor(QTextCursor.End)
-                    QApplication.processEvents()
-                if self.session_data["username"] in output and "$" in output:
-                    break  # Command prompt returned, sudo command completed
         finally:
             self.sudo_in_progress = False
 
@@ -323,8 +720,7 @@ class SSHTab(QWidget):
             output = await self.ssh_connection.read_output()
             if not output:
                 break
-            self.output_buffer += output
-            self.update_terminal()
+            self.update_terminal(output)
             await asyncio.sleep(0.1)
 
     async def send_ctrl_c(self):
@@ -337,9 +733,7 @@ class SSHTab(QWidget):
     async def process_output(self, stdout_gen, stderr_gen, channel):
         async def read_stream(stream_gen):
             async for line in stream_gen:
-                self.terminal.append(line.strip())
-                self.terminal.moveCursor(QTextCursor.End)
-                QApplication.processEvents()
+                self.write_local(line.strip())
 
         stdout_task = asyncio.create_task(read_stream(stdout_gen))
         stderr_task = asyncio.create_task(read_stream(stderr_gen))
@@ -350,7 +744,7 @@ class SSHTab(QWidget):
         )
 
         if exit_status != 0:
-            self.terminal.append(f"Command exited with status: {exit_status}")
+            self.write_local(f"Command exited with status: {exit_status}")
 
     def assess_risk_level(self, command: str) -> str:
         """Assess the risk level of a suggested command."""
@@ -366,12 +760,6 @@ class SSHTab(QWidget):
         else:
             return "Low"
 
-    def show_prompt(self):
-        prompt = f"{self.session_data['username']}@{self.session_data['hostname']}:~$ "
-        self.terminal.insertPlainText(prompt)
-        self.terminal.moveCursor(QTextCursor.End)
-        self.last_prompt_position = self.terminal.textCursor().position()
-
     def show_previous_command(self):
         if self.history_index < len(self.command_history) - 1:
             self.history_index += 1
@@ -390,17 +778,11 @@ class SSHTab(QWidget):
                 )
 
     def set_command_in_terminal(self, command):
-        cursor = self.terminal.textCursor()
-        cursor.movePosition(QTextCursor.End)
-        cursor.movePosition(QTextCursor.StartOfLine, QTextCursor.KeepAnchor)
-        cursor.removeSelectedText()
-        cursor.insertText(
-            f"{self.session_data['username']}@{self.session_data['hostname']}:~$ {command}"
-        )
+        self.terminal.replace_typed_text(command)
 
     def closeEvent(self, event):
         if self.ssh_connection:
-            self.ssh_connection.close()
+            asyncio.ensure_future(self.close())
         super().closeEvent(event)
 
     def toggle_insights(self):
@@ -420,21 +802,46 @@ class SSHTab(QWidget):
         self.insights_visible = not self.insights_visible
 
     def reconnect(self):
-        """Reconnect to the SSH server."""
+        """Reconnect to the SSH server in the background."""
         logger.debug("Reconnecting to SSH")
+        if self.reconnect_task and not self.reconnect_task.done():
+            return
+        self.reconnect_task = asyncio.ensure_future(self.reconnect_async())
+
+    async def reconnect_async(self):
+        """Re-open the session with jittered exponential backoff.
+
+        Returns:
+            bool: True once the session is back.
+        """
+        self.is_connected = False
         if self.ssh_connection:
-            self.ssh_connection.close()
-        asyncio.create_task(self.connect_async())
+            await self.ssh_connection.close()
+
+        def show_retry(attempt, delay, error):
+            self.write_local(
+                f"Reconnect attempt {attempt} failed, retrying in {delay:.0f}s..."
+            )
+
+        reconnected = await reconnect_with_backoff(
+            self.open_connection, max_delay=RECONNECT_MAX_DELAY, on_retry=show_retry
+        )
+        if reconnected:
+            self.write_local(f"Reconnected to {self.session_data['hostname']}")
+        return reconnected
 
     def display_session_info(self):
         info = f"Connected to {self.session_data['hostname']} as {self.session_data['username']}\n"
         info += f"OS Type: {self.os_type}\n"
         info += f"Connection Type: {'Cisco' if self.is_cisco else 'Standard'} SSH\n"
-        info += "-" * 40 + "\n"
-        self.terminal.append(info)
+        info += "-" * 40
+        self.write_local(info)
 
     async def close(self):
         self.is_connected = False
+        self.throughput_timer.stop()
+        if self.reconnect_task:
+            self.reconnect_task.cancel()
         if self.read_output_task:
             self.read_output_task.cancel()
             try:
@@ -444,6 +851,15 @@ class SSHTab(QWidget):
         if self.ssh_connection:
             await self.ssh_connection.close()
         self.ssh_connection = None
+        self.input_writer.clear()
+        self.abort_paste()
+        self.stop_transcript()
+        self.stop_recording()
+        self.frame_timer.stop()
+        self.output_worker.close()
+        self.scrollback_search.close()
+        with self.output_worker.lock:
+            self.screen.scrollback.close()
 
     def setup_chief_interaction(self):
         self.chief_input = QLineEdit()
@@ -487,8 +903,6 @@ class SSHTab(QWidget):
                 break
             decoded_line = line.decode().strip()
             if is_error:
-                self.terminal.append(f"<span style='color: red;'>{decoded_line}</span>")
+                self.write_local(f"\x1b[31m{decoded_line}\x1b[0m")
             else:
-                self.terminal.append(decoded_line)
-            self.terminal.moveCursor(QTextCursor.End)
-            QApplication.processEvents()
+                self.write_local(decoded_line)
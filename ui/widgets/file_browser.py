@@ -3,8 +3,11 @@ import os
 import paramiko
 from PyQt5.QtCore import QMimeData, Qt
 from PyQt5.QtGui import QDrag
-from PyQt5.QtWidgets import (QFileSystemModel, QInputDialog, QMessageBox,
-                             QPushButton, QTreeView, QVBoxLayout, QWidget)
+from PyQt5.QtWidgets import (QFileDialog, QFileSystemModel, QInputDialog,
+                             QMessageBox, QPushButton, QTreeView, QVBoxLayout,
+                             QWidget)
+
+from utils.transport_pool import transport_pool
 
 
 class RemoteFileSystemModel(QFileSystemModel):
@@ -71,21 +74,30 @@ class DraggableTreeView(QTreeView):
 
 
 class FileBrowser(QWidget):
-    def __init__(self, parent, ssh_client):
+    def __init__(self, parent, ssh_connection):
         """Initialize a new instance of the class.
         
         Args:
             parent (object): The parent object or widget to which this instance belongs.
-            ssh_client (paramiko.SSHClient): The SSH client used for remote connections.
+            ssh_connection (SSHConnection): The SSH connection of the session to browse.
+                The SFTP session is opened on its pooled transport, so browsing a
+                host that already has an open tab costs no extra handshake.
         
         Returns:
             None: This method doesn't return anything.
         """
         super().__init__(parent)
-        self.ssh_client = ssh_client
-        self.sftp = ssh_client.open_sftp()
+        self.ssh_connection = ssh_connection
+        self.sftp = transport_pool.open_sftp(**ssh_connection.pool_params())
         self.init_ui()
 
+    def closeEvent(self, event):
+        """Release the SFTP channel when the browser is closed."""
+        if self.sftp:
+            self.sftp.close()
+            self.sftp = None
+        super().closeEvent(event)
+
     def init_ui(self):
         """Initializes the user interface for the SFTP file system viewer.
         
@@ -0,0 +1,284 @@
+"""Channel reader module for Eagle Terminal.
+
+This module delivers output from paramiko channels as soon as it arrives
+instead of polling ``recv_ready()`` or waking up on a timer. A paramiko
+channel exposes a ``fileno()`` that becomes readable whenever bytes are
+buffered (or the channel closes), so it can be registered with the
+asyncio event loop or with a ``QSocketNotifier``. Idle sessions then cost
+no CPU at all, and each chunk is handed over the moment it lands.
+
+The descriptor is readable while either stdout or stderr has data, so
+both are drained; stderr is merged into the stream the way a terminal
+shows it (with a pseudo-terminal the remote side merges them already).
+Leaving stderr buffered would keep the descriptor readable and the
+reader spinning without consuming anything.
+
+Read sizes adapt to the traffic: they double while every read comes back
+full (a ``cat`` of a large file, a routing table dump) and fall back to
+the minimum once output turns interactive again.
+
+The asyncio reader copies incoming data into a preallocated ring buffer
+(see ``utils.output_pipeline.ByteRing``) rather than queueing one bytes
+object per chunk. When the ring is full it stops reading, so the SSH
+window closes and the remote side is throttled instead of memory growing.
+"""
+
+import asyncio
+from typing import Optional
+
+from PyQt5.QtCore import QObject, QSocketNotifier, pyqtSignal
+
+from utils.logger import logger
+from utils.output_pipeline import DEFAULT_RING_SIZE, ByteRing
+
+DEFAULT_READ_SIZE = 4096
+MAX_READ_SIZE = 1024 * 1024
+
+
+class AdaptiveReadSize:
+    """Chooses the next read size from how full the previous reads were."""
+
+    def __init__(self, minimum: int = DEFAULT_READ_SIZE, maximum: int = MAX_READ_SIZE):
+        """Initialize the sizer.
+
+        Args:
+            minimum (int, optional): Size used for interactive traffic. Defaults to 4096.
+            maximum (int, optional): Upper bound under sustained output. Defaults to 1 MiB.
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.size = minimum
+
+    def update(self, received: int) -> int:
+        """Record the size of a read and return the size for the next one.
+
+        Args:
+            received (int): Bytes returned by the last read.
+
+        Returns:
+            int: The next read size.
+        """
+        if received >= self.size:
+            self.size = min(self.size * 2, self.maximum)
+        elif received < self.size // 4:
+            self.size = max(self.size // 2, self.minimum)
+        return self.size
+
+
+def _pending(channel) -> bool:
+    return channel.recv_ready() or channel.recv_stderr_ready()
+
+
+def _recv_any(channel, max_bytes: int) -> bytes:
+    # stdout first; stderr only while stdout has nothing buffered.
+    if channel.recv_ready():
+        return channel.recv(max_bytes)
+    return channel.recv_stderr(max_bytes)
+
+
+def drain_channel(channel, max_bytes: int = DEFAULT_READ_SIZE):
+    """Read everything currently buffered on a channel without blocking.
+
+    stderr data is returned in the same chunks as stdout data.
+
+    Args:
+        channel (paramiko.Channel): The channel to read from.
+        max_bytes (int, optional): Size of each ``recv`` call. Defaults to 4096.
+
+    Returns:
+        tuple: ``(chunks, closed)`` where ``chunks`` is a list of received byte
+        strings and ``closed`` is True once the channel has reached EOF.
+    """
+    chunks = []
+    while _pending(channel):
+        data = _recv_any(channel, max_bytes)
+        if not data:
+            return chunks, True
+        chunks.append(data)
+    closed = channel.closed or (channel.eof_received and not _pending(channel))
+    return chunks, closed
+
+
+class ChannelReader:
+    """Push-based asyncio reader for a paramiko channel.
+
+    The channel's file descriptor is registered with the running event
+    loop; the loop only calls back when data is available, and the data is
+    buffered in a ring for consumers awaiting :meth:`read`.
+    """
+
+    def __init__(
+        self,
+        channel,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        capacity: int = DEFAULT_RING_SIZE,
+    ):
+        """Initialize the reader.
+
+        Args:
+            channel (paramiko.Channel): The channel to read from.
+            loop (asyncio.AbstractEventLoop, optional): The loop to register
+                with. Defaults to the running event loop.
+            capacity (int, optional): Size of the receive ring. Defaults to 256 KiB.
+        """
+        self.channel = channel
+        self.loop = loop or asyncio.get_event_loop()
+        self.ring = ByteRing(capacity)
+        self.sizer = AdaptiveReadSize(maximum=min(MAX_READ_SIZE, capacity))
+        self._ready = asyncio.Event()
+        self._fd: Optional[int] = None
+        self._watching = False
+        self._eof = False
+
+    def start(self) -> None:
+        """Start watching the channel for incoming data."""
+        if self._fd is not None:
+            return
+        self._fd = self.channel.fileno()
+        self._watch(True)
+        # Data may already be buffered from before the reader was attached.
+        self._on_readable()
+
+    def stop(self) -> None:
+        """Stop watching the channel."""
+        self._watch(False)
+        self._fd = None
+
+    def _watch(self, enabled: bool) -> None:
+        if self._fd is None or enabled == self._watching:
+            return
+        try:
+            if enabled:
+                self.loop.add_reader(self._fd, self._on_readable)
+            else:
+                self.loop.remove_reader(self._fd)
+            self._watching = enabled
+        except Exception as e:
+            logger.debug(f"Error updating channel reader: {str(e)}")
+
+    def _on_readable(self) -> None:
+        closed = False
+        try:
+            while self.ring.free and _pending(self.channel):
+                if self.channel.recv_ready():
+                    received = self.ring.recv_into(self.channel, self.sizer.size)
+                else:
+                    received = self.ring.write(
+                        self.channel.recv_stderr(min(self.ring.free, self.sizer.size))
+                    )
+                if not received:
+                    closed = True
+                    break
+                self.sizer.update(received)
+            closed = (
+                closed
+                or self.channel.closed
+                or (self.channel.eof_received and not _pending(self.channel))
+            )
+        except Exception as e:
+            logger.error(f"Error reading from channel: {str(e)}")
+            closed = True
+        if len(self.ring):
+            self._ready.set()
+        if closed:
+            self.feed_eof()
+        elif not self.ring.free:
+            # Back-pressure: leave the rest in paramiko's window until read.
+            self._watch(False)
+
+    def feed_eof(self) -> None:
+        """Stop watching the channel and wake readers with an EOF marker."""
+        self.stop()
+        self._eof = True
+        self._ready.set()
+
+    async def read(
+        self, timeout: Optional[float] = None, max_bytes: Optional[int] = None
+    ) -> Optional[bytes]:
+        """Wait for data.
+
+        Everything that arrived while nobody was reading is returned
+        together, up to ``max_bytes``, so a slow consumer catches up in one call.
+
+        Args:
+            timeout (float, optional): Seconds to wait. None waits until data arrives.
+            max_bytes (int, optional): Upper bound for the returned data.
+                Defaults to the adaptive read size.
+
+        Returns:
+            bytes or None: The buffered data, ``b""`` at EOF, or None on timeout.
+        """
+        if not self._ready.is_set():
+            try:
+                if timeout is None:
+                    await self._ready.wait()
+                else:
+                    await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if not len(self.ring):
+            # Only the EOF marker is left; keep it set for other readers.
+            return b""
+
+        data = self.ring.read(max_bytes or self.sizer.size)
+        if not len(self.ring) and not self._eof:
+            self._ready.clear()
+        if self._fd is not None and not self._watching:
+            self._watch(True)
+        return data
+
+
+class QtChannelReader(QObject):
+    """Push-based Qt reader for a paramiko channel.
+
+    Uses a ``QSocketNotifier`` on the channel's file descriptor so widgets
+    that do not run on the asyncio loop receive output through signals,
+    on the GUI thread, without a polling thread.
+    """
+
+    data_received = pyqtSignal(bytes)
+    channel_closed = pyqtSignal()
+
+    def __init__(self, channel, parent=None):
+        """Initialize the reader.
+
+        Args:
+            channel (paramiko.Channel): The channel to read from.
+            parent (QObject, optional): The parent object. Defaults to None.
+        """
+        super().__init__(parent)
+        self.channel = channel
+        self.sizer = AdaptiveReadSize()
+        self.notifier: Optional[QSocketNotifier] = None
+
+    def start(self) -> None:
+        """Start watching the channel for incoming data."""
+        if self.notifier:
+            return
+        self.notifier = QSocketNotifier(
+            self.channel.fileno(), QSocketNotifier.Read, self
+        )
+        self.notifier.activated.connect(self._on_readable)
+        self._on_readable()
+
+    def stop(self) -> None:
+        """Stop watching the channel."""
+        if self.notifier:
+            self.notifier.setEnabled(False)
+            self.notifier.deleteLater()
+            self.notifier = None
+
+    def _on_readable(self, *_args) -> None:
+        try:
+            chunks, closed = drain_channel(self.channel, self.sizer.size)
+        except Exception as e:
+            logger.error(f"Error reading from channel: {str(e)}")
+            chunks, closed = [], True
+        for chunk in chunks:
+            self.sizer.update(len(chunk))
+        if chunks:
+            # One signal per wake-up, however many reads it took to drain.
+            self.data_received.emit(chunks[0] if len(chunks) == 1 else b"".join(chunks))
+        if closed:
+            self.stop()
+            self.channel_closed.emit()
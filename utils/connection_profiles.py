@@ -0,0 +1,393 @@
+"""Connection profile module for Eagle Terminal.
+
+This module defines named SSH connection profiles: the preferred key
+exchange, cipher and MAC algorithms and whether to compress, plus the TCP
+socket options used for every connection. Devices select a profile by
+name (``device["connection_profile"]``); the transport pool and the
+asyncssh backend translate it into their own connect arguments.
+
+paramiko does not implement ChaCha20-Poly1305, so a profile's algorithm
+lists are filtered down to what the chosen backend supports; a profile
+whose list has nothing supported falls back to that backend's defaults.
+
+The link benchmark measures the handshake time and bulk throughput of
+each candidate profile against a host and recommends the fastest.
+"""
+
+import asyncio
+import socket
+import time
+from typing import Any, Dict, List, Optional
+
+import paramiko
+
+from utils.host_keys import asyncssh_host_key_kwargs
+from utils.logger import logger
+
+try:
+    import asyncssh
+except ImportError:
+    asyncssh = None
+
+DEFAULT_PROFILE = "default"
+
+CONNECTION_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {
+        "description": "Library defaults, no compression",
+        "kex": None,
+        "ciphers": None,
+        "macs": None,
+        "compression": False,
+    },
+    "lan": {
+        "description": "Low-latency LAN: AES-GCM, no compression",
+        "kex": [
+            "curve25519-sha256",
+            "curve25519-sha256@libssh.org",
+            "ecdh-sha2-nistp256",
+        ],
+        "ciphers": ["aes128-gcm@openssh.com", "aes256-gcm@openssh.com", "aes128-ctr"],
+        "macs": ["hmac-sha2-256-etm@openssh.com", "hmac-sha2-256"],
+        "compression": False,
+    },
+    "satellite": {
+        "description": "High latency, low bandwidth: ChaCha20 with zlib compression",
+        "kex": ["curve25519-sha256", "curve25519-sha256@libssh.org"],
+        "ciphers": [
+            "chacha20-poly1305@openssh.com",
+            "aes128-gcm@openssh.com",
+            "aes128-ctr",
+        ],
+        "macs": ["hmac-sha2-256-etm@openssh.com", "hmac-sha2-256"],
+        "compression": True,
+    },
+    "legacy": {
+        "description": "Older network gear: group14 key exchange, CTR/CBC ciphers",
+        "kex": [
+            "diffie-hellman-group14-sha256",
+            "diffie-hellman-group14-sha1",
+            "diffie-hellman-group-exchange-sha1",
+        ],
+        "ciphers": ["aes128-ctr", "aes256-ctr", "aes128-cbc", "3des-cbc"],
+        "macs": ["hmac-sha2-256", "hmac-sha1"],
+        "compression": False,
+    },
+}
+
+# Maps the profile keys to paramiko's ``disabled_algorithms`` keys and
+# the transport's preference lists.
+_PARAMIKO_ALGORITHMS = {
+    "kex": "_preferred_kex",
+    "ciphers": "_preferred_ciphers",
+    "macs": "_preferred_macs",
+}
+
+_ASYNCSSH_ALGORITHMS = {
+    "kex": "kex_algs",
+    "ciphers": "encryption_algs",
+    "macs": "mac_algs",
+}
+
+
+def get_profile(name: Optional[str]) -> Dict[str, Any]:
+    """Look up a connection profile, falling back to the default profile.
+
+    Args:
+        name (str, optional): The profile name.
+
+    Returns:
+        dict: The profile definition.
+    """
+    if name and name not in CONNECTION_PROFILES:
+        logger.warning(f"Unknown connection profile '{name}'; using defaults")
+    return CONNECTION_PROFILES.get(
+        name or DEFAULT_PROFILE, CONNECTION_PROFILES[DEFAULT_PROFILE]
+    )
+
+
+def paramiko_connect_kwargs(name: Optional[str]) -> Dict[str, Any]:
+    """Translate a profile into ``SSHClient.connect`` keyword arguments.
+
+    paramiko has no way to reorder its preferences through ``connect``, so
+    every supported algorithm that is not in the profile is disabled.
+
+    Args:
+        name (str, optional): The profile name.
+
+    Returns:
+        dict: ``disabled_algorithms`` and ``compress`` arguments.
+    """
+    profile = get_profile(name)
+    disabled = {}
+    for key, attribute in _PARAMIKO_ALGORITHMS.items():
+        wanted = profile.get(key)
+        if not wanted:
+            continue
+        supported = getattr(paramiko.Transport, attribute)
+        if not any(alg in supported for alg in wanted):
+            logger.debug(f"No {key} of profile '{name}' is supported by paramiko")
+            continue
+        disabled[key] = [alg for alg in supported if alg not in wanted]
+    kwargs = {"compress": bool(profile.get("compression"))}
+    if disabled:
+        kwargs["disabled_algorithms"] = disabled
+    return kwargs
+
+
+def asyncssh_connect_kwargs(name: Optional[str]) -> Dict[str, Any]:
+    """Translate a profile into ``asyncssh.connect`` keyword arguments.
+
+    Args:
+        name (str, optional): The profile name.
+
+    Returns:
+        dict: Algorithm lists in profile order, compression and TCP keepalive options.
+    """
+    profile = get_profile(name)
+    kwargs: Dict[str, Any] = {"tcp_keepalive": True}
+    if asyncssh is not None:
+        supported = {
+            "kex": asyncssh.kex.get_kex_algs(),
+            "ciphers": asyncssh.encryption.get_encryption_algs(),
+            "macs": asyncssh.mac.get_mac_algs(),
+        }
+        for key, option in _ASYNCSSH_ALGORITHMS.items():
+            wanted = [
+                alg for alg in profile.get(key) or [] if alg.encode() in supported[key]
+            ]
+            if wanted:
+                kwargs[option] = wanted
+    if profile.get("compression"):
+        kwargs["compression_algs"] = ["zlib@openssh.com", "zlib", "none"]
+    else:
+        kwargs["compression_algs"] = ["none"]
+    return kwargs
+
+
+def tune_socket(sock: socket.socket) -> None:
+    """Tune a connected TCP socket for interactive SSH traffic.
+
+    Disables Nagle's algorithm so keystrokes are not held back waiting for
+    an ACK, and enables TCP keepalives so dead links are noticed even when
+    the session is idle. Anything that is not a TCP socket (e.g. a proxy
+    channel) is left alone.
+
+    Args:
+        sock (socket.socket): The socket carrying the SSH transport.
+    """
+    if not isinstance(sock, socket.socket) or sock.family not in (
+        socket.AF_INET,
+        socket.AF_INET6,
+    ):
+        return
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    for option, value in (
+        ("TCP_KEEPIDLE", 60),
+        ("TCP_KEEPINTVL", 15),
+        ("TCP_KEEPCNT", 4),
+    ):
+        if hasattr(socket, option):
+            sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+
+
+def open_socket(
+    hostname: str, port: int = 22, timeout: Optional[float] = None
+) -> socket.socket:
+    """Open a TCP connection tuned with :func:`tune_socket` before the handshake.
+
+    Args:
+        hostname (str): The hostname or IP address of the SSH server.
+        port (int, optional): The port number of the SSH server. Defaults to 22.
+        timeout (float, optional): Connect timeout in seconds. Defaults to None.
+
+    Returns:
+        socket.socket: The connected socket.
+    """
+    sock = socket.create_connection((hostname, int(port)), timeout=timeout)
+    tune_socket(sock)
+    return sock
+
+
+def _benchmark_command(payload_bytes: int) -> str:
+    # base64 text compresses roughly like real terminal output.
+    return f"head -c {payload_bytes * 3 // 4} /dev/urandom | base64"
+
+
+def _benchmark_paramiko(
+    params: Dict[str, Any], profile: str, payload_bytes: int
+) -> Dict[str, Any]:
+    timeout = params.get("timeout", 10)
+    client = paramiko.SSHClient()
+    client.load_system_host_keys()
+    client.set_missing_host_key_policy(
+        params.get("host_key_policy") or paramiko.RejectPolicy()
+    )
+    started = time.perf_counter()
+    client.connect(
+        hostname=params["hostname"],
+        port=int(params.get("port", 22)),
+        username=params.get("username"),
+        password=params.get("password"),
+        key_filename=params.get("key_filename"),
+        sock=open_socket(params["hostname"], params.get("port", 22), timeout),
+        timeout=timeout,
+        allow_agent=False,
+        look_for_keys=not (params.get("password") or params.get("key_filename")),
+        **paramiko_connect_kwargs(profile),
+    )
+    handshake = time.perf_counter() - started
+    try:
+        transport = client.get_transport()
+        negotiated = {
+            "cipher": transport.remote_cipher,
+            "mac": transport.remote_mac,
+            "compression": transport.remote_compression,
+        }
+        _, stdout, _ = client.exec_command(
+            _benchmark_command(payload_bytes), timeout=60
+        )
+        started = time.perf_counter()
+        total = 0
+        while True:
+            chunk = stdout.channel.recv(65536)
+            if not chunk:
+                break
+            total += len(chunk)
+        elapsed = time.perf_counter() - started
+    finally:
+        client.close()
+    return {"handshake": handshake, "bytes": total, "seconds": elapsed, **negotiated}
+
+
+async def _benchmark_asyncssh(
+    params: Dict[str, Any], profile: str, payload_bytes: int
+) -> Dict[str, Any]:
+    key_filename = params.get("key_filename")
+    started = time.perf_counter()
+    conn = await asyncssh.connect(
+        params["hostname"],
+        port=int(params.get("port", 22)),
+        username=params.get("username"),
+        password=params.get("password"),
+        client_keys=[key_filename] if key_filename else (),
+        connect_timeout=params.get("timeout", 10),
+        **asyncssh_connect_kwargs(profile),
+        **asyncssh_host_key_kwargs(params),
+    )
+    handshake = time.perf_counter() - started
+    try:
+        negotiated = {
+            "cipher": conn.get_extra_info("send_cipher"),
+            "mac": conn.get_extra_info("send_mac"),
+            "compression": conn.get_extra_info("send_compression"),
+        }
+        process = await conn.create_process(
+            _benchmark_command(payload_bytes), encoding=None
+        )
+        started = time.perf_counter()
+        total = 0
+        while True:
+            chunk = await process.stdout.read(65536)
+            if not chunk:
+                break
+            total += len(chunk)
+        elapsed = time.perf_counter() - started
+    finally:
+        conn.close()
+    return {"handshake": handshake, "bytes": total, "seconds": elapsed, **negotiated}
+
+
+async def benchmark_profile(
+    params: Dict[str, Any],
+    profile: str,
+    backend: str = "paramiko",
+    payload_bytes: int = 4 * 1024 * 1024,
+) -> Dict[str, Any]:
+    """Measure handshake time and bulk throughput for one profile.
+
+    Args:
+        params (dict): Connection arguments (``hostname``, ``port``, ``username``,
+            ``password``, ``key_filename``, ``timeout``, ``host_key_policy``).
+        profile (str): The profile name.
+        backend (str, optional): "paramiko" or "asyncssh". Defaults to "paramiko".
+        payload_bytes (int, optional): Bytes to stream from the host. Defaults to 4 MiB.
+
+    Returns:
+        dict: ``profile``, ``backend``, ``handshake_ms``, ``mb_per_s``, the
+        negotiated ``cipher``/``mac``/``compression`` and ``error``.
+    """
+    result = {"profile": profile, "backend": backend, "error": None}
+    try:
+        if backend == "asyncssh":
+            if asyncssh is None:
+                raise RuntimeError("asyncssh is not installed")
+            measured = await _benchmark_asyncssh(params, profile, payload_bytes)
+        else:
+            measured = await asyncio.get_event_loop().run_in_executor(
+                None, _benchmark_paramiko, params, profile, payload_bytes
+            )
+    except Exception as e:
+        logger.warning(f"Link benchmark of '{profile}' ({backend}) failed: {str(e)}")
+        result.update(handshake_ms=None, mb_per_s=None, error=str(e))
+        return result
+
+    seconds = measured.pop("seconds")
+    result.update(
+        handshake_ms=round(measured.pop("handshake") * 1000, 1),
+        mb_per_s=round(measured["bytes"] / seconds / 1e6, 2) if seconds else 0.0,
+        **measured,
+    )
+    return result
+
+
+async def run_link_benchmark(
+    params: Dict[str, Any],
+    profiles: Optional[List[str]] = None,
+    backends: Optional[List[str]] = None,
+    payload_bytes: int = 4 * 1024 * 1024,
+    on_result=None,
+) -> List[Dict[str, Any]]:
+    """Benchmark every candidate profile against a host, one after another.
+
+    Args:
+        params (dict): Connection arguments for the host.
+        profiles (List[str], optional): Profile names. Defaults to all profiles.
+        backends (List[str], optional): Backends to try. Defaults to paramiko,
+            plus asyncssh when installed.
+        payload_bytes (int, optional): Bytes to stream per run. Defaults to 4 MiB.
+        on_result (Callable, optional): Called with each result as it completes.
+
+    Returns:
+        List[Dict[str, Any]]: One result per profile and backend.
+    """
+    profiles = profiles or list(CONNECTION_PROFILES)
+    if backends is None:
+        backends = ["paramiko"] + (["asyncssh"] if asyncssh is not None else [])
+    results = []
+    for backend in backends:
+        for profile in profiles:
+            result = await benchmark_profile(params, profile, backend, payload_bytes)
+            results.append(result)
+            if on_result:
+                on_result(result)
+    return results
+
+
+def recommend_profile(results: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Pick the fastest successful benchmark result.
+
+    Throughput decides; handshake time breaks near-ties (within 5%).
+
+    Args:
+        results (List[Dict[str, Any]]): Results from :func:`run_link_benchmark`.
+
+    Returns:
+        dict or None: The recommended result, or None if every run failed.
+    """
+    ok = [r for r in results if not r.get("error") and r.get("mb_per_s")]
+    if not ok:
+        return None
+    fastest = max(r["mb_per_s"] for r in ok)
+    close = [r for r in ok if r["mb_per_s"] >= fastest * 0.95]
+    return min(close, key=lambda r: r["handshake_ms"])
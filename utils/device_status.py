@@ -13,10 +13,42 @@ from typing import Any, Dict, Optional, Tuple
 
 import paramiko
 
+from utils.exec_channel import run_on_host
+from utils.transport_pool import make_pool_params
 
-import paramiko
-import ssl
-from cryptography.fernet import Fernet
+
+def device_pool_params(device: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the transport pool arguments for a device entry.
+
+    Args:
+        device (Dict[str, Any]): A dictionary containing SSH device information.
+
+    Returns:
+        Dict[str, Any]: Connection arguments accepted by ``TransportPool.acquire``.
+    """
+    return make_pool_params(
+        device["hostname"],
+        device.get("port", 22),
+        device["username"],
+        device.get("password"),
+        device.get("key_filename"),
+        device.get("connection_profile"),
+        device.get("jump_hosts"),
+    )
+
+
+def run_device_command(device: Dict[str, Any], command: str) -> str:
+    """Run a trusted command on a device over its pooled transport.
+
+    Args:
+        device (Dict[str, Any]): A dictionary containing SSH device information.
+        command (str): The command to execute. It is passed to the remote
+            shell unmodified, so it must not contain user input.
+
+    Returns:
+        str: The output of the command.
+    """
+    return run_on_host(device_pool_params(device), command)["stdout"].strip()
 
 
 def safe_execute_command(hostname: str, username: str, password: str, command: str) -> str:
@@ -35,13 +67,8 @@ def safe_execute_command(hostname: str, username: str, password: str, command: s
         paramiko.SSHException: If there is an error executing the command.
     """
     sanitized_command = shlex.quote(command)
-    context = ssl.create_default_context()  # Secure default context
-    with paramiko.SSHClient() as client:
-        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        client.connect(hostname=hostname, username=username, password=password,
-                       sock=context.wrap_socket())
-        stdin, stdout, stderr = client.exec_command(sanitized_command)
-        return stdout.read().decode("utf-8").strip()
+    device = {"hostname": hostname, "username": username, "password": password}
+    return run_device_command(device, sanitized_command)
 
 
 def get_device_status(device: Dict[str, Any]) -> Dict[str, Any]:
@@ -71,31 +98,19 @@ def get_ssh_device_status(device: Dict[str, Any]) -> Dict[str, Any]:
         Dict[str, Any]: A dictionary containing the SSH device status.
     """
     try:
-        client = paramiko.SSHClient()
-        client.load_system_host_keys()
-        client.set_missing_host_key_policy(paramiko.RejectPolicy())
-
-        client.connect(
-            device["hostname"],
-            username=device["username"],
-            password=device.get("password"),
-            key_filename=device.get("key_filename"),
-        )
-
         status = {}
 
-        status["uptime"] = safe_execute_command(client, "uptime")
-        status["memory_usage"] = safe_execute_command(
-            client, "free -m | awk '/Mem:/ {print $3/$2 * 100.0}'"
+        status["uptime"] = run_device_command(device, "uptime")
+        status["memory_usage"] = run_device_command(
+            device, "free -m | awk '/Mem:/ {print $3/$2 * 100.0}'"
         )
-        status["cpu_usage"] = safe_execute_command(
-            client, "top -bn1 | grep 'Cpu(s)' | awk '{print $2 + $4}'"
+        status["cpu_usage"] = run_device_command(
+            device, "top -bn1 | grep 'Cpu(s)' | awk '{print $2 + $4}'"
         )
-        status["disk_usage"] = safe_execute_command(
-            client, r"df -h / | awk '/\// {print $5}'"
+        status["disk_usage"] = run_device_command(
+            device, r"df -h / | awk '/\// {print $5}'"
         )
 
-        client.close()
         return status
     except Exception as e:
         return {"status": "error", "error": str(e)}
@@ -197,24 +212,12 @@ def get_ssh_device_info(device):
         dict: A dictionary containing the SSH device information.
     """
     try:
-        client = paramiko.SSHClient()
-        client.load_system_host_keys()
-        client.set_missing_host_key_policy(paramiko.RejectPolicy())
-
-        client.connect(
-            device["hostname"],
-            username=device["username"],
-            password=device.get("password"),
-            key_filename=device.get("key_filename"),
-        )
-
         info = {}
-        info["hostname"] = safe_execute_command(client, "hostname")
-        info["os"] = safe_execute_command(client, "uname -s")
-        info["kernel"] = safe_execute_command(client, "uname -r")
-        info["architecture"] = safe_execute_command(client, "uname -m")
+        info["hostname"] = run_device_command(device, "hostname")
+        info["os"] = run_device_command(device, "uname -s")
+        info["kernel"] = run_device_command(device, "uname -r")
+        info["architecture"] = run_device_command(device, "uname -m")
 
-        client.close()
         return info
     except Exception as e:
         return {"error": str(e)}
@@ -0,0 +1,251 @@
+"""Exec channel module for Eagle Terminal.
+
+This module runs single, non-interactive commands on exec channels of the
+shared transport pool. It is the building block for scripts, status
+polling and automation, so it does nothing beyond running the command:
+
+- stdout and stderr are drained together as data arrives, so a command
+  that writes a lot to stderr cannot stall on a full channel window while
+  stdout is being read (and vice versa);
+- both streams are decoded incrementally and can be streamed to callbacks;
+- the result carries the exit status and timing;
+- AI analysis is a separate, opt-in coroutine (:func:`analyze_exec_result`).
+"""
+
+import asyncio
+import select
+import time
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+from utils.channel_reader import AdaptiveReadSize
+from utils.logger import logger
+from utils.output_pipeline import OutputPipeline
+from utils.transport_pool import transport_pool
+
+DEFAULT_EXEC_TIMEOUT = 30
+
+OutputCallback = Callable[[str], None]
+
+
+def collect_exec(
+    channel,
+    command: str = "",
+    timeout: Optional[float] = DEFAULT_EXEC_TIMEOUT,
+    on_stdout: Optional[OutputCallback] = None,
+    on_stderr: Optional[OutputCallback] = None,
+    encoding: str = "utf-8",
+) -> Dict[str, Any]:
+    """Drain an exec channel until the command exits.
+
+    Args:
+        channel (paramiko.Channel): An exec channel whose command is running.
+        command (str, optional): The command, recorded in the result. Defaults to "".
+        timeout (float, optional): Seconds to wait for the command to finish.
+            None waits forever. Defaults to 30.
+        on_stdout (Callable[[str], None], optional): Called with stdout text as it arrives.
+        on_stderr (Callable[[str], None], optional): Called with stderr text as it arrives.
+        encoding (str, optional): The remote character encoding. Defaults to "utf-8".
+
+    Returns:
+        Dict[str, Any]: ``command``, ``stdout``, ``stderr``, ``exit_status``
+        (None if it never arrived), ``elapsed`` and ``first_byte`` (seconds,
+        the latter None without output) and ``timed_out``.
+    """
+    started = time.perf_counter()
+    deadline = None if timeout is None else time.monotonic() + timeout
+    streams = {
+        "stdout": (
+            channel.recv_ready,
+            channel.recv,
+            OutputPipeline(encoding),
+            on_stdout,
+            [],
+        ),
+        "stderr": (
+            channel.recv_stderr_ready,
+            channel.recv_stderr,
+            OutputPipeline(encoding),
+            on_stderr,
+            [],
+        ),
+    }
+    sizer = AdaptiveReadSize()
+    first_byte = None
+    timed_out = False
+
+    def drain():
+        nonlocal first_byte
+        for ready, recv, pipeline, callback, parts in streams.values():
+            while ready():
+                data = recv(sizer.size)
+                if not data:
+                    break
+                sizer.update(len(data))
+                if first_byte is None:
+                    first_byte = time.perf_counter() - started
+                text = pipeline.feed(data)
+                if text:
+                    parts.append(text)
+                    if callback:
+                        callback(text)
+
+    while True:
+        drain()
+        if channel.eof_received or channel.closed:
+            drain()
+            break
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            timed_out = True
+            break
+        # The channel's fileno() becomes readable for stdout, stderr and EOF.
+        select.select([channel], [], [], remaining)
+
+    exit_status = None
+    if not timed_out:
+        remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+        if channel.status_event.wait(remaining):
+            exit_status = channel.exit_status
+        else:
+            timed_out = True
+    if timed_out:
+        logger.warning(f"Command timed out after {timeout}s: {command}")
+        channel.close()
+
+    result = {"command": command}
+    for name, (_, _, pipeline, callback, parts) in streams.items():
+        tail = pipeline.flush()
+        if tail:
+            parts.append(tail)
+            if callback:
+                callback(tail)
+        result[name] = "".join(parts)
+    result.update(
+        exit_status=exit_status,
+        elapsed=round(time.perf_counter() - started, 6),
+        first_byte=None if first_byte is None else round(first_byte, 6),
+        timed_out=timed_out,
+    )
+    return result
+
+
+def run_exec(
+    transport,
+    command: str,
+    timeout: Optional[float] = DEFAULT_EXEC_TIMEOUT,
+    get_pty: bool = False,
+    on_stdout: Optional[OutputCallback] = None,
+    on_stderr: Optional[OutputCallback] = None,
+) -> Dict[str, Any]:
+    """Run a command on an exec channel of a pooled transport.
+
+    Args:
+        transport (PooledTransport): The transport to open the channel on.
+        command (str): The command line. The remote shell interprets it, so
+            it must not contain untrusted input.
+        timeout (float, optional): Seconds to wait for completion. Defaults to 30.
+        get_pty (bool, optional): Request a pseudo-terminal (merges stderr
+            into stdout on most servers). Defaults to False.
+        on_stdout (Callable[[str], None], optional): Streams stdout text.
+        on_stderr (Callable[[str], None], optional): Streams stderr text.
+
+    Returns:
+        Dict[str, Any]: The result described in :func:`collect_exec`.
+    """
+    channel = transport.open_exec(command, get_pty=get_pty)
+    try:
+        return collect_exec(channel, command, timeout, on_stdout, on_stderr)
+    finally:
+        channel.close()
+
+
+def run_on_host(
+    params: Dict[str, Any],
+    command: str,
+    timeout: Optional[float] = DEFAULT_EXEC_TIMEOUT,
+    **kwargs,
+) -> Dict[str, Any]:
+    """Run a command on a host through the shared transport pool.
+
+    Args:
+        params (Dict[str, Any]): Connection arguments accepted by
+            ``TransportPool.acquire`` (e.g. from ``device_pool_params``).
+        command (str): The command line.
+        timeout (float, optional): Seconds to wait for completion. Defaults to 30.
+        **kwargs: ``get_pty``, ``on_stdout`` and ``on_stderr`` for :func:`run_exec`.
+
+    Returns:
+        Dict[str, Any]: The result described in :func:`collect_exec`.
+    """
+    return run_exec(transport_pool.acquire(**params), command, timeout, **kwargs)
+
+
+async def run_on_host_async(
+    params: Dict[str, Any],
+    command: str,
+    timeout: Optional[float] = DEFAULT_EXEC_TIMEOUT,
+    on_stdout: Optional[OutputCallback] = None,
+    on_stderr: Optional[OutputCallback] = None,
+    get_pty: bool = False,
+) -> Dict[str, Any]:
+    """Run :func:`run_on_host` in the default executor.
+
+    The handshake (if any) and the blocking channel reads happen off the
+    event loop; the output callbacks are called back on the loop.
+
+    Args:
+        params (Dict[str, Any]): Connection arguments for the transport pool.
+        command (str): The command line.
+        timeout (float, optional): Seconds to wait for completion. Defaults to 30.
+        on_stdout (Callable[[str], None], optional): Streams stdout text.
+        on_stderr (Callable[[str], None], optional): Streams stderr text.
+        get_pty (bool, optional): Request a pseudo-terminal. Defaults to False.
+
+    Returns:
+        Dict[str, Any]: The result described in :func:`collect_exec`.
+    """
+    loop = asyncio.get_event_loop()
+
+    def on_loop(callback):
+        if callback is None:
+            return None
+        return lambda text: loop.call_soon_threadsafe(callback, text)
+
+    return await loop.run_in_executor(
+        None,
+        partial(
+            run_on_host,
+            params,
+            command,
+            timeout,
+            get_pty=get_pty,
+            on_stdout=on_loop(on_stdout),
+            on_stderr=on_loop(on_stderr),
+        ),
+    )
+
+
+async def analyze_exec_result(
+    chief, result: Dict[str, Any], os_type: str = "unknown"
+) -> Optional[Dict[str, Any]]:
+    """Ask Chief to analyse a finished command. Callers opt in explicitly.
+
+    Args:
+        chief (Chief): The AI assistant, or None.
+        result (Dict[str, Any]): A result from :func:`collect_exec`.
+        os_type (str, optional): The device's OS type. Defaults to "unknown".
+
+    Returns:
+        Dict[str, Any] or None: Chief's analysis, or None if Chief is unavailable.
+    """
+    if chief is None or not chief.is_functional():
+        return None
+    output = result["stdout"]
+    if result["stderr"]:
+        output += "\n" + result["stderr"]
+    try:
+        return await chief.analyze_command_output(result["command"], output, os_type)
+    except Exception as e:
+        logger.error(f"Command analysis failed: {str(e)}")
+        return None
@@ -0,0 +1,322 @@
+"""Fleet fan-out module for Eagle Terminal.
+
+This module runs a list of commands on many inventory devices at once.
+``FanoutEngine`` keeps up to ``concurrency`` hosts in flight, applies a
+per-host timeout and a bounded number of retries, and yields each host's
+result the moment it completes so a results view and an export file can
+be filled while the rest of the fleet is still running.
+
+Commands run on exec channels of the shared transport pool, so hosts that
+already have an open tab or a status poll reuse that transport instead of
+performing a second handshake.
+"""
+
+import asyncio
+import csv
+import fnmatch
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from utils.device_status import device_pool_params
+from utils.exec_channel import run_on_host
+from utils.logger import logger
+
+DEFAULT_CONCURRENCY = 50
+DEFAULT_TIMEOUT = 30
+DEFAULT_RETRIES = 1
+# Share of the host timeout a runner is given on top of it to notice its own
+# deadline before the host is reported as hung.
+TIMEOUT_SLACK = 0.1
+
+
+def select_devices(
+    devices: List[Dict[str, Any]],
+    names: Optional[List[str]] = None,
+    pattern: Optional[str] = None,
+    os_type: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Select SSH devices from the inventory.
+
+    Args:
+        devices (List[Dict[str, Any]]): The inventory entries.
+        names (List[str], optional): Device names to include. Defaults to all.
+        pattern (str, optional): A glob matched against name and hostname,
+            e.g. ``"core-sw-*"``. Defaults to None.
+        os_type (str, optional): Only include devices of this OS type. Defaults to None.
+
+    Returns:
+        List[Dict[str, Any]]: The matching devices that have a hostname.
+    """
+    selected = []
+    for device in devices:
+        if not device.get("hostname"):
+            continue
+        if device.get("connection_type", "SSH").upper() != "SSH":
+            continue
+        if names is not None and device.get("name") not in names:
+            continue
+        if pattern and not (
+            fnmatch.fnmatch(device.get("name", ""), pattern)
+            or fnmatch.fnmatch(device["hostname"], pattern)
+        ):
+            continue
+        if os_type and device.get("os_type", "unknown").lower() != os_type.lower():
+            continue
+        selected.append(device)
+    return selected
+
+
+def run_host_commands(
+    device: Dict[str, Any], commands: List[str], timeout: float
+) -> List[Dict[str, Any]]:
+    """Run commands one after another on a single device.
+
+    ``timeout`` is a budget for the whole host: the connection and each
+    command get what is left of it, so the call returns (or raises) once it
+    is spent rather than leaving a command running in its thread.
+
+    Args:
+        device (Dict[str, Any]): The inventory entry.
+        commands (List[str]): The commands to run.
+        timeout (float): Seconds all commands together may take.
+
+    Returns:
+        List[Dict[str, Any]]: One entry per command with ``command``,
+        ``stdout``, ``stderr`` and ``exit_status``.
+
+    Raises:
+        TimeoutError: If the commands do not finish in time.
+    """
+    outputs = []
+    deadline = time.monotonic() + timeout
+    params = device_pool_params(device)
+    for command in commands:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"'{command}' not started within {timeout}s")
+        result = run_on_host({**params, "timeout": remaining}, command, remaining)
+        if result["timed_out"]:
+            raise TimeoutError(f"'{command}' did not finish within {timeout}s")
+        outputs.append(
+            {key: result[key] for key in ("command", "stdout", "stderr", "exit_status")}
+        )
+    return outputs
+
+
+class FanoutEngine:
+    """Runs commands across a fleet with bounded concurrency."""
+
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+        retry_delay: float = 1.0,
+        runner: Callable = run_host_commands,
+    ):
+        """Initialize the engine.
+
+        Args:
+            concurrency (int, optional): Maximum number of hosts in flight. Defaults to 50.
+            timeout (float, optional): Seconds allowed per host and attempt,
+                handed to the runner as its budget. Defaults to 30.
+            retries (int, optional): Extra attempts after a failed one. Defaults to 1.
+            retry_delay (float, optional): Base delay before a retry, doubled on
+                every further attempt. Defaults to 1.0.
+            runner (Callable, optional): Blocking ``runner(device, commands, timeout)``
+                used for each host. It must return or raise within about
+                ``timeout`` seconds; a host whose runner is still busy after
+                that is reported as timed out and not retried, since its
+                thread cannot be stopped. Defaults to :func:`run_host_commands`.
+        """
+        self.concurrency = max(1, int(concurrency))
+        self.timeout = timeout
+        self.retries = max(0, int(retries))
+        self.retry_delay = retry_delay
+        self.runner = runner
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """Stop starting new hosts; hosts already in flight finish normally."""
+        self.cancelled = True
+
+    async def stream(
+        self, devices: List[Dict[str, Any]], commands: List[str]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Run ``commands`` on every device and yield results as hosts finish.
+
+        Args:
+            devices (List[Dict[str, Any]]): The selected inventory entries.
+            commands (List[str]): The commands to run on each device.
+
+        Yields:
+            Dict[str, Any]: One result per host with ``device``, ``hostname``,
+            ``status`` ("ok", "failed", "error", "timeout" or "cancelled"),
+            ``attempts``, ``elapsed``, ``outputs`` and ``error``.
+        """
+        self.cancelled = False
+        semaphore = asyncio.Semaphore(self.concurrency)
+        executor = ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="fanout"
+        )
+        started = time.perf_counter()
+
+        async def run_one(device):
+            async with semaphore:
+                return await self._run_host(device, commands, executor)
+
+        tasks = [asyncio.ensure_future(run_one(device)) for device in devices]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            executor.shutdown(wait=False)
+            logger.info(
+                f"Fan-out of {len(commands)} command(s) to {len(devices)} host(s) "
+                f"finished in {time.perf_counter() - started:.2f}s"
+            )
+
+    async def run(
+        self,
+        devices: List[Dict[str, Any]],
+        commands: List[str],
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Run ``commands`` on every device and collect all results.
+
+        Args:
+            devices (List[Dict[str, Any]]): The selected inventory entries.
+            commands (List[str]): The commands to run on each device.
+            on_result (Callable, optional): Called with each result as soon as
+                its host completes. Defaults to None.
+
+        Returns:
+            List[Dict[str, Any]]: The results in completion order.
+        """
+        results = []
+        async for result in self.stream(devices, commands):
+            if on_result:
+                on_result(result)
+            results.append(result)
+        return results
+
+    async def _run_host(self, device, commands, executor) -> Dict[str, Any]:
+        loop = asyncio.get_event_loop()
+        result = {
+            "device": device.get("name") or device["hostname"],
+            "hostname": device["hostname"],
+            "status": "cancelled",
+            "attempts": 0,
+            "elapsed": 0.0,
+            "outputs": [],
+            "error": None,
+        }
+        started = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            if self.cancelled:
+                break
+            if attempt:
+                await asyncio.sleep(self.retry_delay * 2 ** (attempt - 1))
+            result["attempts"] = attempt + 1
+            job = loop.run_in_executor(
+                executor, self.runner, device, commands, self.timeout
+            )
+            done, _ = await asyncio.wait(
+                {job}, timeout=self.timeout * (1 + TIMEOUT_SLACK)
+            )
+            if not done:
+                # The runner ignored its budget. Its thread keeps going, so a
+                # retry would only run the commands a second time beside it.
+                result["status"] = "timeout"
+                result["error"] = f"No answer within {self.timeout}s"
+                logger.warning(f"Fan-out runner for {result['hostname']} is hung")
+                break
+            try:
+                outputs = job.result()
+            except TimeoutError as e:
+                result["status"] = "timeout"
+                result["error"] = str(e)
+            except Exception as e:
+                result["status"] = "error"
+                result["error"] = str(e)
+            else:
+                result["outputs"] = outputs
+                failed = any(entry.get("exit_status") for entry in outputs)
+                result["status"] = "failed" if failed else "ok"
+                result["error"] = None
+                break
+            logger.debug(
+                f"Fan-out attempt {attempt + 1} on {result['hostname']} failed: {result['error']}"
+            )
+        result["elapsed"] = round(time.perf_counter() - started, 3)
+        return result
+
+
+class ResultExporter:
+    """Writes fan-out results to a JSONL or CSV file as they arrive."""
+
+    CSV_FIELDS = [
+        "device",
+        "hostname",
+        "status",
+        "attempts",
+        "elapsed",
+        "command",
+        "exit_status",
+        "stdout",
+        "stderr",
+        "error",
+    ]
+
+    def __init__(self, path: str):
+        """Open the export file.
+
+        Args:
+            path (str): The output path. A ``.csv`` suffix selects CSV,
+                anything else writes one JSON object per line.
+        """
+        self.path = path
+        self.format = "csv" if path.lower().endswith(".csv") else "jsonl"
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = None
+        if self.format == "csv":
+            self.writer = csv.DictWriter(self.file, fieldnames=self.CSV_FIELDS)
+            self.writer.writeheader()
+
+    def write(self, result: Dict[str, Any]) -> None:
+        """Append one host result and flush it to disk.
+
+        Args:
+            result (Dict[str, Any]): A result yielded by :meth:`FanoutEngine.stream`.
+        """
+        if self.format == "jsonl":
+            self.file.write(json.dumps(result) + "\n")
+        else:
+            host = {
+                key: result[key]
+                for key in (
+                    "device",
+                    "hostname",
+                    "status",
+                    "attempts",
+                    "elapsed",
+                    "error",
+                )
+            }
+            for entry in result["outputs"] or [{}]:
+                self.writer.writerow({**host, **entry})
+        self.file.flush()
+
+    def close(self) -> None:
+        """Close the export file."""
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
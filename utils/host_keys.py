@@ -0,0 +1,89 @@
+"""Host key module for Eagle Terminal.
+
+paramiko checks host keys against ``~/.ssh/known_hosts`` and hands hosts
+that are not listed to a ``MissingHostKeyPolicy``. This module applies the
+same rules to asyncssh connections, so a session checks host keys the same
+way whichever library carries it:
+
+- a host listed in known_hosts with another key is always refused;
+- a host that is not listed is left to the paramiko ``host_key_policy``
+  (RejectPolicy when none is given).
+"""
+
+import os
+from typing import Any, Dict, Optional
+
+import paramiko
+
+from utils.logger import logger
+
+try:
+    import asyncssh
+except ImportError:
+    asyncssh = None
+
+KNOWN_HOSTS_FILE = os.path.join("~", ".ssh", "known_hosts")
+
+
+def accept_unknown_host_key(
+    policy: Optional[paramiko.MissingHostKeyPolicy],
+    known_hosts: str,
+    host: str,
+    addr: str,
+    port: int,
+) -> bool:
+    """Decide on a host key that is not in known_hosts, as paramiko would.
+
+    Args:
+        policy (paramiko.MissingHostKeyPolicy, optional): The session's
+            policy; None is ``RejectPolicy``.
+        known_hosts (str): The known_hosts file the key was checked against.
+        host (str): The host name connected to.
+        addr (str): Its IP address.
+        port (int): Its port.
+
+    Returns:
+        bool: True to trust the key.
+    """
+    if os.path.isfile(known_hosts):
+        listed = asyncssh.read_known_hosts(known_hosts).match(
+            host, addr, port if port != 22 else None
+        )[0]
+        if listed:
+            logger.error(f"Host key for {host} does not match {known_hosts}")
+            return False
+    if policy is None or isinstance(policy, paramiko.RejectPolicy):
+        logger.error(f"Host key for {host} is not in {known_hosts}")
+        return False
+    if isinstance(policy, paramiko.WarningPolicy):
+        logger.warning(f"Unknown host key for {host} accepted")
+    return True
+
+
+class HostKeyPolicyClient(asyncssh.SSHClient if asyncssh else object):
+    """Applies a paramiko host key policy to hosts missing from known_hosts."""
+
+    def __init__(self, policy, known_hosts: str):
+        self.policy = policy
+        self.known_hosts = known_hosts
+
+    def validate_host_public_key(self, host, addr, port, key) -> bool:
+        return accept_unknown_host_key(self.policy, self.known_hosts, host, addr, port)
+
+
+def asyncssh_host_key_kwargs(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the ``asyncssh.connect`` arguments that check the host key.
+
+    Args:
+        params (dict): Connection arguments; ``host_key_policy`` and
+            ``known_hosts`` (a path, defaults to ``~/.ssh/known_hosts``) are used.
+
+    Returns:
+        dict: ``known_hosts`` and ``client_factory`` for ``asyncssh.connect``.
+    """
+    known_hosts = os.path.expanduser(params.get("known_hosts") or KNOWN_HOSTS_FILE)
+    policy = params.get("host_key_policy")
+    return {
+        "known_hosts": known_hosts if os.path.isfile(known_hosts) else (),
+        "client_factory": lambda: HostKeyPolicyClient(policy, known_hosts),
+    }
@@ -0,0 +1,83 @@
+"""Input writer module for Eagle Terminal.
+
+Keystrokes sent one write at a time cost one channel write (and, with
+paramiko, one trip to a worker thread) each. ``InputWriter`` coalesces
+them instead, in the manner of Nagle's algorithm:
+
+- Input sent while the channel is idle goes out on the next turn of the
+  event loop, so everything sent in the same tick, such as a burst of key
+  repeats, makes one write.
+- While a write is in flight, further input is buffered. It goes out as
+  one write once the write completes and ``delay`` has passed, so a
+  quick typist or a slow channel gets fewer, larger writes.
+- Writes are sent in order, one at a time.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, List, Optional
+
+from utils.logger import logger
+
+DEFAULT_COALESCE_DELAY = 0.005
+
+
+class InputWriter:
+    """Coalesces input for a channel into as few writes as latency allows."""
+
+    def __init__(
+        self,
+        write: Callable[[str], Awaitable[None]],
+        delay: float = DEFAULT_COALESCE_DELAY,
+    ):
+        """Create a writer.
+
+        Args:
+            write (Callable[[str], Awaitable[None]]): Sends data to the
+                channel, e.g. ``SSHConnection.write_input``.
+            delay (float, optional): Seconds to gather input after a write
+                before sending the next one. Defaults to 5 ms.
+        """
+        self.write = write
+        self.delay = delay
+        self.writes = 0
+        self._buffer: List[str] = []
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        """int: Characters buffered and not written yet."""
+        return sum(len(data) for data in self._buffer)
+
+    def send(self, data: str) -> None:
+        """Queue ``data``; it is written with whatever else is sent meanwhile."""
+        if not data:
+            return
+        self._buffer.append(data)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._drain())
+
+    async def _drain(self) -> None:
+        # Started as a task: the rest of this tick's input is in by now.
+        await asyncio.sleep(0)
+        while self._buffer:
+            data = "".join(self._buffer)
+            self._buffer = []
+            try:
+                await self.write(data)
+                self.writes += 1
+            except Exception as e:
+                logger.error(f"Error writing input: {str(e)}")
+                self._buffer = []
+                return
+            if self.delay:
+                # Whatever is sent meanwhile goes out together.
+                await asyncio.sleep(self.delay)
+
+    async def flush(self) -> None:
+        """Wait until everything queued so far is written."""
+        while self._task is not None and not self._task.done():
+            await asyncio.shield(self._task)
+
+    def clear(self) -> None:
+        """Drop input that was not written yet."""
+        self._buffer = []
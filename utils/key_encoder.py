@@ -0,0 +1,127 @@
+"""Key encoder module for Eagle Terminal.
+
+In raw input mode every key press goes to the remote side as the bytes an
+xterm would send, and the remote shell or program does its own editing:
+
+- printable text is sent as typed; Alt sends it prefixed with ESC;
+- Ctrl with a letter or one of ``@[\\]^_`` and space sends the C0 control
+  character, so Ctrl-C, Ctrl-R, Ctrl-D... reach the remote side;
+- Return, Backspace, Tab, Shift-Tab and Escape send CR, DEL, HT, CSI Z
+  and ESC;
+- cursor keys, Home and End send CSI sequences, or SS3 ones while the
+  remote side has turned application cursor keys on (DECCKM);
+- Insert, Delete, Page Up/Down and F1-F12 send their xterm sequences.
+  With Shift, Alt or Ctrl held, these keys carry xterm's modifier
+  parameter, as in ``CSI 1;5A`` for Ctrl-Up.
+"""
+
+from typing import Optional
+
+from PyQt5.QtCore import Qt
+
+# Final character of the CSI/SS3 sequence of the cursor keys, Home and End.
+CURSOR_KEYS = {
+    Qt.Key_Up: "A",
+    Qt.Key_Down: "B",
+    Qt.Key_Right: "C",
+    Qt.Key_Left: "D",
+    Qt.Key_Home: "H",
+    Qt.Key_End: "F",
+}
+
+# Number in the ``CSI n ~`` sequence of the editing and function keys.
+TILDE_KEYS = {
+    Qt.Key_Insert: 2,
+    Qt.Key_Delete: 3,
+    Qt.Key_PageUp: 5,
+    Qt.Key_PageDown: 6,
+    Qt.Key_F5: 15,
+    Qt.Key_F6: 17,
+    Qt.Key_F7: 18,
+    Qt.Key_F8: 19,
+    Qt.Key_F9: 20,
+    Qt.Key_F10: 21,
+    Qt.Key_F11: 23,
+    Qt.Key_F12: 24,
+}
+
+# F1-F4 are SS3 P to S.
+SS3_KEYS = {Qt.Key_F1: "P", Qt.Key_F2: "Q", Qt.Key_F3: "R", Qt.Key_F4: "S"}
+
+SPECIAL_KEYS = {
+    Qt.Key_Return: "\r",
+    Qt.Key_Enter: "\r",
+    Qt.Key_Backspace: "\x7f",
+    Qt.Key_Tab: "\t",
+    Qt.Key_Backtab: "\x1b[Z",
+    Qt.Key_Escape: "\x1b",
+}
+
+# Keys that give a control character with Ctrl, besides the letters.
+CONTROL_KEYS = {
+    Qt.Key_Space: "\x00",
+    Qt.Key_At: "\x00",
+    Qt.Key_BracketLeft: "\x1b",
+    Qt.Key_Backslash: "\x1c",
+    Qt.Key_BracketRight: "\x1d",
+    Qt.Key_AsciiCircum: "\x1e",
+    Qt.Key_Underscore: "\x1f",
+}
+
+
+def modifier_parameter(modifiers) -> int:
+    """Return xterm's modifier parameter: 1 plus Shift 1, Alt 2 and Ctrl 4."""
+    value = 1
+    if modifiers & Qt.ShiftModifier:
+        value += 1
+    if modifiers & Qt.AltModifier:
+        value += 2
+    if modifiers & Qt.ControlModifier:
+        value += 4
+    return value
+
+
+def encode_key(
+    key: int, modifiers, text: str = "", application_cursor: bool = False
+) -> Optional[str]:
+    """Return what an xterm sends for a key press.
+
+    Args:
+        key (int): The ``Qt.Key`` code.
+        modifiers (Qt.KeyboardModifiers): The modifiers held.
+        text (str, optional): The text the key produces, from
+            ``QKeyEvent.text()``.
+        application_cursor (bool, optional): True while the remote side has
+            application cursor keys on. Defaults to False.
+
+    Returns:
+        str or None: The sequence, or None for keys that send nothing, such
+        as a modifier on its own.
+    """
+    parameter = modifier_parameter(modifiers)
+    if key in CURSOR_KEYS:
+        final = CURSOR_KEYS[key]
+        if parameter > 1:
+            return f"\x1b[1;{parameter}{final}"
+        return ("\x1bO" if application_cursor else "\x1b[") + final
+    if key in TILDE_KEYS:
+        number = TILDE_KEYS[key]
+        if parameter > 1:
+            return f"\x1b[{number};{parameter}~"
+        return f"\x1b[{number}~"
+    if key in SS3_KEYS:
+        if parameter > 1:
+            return f"\x1b[1;{parameter}{SS3_KEYS[key]}"
+        return "\x1bO" + SS3_KEYS[key]
+
+    alt = "\x1b" if modifiers & Qt.AltModifier else ""
+    if key in SPECIAL_KEYS:
+        return alt + SPECIAL_KEYS[key]
+    if modifiers & Qt.ControlModifier:
+        if Qt.Key_A <= key <= Qt.Key_Z:
+            return alt + chr(key - Qt.Key_A + 1)
+        if key in CONTROL_KEYS:
+            return alt + CONTROL_KEYS[key]
+    if text and all(char.isprintable() or char == "\t" for char in text):
+        return alt + text
+    return None
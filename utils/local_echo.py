@@ -0,0 +1,222 @@
+"""Local echo module for Eagle Terminal.
+
+Over a slow link, what the user types shows up on the remote screen only
+once the server has echoed it back, a full round trip later. Like mosh,
+``EchoPredictor`` guesses the echo instead:
+
+- Text sent to the session is recorded as a prediction at the position
+  the cursor had: an absolute line number (as used by the scrollback
+  store) and a character column, continuing on the next line where the
+  text would wrap.
+- Each time the screen changes, the predictions are checked against it.
+  Text that appeared as predicted is confirmed, and the time it took is a
+  round-trip sample for a smoothed RTT (``srtt``). Different text rolls
+  every prediction back, and so does no echo at all within ``timeout``.
+- Predictions are only worth showing when the round trip is noticeable:
+  :attr:`EchoPredictor.active` turns on once ``srtt`` exceeds
+  ``threshold`` and off again below half of it. They are always checked,
+  so the RTT keeps being measured.
+- Input that is not echoed, such as a password, must never be shown.
+  :func:`is_password_prompt` recognises the usual prompts, so the caller
+  does not predict there. Input that timed out without any echo also
+  stops predictions from being shown until an echo is confirmed again.
+
+The predictor does not touch what is sent; it only tells the view what
+to draw meanwhile.
+"""
+
+import re
+import time
+from typing import Callable, List, Optional, Tuple
+
+from utils.terminal_screen import char_width
+
+DEFAULT_RTT_THRESHOLD = 0.1
+MIN_ECHO_TIMEOUT = 1.0
+# Weight of a new round-trip sample, as in TCP's smoothed RTT.
+RTT_GAIN = 0.125
+
+PASSWORD_PROMPT = re.compile(
+    r"(?:password|passphrase|passcode|\bpin|secret)[^:\r\n]*:\s*$", re.IGNORECASE
+)
+
+Segment = Tuple[int, int, str]
+
+
+def is_password_prompt(text: str) -> bool:
+    """Return True if ``text``, the line before the cursor, asks for a secret."""
+    return PASSWORD_PROMPT.search(text) is not None
+
+
+class _Prediction:
+    __slots__ = ("line", "column", "text", "cells_after", "sent", "matched")
+
+    def __init__(
+        self, line: int, column: int, text: str, cells_after: int, sent: float
+    ):
+        self.line = line
+        self.column = column
+        self.text = text
+        self.cells_after = cells_after
+        self.sent = sent
+        self.matched = 0
+
+
+class EchoPredictor:
+    """Tracks predicted echo and confirms or rolls it back against the screen."""
+
+    def __init__(self, threshold: float = DEFAULT_RTT_THRESHOLD, mode: str = "auto"):
+        """Create a predictor.
+
+        Args:
+            threshold (float, optional): Smoothed RTT in seconds above which
+                predictions are shown. Defaults to 0.1.
+            mode (str, optional): ``"auto"`` to show predictions depending
+                on the RTT, ``"always"`` or ``"never"``. Defaults to "auto".
+        """
+        self.threshold = threshold
+        self.mode = mode
+        self.srtt: Optional[float] = None
+        self.echoing = True
+        self._slow = False
+        self._predictions: List[_Prediction] = []
+        # Set when sent text moved the cursor in a way that is not predicted.
+        self._lost = False
+
+    @property
+    def active(self) -> bool:
+        """bool: True if predictions should be shown."""
+        if self.mode == "never" or not self.echoing:
+            return False
+        return self.mode == "always" or self._slow
+
+    @property
+    def timeout(self) -> float:
+        """float: Seconds an echo may take before a prediction is rolled back."""
+        return max(MIN_ECHO_TIMEOUT, 4 * (self.srtt or 0.0))
+
+    def predict(
+        self,
+        line: int,
+        column: int,
+        text: str,
+        cells_left: int,
+        columns: int,
+        now: Optional[float] = None,
+    ) -> None:
+        """Record ``text`` as sent, to be echoed from the given position on.
+
+        Args:
+            line (int): Absolute number of the cursor line.
+            column (int): Characters before the cursor on that line.
+            text (str): Printable text sent; control characters end the
+                prediction, as their effect is not predicted.
+            cells_left (int): Cells from the cursor to the end of the line.
+            columns (int): Screen width, for the lines the text wraps onto.
+            now (float, optional): Current ``time.monotonic()``.
+        """
+        if self.mode == "never":
+            return
+        if self._lost and self._predictions:
+            # Where the cursor is after the earlier input is not known.
+            return
+        now = time.monotonic() if now is None else now
+        if self._predictions:
+            last = self._predictions[-1]
+            line, column = last.line, last.column + len(last.text)
+            cells_left = last.cells_after
+        self._lost = False
+        chars: List[str] = []
+        for char in text:
+            if not char.isprintable():
+                self._lost = True
+                break
+            width = char_width(char)
+            if width > cells_left:
+                if chars:
+                    self._add(line, column, chars, cells_left, now)
+                line, column, cells_left, chars = line + 1, 0, columns, []
+            chars.append(char)
+            cells_left -= width
+        if chars:
+            self._add(line, column, chars, cells_left, now)
+
+    def _add(self, line, column, chars, cells_after, now) -> None:
+        self._predictions.append(
+            _Prediction(line, column, "".join(chars), cells_after, now)
+        )
+
+    def check(
+        self, line_text: Callable[[int], Optional[str]], now: Optional[float] = None
+    ) -> bool:
+        """Compare the predictions with the screen.
+
+        Args:
+            line_text (Callable[[int], Optional[str]]): Returns the text of
+                an absolute line, or None if it is no longer kept.
+            now (float, optional): Current ``time.monotonic()``.
+
+        Returns:
+            bool: True if the predictions to draw changed.
+        """
+        if not self._predictions:
+            return False
+        now = time.monotonic() if now is None else now
+        changed = False
+        while self._predictions:
+            prediction = self._predictions[0]
+            text = line_text(prediction.line)
+            if text is None:
+                self.reset()
+                return True
+            echoed = text[prediction.column : prediction.column + len(prediction.text)]
+            matched = 0
+            while matched < len(echoed) and echoed[matched] == prediction.text[matched]:
+                matched += 1
+            if matched != prediction.matched:
+                prediction.matched = matched
+                changed = True
+            if matched == len(prediction.text):
+                self._predictions.pop(0)
+                self._confirmed(now - prediction.sent)
+                changed = True
+                continue
+            if echoed[matched:].strip():
+                # Something else appeared where the echo was expected.
+                self.reset()
+                return True
+            if now - prediction.sent > self.timeout:
+                if not echoed.strip():
+                    # Nothing echoed at all: the remote side is not echoing.
+                    self.echoing = False
+                self.reset()
+                return True
+            break
+        return changed
+
+    def _confirmed(self, sample: float) -> None:
+        self.echoing = True
+        if self.srtt is None:
+            self.srtt = sample
+        else:
+            self.srtt += RTT_GAIN * (sample - self.srtt)
+        if self.srtt > self.threshold:
+            self._slow = True
+        elif self.srtt < self.threshold / 2:
+            self._slow = False
+
+    def pending(self) -> List[Segment]:
+        """Return the text still waiting for its echo, as ``(line, column, text)``."""
+        return [
+            (p.line, p.column + p.matched, p.text[p.matched :]) for p in self._predictions
+        ]
+
+    @property
+    def waiting(self) -> bool:
+        """bool: True if some prediction is not confirmed yet."""
+        return bool(self._predictions)
+
+    def reset(self) -> None:
+        """Drop every prediction, e.g. when the screen was cleared."""
+        self._predictions = []
+        self._lost = False
@@ -0,0 +1,298 @@
+"""Output pipeline module for Eagle Terminal.
+
+This module turns the raw bytes coming off an SSH channel into text with
+as little copying as possible:
+
+- ``ByteRing`` is a preallocated ``bytearray`` ring buffer. Channel readers
+  write into it and consumers take bytes out, so a burst of output does
+  not allocate one object per chunk and memory stays bounded.
+- ``OutputPipeline`` hands each chunk to byte-level stages (transcript
+  logging, plugin hooks...) as a ``memoryview`` and then decodes it with
+  an incremental decoder, which keeps partial UTF-8 sequences split
+  across chunks instead of replacing them with U+FFFD.
+- ``AnsiFilter`` strips escape sequences from the decoded text, carrying
+  a sequence that is cut off at the end of a chunk over to the next one.
+- ``ThroughputMeter`` is a stage that measures the output rate.
+"""
+
+import codecs
+import re
+import threading
+import time
+from collections import deque
+from typing import Callable, List, Optional
+
+from utils.logger import logger
+
+DEFAULT_RING_SIZE = 256 * 1024
+
+# CSI/OSC/two-byte escape sequences and the stray "=" / ">" keypad-mode
+# artifacts some devices print at the start of a line.
+DISPLAY_FILTER = re.compile(
+    r"\x1B(?:\][^\x07\x1B]*(?:\x07|\x1B\\)|\[[0-?]*[ -/]*[@-~]|[@-Z\\-_])"
+    r"|^[ \t]*[=>][ \t]*",
+    re.MULTILINE,
+)
+# An escape sequence that has started but not finished at the end of a chunk.
+_PARTIAL_ESCAPE = re.compile(r"\x1B(?:\][^\x07\x1B]*|\[[0-?]*[ -/]*)?$")
+
+OutputStage = Callable[[memoryview], None]
+
+
+class ByteRing:
+    """Fixed-capacity FIFO byte buffer backed by a single ``bytearray``."""
+
+    def __init__(self, capacity: int = DEFAULT_RING_SIZE):
+        """Initialize the ring.
+
+        Args:
+            capacity (int, optional): Size of the buffer in bytes. Defaults to 256 KiB.
+        """
+        self.capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def free(self) -> int:
+        """Number of bytes that can be written without overflowing."""
+        return self.capacity - self._size
+
+    def write(self, data) -> int:
+        """Copy bytes into the ring.
+
+        Args:
+            data (bytes-like): The bytes to append.
+
+        Returns:
+            int: The number of bytes written; less than ``len(data)`` if the ring is full.
+        """
+        data = memoryview(data).cast("B")
+        count = min(len(data), self.free)
+        end = (self._start + self._size) % self.capacity
+        first = min(count, self.capacity - end)
+        self._view[end : end + first] = data[:first]
+        if count > first:
+            self._view[: count - first] = data[first:count]
+        self._size += count
+        return count
+
+    def recv_into(self, source, max_bytes: Optional[int] = None) -> int:
+        """Receive from a socket-like object straight into the ring.
+
+        Objects with ``recv_into`` (sockets) write into the ring's free space
+        without an intermediate copy. paramiko channels only offer ``recv``,
+        so their chunk is copied in.
+
+        Args:
+            source: An object with ``recv_into`` or ``recv``.
+            max_bytes (int, optional): Upper bound for this call. Defaults to the free space.
+
+        Returns:
+            int: Bytes received; 0 means the source reached EOF (or the ring is full).
+        """
+        limit = min(self.free, max_bytes or self.free)
+        if limit <= 0:
+            return 0
+        end = (self._start + self._size) % self.capacity
+        if hasattr(source, "recv_into"):
+            count = source.recv_into(
+                self._view[end : end + min(limit, self.capacity - end)]
+            )
+            self._size += count
+            return count
+        return self.write(source.recv(limit))
+
+    def peek(self, max_bytes: Optional[int] = None) -> List[memoryview]:
+        """Return views of the buffered bytes without consuming them.
+
+        Args:
+            max_bytes (int, optional): Upper bound. Defaults to everything buffered.
+
+        Returns:
+            List[memoryview]: One view, or two when the data wraps around.
+            The views are only valid until the next write.
+        """
+        count = min(self._size, max_bytes or self._size)
+        first = min(count, self.capacity - self._start)
+        views = [self._view[self._start : self._start + first]] if first else []
+        if count > first:
+            views.append(self._view[: count - first])
+        return views
+
+    def consume(self, count: int) -> None:
+        """Drop ``count`` bytes from the front of the ring."""
+        count = min(count, self._size)
+        self._start = (self._start + count) % self.capacity
+        self._size -= count
+        if not self._size:
+            self._start = 0
+
+    def read(self, max_bytes: Optional[int] = None) -> bytes:
+        """Take up to ``max_bytes`` out of the ring as one ``bytes`` object.
+
+        Args:
+            max_bytes (int, optional): Upper bound. Defaults to everything buffered.
+
+        Returns:
+            bytes: The consumed bytes.
+        """
+        views = self.peek(max_bytes)
+        data = bytes(views[0]) if len(views) == 1 else b"".join(views)
+        self.consume(len(data))
+        return data
+
+    def clear(self) -> None:
+        """Discard everything buffered."""
+        self._start = 0
+        self._size = 0
+
+
+class OutputPipeline:
+    """Decodes a channel's byte stream and feeds it through output stages."""
+
+    def __init__(self, encoding: str = "utf-8"):
+        """Initialize the pipeline.
+
+        Args:
+            encoding (str, optional): The remote side's character encoding. Defaults to "utf-8".
+        """
+        self.encoding = encoding
+        self.stages: List[OutputStage] = []
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+
+    def add_stage(self, stage: OutputStage) -> None:
+        """Register a callable that receives every raw chunk as a ``memoryview``.
+
+        Stages must not keep the view beyond the call; copy it if needed.
+
+        Args:
+            stage (Callable[[memoryview], None]): The stage to add.
+        """
+        # The list is replaced, not changed: ``feed`` may be running on an
+        # output worker thread.
+        self.stages = self.stages + [stage]
+
+    def remove_stage(self, stage: OutputStage) -> None:
+        """Unregister a stage added with :meth:`add_stage`."""
+        self.stages = [existing for existing in self.stages if existing is not stage]
+
+    def feed(self, data) -> str:
+        """Run a chunk through the stages and decode it.
+
+        Args:
+            data (bytes-like): The raw chunk.
+
+        Returns:
+            str: The decoded text. A multibyte character split at the end of
+            the chunk is held back and returned with the next chunk.
+        """
+        view = memoryview(data)
+        for stage in self.stages:
+            try:
+                stage(view)
+            except Exception as e:
+                logger.error(f"Error in output stage {stage!r}: {str(e)}")
+        return self._decoder.decode(view)
+
+    def flush(self) -> str:
+        """Return whatever is held back, e.g. when the channel closes.
+
+        Returns:
+            str: The pending text, with an incomplete sequence replaced.
+        """
+        text = self._decoder.decode(b"", final=True)
+        self._decoder.reset()
+        return text
+
+    def reset(self) -> None:
+        """Forget any partial sequence, e.g. after reconnecting."""
+        self._decoder.reset()
+
+
+class AnsiFilter:
+    """Strips escape sequences from a text stream split into chunks."""
+
+    def __init__(self):
+        self._pending = ""
+
+    def feed(self, text: str) -> str:
+        """Filter the next piece of text.
+
+        Args:
+            text (str): Decoded output.
+
+        Returns:
+            str: The text without escape sequences. An escape sequence that is
+            still incomplete at the end is kept for the next call.
+        """
+        if self._pending:
+            text = self._pending + text
+            self._pending = ""
+        partial = _PARTIAL_ESCAPE.search(text, max(0, len(text) - 256))
+        if partial:
+            self._pending = text[partial.start() :]
+            text = text[: partial.start()]
+        return DISPLAY_FILTER.sub("", text)
+
+
+class ThroughputMeter:
+    """Output stage measuring bytes per second over a sliding window.
+
+    Bytes are usually added on the output worker thread while the rate is
+    read on the GUI thread, so the counters are guarded by a lock.
+    """
+
+    def __init__(
+        self, window: float = 2.0, clock: Callable[[], float] = time.monotonic
+    ):
+        """Initialize the meter.
+
+        Args:
+            window (float, optional): Seconds of history the rate is averaged over. Defaults to 2.0.
+            clock (Callable, optional): Time source. Defaults to ``time.monotonic``.
+        """
+        self.window = window
+        self.clock = clock
+        self.total = 0
+        self._samples = deque()
+        self._window_bytes = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, view: memoryview) -> None:
+        self.add(len(view))
+
+    def add(self, count: int) -> None:
+        """Record ``count`` received bytes."""
+        with self._lock:
+            self.total += count
+            self._samples.append((self.clock(), count))
+            self._window_bytes += count
+            self._expire()
+
+    def _expire(self) -> None:
+        # Callers hold the lock.
+        horizon = self.clock() - self.window
+        while self._samples and self._samples[0][0] < horizon:
+            self._window_bytes -= self._samples.popleft()[1]
+
+    def rate(self) -> float:
+        """Return the current rate in bytes per second."""
+        with self._lock:
+            self._expire()
+            return self._window_bytes / self.window
+
+    def mb_per_s(self) -> float:
+        """Return the current rate in megabytes (10^6 bytes) per second."""
+        return self.rate() / 1e6
+
+    def reset(self) -> None:
+        """Forget all recorded traffic."""
+        with self._lock:
+            self.total = 0
+            self._samples.clear()
+            self._window_bytes = 0
@@ -0,0 +1,297 @@
+"""Output worker module for Eagle Terminal.
+
+Everything a session does with its output before it can be painted runs on
+one background thread per session, so a busy session cannot stall input or
+painting in the others:
+
+- ``OutputWorker`` takes the raw bytes read from the channel, runs them
+  through the session's ``OutputPipeline`` (byte stages such as transcripts
+  and plugin hooks, then incremental decoding), hands the text to its
+  listeners (prompt waiters, triggers...) and feeds it to the session's
+  ``TerminalScreen``. Screen listeners (recorders) hear all the text fed
+  to the screen, local messages included.
+- After each slice of output it takes a frame from the screen: the rows
+  that changed and the lines that scrolled off, as ready-to-paint
+  ``(text, attribute)`` runs. Frames pile up into one until the GUI takes
+  it, so the GUI thread only paints, at its own frame rate.
+- The screen is guarded by ``lock``; the GUI holds it for anything it does
+  to the screen or its scrollback directly (resizing, searching...).
+- While the session is not on screen the worker is ``suspended``: output
+  still goes through the screen, but no frames are taken, and feeding is
+  held to ``background_budget`` characters per second so a noisy
+  background session leaves the CPU to the one in front. What it could not
+  feed yet stays queued as raw bytes. The first frame after
+  :meth:`OutputWorker.resume` carries everything that changed meanwhile.
+
+Listeners run on the worker thread. Anything that touches Qt widgets or an
+asyncio loop from there must hand over to its own thread first.
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.logger import logger
+from utils.output_pipeline import OutputPipeline
+from utils.terminal_screen import TerminalScreen
+
+DEFAULT_HISTORY_LIMIT = 2000
+DEFAULT_SLICE_CHARS = 64 * 1024
+DEFAULT_BACKGROUND_BUDGET = 256 * 1024
+MAX_BATCH = 256
+
+Frame = Dict[str, Any]
+
+_FLUSH = object()
+
+
+def merge_frames(older: Frame, newer: Frame, history_limit: int) -> Frame:
+    """Combine two consecutive frames into one, as if taken once.
+
+    Args:
+        older (Dict[str, Any]): The frame taken first.
+        newer (Dict[str, Any]): The frame taken right after it.
+        history_limit (int): Scrolled-off lines kept at most.
+
+    Returns:
+        Dict[str, Any]: The combined frame.
+    """
+    merged = dict(newer)
+    scrolled = newer["scrolled"]
+    merged["scrolled"] = older["scrolled"] + scrolled
+    merged["rebuild"] = older["rebuild"] or newer["rebuild"]
+    merged["history_cleared"] = older["history_cleared"] or newer["history_cleared"]
+    history = newer["history"]
+    if not newer["history_cleared"]:
+        history = older["history"] + history
+    merged["history"] = history[max(0, len(history) - history_limit) :]
+    # Rows of the older frame moved up by what scrolled since; rows changed
+    # again are replaced by their newer copy.
+    rows = {
+        row - scrolled: runs
+        for row, runs in older["rows"].items()
+        if 0 <= row - scrolled < newer["size"]
+    }
+    rows.update(newer["rows"])
+    merged["rows"] = rows
+    merged["dirty"] = sorted(rows)
+    return merged
+
+
+class OutputWorker:
+    """Processes one session's output on a background thread."""
+
+    def __init__(
+        self,
+        screen: TerminalScreen,
+        pipeline: Optional[OutputPipeline] = None,
+        on_frame: Optional[Callable[[], None]] = None,
+        history_limit: int = DEFAULT_HISTORY_LIMIT,
+        slice_chars: int = DEFAULT_SLICE_CHARS,
+        background_budget: int = DEFAULT_BACKGROUND_BUDGET,
+    ):
+        """Start the worker.
+
+        Args:
+            screen (TerminalScreen): The screen the output is fed to.
+            pipeline (OutputPipeline, optional): Byte stages and decoder.
+                Defaults to a new pipeline.
+            on_frame (Callable[[], None], optional): Called on the worker
+                thread when a frame becomes ready after the previous one was
+                taken, e.g. a Qt signal's ``emit``. Defaults to None.
+            history_limit (int, optional): Scrolled-off lines a frame carries
+                at most. Defaults to 2000.
+            slice_chars (int, optional): Characters fed between two frames,
+                so a flood is painted as it goes. Defaults to 64 Ki.
+            background_budget (int, optional): Characters fed per second at
+                most while suspended. Defaults to 256 Ki.
+        """
+        self.screen = screen
+        self.pipeline = pipeline or OutputPipeline()
+        self.on_frame = on_frame
+        self.history_limit = history_limit
+        self.slice_chars = slice_chars
+        self.background_budget = background_budget
+        self.suspended = False
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self.lock = threading.RLock()
+        self.text_listeners: List[Callable[[str], None]] = []
+        self.screen_listeners: List[Callable[[str], None]] = []
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        # Counted on each side and compared, so neither thread writes the other's.
+        self._submitted = 0
+        self._processed = 0
+        self._frame: Optional[Frame] = None
+        self._thread = threading.Thread(
+            target=self._run, name="output-worker", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def backlog(self) -> int:
+        """int: Bytes and characters queued but not processed yet."""
+        return self._submitted - self._processed
+
+    def submit(self, data: bytes) -> None:
+        """Queue raw bytes read from the channel.
+
+        Args:
+            data (bytes): The chunk; it must not be changed afterwards.
+        """
+        if data:
+            self._submitted += len(data)
+            self._queue.put(data)
+
+    def submit_text(self, text: str) -> None:
+        """Queue text that bypasses the pipeline, e.g. a local status message.
+
+        Args:
+            text (str): Decoded text, in order with the output around it.
+        """
+        if text:
+            self._submitted += len(text)
+            self._queue.put(text)
+
+    def add_screen_listener(self, listener: Callable[[str], None]) -> None:
+        """Register a callable that receives all text fed to the screen, in order.
+
+        Args:
+            listener (Callable[[str], None]): Called on the worker thread.
+        """
+        # Replaced, not changed, as the worker may be iterating over it.
+        self.screen_listeners = self.screen_listeners + [listener]
+
+    def remove_screen_listener(self, listener: Callable[[str], None]) -> None:
+        """Unregister a listener added with :meth:`add_screen_listener`."""
+        self.screen_listeners = [
+            existing for existing in self.screen_listeners if existing is not listener
+        ]
+
+    def suspend(self) -> None:
+        """Stop taking frames and throttle feeding, e.g. while the tab is hidden."""
+        self.suspended = True
+        self._resumed.clear()
+
+    def resume(self) -> None:
+        """Take frames again and feed at full speed."""
+        self.suspended = False
+        self._resumed.set()
+
+    def finish(self) -> None:
+        """Queue the end of the stream: the decoder's buffered tail is flushed."""
+        self._queue.put(_FLUSH)
+
+    def take_frame(self) -> Frame:
+        """Return everything that changed since the previous call.
+
+        Also picks up changes made to the screen outside the worker, such as
+        a resize.
+
+        Returns:
+            Dict[str, Any]: A frame as returned by
+            :meth:`TerminalScreen.take_frame`.
+        """
+        with self.lock:
+            self._capture()
+            frame, self._frame = self._frame, None
+        return frame
+
+    def wait_idle(self) -> None:
+        """Block until everything queued has been processed."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Drop whatever is still queued and stop the thread."""
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._queue.task_done()
+        self._queue.put(None)
+
+    def _capture(self) -> bool:
+        """Take a frame and merge it into the waiting one; the lock must be held.
+
+        Returns:
+            bool: True if no frame was waiting before.
+        """
+        frame = self.screen.take_frame(self.history_limit)
+        if self._frame is None:
+            self._frame = frame
+            return True
+        self._frame = merge_frames(self._frame, frame, self.history_limit)
+        return False
+
+    def _run(self) -> None:
+        running = True
+        while running:
+            # Whatever queued up meanwhile is processed in one pass.
+            items = [self._queue.get()]
+            while len(items) < MAX_BATCH:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                running = not any(item is None for item in items)
+                self._process([item for item in items if item is not None])
+            except Exception as e:
+                logger.error(f"Error processing terminal output: {str(e)}")
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+
+    def _process(self, items) -> None:
+        parts = []
+        for item in items:
+            if isinstance(item, str):
+                self._processed += len(item)
+                parts.append(item)
+                continue
+            if item is _FLUSH:
+                text = self.pipeline.flush()
+            else:
+                self._processed += len(item)
+                text = self.pipeline.feed(item)
+            if not text:
+                continue
+            for listener in self.text_listeners:
+                try:
+                    listener(text)
+                except Exception as e:
+                    logger.error(f"Error in output listener: {str(e)}")
+            parts.append(text)
+        text = "".join(parts)
+        if text:
+            for listener in self.screen_listeners:
+                try:
+                    listener(text)
+                except Exception as e:
+                    logger.error(f"Error in screen listener: {str(e)}")
+        for start in range(0, len(text), self.slice_chars):
+            chunk = text[start : start + self.slice_chars]
+            if self.suspended:
+                self._feed_in_background(chunk)
+                continue
+            with self.lock:
+                self.screen.feed(chunk)
+                ready = self._capture()
+            if ready and self.on_frame is not None:
+                self.on_frame()
+
+    def _feed_in_background(self, chunk: str) -> None:
+        started = time.monotonic()
+        with self.lock:
+            self.screen.feed(chunk)
+            # Queries still need an answer while nothing is drawn.
+            answer = bool(self.screen.responses)
+        if answer and self.on_frame is not None:
+            self.on_frame()
+        if self.background_budget:
+            delay = len(chunk) / self.background_budget - (time.monotonic() - started)
+            if delay > 0:
+                # Cut short by resume().
+                self._resumed.wait(delay)
@@ -0,0 +1,278 @@
+"""Paste engine module for Eagle Terminal.
+
+Pasting thousands of lines into a session in one write overruns the input
+buffer of many network devices, and sending a line at a time with a fixed
+sleep is slow on a fast link and still too fast on a slow one.
+``PasteEngine`` sends pasted text as fast as the remote side takes it:
+
+- If the remote side turned bracketed paste on (DECSET 2004), the text is
+  sent between ``ESC [200~`` and ``ESC [201~`` so the shell or editor
+  takes it as typed text rather than commands, in chunks whose writes are
+  awaited, so the channel's window holds the paste back.
+- Otherwise it is sent line by line. A line is acknowledged once its echo
+  and a line break, or a prompt, came back. Like a TCP congestion window,
+  the number of lines sent ahead of their acknowledgement starts at one
+  and grows with each acknowledgement, up to ``max_window``; a line not
+  acknowledged within ``timeout`` (four smoothed round trips, and at
+  least a second) brings it back to one. If nothing comes back at all,
+  the remote side does not echo and lines are sent without waiting.
+- Both ways, at most ``max_rate`` characters a second are sent, and the
+  paste can be aborted between writes. An aborted bracketed paste is
+  still closed, so the remote side does not stay in paste mode.
+
+Session output reaches the engine through :meth:`PasteEngine.output`,
+which may be called from an output worker thread.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, List, Optional, Tuple
+
+from utils.local_echo import MIN_ECHO_TIMEOUT, RTT_GAIN
+from utils.logger import logger
+from utils.prompt_detector import strip_ansi
+
+BRACKETED_PASTE_START = "\x1b[200~"
+BRACKETED_PASTE_END = "\x1b[201~"
+
+DEFAULT_MAX_RATE = 64 * 1024
+DEFAULT_MAX_WINDOW = 8
+DEFAULT_CHUNK_SIZE = 4096
+# Output kept while looking for echo; more means it was not going to match.
+MAX_ECHO_BUFFER = 64 * 1024
+
+
+def paste_lines(text: str) -> List[str]:
+    """Split pasted text into the lines to send.
+
+    Args:
+        text (str): The pasted text, with any kind of line breaks.
+
+    Returns:
+        list of str: Each line ends in a carriage return, as Return sends,
+        except a last line that had no line break.
+    """
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    last = lines.pop()
+    return [line + "\r" for line in lines] + ([last] if last else [])
+
+
+class PasteEngine:
+    """Sends pasted text to a session without overrunning the remote side."""
+
+    def __init__(
+        self,
+        write: Callable[[str], Awaitable[None]],
+        at_prompt: Optional[Callable[[str], bool]] = None,
+        max_rate: int = DEFAULT_MAX_RATE,
+        max_window: int = DEFAULT_MAX_WINDOW,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        """Create an engine.
+
+        Args:
+            write (Callable[[str], Awaitable[None]]): Sends data to the
+                channel, e.g. ``SSHConnection.write_input``.
+            at_prompt (Callable[[str], bool], optional): Tells whether
+                output ends at the session prompt, e.g.
+                ``PromptDetector.at_prompt``.
+            max_rate (int, optional): Characters a second at most; 0 for
+                no limit. Defaults to 64 KiB.
+            max_window (int, optional): Lines sent ahead of their echo at
+                most. Defaults to 8.
+            chunk_size (int, optional): Characters per write of a bracketed
+                paste. Defaults to 4096.
+        """
+        self.write = write
+        self.at_prompt = at_prompt
+        self.max_rate = max_rate
+        self.max_window = max_window
+        self.chunk_size = chunk_size
+        self.window = 1
+        self.srtt: Optional[float] = None
+        self.echoing = True
+        self.sent = 0
+        self.total = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._output = ""
+        self._heard = False
+        self._aborted = False
+        self._started = 0.0
+
+    @property
+    def running(self) -> bool:
+        """bool: True while a paste is being sent."""
+        return self._loop is not None
+
+    @property
+    def timeout(self) -> float:
+        """float: Seconds a line may go without echo before moving on."""
+        return max(MIN_ECHO_TIMEOUT, 4 * (self.srtt or 0.0))
+
+    def abort(self) -> None:
+        """Stop the paste after the write in progress."""
+        self._aborted = True
+        if self._wake is not None:
+            self._wake.set()
+
+    def output(self, text: str) -> None:
+        """Take session output, to look for the echo of pasted lines.
+
+        May be called from any thread.
+        """
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._received(text)
+        else:
+            loop.call_soon_threadsafe(self._received, text)
+
+    def _received(self, text: str) -> None:
+        if self._loop is None:
+            return
+        self._heard = True
+        self._output = (self._output + strip_ansi(text))[-MAX_ECHO_BUFFER:]
+        self._wake.set()
+
+    async def paste(
+        self,
+        text: str,
+        bracketed: bool = False,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> bool:
+        """Send ``text`` to the session.
+
+        Args:
+            text (str): The text to paste.
+            bracketed (bool, optional): True if the remote side has
+                bracketed paste on. Defaults to False.
+            progress (Callable[[int, int], None], optional): Called with
+                the characters sent so far and in total after each write.
+
+        Returns:
+            bool: True if everything was sent, False if the paste was
+            aborted.
+
+        Raises:
+            RuntimeError: If a paste is already running.
+        """
+        if self.running:
+            raise RuntimeError("A paste is already in progress")
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._output = ""
+        self._heard = False
+        self._aborted = False
+        self._started = time.monotonic()
+        self.window = 1
+        self.echoing = True
+        self.sent = 0
+        try:
+            if bracketed:
+                await self._paste_bracketed(text, progress)
+            else:
+                await self._paste_lines(text, progress)
+        finally:
+            self._loop = None
+            self._wake = None
+            self._output = ""
+        if self._aborted:
+            logger.info(f"Paste aborted after {self.sent} of {self.total} characters")
+        return not self._aborted
+
+    async def _paste_bracketed(self, text, progress) -> None:
+        # The end marker inside the text would end the paste early.
+        payload = (
+            text.replace("\r\n", "\r")
+            .replace("\n", "\r")
+            .replace(BRACKETED_PASTE_END, "")
+        )
+        self.total = len(payload)
+        await self.write(BRACKETED_PASTE_START)
+        try:
+            for start in range(0, len(payload), self.chunk_size):
+                chunk = payload[start : start + self.chunk_size]
+                await self._throttle()
+                if self._aborted:
+                    break
+                await self._send(chunk, progress)
+        finally:
+            await self.write(BRACKETED_PASTE_END)
+
+    async def _paste_lines(self, text, progress) -> None:
+        lines = paste_lines(text)
+        self.total = sum(len(line) for line in lines)
+        # Echo expected for each line sent and not acknowledged yet.
+        in_flight: Deque[Tuple[str, float]] = deque()
+        index = 0
+        while not self._aborted:
+            self._acknowledge(in_flight)
+            if index < len(lines) and len(in_flight) < self.window:
+                line = lines[index]
+                await self._throttle()
+                if self._aborted:
+                    break
+                await self._send(line, progress)
+                index += 1
+                if self.echoing and line.endswith("\r"):
+                    in_flight.append((line[:-1].strip(), time.monotonic()))
+                continue
+            if not in_flight:
+                break
+            waited = time.monotonic() - in_flight[0][1]
+            if waited >= self.timeout:
+                in_flight.popleft()
+                self.window = 1
+                if not self._heard:
+                    # Not a character back: the remote side does not echo.
+                    self.echoing = False
+                    in_flight.clear()
+                continue
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.timeout - waited)
+            except asyncio.TimeoutError:
+                pass
+
+    def _acknowledge(self, in_flight: Deque[Tuple[str, float]]) -> None:
+        while in_flight:
+            echo, sent = in_flight[0]
+            start = self._output.find(echo)
+            end = self._output.find("\n", start + len(echo)) if start >= 0 else -1
+            if end >= 0:
+                self._output = self._output[end + 1 :]
+            elif (
+                self.at_prompt is not None
+                and "\n" in self._output
+                and self.at_prompt(self._output)
+            ):
+                # The echo looked different, e.g. scrolled, but the line is done.
+                self._output = ""
+            else:
+                return
+            in_flight.popleft()
+            sample = time.monotonic() - sent
+            self.srtt = sample if self.srtt is None else self.srtt + RTT_GAIN * (
+                sample - self.srtt
+            )
+            self.window = min(self.max_window, self.window + 1)
+
+    async def _throttle(self) -> None:
+        if not self.max_rate:
+            return
+        delay = self._started + self.sent / self.max_rate - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _send(self, data, progress) -> None:
+        await self.write(data)
+        self.sent += len(data)
+        if progress is not None:
+            progress(self.sent, self.total)
@@ -0,0 +1,399 @@
+"""Prompt detection module for Eagle Terminal.
+
+This module decides when a command sent to an interactive shell has
+finished, without sleeping for a fixed amount of time. At connect time a
+``PromptDetector`` looks at the first prompt the device prints, recognises
+its family (Linux shells, Cisco IOS, Juniper Junos, a bare root ``#``) and
+learns an exact regular expression for that session's prompt. Command
+completion is then resolved the moment that prompt shows up again at the
+end of the output.
+
+For POSIX shells a unique sentinel can additionally be appended to the
+command. The sentinel line also carries the command's exit status and
+keeps completion deterministic when a command changes the prompt.
+"""
+
+import re
+import socket
+import time
+import uuid
+from typing import Callable, List, Optional, Tuple
+
+from utils.logger import logger
+
+ANSI_ESCAPE = re.compile(
+    r"\x1B(?:\][^\x07\x1B]*(?:\x07|\x1B\\)|[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])"
+)
+
+# An escape sequence cut off at the end of a chunk is kept for the next one
+# if it is shorter than this; longer ones are not escape sequences.
+MAX_ESCAPE_LENGTH = 256
+# ":<status>" and the character after it, following a sentinel token.
+MAX_STATUS_LENGTH = 8
+
+# Generic prompt shapes, checked in order against the last line of output.
+PROMPT_FAMILIES = [
+    (
+        "linux",
+        re.compile(r"(?:\[[\w.-]+@[\w.-]+[^\]\r\n]*\]|[\w.-]+@[\w.-]+:[^\r\n]*)[$#]$"),
+    ),
+    ("juniper", re.compile(r"^(?:\{[\w:]+\}\s*)?[\w.-]+@[\w.-]+[>#]$")),
+    ("cisco", re.compile(r"^[\w.-]+(?:\([\w/.-]+\))?[#>]$")),
+    ("root", re.compile(r"#$")),
+    ("shell", re.compile(r"[$%>]$")),
+]
+
+# Families that run a POSIX shell and can therefore echo a sentinel.
+SENTINEL_FAMILIES = {"linux", "root", "shell"}
+
+
+def strip_ansi(text: str) -> str:
+    """Remove ANSI escape sequences from terminal output.
+
+    Args:
+        text (str): The raw terminal output.
+
+    Returns:
+        str: The text without escape sequences.
+    """
+    return ANSI_ESCAPE.sub("", text)
+
+
+def last_line(text: str) -> str:
+    """Return the partial line at the end of ``text`` as a terminal shows it.
+
+    Args:
+        text (str): The terminal output, with escape sequences already removed.
+
+    Returns:
+        str: The text after the last line break or carriage return, with
+        trailing whitespace removed.
+    """
+    line = re.split(r"[\r\n]", text)[-1]
+    return line.rstrip()
+
+
+def detect_family(line: str) -> Optional[str]:
+    """Guess the prompt family of a single line.
+
+    Args:
+        line (str): A candidate prompt line without escape sequences.
+
+    Returns:
+        str or None: The family name, or None if the line does not look
+        like a prompt.
+    """
+    for family, pattern in PROMPT_FAMILIES:
+        if line and pattern.search(line):
+            return family
+    return None
+
+
+def build_prompt_regex(line: str, family: str):
+    """Build an exact matcher for a prompt seen in a session.
+
+    The parts that identify the session (user, host name) are matched
+    literally, while the parts that legitimately change between commands
+    (working directory, Cisco configuration mode, ``>``/``#`` privilege)
+    are left open.
+
+    Args:
+        line (str): The prompt line.
+        family (str): The family returned by :func:`detect_family`.
+
+    Returns:
+        re.Pattern: The compiled prompt matcher.
+    """
+    if family == "linux":
+        ident = re.search(r"[\w.-]+@[\w.-]+", line)
+        head = line[: ident.end()]
+        return re.compile("^" + re.escape(head) + r"[^\r\n]*[$#]$")
+    if family == "juniper":
+        ident = re.search(r"[\w.-]+@[\w.-]+", line)
+        return re.compile(r"^(?:\{[\w:]+\}\s*)?" + re.escape(ident.group(0)) + r"[>#]$")
+    if family == "cisco":
+        hostname = re.match(r"[\w.-]+", line).group(0)
+        return re.compile("^" + re.escape(hostname) + r"(?:\([\w/.-]+\))?[#>]$")
+    return re.compile("^" + re.escape(line) + "$")
+
+
+class PromptDetector:
+    """Learns a session's prompt and recognises it at the end of output."""
+
+    def __init__(self):
+        """Initialize a detector that has not seen a prompt yet."""
+        self.family: Optional[str] = None
+        self.prompt: Optional[str] = None
+        self.pattern = None
+
+    @property
+    def learned(self) -> bool:
+        """bool: True once a prompt has been learned for the session."""
+        return self.pattern is not None
+
+    @property
+    def supports_sentinel(self) -> bool:
+        """bool: True if the remote side is a POSIX shell that can echo a sentinel."""
+        return self.family in SENTINEL_FAMILIES
+
+    def learn(self, text: str) -> bool:
+        """Learn the prompt from output that ends with one.
+
+        Args:
+            text (str): Terminal output, for example the login banner.
+
+        Returns:
+            bool: True if a prompt was recognised and learned.
+        """
+        line = last_line(strip_ansi(text))
+        family = detect_family(line)
+        if not family:
+            return False
+        self.family = family
+        self.prompt = line
+        self.pattern = build_prompt_regex(line, family)
+        logger.debug(f"Learned {family} prompt {line!r}")
+        return True
+
+    def at_prompt(self, text: str) -> bool:
+        """Check whether ``text`` ends with the session prompt.
+
+        Before a prompt has been learned, any line that looks like a prompt
+        of a known family is accepted.
+
+        Args:
+            text (str): Terminal output.
+
+        Returns:
+            bool: True if the output ends at a prompt.
+        """
+        line = last_line(strip_ansi(text))
+        if not line:
+            return False
+        if self.pattern is not None:
+            return bool(self.pattern.search(line))
+        return detect_family(line) is not None
+
+    def wrap_command(self, command: str):
+        """Append a unique sentinel to a shell command.
+
+        The sentinel is printed with the command's exit status. The printf
+        format keeps the token and status apart on the echoed command line,
+        so only the real output matches :attr:`CommandWaiter.sentinel_regex`.
+
+        Args:
+            command (str): The command to run.
+
+        Returns:
+            tuple: ``(wrapped_command, token)``.
+        """
+        token = f"__EAGLE_{uuid.uuid4().hex[:12]}__"
+        return f"{command}; printf '%s:%s\\n' {token} $?", token
+
+
+class CommandWaiter:
+    """Collects the output of one command until it completes.
+
+    Feed it every chunk of shell output that arrives after the command was
+    sent; :meth:`feed` returns True once the command has completed and
+    :attr:`output` / :attr:`exit_status` hold the result.
+    """
+
+    def __init__(
+        self, detector: PromptDetector, command: str, token: Optional[str] = None
+    ):
+        """Initialize the waiter.
+
+        Args:
+            detector (PromptDetector): The session's prompt detector.
+            command (str): The command as typed, used to drop its echo.
+            token (str, optional): The sentinel token from
+                :meth:`PromptDetector.wrap_command`. Defaults to None.
+        """
+        self.detector = detector
+        self.command = command
+        self.token = token
+        # The status is only read once a character follows it, so a status
+        # split across chunks is not cut short.
+        self.sentinel_regex = (
+            re.compile(re.escape(token) + r":(\d+)(?=\D)") if token else None
+        )
+        self.output: Optional[str] = None
+        self.exit_status: Optional[int] = None
+        self.done = False
+        self.started = time.perf_counter()
+        self.elapsed: Optional[float] = None
+        # Each chunk is cleaned and looked at once, so long output costs
+        # linear time: only the current last line is matched against the
+        # prompt, and only the end of the output is searched for the
+        # sentinel.
+        self._chunks: List[str] = []
+        self._carry = ""
+        self._head = ""
+        self._body: Optional[List[str]] = None
+        self._body_length = 0
+        self._tail = ""
+        self._line = ""
+        self._sentinel: Optional[Tuple[int, int]] = None
+
+    @property
+    def buffer(self) -> str:
+        """str: All output fed so far, as received."""
+        return "".join(self._chunks)
+
+    def feed(self, text: str) -> bool:
+        """Add a chunk of output and check for completion.
+
+        Args:
+            text (str): The decoded output chunk.
+
+        Returns:
+            bool: True once the command has completed.
+        """
+        if self.done:
+            return True
+        self._chunks.append(text)
+        clean = self._strip(text)
+        if self._body is None:
+            self._head += clean
+            if "\n" not in clean:
+                return False
+            clean = self._drop_echo(self._head)
+            self._head = ""
+            self._body = []
+        self._add_body(clean)
+
+        if self.sentinel_regex:
+            if self._sentinel is None:
+                return False
+            if self.detector.learned and not self.detector.at_prompt(self._line):
+                return False
+            end, self.exit_status = self._sentinel
+            body = "".join(self._body)[:end]
+        elif self.detector.at_prompt(self._line):
+            body = "".join(self._body)
+            body = body[: max(body.rfind("\n"), 0)]
+        else:
+            return False
+
+        self.output = body.replace("\r\n", "\n").replace("\r", "").strip("\n")
+        self.done = True
+        self.elapsed = time.perf_counter() - self.started
+        return True
+
+    def _strip(self, text: str) -> str:
+        """Remove escape sequences, keeping one cut off at the end for later."""
+        text = self._carry + text
+        self._carry = ""
+        escape = text.rfind("\x1b")
+        if (
+            escape >= 0
+            and len(text) - escape < MAX_ESCAPE_LENGTH
+            and not ANSI_ESCAPE.match(text, escape)
+        ):
+            text, self._carry = text[:escape], text[escape:]
+        return strip_ansi(text)
+
+    def _add_body(self, clean: str) -> None:
+        """Append cleaned output after the echo, tracking the last line."""
+        if not clean:
+            return
+        self._body.append(clean)
+        breaks = max(clean.rfind("\r"), clean.rfind("\n"))
+        self._line = clean[breaks + 1 :] if breaks >= 0 else self._line + clean
+        if self.sentinel_regex and self._sentinel is None:
+            window = self._tail + clean
+            match = self.sentinel_regex.search(window)
+            if match:
+                offset = self._body_length - len(self._tail)
+                self._sentinel = (offset + match.start(), int(match.group(1)))
+            self._tail = window[-(len(self.token) + MAX_STATUS_LENGTH) :]
+        self._body_length += len(clean)
+
+    def _drop_echo(self, clean: str) -> Optional[str]:
+        """Return the output after the echoed command line.
+
+        Returns None while the echo line is still incomplete. Long command
+        lines are wrapped by the remote line editor, so only the end of the
+        command is compared. Devices that do not echo are handled by treating
+        everything as output once a line break has arrived.
+        """
+        newline = re.search(r"\r?\n", clean)
+        if not newline:
+            return None
+        first_line = re.sub(r"[\r\b ]", "", clean[: newline.start()])
+        command_tail = self.command.replace(" ", "")[-20:]
+        if command_tail and command_tail in first_line:
+            return clean[newline.end() :]
+        return clean
+
+
+class LineWaiter:
+    """Waits until the line before the cursor matches, e.g. a password prompt.
+
+    Fed like a :class:`CommandWaiter`, with the shell output that arrives
+    after it was registered.
+    """
+
+    def __init__(self, predicate: Callable[[str], bool]):
+        """Initialize the waiter.
+
+        Args:
+            predicate (Callable[[str], bool]): Called with the last line of
+                output, without escape sequences.
+        """
+        self.predicate = predicate
+        self.done = False
+        self._line = ""
+
+    def feed(self, text: str) -> bool:
+        """Add a chunk of output.
+
+        Args:
+            text (str): The decoded output chunk.
+
+        Returns:
+            bool: True once the last line has matched.
+        """
+        if self.done:
+            return True
+        clean = strip_ansi(text)
+        breaks = max(clean.rfind("\r"), clean.rfind("\n"))
+        self._line = clean[breaks + 1 :] if breaks >= 0 else self._line + clean
+        self.done = self.predicate(self._line)
+        return self.done
+
+
+def read_until(channel, feed, timeout: float = 30) -> bool:
+    """Block on a paramiko channel until ``feed`` reports completion.
+
+    Uses the channel timeout so the call wakes up as soon as data arrives
+    instead of polling ``recv_ready()`` on a timer.
+
+    Args:
+        channel (paramiko.Channel): The interactive shell channel.
+        feed (callable): Called with each decoded chunk; returns True when done,
+            for example :meth:`CommandWaiter.feed`.
+        timeout (float, optional): Seconds to wait in total. Defaults to 30.
+
+    Returns:
+        bool: True if ``feed`` reported completion, False on timeout or EOF.
+    """
+    deadline = time.monotonic() + timeout
+    previous_timeout = channel.gettimeout()
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            channel.settimeout(remaining)
+            try:
+                data = channel.recv(4096)
+            except socket.timeout:
+                return False
+            if not data:
+                return False
+            if feed(data.decode("utf-8", errors="replace")):
+                return True
+    finally:
+        channel.settimeout(previous_timeout)
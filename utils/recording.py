@@ -0,0 +1,328 @@
+"""Recording module for Eagle Terminal.
+
+Sessions are recorded in the asciicast v2 format used by asciinema, so a
+recording plays in any asciicast player, and can be replayed and scrubbed
+through in Eagle Terminal itself:
+
+- ``SessionRecorder`` listens to a session's decoded output. Each chunk is
+  stamped with the session time and queued; a background thread appends it
+  to the ``.cast`` file as an ``"o"`` event. Resizes become ``"r"`` events.
+- The same thread runs the output through a screen of its own and, every
+  ``keyframe_interval`` seconds (or ``keyframe_chars`` characters), writes a
+  keyframe to a sidecar ``.cast.idx`` file: a snapshot of the screen and
+  the file offset of the next event.
+- ``Recording`` opens a cast for replay. :meth:`Recording.seek` restores the
+  nearest keyframe before the requested time and applies only the events
+  after it, so seeking takes the same time anywhere in a long recording.
+  A cast without a sidecar (e.g. from asciinema) is indexed when opened.
+- :func:`iter_events` streams the events of a cast, e.g. as reproducible
+  input for benchmarks.
+"""
+
+import json
+import os
+import queue
+import re
+import threading
+import time
+from bisect import bisect_right
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from utils.logger import logger
+from utils.scrollback import ScrollbackStore
+from utils.terminal_screen import TerminalScreen
+
+DEFAULT_RECORDING_DIR = os.path.join("logs", "recordings")
+DEFAULT_KEYFRAME_INTERVAL = 5.0
+DEFAULT_KEYFRAME_CHARS = 512 * 1024
+INDEX_SUFFIX = ".idx"
+
+Event = Tuple[float, str, str]
+
+_UNSAFE_NAME = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def apply_event(screen: TerminalScreen, kind: str, data: str) -> None:
+    """Apply an asciicast event to a screen; events other than output and resize are ignored."""
+    if kind == "o":
+        screen.feed(data)
+    elif kind == "r":
+        columns, _, rows = data.partition("x")
+        screen.resize(int(columns), int(rows))
+
+
+def _encode_event(event_time: float, kind: str, data: str) -> bytes:
+    return (json.dumps([round(event_time, 6), kind, data], ensure_ascii=False) + "\n").encode(
+        "utf-8"
+    )
+
+
+class KeyframeIndexer:
+    """Follows a cast's events on a screen and emits keyframes at intervals."""
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        interval: float = DEFAULT_KEYFRAME_INTERVAL,
+        max_chars: int = DEFAULT_KEYFRAME_CHARS,
+    ):
+        self.interval = interval
+        self.max_chars = max_chars
+        # Only the visible screen goes into a keyframe.
+        self.screen = TerminalScreen(width, height, scrollback=ScrollbackStore(max_lines=1))
+        self._last_time: Optional[float] = None
+        self._chars = 0
+
+    def keyframe(self, event_time: float, offset: int) -> Dict[str, Any]:
+        """Return a keyframe of the current screen, to be applied before ``offset``."""
+        self._last_time = event_time
+        self._chars = 0
+        return {"time": event_time, "offset": offset, "screen": self.screen.snapshot()}
+
+    def event(self, event_time: float, offset: int, kind: str, data: str):
+        """Apply the event found at ``offset``.
+
+        Returns:
+            Dict[str, Any] or None: A keyframe taken just before the event,
+            when one is due.
+        """
+        due = self._last_time is None or (
+            event_time - self._last_time >= self.interval or self._chars >= self.max_chars
+        )
+        keyframe = self.keyframe(event_time, offset) if due else None
+        apply_event(self.screen, kind, data)
+        self._chars += len(data)
+        return keyframe
+
+
+def _read_header(f) -> Dict[str, Any]:
+    header = json.loads(f.readline())
+    if header.get("version") != 2:
+        raise ValueError("Not an asciicast v2 recording")
+    return header
+
+
+def iter_events(path: str, offset: int = 0) -> Iterator[Tuple[float, str, str, int]]:
+    """Read the events of a cast.
+
+    Args:
+        path (str): The ``.cast`` file.
+        offset (int, optional): File offset to start at, e.g. from a
+            keyframe. Defaults to the first event.
+
+    Yields:
+        Tuple[float, str, str, int]: The event's time, type and data, and
+        the file offset of the event after it.
+    """
+    with open(path, "rb") as f:
+        if offset:
+            f.seek(offset)
+        else:
+            _read_header(f)
+            offset = f.tell()
+        for line in f:
+            offset += len(line)
+            if not line.strip():
+                continue
+            try:
+                event_time, kind, data = json.loads(line)
+            except ValueError:
+                # A recording cut off while being written ends mid-line.
+                return
+            yield float(event_time), kind, data, offset
+
+
+class SessionRecorder:
+    """Records a session's output to an asciicast v2 file with keyframes."""
+
+    def __init__(
+        self,
+        session_name: str,
+        width: int,
+        height: int,
+        directory: str = DEFAULT_RECORDING_DIR,
+        keyframe_interval: float = DEFAULT_KEYFRAME_INTERVAL,
+        keyframe_chars: int = DEFAULT_KEYFRAME_CHARS,
+    ):
+        """Create the recording and start its writer thread.
+
+        Args:
+            session_name (str): Used in the file name and title, e.g. the hostname.
+            width (int): Terminal width in cells when recording starts.
+            height (int): Terminal height in cells when recording starts.
+            directory (str, optional): Where recordings go. Defaults to "logs/recordings".
+            keyframe_interval (float, optional): Seconds of session time
+                between keyframes. Defaults to 5.
+            keyframe_chars (int, optional): Characters of output after which
+                a keyframe is taken early. Defaults to 512 Ki.
+        """
+        os.makedirs(directory, exist_ok=True)
+        name = _UNSAFE_NAME.sub("_", session_name) or "session"
+        self.path = os.path.join(
+            directory, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.cast"
+        )
+        self.index_path = self.path + INDEX_SUFFIX
+        self.started = time.monotonic()
+        self.size = (width, height)
+        self.events_written = 0
+        header = {
+            "version": 2,
+            "width": width,
+            "height": height,
+            "timestamp": int(time.time()),
+            "title": session_name,
+            "env": {"TERM": "xterm-256color"},
+        }
+        self._file = open(self.path, "wb")
+        self._index = open(self.index_path, "w", encoding="utf-8")
+        self._offset = self._file.write((json.dumps(header) + "\n").encode("utf-8"))
+        self._indexer = KeyframeIndexer(width, height, keyframe_interval, keyframe_chars)
+        self._write_keyframe(self._indexer.keyframe(0.0, self._offset))
+        self._queue: "queue.Queue[Optional[Event]]" = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name=f"recording-{name}", daemon=True
+        )
+        self._thread.start()
+
+    def __call__(self, text: str) -> None:
+        self.write(text)
+
+    def write(self, text: str) -> None:
+        """Record a chunk of output; safe to call from any thread."""
+        if text:
+            self._queue.put((time.monotonic() - self.started, "o", text))
+
+    def resize(self, columns: int, rows: int) -> None:
+        """Record a terminal resize; a size that did not change is skipped."""
+        if (columns, rows) == self.size:
+            return
+        self.size = (columns, rows)
+        self._queue.put((time.monotonic() - self.started, "r", f"{columns}x{rows}"))
+
+    def _write_keyframe(self, keyframe: Dict[str, Any]) -> None:
+        self._index.write(json.dumps(keyframe, separators=(",", ":")) + "\n")
+
+    def _run(self) -> None:
+        while True:
+            event = self._queue.get()
+            if event is None:
+                break
+            try:
+                event_time, kind, data = event
+                keyframe = self._indexer.event(event_time, self._offset, kind, data)
+                if keyframe is not None:
+                    self._write_keyframe(keyframe)
+                self._offset += self._file.write(_encode_event(event_time, kind, data))
+                self.events_written += 1
+            except Exception as e:
+                logger.error(f"Error writing recording {self.path}: {str(e)}")
+        self._file.close()
+        self._index.close()
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Write everything queued and close the files."""
+        self._queue.put(None)
+        self._thread.join(timeout)
+        logger.info(f"Recording {self.path} closed: {self.events_written} events")
+
+    def discard(self) -> None:
+        """Close the recording and delete its files."""
+        self.close()
+        for path in (self.path, self.index_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class Recording:
+    """An asciicast recording opened for replay."""
+
+    def __init__(self, path: str):
+        """Open a recording, indexing it first if it has no keyframes yet.
+
+        Args:
+            path (str): The ``.cast`` file.
+
+        Raises:
+            ValueError: If the file is not an asciicast v2 recording.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self.header = _read_header(f)
+            self.data_offset = f.tell()
+        self.width = int(self.header.get("width", 80))
+        self.height = int(self.header.get("height", 24))
+        self.keyframes = self._load_index()
+        if not self.keyframes:
+            self.keyframes = self.build_index()
+        self._times = [keyframe["time"] for keyframe in self.keyframes]
+        last = self.keyframes[-1]
+        self.duration = last["time"]
+        for event_time, _kind, _data, _offset in iter_events(path, last["offset"]):
+            self.duration = event_time
+
+    def _load_index(self) -> List[Dict[str, Any]]:
+        index_path = self.path + INDEX_SUFFIX
+        if not os.path.exists(index_path):
+            return []
+        keyframes = []
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    keyframes.append(json.loads(line))
+        except ValueError:
+            # Cut off while being written: the complete keyframes are usable.
+            pass
+        except OSError as e:
+            logger.warning(f"Could not read the keyframes of {self.path}: {str(e)}")
+            return []
+        return keyframes
+
+    def build_index(self) -> List[Dict[str, Any]]:
+        """Index the recording and save the keyframes next to it when possible.
+
+        Returns:
+            List[Dict[str, Any]]: The keyframes.
+        """
+        indexer = KeyframeIndexer(self.width, self.height)
+        keyframes = [indexer.keyframe(0.0, self.data_offset)]
+        offset = self.data_offset
+        for event_time, kind, data, next_offset in iter_events(self.path):
+            keyframe = indexer.event(event_time, offset, kind, data)
+            if keyframe is not None and keyframe["time"] > 0:
+                keyframes.append(keyframe)
+            offset = next_offset
+        try:
+            with open(self.path + INDEX_SUFFIX, "w", encoding="utf-8") as f:
+                for keyframe in keyframes:
+                    f.write(json.dumps(keyframe, separators=(",", ":")) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not save the keyframes of {self.path}: {str(e)}")
+        return keyframes
+
+    def new_screen(self) -> TerminalScreen:
+        """Return a blank screen of the recording's initial size."""
+        return TerminalScreen(self.width, self.height)
+
+    def seek(self, position: float, screen: TerminalScreen) -> int:
+        """Put ``screen`` in the state it had ``position`` seconds into the recording.
+
+        Args:
+            position (float): Seconds from the start.
+            screen (TerminalScreen): The screen to set; its scrollback is cleared.
+
+        Returns:
+            int: The file offset of the first event after ``position``, for
+            :func:`iter_events`.
+        """
+        keyframe = self.keyframes[max(0, bisect_right(self._times, position) - 1)]
+        screen.restore(keyframe["screen"])
+        offset = keyframe["offset"]
+        for event_time, kind, data, next_offset in iter_events(self.path, offset):
+            if event_time > position:
+                break
+            apply_event(screen, kind, data)
+            offset = next_offset
+        return offset
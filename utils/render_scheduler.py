@@ -0,0 +1,112 @@
+"""Render scheduler module for Eagle Terminal.
+
+Output arrives in many small chunks, far more often than the screen can be
+redrawn. ``RenderScheduler`` queues the decoded text and applies it on a
+frame timer instead:
+
+- at most one flush per frame (about 16 ms by default), however many
+  chunks arrived in between;
+- each flush feeds at most ``frame_budget`` characters to the terminal
+  and then renders once, so a flood (``debug ip packet``,
+  ``journalctl -f``) is spread over several frames and input and painting
+  keep running in between;
+- nothing calls ``QApplication.processEvents()``, so no handler is
+  re-entered while it is still running.
+"""
+
+from collections import deque
+from typing import Callable, Deque
+
+from PyQt5.QtCore import QObject, QTimer
+
+from utils.logger import logger
+
+FRAME_INTERVAL_MS = 16
+DEFAULT_FRAME_BUDGET = 256 * 1024
+
+
+class RenderScheduler(QObject):
+    """Coalesces terminal output into at most one render per frame."""
+
+    def __init__(
+        self,
+        feed: Callable[[str], None],
+        render: Callable[[], None],
+        frame_interval: int = FRAME_INTERVAL_MS,
+        frame_budget: int = DEFAULT_FRAME_BUDGET,
+        parent=None,
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            feed (Callable[[str], None]): Applies text to the terminal state,
+                e.g. ``TerminalScreen.feed``.
+            render (Callable[[], None]): Draws the terminal state; called once
+                per flush.
+            frame_interval (int, optional): Milliseconds between flushes. Defaults to 16.
+            frame_budget (int, optional): Characters fed per flush. Defaults to 256 Ki.
+            parent (QObject, optional): Owner of the scheduler. Defaults to None.
+        """
+        super().__init__(parent)
+        self.feed = feed
+        self.render = render
+        self.frame_budget = frame_budget
+        self._pending: Deque[str] = deque()
+        self._pending_size = 0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(frame_interval)
+        self._timer.timeout.connect(self.flush)
+
+    @property
+    def pending(self) -> int:
+        """int: Characters waiting for the next frame."""
+        return self._pending_size
+
+    def write(self, text: str) -> None:
+        """Queue text for the next frame.
+
+        Args:
+            text (str): Decoded output.
+        """
+        if not text:
+            return
+        self._pending.append(text)
+        self._pending_size += len(text)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self) -> None:
+        """Feed up to one frame's budget of queued text and render once."""
+        budget = self.frame_budget
+        while self._pending and budget > 0:
+            text = self._pending.popleft()
+            if len(text) > budget:
+                self._pending.appendleft(text[budget:])
+                text = text[:budget]
+            self._pending_size -= len(text)
+            budget -= len(text)
+            try:
+                self.feed(text)
+            except Exception as e:
+                logger.error(f"Error feeding terminal output: {str(e)}")
+        try:
+            self.render()
+        except Exception as e:
+            logger.error(f"Error rendering terminal: {str(e)}")
+        if self._pending:
+            # A backlog continues on the next frame, after the event loop ran.
+            self._timer.start()
+
+    def flush_all(self) -> None:
+        """Apply everything queued right away, e.g. before the view closes."""
+        self._timer.stop()
+        while self._pending:
+            self.flush()
+        self._timer.stop()
+
+    def clear(self) -> None:
+        """Drop everything queued."""
+        self._timer.stop()
+        self._pending.clear()
+        self._pending_size = 0
@@ -0,0 +1,384 @@
+"""Scrollback module for Eagle Terminal.
+
+Lines that scroll off the top of a terminal are kept in a
+``ScrollbackStore`` instead of as Qt text blocks or per-cell Python lists:
+
+- Each line is encoded once into a compact record (flags, attribute runs,
+  UTF-8 text) and appended to a page: a ``bytearray`` plus an ``array`` of
+  record offsets. A plain line costs its text plus three bytes.
+- The store has a hard cap on lines and on bytes; the oldest lines are
+  dropped first, so memory stays flat however long a session runs.
+- With spilling enabled, full pages beyond an in-memory budget are written
+  to a temporary file and read back through ``mmap`` when a view scrolls
+  to them. The file is compacted as old pages are dropped.
+
+Lines are numbered absolutely from the start of the session: ``first`` is
+the oldest line still kept and ``end`` the number of the next line to be
+added, so a line keeps its number while older ones are dropped.
+"""
+
+import mmap
+import struct
+import tempfile
+from array import array
+from collections import deque
+from typing import Callable, Deque, Iterator, List, Optional, Tuple
+
+DEFAULT_SCROLLBACK_LINES = 100000
+DEFAULT_SCROLLBACK_BYTES = 64 * 1024 * 1024
+DEFAULT_MEMORY_BYTES = 8 * 1024 * 1024
+PAGE_BYTES = 64 * 1024
+
+WRAPPED = 1
+
+_HEADER = struct.Struct("<BH")  # flags, run count (0: one run with the default attribute)
+_RUN = struct.Struct("<IQ")  # UTF-8 length, attribute
+
+Run = Tuple[str, int]
+
+
+def encode_line(runs: List[Run], wrapped: bool = False) -> bytes:
+    """Encode a line's ``(text, attr)`` runs into a scrollback record."""
+    flags = WRAPPED if wrapped else 0
+    if not runs:
+        return _HEADER.pack(flags, 0)
+    if len(runs) == 1 and runs[0][1] == 0:
+        return _HEADER.pack(flags, 0) + runs[0][0].encode("utf-8")
+    parts = [_HEADER.pack(flags, len(runs))]
+    texts = []
+    for text, attr in runs:
+        encoded = text.encode("utf-8")
+        parts.append(_RUN.pack(len(encoded), attr))
+        texts.append(encoded)
+    return b"".join(parts + texts)
+
+
+def record_text_offset(record, offset: int = 0) -> int:
+    """Return where the UTF-8 text of the record at ``offset`` starts.
+
+    A record's text is contiguous, after its header and run table.
+    """
+    count = _HEADER.unpack_from(record, offset)[1]
+    return offset + _HEADER.size + count * _RUN.size
+
+
+def decode_line(record) -> "StoredLine":
+    """Decode a record made by :func:`encode_line`."""
+    flags, count = _HEADER.unpack_from(record)
+    if not count:
+        text = bytes(record[_HEADER.size :]).decode("utf-8")
+        return StoredLine([(text, 0)] if text else [], bool(flags & WRAPPED))
+    runs = []
+    position = _HEADER.size + count * _RUN.size
+    for index in range(count):
+        length, attr = _RUN.unpack_from(record, _HEADER.size + index * _RUN.size)
+        runs.append((bytes(record[position : position + length]).decode("utf-8"), attr))
+        position += length
+    return StoredLine(runs, bool(flags & WRAPPED))
+
+
+class StoredLine:
+    """A line read back from the scrollback."""
+
+    __slots__ = ("_runs", "wrapped")
+
+    def __init__(self, runs: List[Run], wrapped: bool = False):
+        self._runs = runs
+        # True when the text continues on the next line (soft wrap).
+        self.wrapped = wrapped
+
+    def runs(self) -> List[Run]:
+        """Return the line's ``(text, attr)`` runs."""
+        return self._runs
+
+    def text(self) -> str:
+        """Return the line's text without trailing blanks."""
+        return "".join(text for text, _ in self._runs).rstrip(" ")
+
+
+class _Page:
+    __slots__ = ("first", "data", "offsets", "spill_offset")
+
+    def __init__(self, first: int):
+        self.first = first
+        self.data: Optional[bytearray] = bytearray()
+        self.offsets = array("I", [0])
+        self.spill_offset: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def size(self) -> int:
+        return self.offsets[-1]
+
+
+class ScrollbackStore:
+    """Bounded, compact store of scrolled-off terminal lines."""
+
+    def __init__(
+        self,
+        max_lines: int = DEFAULT_SCROLLBACK_LINES,
+        max_bytes: int = DEFAULT_SCROLLBACK_BYTES,
+        spill: bool = False,
+        memory_bytes: int = DEFAULT_MEMORY_BYTES,
+        spill_dir: Optional[str] = None,
+        page_bytes: int = PAGE_BYTES,
+    ):
+        """Initialize an empty store.
+
+        Args:
+            max_lines (int, optional): Lines kept at most. Defaults to 100000.
+            max_bytes (int, optional): Encoded bytes kept at most, in memory
+                and on disk together. Defaults to 64 MiB.
+            spill (bool, optional): Move full pages beyond ``memory_bytes`` to
+                a memory-mapped temporary file. Defaults to False.
+            memory_bytes (int, optional): Bytes kept in memory when spilling.
+                Defaults to 8 MiB.
+            spill_dir (str, optional): Directory of the spill file. Defaults
+                to the system temporary directory.
+            page_bytes (int, optional): Size at which a page is sealed. Defaults to 64 KiB.
+        """
+        self.max_lines = max(1, max_lines)
+        self.max_bytes = max_bytes
+        self.spill = spill
+        self.memory_limit = memory_bytes
+        self.spill_dir = spill_dir
+        self.page_bytes = page_bytes
+        # Called with (first line number, page bytes) when a page is full,
+        # e.g. to index it in the background.
+        self.page_listeners: List[Callable[[int, bytes], None]] = []
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._end = 0
+        self.clear()
+
+    # -- bookkeeping ------------------------------------------------------
+
+    def clear(self) -> None:
+        """Drop every line. Numbering continues where it was."""
+        self._pages: Deque[_Page] = deque([_Page(self._end)])
+        self._first = self._end
+        self._skip = 0  # lines of the oldest page already dropped
+        self._bytes = 0
+        self.memory_bytes = 0
+        self._spilled = 0  # spilled pages at the front of _pages
+        self._spill_live = 0
+        self._spill_dead = 0
+        if self._file is not None:
+            self._close_map()
+            self._file.seek(0)
+            self._file.truncate()
+
+    @property
+    def maxlen(self) -> int:
+        """int: The line cap, like ``deque.maxlen``."""
+        return self.max_lines
+
+    @property
+    def first(self) -> int:
+        """int: Number of the oldest line kept."""
+        return self._first
+
+    @property
+    def end(self) -> int:
+        """int: Number the next appended line will get."""
+        return self._end
+
+    @property
+    def total_bytes(self) -> int:
+        """int: Encoded bytes kept, in memory and spilled."""
+        return self._bytes
+
+    def __len__(self) -> int:
+        return self._end - self._first
+
+    def __iter__(self) -> Iterator[StoredLine]:
+        return iter(self.lines(self._first, self._end))
+
+    # -- writing ----------------------------------------------------------
+
+    def append(self, runs: List[Run], wrapped: bool = False) -> None:
+        """Add a line, dropping the oldest ones when a cap is exceeded.
+
+        Args:
+            runs (List[Tuple[str, int]]): The line's ``(text, attr)`` runs.
+            wrapped (bool, optional): The line continues on the next one. Defaults to False.
+        """
+        record = encode_line(runs, wrapped)
+        page = self._pages[-1]
+        page.data += record
+        page.offsets.append(len(page.data))
+        self._end += 1
+        self._bytes += len(record)
+        self.memory_bytes += len(record)
+        if len(page.data) >= self.page_bytes:
+            self._pages.append(_Page(self._end))
+            if self.page_listeners:
+                data = bytes(page.data)
+                for listener in self.page_listeners:
+                    listener(page.first, data)
+        self._enforce_limits()
+        if self.spill and self.memory_bytes > self.memory_limit:
+            self._spill_pages()
+
+    def _enforce_limits(self) -> None:
+        while len(self) > self.max_lines or (
+            self._bytes > self.max_bytes and len(self) > 1
+        ):
+            page = self._pages[0]
+            index = self._skip
+            self._bytes -= page.offsets[index + 1] - page.offsets[index]
+            self._skip += 1
+            self._first += 1
+            if self._skip < len(page):
+                continue
+            self._skip = 0
+            if len(self._pages) == 1:
+                # The only page is the one being written: start it over.
+                self.memory_bytes -= page.size
+                self._pages[0] = _Page(self._end)
+                continue
+            self._pages.popleft()
+            if page.data is None:
+                self._spilled -= 1
+                self._spill_live -= page.size
+                self._spill_dead += page.size
+            else:
+                self.memory_bytes -= page.size
+        if self._spill_dead > max(self._spill_live, 16 * self.page_bytes):
+            self._compact()
+
+    def _spill_pages(self) -> None:
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(
+                prefix="eagle-scrollback-", dir=self.spill_dir
+            )
+        self._file.seek(0, 2)
+        # Only full pages move; the page being written stays in memory.
+        while self.memory_bytes > self.memory_limit and self._spilled < len(self._pages) - 1:
+            page = self._pages[self._spilled]
+            page.spill_offset = self._file.tell()
+            self._file.write(page.data)
+            page.data = None
+            self._spilled += 1
+            self.memory_bytes -= page.size
+            self._spill_live += page.size
+
+    def _compact(self) -> None:
+        """Move the live part of the spill file to its start."""
+        if not self._spilled:
+            self._spill_dead = self._spill_live = 0
+            if self._file is not None:
+                self._close_map()
+                self._file.seek(0)
+                self._file.truncate()
+            return
+        start = self._pages[0].spill_offset
+        self._file.seek(start)
+        live = self._file.read(self._spill_live)
+        self._close_map()
+        self._file.seek(0)
+        self._file.write(live)
+        self._file.truncate()
+        for index in range(self._spilled):
+            self._pages[index].spill_offset -= start
+        self._spill_dead = 0
+
+    # -- reading ----------------------------------------------------------
+
+    def _close_map(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def _page_view(self, page: _Page) -> memoryview:
+        if page.data is not None:
+            return memoryview(page.data)
+        end = page.spill_offset + page.size
+        if self._map is None or len(self._map) < end:
+            self._close_map()
+            self._file.flush()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._map)[page.spill_offset : end]
+
+    def _page_index(self, number: int) -> int:
+        pages = self._pages
+        low, high = 0, len(pages) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if pages[middle].first <= number:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+    def record(self, number: int) -> bytes:
+        """Return the encoded record of line ``number``."""
+        if not self._first <= number < self._end:
+            raise IndexError(f"line {number} is not in the scrollback")
+        page = self._pages[self._page_index(number)]
+        index = number - page.first
+        view = self._page_view(page)
+        return bytes(view[page.offsets[index] : page.offsets[index + 1]])
+
+    def line(self, number: int) -> StoredLine:
+        """Return line ``number`` (see ``first`` and ``end``)."""
+        return decode_line(self.record(number))
+
+    def lines(self, start: int, stop: int) -> List[StoredLine]:
+        """Return lines ``start`` to ``stop - 1``, clipped to what is kept.
+
+        Args:
+            start (int): Number of the first line.
+            stop (int): Number after the last line.
+
+        Returns:
+            List[StoredLine]: The lines, oldest first.
+        """
+        start, stop = max(start, self._first), min(stop, self._end)
+        result = []
+        if start >= stop:
+            return result
+        page_index = self._page_index(start)
+        while start < stop:
+            page = self._pages[page_index]
+            view = self._page_view(page)
+            offsets = page.offsets
+            last = min(stop, page.first + len(page))
+            for index in range(start - page.first, last - page.first):
+                result.append(decode_line(view[offsets[index] : offsets[index + 1]]))
+            # Release the view so the spill map can be remapped.
+            view = None
+            start = last
+            page_index += 1
+        return result
+
+    def pages(self, backwards: bool = False) -> Iterator[Tuple[int, array, memoryview, bool]]:
+        """Iterate over the raw pages, e.g. to scan them without decoding.
+
+        Lines of the oldest page may already be dropped; callers skip
+        line numbers below ``first``. The store must not change while a
+        view is in use.
+
+        Args:
+            backwards (bool, optional): Newest page first. Defaults to False.
+
+        Yields:
+            Tuple[int, array, memoryview, bool]: The page's first line
+            number, its record offsets, its bytes and whether it is full
+            (it will not change any more).
+        """
+        last = len(self._pages) - 1
+        order = range(last, -1, -1) if backwards else range(last + 1)
+        for index in order:
+            page = self._pages[index]
+            if len(page):
+                yield page.first, page.offsets, self._page_view(page), index < last
+
+    def close(self) -> None:
+        """Release the spill file."""
+        self._close_map()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,316 @@
+"""Scrollback search module for Eagle Terminal.
+
+Finding text in a long session must not decode millions of lines one by
+one. ``ScrollbackSearch`` searches a :class:`~utils.scrollback.ScrollbackStore`
+page by page instead:
+
+- When the store seals a page, a background thread builds a trigram
+  filter for it: a 2 KiB bitmap of the (ASCII-lowercased) three-byte
+  sequences the page contains.
+- A query's literal text is split into trigrams. Pages whose filter lacks
+  any of them cannot match and are skipped; only the remaining pages and
+  the page still being written are scanned.
+- Scanning for plain text runs one compiled bytes pattern over the page's
+  raw records and maps each hit back to a line and column through the
+  record offsets, so no per-line Python work happens for lines that do
+  not match. A regular expression is matched against each record's text
+  on its own instead, so ``^``, ``$`` and ``.*`` keep to the line.
+
+Results are ``(line, column, length)`` tuples, with absolute line numbers
+as used by the store and columns and lengths in characters. They come in
+pages of ``limit`` matches; pass the last one back as ``after`` to
+continue.
+"""
+
+import queue
+import re
+import threading
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+from utils.logger import logger
+from utils.scrollback import ScrollbackStore, record_text_offset
+
+BLOOM_BITS = 16384
+_BLOOM_MASK = BLOOM_BITS - 1
+DEFAULT_RESULT_PAGE = 100
+
+Match = Tuple[int, int, int]
+
+_REGEX_SPECIAL = set("\\.^$*+?{}[]()|")
+
+
+def _trigram_bit(trigram: bytes) -> int:
+    return ((int.from_bytes(trigram, "little") * 0x9E3779B1) >> 11) & _BLOOM_MASK
+
+
+def build_filter(data: bytes) -> bytearray:
+    """Return the trigram bitmap of a page's bytes."""
+    lowered = data.lower()
+    bits = bytearray(BLOOM_BITS // 8)
+    for trigram in {lowered[i : i + 3] for i in range(len(lowered) - 2)}:
+        bit = _trigram_bit(trigram)
+        bits[bit >> 3] |= 1 << (bit & 7)
+    return bits
+
+
+def _may_contain(bits: bytearray, trigram_bits: List[int]) -> bool:
+    return all(bits[bit >> 3] & (1 << (bit & 7)) for bit in trigram_bits)
+
+
+def required_literals(pattern: str) -> List[str]:
+    """Return text every match of a regular expression must contain.
+
+    This is deliberately simple: literal runs outside groups, classes and
+    escapes, and nothing at all when the pattern has a top-level alternation.
+
+    Args:
+        pattern (str): The regular expression.
+
+    Returns:
+        List[str]: Literal strings, possibly empty.
+    """
+    literals = []
+    current = []
+    depth = 0
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "\\":
+            index += 2
+            literals.append("".join(current))
+            current = []
+            continue
+        if char == "[":
+            end = pattern.find("]", index + 2)
+            index = len(pattern) if end < 0 else end + 1
+            literals.append("".join(current))
+            current = []
+            continue
+        if char in "*?{":
+            # The preceding character is optional (or repeated a variable
+            # number of times), so it is not required.
+            if current:
+                current.pop()
+            literals.append("".join(current))
+            current = []
+        elif char == "(":
+            depth += 1
+            literals.append("".join(current))
+            current = []
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return []
+        elif char in _REGEX_SPECIAL:
+            literals.append("".join(current))
+            current = []
+        elif depth == 0:
+            current.append(char)
+        index += 1
+    literals.append("".join(current))
+    return [literal for literal in literals if literal]
+
+
+class ScrollbackSearch:
+    """Trigram-indexed search over a scrollback store."""
+
+    def __init__(self, store: ScrollbackStore, background: bool = True):
+        """Attach to a store and index its pages as they fill up.
+
+        Args:
+            store (ScrollbackStore): The store to search.
+            background (bool, optional): Build filters on a worker thread.
+                False builds them on the caller's thread. Defaults to True.
+        """
+        self.store = store
+        self.background = background
+        self._filters: Dict[int, bytearray] = {}
+        self._queue: "queue.Queue[Optional[Tuple[int, bytes]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        # Pages sealed before the search was attached are indexed as well.
+        for first, _offsets, view, sealed in store.pages():
+            if sealed:
+                self._page_sealed(first, bytes(view))
+        store.page_listeners.append(self._page_sealed)
+
+    def _page_sealed(self, first: int, data: bytes) -> None:
+        if len(self._filters) % 64 == 63:
+            self._prune()
+        if not self.background:
+            self._filters[first] = build_filter(data)
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="scrollback-index", daemon=True
+            )
+            self._thread.start()
+        self._queue.put((first, data))
+
+    def _prune(self) -> None:
+        """Forget the filters of pages the store has dropped."""
+        first = self.store.first
+        # The newest page starting at or before ``first`` is still partly kept.
+        stale = sorted(key for key in list(self._filters) if key <= first)
+        for key in stale[:-1]:
+            self._filters.pop(key, None)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                first, data = item
+                self._filters[first] = build_filter(data)
+            except Exception as e:
+                logger.error(f"Error indexing scrollback page: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def wait_indexed(self) -> None:
+        """Block until every sealed page has its filter."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """Stop indexing."""
+        if self._page_sealed in self.store.page_listeners:
+            self.store.page_listeners.remove(self._page_sealed)
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread = None
+
+    # -- searching --------------------------------------------------------
+
+    @staticmethod
+    def compile(query: str, regex: bool = False, case_sensitive: bool = False):
+        """Compile a query into the bytes pattern used for scanning.
+
+        Raises:
+            re.error: If ``regex`` is set and the pattern is invalid.
+        """
+        source = query.encode("utf-8") if regex else re.escape(query.encode("utf-8"))
+        return re.compile(source, 0 if case_sensitive else re.IGNORECASE)
+
+    def search(
+        self,
+        query: str,
+        regex: bool = False,
+        case_sensitive: bool = False,
+        after: Optional[Match] = None,
+        backwards: bool = False,
+        limit: int = DEFAULT_RESULT_PAGE,
+    ) -> List[Match]:
+        """Find matches in the scrollback.
+
+        Case-insensitive matching folds ASCII letters only.
+
+        Args:
+            query (str): The text or regular expression.
+            regex (bool, optional): Treat ``query`` as a regular expression. Defaults to False.
+            case_sensitive (bool, optional): Match case exactly. Defaults to False.
+            after (Tuple[int, int, int], optional): Continue after this match
+                (before it when searching backwards). Defaults to the start
+                (the end when searching backwards).
+            backwards (bool, optional): Newest matches first. Defaults to False.
+            limit (int, optional): Matches returned at most. Defaults to 100.
+
+        Returns:
+            List[Tuple[int, int, int]]: ``(line, column, length)`` matches in
+            search order.
+
+        Raises:
+            re.error: If ``regex`` is set and the pattern is invalid.
+        """
+        if not query:
+            return []
+        pattern = self.compile(query, regex, case_sensitive)
+        literals = required_literals(query) if regex else [query]
+        trigram_bits = set()
+        for literal in literals:
+            encoded = literal.encode("utf-8").lower()
+            trigram_bits.update(
+                _trigram_bit(encoded[i : i + 3]) for i in range(len(encoded) - 2)
+            )
+        store = self.store
+        results: List[Match] = []
+        for first, offsets, view, sealed in store.pages(backwards):
+            count = len(offsets) - 1
+            if after is not None:
+                if not backwards and first + count <= after[0]:
+                    continue
+                if backwards and first > after[0]:
+                    continue
+            if sealed and trigram_bits:
+                bits = self._filters.get(first)
+                if bits is not None and not _may_contain(bits, trigram_bits):
+                    continue
+            scan = self._scan_records if regex else self._scan_page
+            matches = scan(pattern, first, offsets, view)
+            if backwards:
+                matches.reverse()
+            for match in matches:
+                if match[0] < store.first:
+                    continue
+                if after is not None and (
+                    (match <= after) if not backwards else (match >= after)
+                ):
+                    continue
+                results.append(match)
+                if len(results) >= limit:
+                    return results
+        return results
+
+    def find_next(
+        self,
+        query: str,
+        after: Optional[Match] = None,
+        backwards: bool = False,
+        **options,
+    ) -> Optional[Match]:
+        """Return the next match after ``after`` (or before it when going backwards).
+
+        Args:
+            query (str): The text or regular expression.
+            after (Tuple[int, int, int], optional): The current match. Defaults to None.
+            backwards (bool, optional): Search towards older lines. Defaults to False.
+            **options: ``regex`` and ``case_sensitive`` for :meth:`search`.
+
+        Returns:
+            Tuple[int, int, int] or None: The match, if any.
+        """
+        matches = self.search(query, after=after, backwards=backwards, limit=1, **options)
+        return matches[0] if matches else None
+
+    @staticmethod
+    def _scan_page(pattern, first: int, offsets, data) -> List[Match]:
+        matches = []
+        for found in pattern.finditer(data):
+            start, end = found.span()
+            if start == end:
+                continue
+            index = bisect_right(offsets, start) - 1
+            record_start, record_end = offsets[index], offsets[index + 1]
+            text_start = record_text_offset(data, record_start)
+            if start < text_start or end > record_end:
+                # The hit spans a record header or two lines.
+                continue
+            column = len(bytes(data[text_start:start]).decode("utf-8", "replace"))
+            length = len(bytes(data[start:end]).decode("utf-8", "replace"))
+            matches.append((first + index, column, length))
+        return matches
+
+    @staticmethod
+    def _scan_records(pattern, first: int, offsets, data) -> List[Match]:
+        matches = []
+        for index in range(len(offsets) - 1):
+            text = data[record_text_offset(data, offsets[index]) : offsets[index + 1]]
+            for found in pattern.finditer(text):
+                start, end = found.span()
+                if start == end:
+                    continue
+                column = len(bytes(text[:start]).decode("utf-8", "replace"))
+                length = len(bytes(text[start:end]).decode("utf-8", "replace"))
+                matches.append((first + index, column, length))
+        return matches
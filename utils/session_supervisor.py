@@ -0,0 +1,236 @@
+"""Session supervisor module for Eagle Terminal.
+
+This module keeps SSH sessions alive in the background. Favorite devices
+get a pinned, keepalive-enabled transport in the shared transport pool,
+so opening a tab to one of them skips the TCP handshake, key exchange
+and authentication entirely (the same idea as OpenSSH's ControlMaster).
+Dead transports are detected by the pool's health checks and re-opened
+by the supervisor with jittered exponential backoff.
+
+Everything runs as asyncio tasks on the GUI's event loop; handshakes run
+in the default executor, so a flapping link never blocks the window.
+Only the paramiko backend draws on the transport pool, so warm sessions
+apply to tabs using that backend.
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from utils.logger import logger
+from utils.transport_pool import pool_key, transport_pool
+
+DEFAULT_CHECK_INTERVAL = 15
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 60.0
+
+
+def backoff_delay(
+    attempt: int,
+    base_delay: float = DEFAULT_BASE_DELAY,
+    max_delay: float = DEFAULT_MAX_DELAY,
+    jitter: float = 0.5,
+) -> float:
+    """Compute the wait before a reconnection attempt.
+
+    The delay doubles with every attempt up to ``max_delay``. A random part
+    of it (``jitter``) is dropped so that many sessions cut by the same
+    outage do not all reconnect at the same instant.
+
+    Args:
+        attempt (int): The number of attempts that already failed (0-based).
+        base_delay (float, optional): Delay after the first failure. Defaults to 1.0.
+        max_delay (float, optional): Upper bound for the delay. Defaults to 60.0.
+        jitter (float, optional): Fraction of the delay that is randomised. Defaults to 0.5.
+
+    Returns:
+        float: The number of seconds to wait.
+    """
+    delay = min(max_delay, base_delay * (2**attempt))
+    return delay * (1 - jitter * random.random())
+
+
+async def reconnect_with_backoff(
+    connect: Callable[[], Awaitable[Any]],
+    max_attempts: Optional[int] = None,
+    base_delay: float = DEFAULT_BASE_DELAY,
+    max_delay: float = DEFAULT_MAX_DELAY,
+    on_retry: Optional[Callable[[int, float, Optional[Exception]], None]] = None,
+) -> bool:
+    """Call ``connect`` until it succeeds, sleeping on the event loop in between.
+
+    Args:
+        connect (Callable): Coroutine function returning a truthy value on
+            success. Exceptions count as a failed attempt.
+        max_attempts (int, optional): Give up after this many attempts.
+            Defaults to None, which retries until cancelled.
+        base_delay (float, optional): Delay after the first failure. Defaults to 1.0.
+        max_delay (float, optional): Upper bound for the delay. Defaults to 60.0.
+        on_retry (Callable, optional): Called as ``on_retry(attempt, delay, error)``
+            before each wait, e.g. to update a status line. Defaults to None.
+
+    Returns:
+        bool: True once ``connect`` succeeded, False if the attempts ran out.
+    """
+    attempt = 0
+    while max_attempts is None or attempt < max_attempts:
+        error = None
+        try:
+            if await connect():
+                return True
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = e
+        if max_attempts is not None and attempt + 1 >= max_attempts:
+            break
+        delay = backoff_delay(attempt, base_delay, max_delay)
+        if on_retry:
+            on_retry(attempt + 1, delay, error)
+        logger.debug(
+            f"Reconnect attempt {attempt + 1} failed, retrying in {delay:.1f}s"
+        )
+        await asyncio.sleep(delay)
+        attempt += 1
+    return False
+
+
+class SessionSupervisor:
+    """Keeps favorite devices' transports warm and re-opens them when they die."""
+
+    def __init__(
+        self,
+        check_interval: float = DEFAULT_CHECK_INTERVAL,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        pool=None,
+    ):
+        """Initialize the supervisor.
+
+        Args:
+            check_interval (float, optional): Seconds between liveness checks. Defaults to 15.
+            base_delay (float, optional): First reconnection delay. Defaults to 1.0.
+            max_delay (float, optional): Largest reconnection delay. Defaults to 60.0.
+            pool (TransportPool, optional): The pool to keep warm. Defaults to
+                the shared ``transport_pool``.
+        """
+        self.check_interval = check_interval
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.pool = pool or transport_pool
+        self.favorites: Dict[tuple, Dict[str, Any]] = {}
+        self._state: Dict[tuple, Dict[str, float]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    @staticmethod
+    def _key(params: Dict[str, Any]) -> tuple:
+        return pool_key(params)
+
+    def add_favorite(self, params: Dict[str, Any]) -> None:
+        """Keep a device's transport open in the background.
+
+        Args:
+            params (dict): Connection arguments accepted by
+                ``TransportPool.acquire``, e.g. ``SSHConnection.pool_params()``.
+        """
+        key = self._key(params)
+        self.favorites[key] = params
+        self._state[key] = {"attempt": 0, "next_try": 0.0}
+        self.pool.pin(key)
+        logger.info(f"Keeping {params['hostname']} warm")
+        self.start()
+        if self._wake:
+            self._wake.set()
+
+    def remove_favorite(self, params: Dict[str, Any]) -> None:
+        """Stop keeping a device's transport open.
+
+        Args:
+            params (dict): The arguments passed to :meth:`add_favorite`.
+        """
+        key = self._key(params)
+        self.favorites.pop(key, None)
+        self._state.pop(key, None)
+        self.pool.unpin(key)
+
+    def is_warm(self, params: Dict[str, Any]) -> bool:
+        """Check whether a tab to this device would skip the handshake.
+
+        Args:
+            params (dict): Connection arguments for the device.
+
+        Returns:
+            bool: True if a live pooled transport is ready.
+        """
+        return self.pool.is_warm(self._key(params))
+
+    def start(self) -> None:
+        """Start the supervision task on the current event loop."""
+        if self._task and not self._task.done():
+            return
+        try:
+            self._wake = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+        except RuntimeError as e:
+            logger.warning(f"Session supervisor not started: {str(e)}")
+
+    def stop(self) -> None:
+        """Cancel the supervision task and release every pinned key."""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        for key in list(self.favorites):
+            self.pool.unpin(key)
+
+    async def _run(self) -> None:
+        while True:
+            await self.check_once()
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.check_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def check_once(self) -> None:
+        """Warm up every favorite that has no live transport and is due a retry."""
+        now = time.monotonic()
+        due = [
+            key
+            for key in self.favorites
+            if not self.pool.is_warm(key) and self._state[key]["next_try"] <= now
+        ]
+        if due:
+            await asyncio.gather(*(self._warm(key) for key in due))
+
+    async def _warm(self, key: tuple) -> None:
+        params = self.favorites.get(key)
+        if params is None:
+            return
+        state = self._state[key]
+        loop = asyncio.get_event_loop()
+        try:
+            await loop.run_in_executor(
+                None, lambda: self.pool.acquire(reserve=False, **params)
+            )
+        except Exception as e:
+            delay = backoff_delay(state["attempt"], self.base_delay, self.max_delay)
+            state["attempt"] += 1
+            state["next_try"] = time.monotonic() + delay
+            logger.warning(
+                f"Could not reach {params['hostname']} ({str(e)}); "
+                f"retrying in {delay:.1f}s"
+            )
+            if self._wake:
+                # Wake up in time for the retry instead of the next regular check.
+                loop.call_later(delay, self._wake.set)
+        else:
+            if state["attempt"]:
+                logger.info(f"Transport to {params['hostname']} restored")
+            state["attempt"] = 0
+            state["next_try"] = 0.0
+
+
+# Create and export the shared supervisor instance
+session_supervisor = SessionSupervisor()
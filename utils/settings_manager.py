@@ -77,6 +77,10 @@ class SettingsManager:
         """
         return {
             "dark_theme": False,
+            "session_transcripts": False,
+            "scrollback_lines": 100000,
+            "scrollback_max_mb": 64,
+            "scrollback_spill": False,
             # Add other default settings here
         }
 
@@ -0,0 +1,402 @@
+"""SSH backend module for Eagle Terminal.
+
+This module defines the interface that ``utils.ssh_utils.SSHConnection``
+uses to talk to a remote shell, together with two implementations:
+
+- ``ParamikoBackend`` opens its shell on the shared paramiko transport pool
+  and receives output through a push-based ``ChannelReader``; only the
+  handshake and writes hop to a worker thread.
+- ``AsyncSSHBackend`` runs entirely on the asyncio (qasync) event loop using
+  asyncssh, so reads and writes never leave the GUI thread's loop.
+
+The paramiko backend stays the default because its transports are shared
+with status polling and the SFTP browser; asyncssh can be selected per
+session with ``session_data["ssh_backend"] = "asyncssh"`` or globally with
+the ``ssh_backend`` setting. Both backends share jump host (ProxyJump)
+connections between their sessions.
+
+Both backends check host keys the same way: against the user's
+``~/.ssh/known_hosts`` (or ``params["known_hosts"]``), where a changed key
+is always refused, and through the paramiko ``host_key_policy`` for hosts
+that are not listed yet (RejectPolicy when none is given); see
+``utils.host_keys``.
+"""
+
+import asyncio
+from typing import Any, Dict, Optional
+
+from utils.channel_reader import AdaptiveReadSize, ChannelReader
+from utils.connection_profiles import asyncssh_connect_kwargs
+from utils.exec_channel import run_on_host
+from utils.host_keys import asyncssh_host_key_kwargs
+from utils.logger import logger
+from utils.transport_pool import (SHELL_MAX_PACKET_SIZE, SHELL_WINDOW_SIZE,
+                                  normalize_jump_hosts, pool_key,
+                                  transport_pool)
+
+try:
+    import asyncssh
+except ImportError:
+    asyncssh = None
+    logger.warning("asyncssh is not installed. Only the paramiko backend is available.")
+
+DEFAULT_BACKEND = "paramiko"
+
+
+class SSHBackend:
+    """Interface implemented by every SSH shell backend."""
+
+    name = "base"
+
+    def __init__(self, params: Dict[str, Any]):
+        """Initialize the backend.
+
+        Args:
+            params (dict): Connection arguments (``hostname``, ``port``,
+                ``username``, ``password``, ``key_filename``, ``timeout``).
+        """
+        self.params = params
+        self.channel: Optional[Any] = None
+
+    @property
+    def is_open(self) -> bool:
+        """bool: True while the shell channel is open."""
+        return self.channel is not None
+
+    async def connect(
+        self,
+        term: str = "xterm",
+        width: int = 80,
+        height: int = 24,
+        window_size: int = SHELL_WINDOW_SIZE,
+        max_packet_size: int = SHELL_MAX_PACKET_SIZE,
+    ) -> None:
+        """Authenticate and open an interactive shell.
+
+        Args:
+            term (str, optional): The terminal type to request. Defaults to "xterm".
+            width (int, optional): The terminal width in characters. Defaults to 80.
+            height (int, optional): The terminal height in characters. Defaults to 24.
+            window_size (int, optional): The SSH channel window in bytes.
+                Defaults to ``SHELL_WINDOW_SIZE``.
+            max_packet_size (int, optional): The largest data packet the server
+                may send. Defaults to ``SHELL_MAX_PACKET_SIZE``.
+        """
+        raise NotImplementedError
+
+    async def read(
+        self, max_bytes: Optional[int] = None, timeout: Optional[float] = None
+    ) -> Optional[bytes]:
+        """Read the next chunk of shell output.
+
+        Args:
+            max_bytes (int, optional): Maximum number of bytes to return.
+                Defaults to None, which adapts the size to the output rate.
+            timeout (float, optional): Seconds to wait for data. None waits forever.
+
+        Returns:
+            bytes or None: The received bytes, ``b""`` once the channel reached
+            EOF, or None if nothing arrived before the timeout.
+        """
+        raise NotImplementedError
+
+    async def write(self, data) -> None:
+        """Send data to the shell.
+
+        Args:
+            data (str or bytes): The data to send. Strings are UTF-8 encoded.
+        """
+        raise NotImplementedError
+
+    async def resize(self, width: int, height: int) -> None:
+        """Resize the remote pseudo-terminal.
+
+        Args:
+            width (int): The terminal width in characters.
+            height (int): The terminal height in characters.
+        """
+        raise NotImplementedError
+
+    async def exec_command(
+        self, command: str, timeout: Optional[float] = None
+    ) -> Optional[str]:
+        """Run a command on an exec channel beside the shell.
+
+        The shell's output stream is left alone, so nothing the user would
+        see in the terminal is consumed.
+
+        Args:
+            command (str): The command line.
+            timeout (float, optional): Seconds to wait for completion. None
+                waits forever.
+
+        Returns:
+            str or None: The command's stdout, or None if it did not finish
+            in time.
+        """
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Close the shell channel."""
+        raise NotImplementedError
+
+
+class ParamikoBackend(SSHBackend):
+    """Shell backend on a pooled paramiko transport."""
+
+    name = "paramiko"
+
+    async def connect(
+        self,
+        term: str = "xterm",
+        width: int = 80,
+        height: int = 24,
+        window_size: int = SHELL_WINDOW_SIZE,
+        max_packet_size: int = SHELL_MAX_PACKET_SIZE,
+    ) -> None:
+        loop = asyncio.get_event_loop()
+        pooled = await loop.run_in_executor(
+            None, lambda: transport_pool.acquire(**self.params)
+        )
+        self.client = pooled.client
+        self.channel = await loop.run_in_executor(
+            None,
+            lambda: pooled.open_shell(
+                term=term,
+                width=width,
+                height=height,
+                window_size=window_size,
+                max_packet_size=max_packet_size,
+            ),
+        )
+        self.reader = ChannelReader(self.channel, loop)
+        self.reader.start()
+
+    async def read(
+        self, max_bytes: Optional[int] = None, timeout: Optional[float] = None
+    ) -> Optional[bytes]:
+        if not self.channel:
+            return None
+        return await self.reader.read(timeout, max_bytes)
+
+    async def write(self, data) -> None:
+        if not self.channel:
+            return
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        await asyncio.get_event_loop().run_in_executor(None, self.channel.sendall, data)
+
+    async def resize(self, width: int, height: int) -> None:
+        if self.channel:
+            self.channel.resize_pty(width=width, height=height)
+
+    async def exec_command(
+        self, command: str, timeout: Optional[float] = None
+    ) -> Optional[str]:
+        result = await asyncio.get_event_loop().run_in_executor(
+            None, lambda: run_on_host(self.params, command, timeout)
+        )
+        return None if result["timed_out"] else result["stdout"]
+
+    async def close(self) -> None:
+        if self.channel:
+            self.channel.close()
+            self.reader.feed_eof()
+            self.channel = None
+
+
+class AsyncSSHBackend(SSHBackend):
+    """Shell backend running natively on the asyncio event loop."""
+
+    name = "asyncssh"
+
+    # Shared connections, keyed like the paramiko transport pool:
+    # key -> [conn, refs, key of the jump host connection it tunnels through]
+    _connections: Dict[tuple, list] = {}
+    # Connections being dialled: key -> future resolved once it is shared.
+    _connecting: Dict[tuple, asyncio.Future] = {}
+
+    def __init__(self, params: Dict[str, Any]):
+        super().__init__(params)
+        self.key = self._connection_key(params)
+        self.conn = None
+        self.sizer = AdaptiveReadSize()
+
+    @staticmethod
+    def _connection_key(params: Dict[str, Any]) -> tuple:
+        return pool_key(params)
+
+    async def _acquire_connection(self):
+        return await self._shared_connection(self.params)
+
+    @classmethod
+    async def _shared_connection(cls, params: Dict[str, Any]):
+        key = cls._connection_key(params)
+        while True:
+            entry = cls._connections.get(key)
+            if entry and not entry[0].is_closed():
+                entry[1] += 1
+                return entry[0]
+            pending = cls._connecting.get(key)
+            if pending is None:
+                break
+            # Someone else is dialling the same key: share their connection,
+            # or their error.
+            await asyncio.shield(pending)
+
+        pending = asyncio.get_running_loop().create_future()
+        cls._connecting[key] = pending
+        try:
+            entry = await cls._dial(params)
+        except BaseException as e:
+            if isinstance(e, Exception):
+                pending.set_exception(e)
+                pending.exception()  # retrieved, even if nobody was waiting
+            else:
+                pending.cancel()
+            raise
+        finally:
+            del cls._connecting[key]
+        cls._connections[key] = entry
+        pending.set_result(None)
+        return entry[0]
+
+    @classmethod
+    async def _dial(cls, params: Dict[str, Any]) -> list:
+        # Jump hosts are shared connections too, so every session behind a
+        # bastion tunnels through the same bastion connection.
+        hops = normalize_jump_hosts(params.get("jump_hosts"))
+        tunnel = tunnel_key = None
+        if hops:
+            hop_params = dict(
+                hops[-1],
+                jump_hosts=hops[:-1],
+                timeout=params.get("timeout", 10),
+                host_key_policy=params.get("host_key_policy"),
+            )
+            tunnel = await cls._shared_connection(hop_params)
+            tunnel_key = cls._connection_key(hop_params)
+
+        key_filename = params.get("key_filename")
+        try:
+            conn = await asyncssh.connect(
+                params["hostname"],
+                port=int(params.get("port", 22)),
+                username=params.get("username"),
+                password=params.get("password"),
+                client_keys=[key_filename] if key_filename else (),
+                **asyncssh_host_key_kwargs(params),
+                connect_timeout=params.get("timeout", 10),
+                tunnel=tunnel,
+                **asyncssh_connect_kwargs(params.get("connection_profile")),
+            )
+        except BaseException:
+            cls._release(tunnel_key)
+            raise
+        return [conn, 1, tunnel_key]
+
+    @classmethod
+    def _release(cls, key: Optional[tuple]) -> None:
+        entry = cls._connections.get(key) if key else None
+        if not entry:
+            return
+        entry[1] -= 1
+        if entry[1] <= 0:
+            entry[0].close()
+            del cls._connections[key]
+            cls._release(entry[2])
+
+    def _release_connection(self) -> None:
+        self._release(self.key)
+
+    async def connect(
+        self,
+        term: str = "xterm",
+        width: int = 80,
+        height: int = 24,
+        window_size: int = SHELL_WINDOW_SIZE,
+        max_packet_size: int = SHELL_MAX_PACKET_SIZE,
+    ) -> None:
+        if asyncssh is None:
+            raise RuntimeError("asyncssh is not installed")
+        self.conn = await self._acquire_connection()
+        self.channel = await self.conn.create_process(
+            term_type=term,
+            term_size=(width, height),
+            encoding=None,
+            window=window_size,
+            max_pktsize=max_packet_size,
+        )
+
+    async def read(
+        self, max_bytes: Optional[int] = None, timeout: Optional[float] = None
+    ) -> Optional[bytes]:
+        if not self.channel:
+            return None
+        try:
+            data = await asyncio.wait_for(
+                self.channel.stdout.read(max_bytes or self.sizer.size), timeout
+            )
+        except asyncio.TimeoutError:
+            return None
+        if max_bytes is None:
+            self.sizer.update(len(data))
+        return data
+
+    async def write(self, data) -> None:
+        if not self.channel:
+            return
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self.channel.stdin.write(data)
+        await self.channel.stdin.drain()
+
+    async def resize(self, width: int, height: int) -> None:
+        if self.channel:
+            self.channel.change_terminal_size(width, height)
+
+    async def exec_command(
+        self, command: str, timeout: Optional[float] = None
+    ) -> Optional[str]:
+        if not self.conn:
+            return None
+        try:
+            result = await self.conn.run(command, check=False, timeout=timeout)
+        except asyncssh.TimeoutError:
+            return None
+        return result.stdout
+
+    async def close(self) -> None:
+        if self.channel:
+            self.channel.close()
+            self.channel = None
+        if self.conn:
+            self.conn = None
+            self._release_connection()
+
+
+BACKENDS = {
+    ParamikoBackend.name: ParamikoBackend,
+    AsyncSSHBackend.name: AsyncSSHBackend,
+}
+
+
+def create_backend(name: Optional[str], params: Dict[str, Any]) -> SSHBackend:
+    """Instantiate the requested backend, falling back to paramiko.
+
+    Args:
+        name (str, optional): The backend name ("paramiko" or "asyncssh").
+            None selects ``DEFAULT_BACKEND``.
+        params (dict): Connection arguments for the backend.
+
+    Returns:
+        SSHBackend: The backend instance.
+    """
+    name = (name or DEFAULT_BACKEND).lower()
+    if name == AsyncSSHBackend.name and asyncssh is None:
+        logger.warning("asyncssh backend requested but not installed; using paramiko")
+        name = ParamikoBackend.name
+    if name not in BACKENDS:
+        logger.warning(f"Unknown SSH backend '{name}'; using {DEFAULT_BACKEND}")
+        name = DEFAULT_BACKEND
+    return BACKENDS[name](params)
@@ -1,6 +1,5 @@
 import asyncio
 import logging
-import socket
 import time
 
 import paramiko
@@ -14,10 +13,78 @@ from paramiko.ssh_exception import (AuthenticationException,
                                     BadHostKeyException, SSHException)
 
 from utils.logging_config import logger
+from utils.output_pipeline import OutputPipeline
+from utils.prompt_detector import CommandWaiter, LineWaiter, PromptDetector
+from utils.session_supervisor import reconnect_with_backoff
+from utils.ssh_backends import create_backend
+from utils.transport_pool import make_pool_params, transport_pool
+
+
+def session_pool_params(
+    hostname,
+    username,
+    password=None,
+    key_filename=None,
+    port=22,
+    connection_profile=None,
+    jump_hosts=None,
+):
+    """Build the transport pool arguments used by interactive sessions.
+
+    Tabs and the session supervisor use the same arguments, so a transport
+    kept warm for a favorite device is the one a new tab picks up; see
+    ``transport_pool.make_pool_params``.
+
+    Args:
+        hostname (str): The hostname or IP address of the SSH server.
+        username (str): The username to authenticate with.
+        password (str, optional): The password for authentication. Defaults to None.
+        key_filename (str, optional): The private key file. Defaults to None.
+        port (int, optional): The port number of the SSH server. Defaults to 22.
+        connection_profile (str, optional): The name of the connection profile
+            selecting algorithms and compression. Defaults to None.
+        jump_hosts (optional): Jump hosts (ProxyJump) to reach the server
+            through, see ``transport_pool.normalize_jump_hosts``. Defaults to None.
+
+    Returns:
+        dict: Connection arguments accepted by ``TransportPool.acquire``.
+    """
+    return make_pool_params(
+        hostname,
+        port,
+        username,
+        password,
+        key_filename,
+        connection_profile,
+        jump_hosts,
+    )
+
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _resolve(future, waiter):
+    if not future.done():
+        future.set_result(waiter)
 
 
 class SSHConnection:
-    def __init__(self, hostname, username, password=None, key_filename=None, port=22):
+    def __init__(
+        self,
+        hostname,
+        username,
+        password=None,
+        key_filename=None,
+        port=22,
+        backend=None,
+        connection_profile=None,
+        output_pipeline=None,
+        jump_hosts=None,
+    ):
         """Initialize a new SSH connection object.
 
         Args:
@@ -26,6 +93,14 @@ class SSHConnection:
             password (str, optional): The password for authentication. Defaults to None.
             key_filename (str, optional): The filename of the private key to use for authentication. Defaults to None.
             port (int, optional): The port number of the SSH server. Defaults to 22.
+            backend (str, optional): The shell backend to use, "paramiko" or "asyncssh".
+                Defaults to None, which selects ``ssh_backends.DEFAULT_BACKEND``.
+            connection_profile (str, optional): The connection profile to negotiate
+                with (see ``utils.connection_profiles``). Defaults to None.
+            output_pipeline (OutputPipeline, optional): Decoder and output stages
+                for the shell's byte stream. Defaults to a new pipeline.
+            jump_hosts (optional): Jump hosts (ProxyJump) to tunnel through.
+                Defaults to None.
 
         Returns:
             None
@@ -39,16 +114,52 @@ class SSHConnection:
             password (str): The password for authentication (if provided).
             key_filename (str): The filename of the private key (if provided).
             port (int): The port number of the SSH server.
-            client (None): Placeholder for the SSH client object.
-            channel (None): Placeholder for the SSH channel object.
+            connection_profile (str): The connection profile name, if any.
+            jump_hosts: The jump host route, if any.
+            backend (SSHBackend): The backend carrying the interactive shell.
+            output_pipeline (OutputPipeline): Turns shell output into text.
+            sftp (None): Placeholder for the SFTP client object.
+            prompt_detector (PromptDetector): The prompt learned for this session.
+            last_exit_status (int or None): Exit status of the last sentinel command.
+            login_output (str): The shell output read while connecting (banner,
+                first prompt), for the caller to show.
         """
         self.hostname = hostname
         self.username = username
         self.password = password
         self.key_filename = key_filename
         self.port = port
-        self.client = None
-        self.channel = None
+        self.connection_profile = connection_profile
+        self.jump_hosts = jump_hosts
+        self.backend = create_backend(backend, self.pool_params())
+        self.sftp = None
+        self.output_pipeline = output_pipeline or OutputPipeline()
+        self.prompt_detector = PromptDetector()
+        self.last_exit_status = None
+        self.login_output = ""
+        self._waiters = []
+        self._streaming = False
+
+    @property
+    def channel(self):
+        """The backend's shell channel, or None when not connected."""
+        return self.backend.channel
+
+    def pool_params(self):
+        """Return the keyword arguments identifying this connection in the transport pool.
+
+        Returns:
+            dict: Connection arguments accepted by ``TransportPool.acquire``.
+        """
+        return session_pool_params(
+            self.hostname,
+            self.username,
+            self.password,
+            self.key_filename,
+            self.port,
+            self.connection_profile,
+            self.jump_hosts,
+        )
 
     async def async_connect(self):
         """Asynchronously establishes an SSH connection to a remote host.
@@ -63,40 +174,32 @@ class SSHConnection:
 
         Raises:
             Exception: If there's an error during the connection process.
+
+        Note:
+            With the paramiko backend the shell channel is opened on a
+            transport from the shared transport pool, so no new handshake
+            happens when the host is already in use by another tab, status
+            sweep or file browser.
+
+            The banner and first prompt read while connecting are kept in
+            ``login_output``; the shell stream continues right after them.
         """
         try:
-            self.client = paramiko.SSHClient()
-            self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-
-            connect_kwargs = {
-                "hostname": self.hostname,
-                "port": self.port,
-                "username": self.username,
-                "password": self.password,
-                "key_filename": self.key_filename,
-                "timeout": 10,
-            }
-
-            await asyncio.get_event_loop().run_in_executor(
-                None, lambda: self.client.connect(**connect_kwargs)
-            )
+            await self.backend.connect()
+            self.login_output = await self.learn_prompt()
 
-            self.channel = await asyncio.get_event_loop().run_in_executor(
-                None, self.client.invoke_shell
-            )
-            self.channel.settimeout(0.1)  # Set a short timeout for non-blocking reads
-
-            logger.info(f"Connected to {self.hostname}")
+            logger.info(f"Connected to {self.hostname} ({self.backend.name} backend)")
             return True, await self.get_os_type()
         except Exception as e:
             logger.error(f"Failed to connect to {self.hostname}: {str(e)}")
             return False, "unknown"
 
-    async def read_output(self):
+    async def read_output(self, timeout=0.1):
         """Asynchronously reads output from an SSH channel.
 
         Args:
             self: The instance of the class containing this method.
+            timeout (float, optional): Seconds to wait for data. Defaults to 0.1.
 
         Returns:
             str or None: The decoded output from the SSH channel as a UTF-8 string,
@@ -104,20 +207,34 @@ class SSHConnection:
             or if there's a socket timeout.
 
         Raises:
-            None explicitly, but may propagate exceptions from asyncio or paramiko.
+            None explicitly, but may propagate exceptions from asyncio or the backend.
         """
         if not self.channel:
             return None
 
-        try:
-            output = await asyncio.get_event_loop().run_in_executor(
-                None, self.channel.recv, 4096
-            )
-            return output.decode("utf-8", errors="replace")
-        except paramiko.ssh_exception.ChannelException:
+        output = await self.backend.read(timeout=timeout)
+        if not output:
             return None
-        except socket.timeout:
-            return None  # No data available
+        text = self.output_pipeline.feed(output)
+        self.dispatch_output(text)
+        return text
+
+    def dispatch_output(self, text):
+        """Hand a chunk of shell output to every pending command waiter.
+
+        May be called from an output worker thread: a waiter's future is
+        then resolved on its own event loop.
+
+        Args:
+            text (str): The decoded output chunk.
+        """
+        for waiter, future in list(self._waiters):
+            if waiter.feed(text) and not future.done():
+                loop = future.get_loop()
+                if _running_loop() is loop:
+                    future.set_result(waiter)
+                else:
+                    loop.call_soon_threadsafe(_resolve, future, waiter)
 
     async def write_input(self, data):
         """Asynchronously writes input data to a channel.
@@ -134,7 +251,22 @@ class SSHConnection:
         if not self.channel:
             return
 
-        await asyncio.get_event_loop().run_in_executor(None, self.channel.send, data)
+        await self.backend.write(data)
+
+    async def resize_terminal(self, width, height):
+        """Tell the remote side the terminal's new size in cells.
+
+        Args:
+            width (int): Columns.
+            height (int): Rows.
+
+        Returns:
+            None
+        """
+        if not self.channel:
+            return
+
+        await self.backend.resize(width, height)
 
     async def execute_command(self, command):
         """Executes a command asynchronously and yields the output.
@@ -159,11 +291,15 @@ class SSHConnection:
             else:
                 break
 
-    async def read_output_generator(self):
+    async def read_output_generator(self, decode=True):
         """An asynchronous generator method that continuously reads output and yields it.
 
         Args:
             self: The instance of the class containing this method.
+            decode (bool, optional): Run the output through ``output_pipeline``
+                and the command waiters and yield text. False yields the raw
+                bytes and leaves both to the caller, e.g. an ``OutputWorker``
+                with ``dispatch_output`` as a listener. Defaults to True.
 
         Returns:
             AsyncGenerator[Any, None]: An asynchronous generator that yields output as it becomes available.
@@ -172,16 +308,150 @@ class SSHConnection:
             None
 
         Notes:
-            - This method runs in an infinite loop, continuously checking for new output.
-            - If no output is available, it waits for 0.1 seconds before checking again.
-            - The actual type of the output depends on what the `read_output` method returns.
+            - The backend pushes output as it arrives, so the generator sleeps
+              on the event loop until data is available instead of polling.
+            - The generator finishes when the channel reaches EOF.
+        """
+        self._streaming = True
+        try:
+            while self.channel:
+                output = await self.backend.read(timeout=None)
+                if not decode:
+                    if not output:
+                        break
+                    yield output
+                    continue
+                if not output:
+                    tail = self.output_pipeline.flush()
+                    if tail:
+                        yield tail
+                    break
+                text = self.output_pipeline.feed(output)
+                if text:
+                    self.dispatch_output(text)
+                    yield text
+        finally:
+            self._streaming = False
+
+    async def learn_prompt(self, timeout=5):
+        """Learn the session's prompt from the login output.
+
+        Reads until the output ends with something that looks like a prompt
+        and teaches it to ``self.prompt_detector``. If the device stays
+        silent for half the timeout, a single newline is sent to make it
+        print a prompt.
+
+        Args:
+            timeout (float, optional): Seconds to wait for a prompt. Defaults to 5.
+
+        Returns:
+            str: The output read meanwhile, which nothing else has seen.
         """
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout
+        nudge_at = loop.time() + timeout / 2
+        buffer = ""
         while True:
-            output = await self.read_output()
-            if output:
-                yield output
+            now = loop.time()
+            if now >= deadline:
+                logger.warning(f"No prompt detected on {self.hostname}")
+                return buffer
+            wait = (nudge_at if nudge_at else deadline) - now
+            output = await self.backend.read(timeout=max(wait, 0))
+            if output == b"":
+                return buffer
+            if output is None:
+                if nudge_at and loop.time() >= nudge_at:
+                    nudge_at = None
+                    await self.write_input("\n")
+                continue
+            buffer += self.output_pipeline.feed(output)
+            if self.prompt_detector.at_prompt(buffer):
+                self.prompt_detector.learn(buffer)
+                return buffer
+
+    async def run_command(self, command, timeout=30, sentinel=False):
+        """Run a command in the interactive shell and wait for it to finish.
+
+        Completion is detected as soon as the learned prompt comes back, so
+        the call returns as fast as the device answers. When ``sentinel`` is
+        set and the remote side is a POSIX shell, a unique marker carrying
+        the exit status is echoed after the command as well.
+
+        The output is collected from whichever reader is active: if
+        ``read_output_generator`` is streaming (as in an SSH tab) the chunks
+        it yields are inspected, otherwise this method reads the channel
+        itself.
+
+        Args:
+            command (str): The command to run.
+            timeout (float, optional): Seconds to wait for completion. Defaults to 30.
+            sentinel (bool, optional): Append an exit-status sentinel. Defaults to False.
+
+        Returns:
+            str or None: The command output without echo and prompt, or None
+            if the command did not complete before the timeout.
+        """
+        token = None
+        wire_command = command
+        if sentinel and self.prompt_detector.supports_sentinel:
+            wire_command, token = self.prompt_detector.wrap_command(command)
+
+        waiter = CommandWaiter(self.prompt_detector, wire_command, token)
+        if not await self._wait(waiter, wire_command + "\n", timeout):
+            logger.warning(f"Command timed out after {timeout}s: {command}")
+
+        self.last_exit_status = waiter.exit_status
+        return waiter.output
+
+    async def wait_for_line(self, predicate, data=None, timeout=10):
+        """Send ``data`` and wait until the line before the cursor matches.
+
+        Used for prompts that are not the shell prompt, such as sudo asking
+        for a password.
+
+        Args:
+            predicate (Callable[[str], bool]): Called with the last line of output.
+            data (str, optional): Input to send once the waiter is registered.
+                Defaults to None.
+            timeout (float, optional): Seconds to wait. Defaults to 10.
+
+        Returns:
+            bool: True if the line matched before the timeout or EOF.
+        """
+        return await self._wait(LineWaiter(predicate), data, timeout)
+
+    async def _wait(self, waiter, data, timeout):
+        """Feed the output following ``data`` to ``waiter`` until it is done.
+
+        The output is inspected by whichever reader is active: the one
+        streaming through ``dispatch_output``, or else this method.
+        """
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        entry = (waiter, future)
+        self._waiters.append(entry)
+        try:
+            if data:
+                await self.write_input(data)
+            if self._streaming:
+                await asyncio.wait_for(asyncio.shield(future), timeout)
             else:
-                await asyncio.sleep(0.1)
+                deadline = loop.time() + timeout
+                while not future.done():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError
+                    output = await self.backend.read(timeout=remaining)
+                    if output == b"":
+                        break
+                    if output:
+                        self.dispatch_output(self.output_pipeline.feed(output))
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiters.remove(entry)
+        return future.done()
 
     async def get_os_type(self):
         """Asynchronously determines the operating system type of the current environment.
@@ -195,19 +465,24 @@ class SSHConnection:
                  - 'linux': For Linux-based operating systems
                  - 'macos': For macOS operating systems
                  - 'windows': For Windows operating systems
+                 - 'cisco' / 'juniper': For network devices, recognised by their prompt
                  - 'unknown': If the operating system type cannot be determined
 
         Raises:
             None
 
         Note:
-            This method uses the 'uname -s' command to determine the operating system type.
-            It writes the command to the input, waits for execution, and then reads the output.
-            The method has a built-in delay of 0.5 seconds to allow time for command execution.
+            Network devices are recognised from the learned prompt ('cisco',
+            'juniper'). Otherwise 'uname -s' is run on an exec channel, so
+            the probe does not show up in the interactive shell.
         """
-        await self.write_input("uname -s\n")
-        await asyncio.sleep(0.5)  # Give some time for the command to execute
-        output = await self.read_output()
+        if self.prompt_detector.family in ("cisco", "juniper"):
+            return self.prompt_detector.family
+        try:
+            output = await self.backend.exec_command("uname -s", timeout=5)
+        except Exception as e:
+            logger.debug(f"OS probe failed on {self.hostname}: {str(e)}")
+            output = None
         os_type = output.strip().lower() if output else "unknown"
         if "linux" in os_type:
             return "linux"
@@ -219,7 +494,10 @@ class SSHConnection:
             return "unknown"
 
     async def close(self):
-        """Closes the connection and associated resources.
+        """Closes the channels opened by this connection.
+
+        The pooled transport itself stays open for other consumers and is
+        evicted by the transport pool once it has been idle long enough.
 
         Args:
             self: The instance of the class containing this method.
@@ -230,10 +508,10 @@ class SSHConnection:
         Raises:
             None
         """
-        if self.channel:
-            self.channel.close()
-        if self.client:
-            self.client.close()
+        if self.sftp:
+            self.sftp.close()
+            self.sftp = None
+        await self.backend.close()
         logger.info(f"Closed connection to {self.hostname}")
 
     async def open_sftp(self):
@@ -252,11 +530,11 @@ class SSHConnection:
         Raises:
             Exception: If not connected to an SSH server when trying to open the SFTP session.
         """
-        if not self.client:
+        if not self.channel:
             raise Exception("Not connected to SSH server")
         if not self.sftp:
             self.sftp = await asyncio.get_event_loop().run_in_executor(
-                None, self.client.open_sftp
+                None, lambda: transport_pool.open_sftp(**self.pool_params())
             )
         return self.sftp
 
@@ -322,25 +600,35 @@ class SSHConnection:
         )
 
 
-def retry_connection(ssh_connection, max_attempts=3, delay=5):
+async def retry_connection(ssh_connection, max_attempts=3, delay=1, max_delay=30):
     """Attempts to establish an SSH connection with retry logic.
 
+    Waits between attempts with jittered exponential backoff on the event
+    loop, so the UI stays responsive while a host is unreachable.
+
     Args:
-        ssh_connection: The SSH connection object to be used for connecting.
+        ssh_connection (SSHConnection): The SSH connection object to be used for connecting.
         max_attempts (int): The maximum number of connection attempts. Defaults to 3.
-        delay (int): The delay in seconds between connection attempts. Defaults to 5.
+        delay (float): The delay in seconds after the first failed attempt; it doubles
+            after every further failure. Defaults to 1.
+        max_delay (float): The longest delay between attempts. Defaults to 30.
 
     Returns:
         bool: True if the connection was successful, False otherwise.
     """
-    for attempt in range(max_attempts):
-        if ssh_connection.connect():
-            return True
+
+    async def attempt():
+        connected, _ = await ssh_connection.async_connect()
+        return connected
+
+    def log_retry(attempt_number, wait, error):
         logger.warning(
-            f"Connection attempt {attempt + 1} failed. Retrying in {delay} seconds..."
+            f"Connection attempt {attempt_number} failed. Retrying in {wait:.1f} seconds..."
         )
-        time.sleep(delay)
-    return False
+
+    return await reconnect_with_backoff(
+        attempt, max_attempts, base_delay=delay, max_delay=max_delay, on_retry=log_retry
+    )
 
 
 def execute_with_timeout(func, *args, timeout=30, **kwargs):
@@ -0,0 +1,1046 @@
+"""Terminal screen module for Eagle Terminal.
+
+This module is the terminal state engine behind the SSH views. Instead of
+stripping escape sequences, output is interpreted the way an xterm does:
+
+- ``TerminalScreen`` keeps a grid of cells (character plus packed
+  attributes), the cursor, scroll regions, tab stops and the alternate
+  screen used by full-screen programs (``top``, ``vim``, ``less``). Lines
+  scrolling off the main screen go to a bounded
+  :class:`~utils.scrollback.ScrollbackStore`.
+- Every change marks the rows it touched as dirty. Renderers call
+  :meth:`TerminalScreen.take_changes` once per repaint and only redraw
+  those rows, plus the lines that scrolled into the scrollback.
+- Replies the remote side asked for (cursor position and device
+  attribute reports) are queued in ``responses`` for the session to send.
+
+The module has no Qt dependency; see ``ui.elements.terminal_view`` for
+the widget side.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.scrollback import DEFAULT_SCROLLBACK_LINES, ScrollbackStore
+
+DEFAULT_COLUMNS = 80
+DEFAULT_ROWS = 24
+# An escape sequence left unfinished at the end of a chunk is kept for the
+# next one, unless it grows beyond this (then it is garbage and dropped).
+MAX_PENDING_ESCAPE = 4096
+
+# Attribute flags, packed into the low byte of a cell's attribute integer.
+BOLD = 1
+DIM = 2
+ITALIC = 4
+UNDERLINE = 8
+BLINK = 16
+REVERSE = 32
+HIDDEN = 64
+STRIKE = 128
+
+# Colors are packed into 26-bit fields: 0 is the default color, 1-256 a
+# palette index plus one and TRUECOLOR | 0xRRGGBB a 24-bit color.
+TRUECOLOR = 1 << 25
+_COLOR_MASK = (1 << 26) - 1
+_FG_SHIFT = 8
+_BG_SHIFT = 34
+DEFAULT_ATTR = 0
+
+_SGR_FLAGS = {
+    1: BOLD,
+    2: DIM,
+    3: ITALIC,
+    4: UNDERLINE,
+    5: BLINK,
+    7: REVERSE,
+    8: HIDDEN,
+    9: STRIKE,
+}
+_SGR_RESET_FLAGS = {
+    21: BOLD,
+    22: BOLD | DIM,
+    23: ITALIC,
+    24: UNDERLINE,
+    25: BLINK,
+    27: REVERSE,
+    28: HIDDEN,
+    29: STRIKE,
+}
+
+# DEC special graphics, selected with ESC ( 0 (used for line drawing).
+DEC_GRAPHICS = dict(
+    zip(
+        "`abcdefghijklmnopqrstuvwxyz{|}~",
+        "◆▒␉␌␍␊°±␤␋┘┐┌└┼⎺⎻─⎼⎽├┤┴┬│≤≥π≠£·",
+    )
+)
+
+_CONTROL = re.compile(r"[\x00-\x1f\x7f-\x9f]")
+_ESCAPE = re.compile(
+    r"\x1b(?:"
+    r"\[(?P<params>[0-?]*)(?P<inter>[ -/]*)(?P<final>[@-~])"
+    r"|\](?P<osc>[^\x07\x1b]*)(?:\x07|\x1b\\)"
+    r"|[P^_X][^\x1b]*\x1b\\"
+    r"|(?P<charset>[()*+])(?P<designator>[%\"&]?[ -~])"
+    r"|#(?P<hash>[0-~])"
+    r"|[ -/]*(?P<esc>[0-OQ-WYZ\\`a-~])"
+    r")"
+)
+_PARTIAL_ESCAPE = re.compile(
+    r"\x1b(?:\[[0-?]*[ -/]*|\][^\x07\x1b]*\x1b?|[P^_X][^\x1b]*\x1b?"
+    r"|[()*+][%\"&]?|#|[ -/]*)?\Z"
+)
+
+
+def pack_attr(flags: int = 0, fg: int = 0, bg: int = 0) -> int:
+    """Pack attribute flags and colors into one cell attribute."""
+    return flags | (fg << _FG_SHIFT) | (bg << _BG_SHIFT)
+
+
+def attr_flags(attr: int) -> int:
+    """Return the flag bits (BOLD, UNDERLINE...) of a cell attribute."""
+    return attr & 0xFF
+
+
+def attr_fg(attr: int) -> int:
+    """Return the packed foreground color of a cell attribute."""
+    return (attr >> _FG_SHIFT) & _COLOR_MASK
+
+
+def attr_bg(attr: int) -> int:
+    """Return the packed background color of a cell attribute."""
+    return (attr >> _BG_SHIFT) & _COLOR_MASK
+
+
+def _build_palette() -> List[Tuple[int, int, int]]:
+    palette = [
+        (0, 0, 0),
+        (205, 49, 49),
+        (13, 188, 121),
+        (229, 229, 16),
+        (36, 114, 200),
+        (188, 63, 188),
+        (17, 168, 205),
+        (229, 229, 229),
+        (102, 102, 102),
+        (241, 76, 76),
+        (35, 209, 139),
+        (245, 245, 67),
+        (59, 142, 234),
+        (214, 112, 214),
+        (41, 184, 219),
+        (255, 255, 255),
+    ]
+    steps = [0, 95, 135, 175, 215, 255]
+    palette += [(r, g, b) for r in steps for g in steps for b in steps]
+    palette += [(8 + 10 * i,) * 3 for i in range(24)]
+    return palette
+
+
+XTERM_PALETTE = _build_palette()
+
+
+def color_rgb(color: int) -> Optional[Tuple[int, int, int]]:
+    """Resolve a packed color to RGB.
+
+    Args:
+        color (int): A color from :func:`attr_fg` or :func:`attr_bg`.
+
+    Returns:
+        tuple or None: ``(r, g, b)``, or None for the default color.
+    """
+    if not color:
+        return None
+    if color & TRUECOLOR:
+        return ((color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF)
+    return XTERM_PALETTE[(color - 1) & 0xFF]
+
+
+@lru_cache(maxsize=4096)
+def char_width(char: str) -> int:
+    """Return how many cells a character occupies: 0, 1 or 2."""
+    if unicodedata.combining(char) or unicodedata.category(char) in ("Mn", "Me", "Cf"):
+        return 0
+    return 2 if unicodedata.east_asian_width(char) in ("W", "F") else 1
+
+
+class Line:
+    """One row of cells."""
+
+    __slots__ = ("chars", "attrs", "wrapped")
+
+    def __init__(self, columns: int, attr: int = DEFAULT_ATTR):
+        self.chars = [" "] * columns
+        self.attrs = [attr] * columns
+        # True when the text continues on the next line (soft wrap).
+        self.wrapped = False
+
+    def text(self) -> str:
+        """Return the row's text without trailing blanks.
+
+        The second cell of a wide character is stored as an empty string,
+        so it adds nothing to the text.
+        """
+        return "".join(self.chars).rstrip(" ")
+
+    def runs(self) -> List[Tuple[str, int]]:
+        """Split the row into ``(text, attr)`` runs, dropping trailing default blanks.
+
+        Returns:
+            List[Tuple[str, int]]: Consecutive cells with the same attribute.
+        """
+        chars, attrs = self.chars, self.attrs
+        end = len(chars)
+        while end and chars[end - 1] == " " and attrs[end - 1] == DEFAULT_ATTR:
+            end -= 1
+        runs = []
+        start = 0
+        while start < end:
+            attr = attrs[start]
+            stop = start + 1
+            while stop < end and attrs[stop] == attr:
+                stop += 1
+            runs.append(("".join(chars[start:stop]), attr))
+            start = stop
+        return runs
+
+    def resize(self, columns: int) -> None:
+        missing = columns - len(self.chars)
+        if missing > 0:
+            self.chars.extend([" "] * missing)
+            self.attrs.extend([DEFAULT_ATTR] * missing)
+        elif missing < 0:
+            del self.chars[columns:]
+            del self.attrs[columns:]
+
+
+class TerminalScreen:
+    """VT100/xterm screen state: cell grid, cursor, modes and scrollback."""
+
+    def __init__(
+        self,
+        columns: int = DEFAULT_COLUMNS,
+        rows: int = DEFAULT_ROWS,
+        scrollback_lines: int = DEFAULT_SCROLLBACK_LINES,
+        scrollback: Optional[ScrollbackStore] = None,
+    ):
+        """Initialize a blank screen.
+
+        Args:
+            columns (int, optional): Width in cells. Defaults to 80.
+            rows (int, optional): Height in cells. Defaults to 24.
+            scrollback_lines (int, optional): Lines kept after they scroll off
+                the top of the main screen. Defaults to 100000.
+            scrollback (ScrollbackStore, optional): Where those lines go, for
+                byte caps or spilling to disk. Defaults to a store capped at
+                ``scrollback_lines``.
+        """
+        self.columns = max(1, columns)
+        self.rows = max(1, rows)
+        if scrollback is None:
+            scrollback = ScrollbackStore(max_lines=scrollback_lines)
+        self.scrollback = scrollback
+        self.responses: List[str] = []
+        self.title = ""
+        self._pending = ""
+        self.reset()
+
+    # -- state ------------------------------------------------------------
+
+    def reset(self) -> None:
+        """Return to the power-on state (RIS), keeping the scrollback."""
+        self.main_buffer = [Line(self.columns) for _ in range(self.rows)]
+        self.alt_buffer: Optional[List[Line]] = None
+        self.buffer = self.main_buffer
+        self.cursor_x = 0
+        self.cursor_y = 0
+        self.attr = DEFAULT_ATTR
+        self.wrap_next = False
+        self.scroll_top = 0
+        self.scroll_bottom = self.rows - 1
+        self.autowrap = True
+        self.insert_mode = False
+        self.origin_mode = False
+        self.cursor_visible = True
+        self.application_cursor_keys = False
+        self.bracketed_paste = False
+        self.tab_stops = set(range(8, self.columns, 8))
+        self.charsets = ["B", "B"]
+        self.active_charset = 0
+        self._saved_cursor: Optional[Dict[str, Any]] = None
+        self._saved_main_cursor: Optional[Dict[str, Any]] = None
+        # Dirty rows are tracked by absolute line number (scrolled + row), so
+        # scrolling does not have to renumber them.
+        self._scrolled = 0
+        self._scrolled_since_take = 0
+        self._dirty = set(range(self.rows))
+        self._rebuild = True
+        self._history_cleared = False
+        # Absolute line of the cursor row when the last frame was taken.
+        self._frame_cursor = 0
+
+    @property
+    def alternate_screen(self) -> bool:
+        """bool: True while a full-screen program has the alternate screen."""
+        return self.buffer is not self.main_buffer
+
+    def line(self, row: int) -> Line:
+        """Return the :class:`Line` displayed at ``row``."""
+        return self.buffer[row]
+
+    def display(self) -> List[str]:
+        """Return the text of every screen row."""
+        return [line.text() for line in self.buffer]
+
+    def _touch(self, row: int) -> None:
+        self._dirty.add(self._scrolled + row)
+
+    def _touch_range(self, first: int, last: int) -> None:
+        base = self._scrolled
+        self._dirty.update(range(base + first, base + last + 1))
+
+    def take_changes(self) -> Dict[str, Any]:
+        """Collect what changed since the previous call, for a renderer.
+
+        Returns:
+            Dict[str, Any]: ``scrolled`` (how many lines scrolled off the top
+            of the main screen; they are the newest lines of ``scrollback``,
+            unless the store already dropped some), ``dirty`` (sorted rows
+            to redraw), ``rebuild`` (the row count changed; redraw every
+            row) and ``history_cleared`` (the scrollback was erased).
+        """
+        base = self._scrolled
+        dirty = sorted(
+            index - base for index in self._dirty if 0 <= index - base < self.rows
+        )
+        changes = {
+            "scrolled": self._scrolled_since_take,
+            "dirty": dirty,
+            "rebuild": self._rebuild,
+            "history_cleared": self._history_cleared,
+        }
+        self._scrolled_since_take = 0
+        self._dirty = set()
+        self._rebuild = False
+        self._history_cleared = False
+        return changes
+
+    def take_frame(self, history_limit: int) -> Dict[str, Any]:
+        """Collect the changes since the previous call with copies of what they affect.
+
+        A frame can be drawn without looking at the screen again, so it may
+        be taken on a thread that keeps feeding the screen while another one
+        paints. Use either this or :meth:`take_changes`, not both.
+
+        Args:
+            history_limit (int): Scrolled-off lines copied at most; the
+                newest ones are kept.
+
+        Returns:
+            Dict[str, Any]: The keys of :meth:`take_changes`, plus
+            ``history`` (the newest scrolled-off lines, oldest first),
+            ``rows`` (``{row: runs}`` for the dirty rows, the cursor row and
+            the row the cursor left), ``cursor`` (the cursor row and the
+            number of characters before the cursor on it), ``size`` (the
+            row count) and ``end`` (``scrollback.end``).
+        """
+        frame = self.take_changes()
+        scrollback = self.scrollback
+        wanted = min(frame["scrolled"], history_limit)
+        frame["history"] = scrollback.lines(scrollback.end - wanted, scrollback.end)
+        if frame["rebuild"] or len(frame["history"]) < frame["scrolled"]:
+            # Drawn from scratch: every row is needed.
+            rows = set(range(self.rows))
+        else:
+            rows = set(frame["dirty"])
+        previous = self._frame_cursor - self._scrolled
+        if 0 <= previous < self.rows:
+            rows.add(previous)
+        rows.add(self.cursor_y)
+        frame["rows"] = {row: self.buffer[row].runs() for row in rows}
+        line = self.buffer[self.cursor_y]
+        frame["cursor"] = (self.cursor_y, len("".join(line.chars[: self.cursor_x])))
+        frame["size"] = self.rows
+        frame["end"] = scrollback.end
+        self._frame_cursor = self._scrolled + self.cursor_y
+        return frame
+
+    _SNAPSHOT_FIELDS = (
+        "cursor_x",
+        "cursor_y",
+        "attr",
+        "wrap_next",
+        "scroll_top",
+        "scroll_bottom",
+        "autowrap",
+        "insert_mode",
+        "origin_mode",
+        "cursor_visible",
+        "application_cursor_keys",
+        "bracketed_paste",
+        "charsets",
+        "active_charset",
+        "title",
+    )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the screen state (without the scrollback) as JSON-compatible data.
+
+        Returns:
+            Dict[str, Any]: State for :meth:`restore`.
+        """
+
+        def dump(buffer):
+            return [
+                [line.chars, _run_lengths(line.attrs), line.wrapped] for line in buffer
+            ]
+
+        state = {name: getattr(self, name) for name in self._SNAPSHOT_FIELDS}
+        state.update(
+            columns=self.columns,
+            rows=self.rows,
+            main=dump(self.main_buffer),
+            alt=dump(self.alt_buffer) if self.alt_buffer is not None else None,
+            charsets=list(self.charsets),
+            alternate=self.alternate_screen,
+            tab_stops=sorted(self.tab_stops),
+            saved_cursor=self._saved_cursor,
+            saved_main_cursor=self._saved_main_cursor,
+            pending=self._pending,
+        )
+        return state
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """Return to a state taken with :meth:`snapshot`; the scrollback is cleared.
+
+        Args:
+            state (Dict[str, Any]): The snapshot.
+        """
+
+        def load(rows):
+            buffer = []
+            for chars, attr_runs, wrapped in rows:
+                line = Line(0)
+                line.chars = list(chars)
+                line.attrs = [attr for attr, count in attr_runs for _ in range(count)]
+                line.wrapped = wrapped
+                buffer.append(line)
+            return buffer
+
+        self.columns, self.rows = state["columns"], state["rows"]
+        for name in self._SNAPSHOT_FIELDS:
+            setattr(self, name, state[name])
+        self.charsets = list(self.charsets)
+        self.main_buffer = load(state["main"])
+        self.alt_buffer = load(state["alt"]) if state["alt"] is not None else None
+        self.buffer = self.alt_buffer if state["alternate"] else self.main_buffer
+        self.tab_stops = set(state["tab_stops"])
+        self._saved_cursor = state["saved_cursor"]
+        self._saved_main_cursor = state["saved_main_cursor"]
+        self._pending = state["pending"]
+        self.scrollback.clear()
+        self._history_cleared = True
+        self._rebuild = True
+        self._touch_range(0, self.rows - 1)
+
+    def take_responses(self) -> str:
+        """Return and clear the replies queued for the remote side."""
+        responses, self.responses = "".join(self.responses), []
+        return responses
+
+    def resize(self, columns: int, rows: int) -> None:
+        """Change the screen size, keeping the cursor row on screen.
+
+        Args:
+            columns (int): New width in cells.
+            rows (int): New height in cells.
+        """
+        columns, rows = max(1, columns), max(1, rows)
+        if (columns, rows) == (self.columns, self.rows):
+            return
+        for buffer in filter(None, (self.main_buffer, self.alt_buffer)):
+            for line in buffer:
+                line.resize(columns)
+        if rows < self.rows:
+            # Lines above the cursor go to the scrollback first, the rest
+            # are cut from the bottom.
+            excess = self.rows - rows
+            push = min(excess, max(0, self.cursor_y - rows + 1))
+            for _ in range(push):
+                self._push_history(self.main_buffer.pop(0))
+            del self.main_buffer[rows:]
+            if self.alt_buffer is not None:
+                del self.alt_buffer[rows:]
+            self.cursor_y = max(0, self.cursor_y - push)
+        else:
+            for buffer in filter(None, (self.main_buffer, self.alt_buffer)):
+                buffer.extend(Line(columns) for _ in range(rows - self.rows))
+        self.columns, self.rows = columns, rows
+        self.scroll_top, self.scroll_bottom = 0, rows - 1
+        self.tab_stops = {stop for stop in self.tab_stops if stop < columns} | set(
+            range(8, columns, 8)
+        )
+        self.cursor_x = min(self.cursor_x, columns - 1)
+        self.cursor_y = min(self.cursor_y, rows - 1)
+        self.wrap_next = False
+        self._rebuild = True
+        self._touch_range(0, rows - 1)
+
+    # -- input ------------------------------------------------------------
+
+    def feed(self, text: str) -> None:
+        """Interpret a chunk of decoded output.
+
+        Args:
+            text (str): The output. Escape sequences may be split across
+                chunks; an unfinished one is completed by the next call.
+        """
+        if self._pending:
+            text = self._pending + text
+            self._pending = ""
+        position = 0
+        end = len(text)
+        while position < end:
+            match = _CONTROL.search(text, position)
+            stop = match.start() if match else end
+            if stop > position:
+                self._print(text[position:stop])
+            if not match:
+                break
+            char = text[stop]
+            if char != "\x1b":
+                self._control(char)
+                position = stop + 1
+                continue
+            escape = _ESCAPE.match(text, stop)
+            if escape:
+                self._escape(escape)
+                position = escape.end()
+            elif _PARTIAL_ESCAPE.match(text, stop) and end - stop < MAX_PENDING_ESCAPE:
+                self._pending = text[stop:]
+                break
+            else:
+                position = stop + 1
+
+    def _print(self, text: str) -> None:
+        if self.charsets[self.active_charset] == "0":
+            text = "".join(DEC_GRAPHICS.get(char, char) for char in text)
+        if text.isascii():
+            self._print_narrow(text)
+            return
+        run_start = 0
+        for index, char in enumerate(text):
+            width = char_width(char)
+            if width == 1:
+                continue
+            if index > run_start:
+                self._print_narrow(text[run_start:index])
+            run_start = index + 1
+            if width == 0:
+                self._combine(char)
+            else:
+                self._print_wide(char)
+        if run_start < len(text):
+            self._print_narrow(text[run_start:])
+
+    def _wrap(self) -> None:
+        self.buffer[self.cursor_y].wrapped = True
+        self.cursor_x = 0
+        self._index()
+        self.wrap_next = False
+
+    def _print_narrow(self, text: str) -> None:
+        columns = self.columns
+        attr = self.attr
+        while text:
+            if self.wrap_next:
+                if self.autowrap:
+                    self._wrap()
+                else:
+                    self.wrap_next = False
+            line = self.buffer[self.cursor_y]
+            x = self.cursor_x
+            count = min(len(text), columns - x)
+            if not self.autowrap and len(text) > count:
+                # Without autowrap the rest overwrites the last column.
+                text = text[: count - 1] + text[-1]
+            chunk, text = text[:count], text[count:]
+            if self.insert_mode:
+                del line.chars[columns - count :]
+                del line.attrs[columns - count :]
+                line.chars[x:x] = chunk
+                line.attrs[x:x] = [attr] * count
+            else:
+                line.chars[x : x + count] = chunk
+                line.attrs[x : x + count] = [attr] * count
+            self._touch(self.cursor_y)
+            x += count
+            if x >= columns:
+                self.cursor_x = columns - 1
+                self.wrap_next = True
+            else:
+                self.cursor_x = x
+            if not self.autowrap:
+                text = ""
+
+    def _print_wide(self, char: str) -> None:
+        if self.columns < 2:
+            return
+        if self.wrap_next or self.cursor_x >= self.columns - 1:
+            if self.autowrap:
+                if not self.wrap_next:
+                    self._erase_cells(self.cursor_y, self.cursor_x, self.columns)
+                self._wrap()
+            else:
+                self.cursor_x = self.columns - 2
+                self.wrap_next = False
+        line = self.buffer[self.cursor_y]
+        x = self.cursor_x
+        line.chars[x : x + 2] = [char, ""]
+        line.attrs[x : x + 2] = [self.attr, self.attr]
+        self._touch(self.cursor_y)
+        if x + 2 >= self.columns:
+            self.cursor_x = self.columns - 1
+            self.wrap_next = True
+        else:
+            self.cursor_x = x + 2
+
+    def _combine(self, char: str) -> None:
+        x = self.columns - 1 if self.wrap_next else self.cursor_x - 1
+        line = self.buffer[self.cursor_y]
+        while x > 0 and line.chars[x] == "":
+            x -= 1
+        if x >= 0:
+            line.chars[x] += char
+            self._touch(self.cursor_y)
+
+    def _control(self, char: str) -> None:
+        if char == "\r":
+            self.cursor_x = 0
+            self.wrap_next = False
+        elif char in "\n\x0b\x0c":
+            self._index()
+        elif char == "\x08":
+            if self.wrap_next:
+                self.wrap_next = False
+            elif self.cursor_x > 0:
+                self.cursor_x -= 1
+        elif char == "\t":
+            self.cursor_x = min(
+                [stop for stop in self.tab_stops if stop > self.cursor_x]
+                or [self.columns - 1]
+            )
+            self.wrap_next = False
+        elif char == "\x0e":
+            self.active_charset = 1
+        elif char == "\x0f":
+            self.active_charset = 0
+
+    # -- scrolling --------------------------------------------------------
+
+    def _push_history(self, line: Line) -> None:
+        self.scrollback.append(line.runs(), line.wrapped)
+        # Only rows on screen are worth redrawing; while frames are not
+        # being taken, this keeps the set to a screenful.
+        self._dirty.discard(self._scrolled)
+        self._scrolled += 1
+        self._scrolled_since_take += 1
+
+    def _index(self) -> None:
+        if self.cursor_y == self.scroll_bottom:
+            self.scroll_up(1)
+        elif self.cursor_y < self.rows - 1:
+            self.cursor_y += 1
+        self.wrap_next = False
+
+    def _reverse_index(self) -> None:
+        if self.cursor_y == self.scroll_top:
+            self.scroll_down(1)
+        elif self.cursor_y > 0:
+            self.cursor_y -= 1
+        self.wrap_next = False
+
+    def scroll_up(self, count: int = 1) -> None:
+        """Scroll the scroll region up, feeding the scrollback when it is the whole main screen."""
+        top, bottom = self.scroll_top, self.scroll_bottom
+        count = min(count, bottom - top + 1)
+        buffer = self.buffer
+        if top == 0 and bottom == self.rows - 1 and not self.alternate_screen:
+            # Dirty rows are numbered absolutely, so the shift is free; only
+            # the new blank rows at the bottom need drawing.
+            for _ in range(count):
+                self._push_history(buffer.pop(0))
+                buffer.append(Line(self.columns, self._blank_attr()))
+            self._touch_range(self.rows - count, self.rows - 1)
+            return
+        del buffer[top : top + count]
+        for _ in range(count):
+            buffer.insert(bottom - count + 1, Line(self.columns, self._blank_attr()))
+        self._touch_range(top, bottom)
+
+    def scroll_down(self, count: int = 1) -> None:
+        """Scroll the scroll region down, inserting blank lines at its top."""
+        top, bottom = self.scroll_top, self.scroll_bottom
+        count = min(count, bottom - top + 1)
+        del self.buffer[bottom - count + 1 : bottom + 1]
+        for _ in range(count):
+            self.buffer.insert(top, Line(self.columns, self._blank_attr()))
+        self._touch_range(top, bottom)
+
+    # -- erasing ----------------------------------------------------------
+
+    def _blank_attr(self) -> int:
+        # Erased cells keep the current background color (xterm's BCE).
+        return self.attr & (_COLOR_MASK << _BG_SHIFT)
+
+    def _erase_cells(self, row: int, start: int, stop: int) -> None:
+        line = self.buffer[row]
+        stop = min(stop, self.columns)
+        if start >= stop:
+            return
+        line.chars[start:stop] = [" "] * (stop - start)
+        line.attrs[start:stop] = [self._blank_attr()] * (stop - start)
+        line.wrapped = line.wrapped and stop < self.columns
+        self._touch(row)
+
+    def erase_in_display(self, mode: int = 0) -> None:
+        """ED: 0 erases below the cursor, 1 above, 2 the whole screen, 3 the scrollback."""
+        if mode == 0:
+            self._erase_cells(self.cursor_y, self.cursor_x, self.columns)
+            for row in range(self.cursor_y + 1, self.rows):
+                self._erase_cells(row, 0, self.columns)
+        elif mode == 1:
+            for row in range(self.cursor_y):
+                self._erase_cells(row, 0, self.columns)
+            self._erase_cells(self.cursor_y, 0, self.cursor_x + 1)
+        elif mode == 2:
+            for row in range(self.rows):
+                self._erase_cells(row, 0, self.columns)
+        elif mode == 3:
+            self.scrollback.clear()
+            self._history_cleared = True
+            self._rebuild = True
+
+    def erase_in_line(self, mode: int = 0) -> None:
+        """EL: 0 erases right of the cursor, 1 left of it, 2 the whole line."""
+        if mode == 0:
+            self._erase_cells(self.cursor_y, self.cursor_x, self.columns)
+        elif mode == 1:
+            self._erase_cells(self.cursor_y, 0, self.cursor_x + 1)
+        elif mode == 2:
+            self._erase_cells(self.cursor_y, 0, self.columns)
+
+    # -- escape sequences -------------------------------------------------
+
+    def _escape(self, match) -> None:
+        final = match.group("final")
+        if final is not None:
+            self._csi(match.group("params"), match.group("inter"), final)
+        elif match.group("osc") is not None:
+            self._osc(match.group("osc"))
+        elif match.group("charset") is not None:
+            self.charsets["()*+".index(match.group("charset")) % 2] = match.group(
+                "designator"
+            )[-1]
+        elif match.group("hash") is not None:
+            if match.group("hash") == "8":
+                # DECALN: fill the screen with E (alignment test).
+                for row in range(self.rows):
+                    line = self.buffer[row]
+                    line.chars[:] = ["E"] * self.columns
+                    line.attrs[:] = [DEFAULT_ATTR] * self.columns
+                self._touch_range(0, self.rows - 1)
+        elif match.group("esc") is not None:
+            self._esc(match.group("esc"))
+
+    def _esc(self, final: str) -> None:
+        if final == "7":
+            self._saved_cursor = self._cursor_state()
+        elif final == "8":
+            self._restore_cursor(self._saved_cursor)
+        elif final == "D":
+            self._index()
+        elif final == "E":
+            self.cursor_x = 0
+            self._index()
+        elif final == "M":
+            self._reverse_index()
+        elif final == "H":
+            self.tab_stops.add(self.cursor_x)
+        elif final == "c":
+            self.reset()
+        # "=" / ">" (keypad modes) only affect what the keyboard sends.
+
+    def _osc(self, body: str) -> None:
+        command, _, value = body.partition(";")
+        if command in ("0", "2"):
+            self.title = value
+
+    def _cursor_state(self) -> Dict[str, Any]:
+        return {
+            "x": self.cursor_x,
+            "y": self.cursor_y,
+            "attr": self.attr,
+            "wrap_next": self.wrap_next,
+            "origin_mode": self.origin_mode,
+            "charsets": list(self.charsets),
+            "active_charset": self.active_charset,
+        }
+
+    def _restore_cursor(self, state: Optional[Dict[str, Any]]) -> None:
+        if state is None:
+            self.cursor_x = self.cursor_y = 0
+            self.attr = DEFAULT_ATTR
+            return
+        self.cursor_x = min(state["x"], self.columns - 1)
+        self.cursor_y = min(state["y"], self.rows - 1)
+        self.attr = state["attr"]
+        self.wrap_next = state["wrap_next"]
+        self.origin_mode = state["origin_mode"]
+        self.charsets = list(state["charsets"])
+        self.active_charset = state["active_charset"]
+
+    def _move_to(self, row: int, column: int) -> None:
+        if self.origin_mode:
+            row = min(max(row + self.scroll_top, self.scroll_top), self.scroll_bottom)
+        self.cursor_y = min(max(row, 0), self.rows - 1)
+        self.cursor_x = min(max(column, 0), self.columns - 1)
+        self.wrap_next = False
+
+    def _csi(self, params: str, intermediates: str, final: str) -> None:
+        private = params[:1] if params[:1] in "?<=>" else ""
+        if private:
+            params = params[1:]
+        values = [int(value) if value.isdigit() else 0 for value in params.split(";")]
+        first = values[0]
+        count = max(first, 1)
+
+        if final == "m" and not private:
+            self._sgr(params)
+        elif final in "Hf":
+            row = values[1] if len(values) > 1 else 0
+            self._move_to(count - 1, max(row, 1) - 1)
+        elif final == "A":
+            top = self.scroll_top if self.cursor_y >= self.scroll_top else 0
+            self.cursor_y = max(self.cursor_y - count, top)
+            self.wrap_next = False
+        elif final == "B" or final == "e":
+            bottom = self.scroll_bottom if self.cursor_y <= self.scroll_bottom else self.rows - 1
+            self.cursor_y = min(self.cursor_y + count, bottom)
+            self.wrap_next = False
+        elif final == "C" or final == "a":
+            self.cursor_x = min(self.cursor_x + count, self.columns - 1)
+            self.wrap_next = False
+        elif final == "D":
+            self.cursor_x = max(self.cursor_x - count, 0)
+            self.wrap_next = False
+        elif final == "E":
+            self._move_to(self.cursor_y + count - (self.scroll_top if self.origin_mode else 0), 0)
+        elif final == "F":
+            self._move_to(self.cursor_y - count - (self.scroll_top if self.origin_mode else 0), 0)
+        elif final in "G`":
+            self.cursor_x = min(count - 1, self.columns - 1)
+            self.wrap_next = False
+        elif final == "d":
+            self._move_to(count - 1, self.cursor_x)
+        elif final == "J":
+            self.erase_in_display(first)
+        elif final == "K":
+            self.erase_in_line(first)
+        elif final == "X":
+            self._erase_cells(self.cursor_y, self.cursor_x, self.cursor_x + count)
+        elif final == "@":
+            self._insert_cells(count)
+        elif final == "P":
+            self._delete_cells(count)
+        elif final == "L":
+            self._insert_lines(count)
+        elif final == "M":
+            self._delete_lines(count)
+        elif final == "S" and not private:
+            self.scroll_up(count)
+        elif final == "T" and not private:
+            self.scroll_down(count)
+        elif final == "r" and not private:
+            top = count - 1
+            bottom = (values[1] if len(values) > 1 and values[1] else self.rows) - 1
+            if top < bottom < self.rows:
+                self.scroll_top, self.scroll_bottom = top, bottom
+                self._move_to(0, 0)
+        elif final == "s" and not private:
+            self._saved_cursor = self._cursor_state()
+        elif final == "u" and not private:
+            self._restore_cursor(self._saved_cursor)
+        elif final == "g":
+            if first == 0:
+                self.tab_stops.discard(self.cursor_x)
+            elif first == 3:
+                self.tab_stops.clear()
+        elif final in "hl":
+            for value in values:
+                self._set_mode(private, value, final == "h")
+        elif final == "n" and not private:
+            if first == 5:
+                self.responses.append("\x1b[0n")
+            elif first == 6:
+                row = self.cursor_y - (self.scroll_top if self.origin_mode else 0)
+                self.responses.append(f"\x1b[{row + 1};{self.cursor_x + 1}R")
+        elif final == "c" and first == 0:
+            if private == ">":
+                self.responses.append("\x1b[>0;10;1c")
+            elif not private:
+                self.responses.append("\x1b[?1;2c")
+
+    def _insert_cells(self, count: int) -> None:
+        line = self.buffer[self.cursor_y]
+        x = self.cursor_x
+        count = min(count, self.columns - x)
+        line.chars[x:x] = [" "] * count
+        line.attrs[x:x] = [self._blank_attr()] * count
+        del line.chars[self.columns :]
+        del line.attrs[self.columns :]
+        self.wrap_next = False
+        self._touch(self.cursor_y)
+
+    def _delete_cells(self, count: int) -> None:
+        line = self.buffer[self.cursor_y]
+        x = self.cursor_x
+        count = min(count, self.columns - x)
+        del line.chars[x : x + count]
+        del line.attrs[x : x + count]
+        line.chars.extend([" "] * count)
+        line.attrs.extend([self._blank_attr()] * count)
+        self.wrap_next = False
+        self._touch(self.cursor_y)
+
+    def _insert_lines(self, count: int) -> None:
+        if not self.scroll_top <= self.cursor_y <= self.scroll_bottom:
+            return
+        top = self.scroll_top
+        self.scroll_top = self.cursor_y
+        self.scroll_down(count)
+        self.scroll_top = top
+        self.cursor_x = 0
+
+    def _delete_lines(self, count: int) -> None:
+        if not self.scroll_top <= self.cursor_y <= self.scroll_bottom:
+            return
+        # Unlike scroll_up, deleted lines never feed the scrollback.
+        bottom = self.scroll_bottom
+        count = min(count, bottom - self.cursor_y + 1)
+        del self.buffer[self.cursor_y : self.cursor_y + count]
+        for _ in range(count):
+            self.buffer.insert(bottom - count + 1, Line(self.columns, self._blank_attr()))
+        self._touch_range(self.cursor_y, bottom)
+        self.cursor_x = 0
+        self.wrap_next = False
+
+    def _set_mode(self, private: str, mode: int, enabled: bool) -> None:
+        if private == "?":
+            if mode == 1:
+                self.application_cursor_keys = enabled
+            elif mode == 6:
+                self.origin_mode = enabled
+                self._move_to(0, 0)
+            elif mode == 7:
+                self.autowrap = enabled
+            elif mode == 25:
+                self.cursor_visible = enabled
+                self._touch(self.cursor_y)
+            elif mode in (47, 1047, 1049):
+                self._set_alternate_screen(enabled, save_cursor=mode == 1049)
+            elif mode == 1048:
+                if enabled:
+                    self._saved_cursor = self._cursor_state()
+                else:
+                    self._restore_cursor(self._saved_cursor)
+            elif mode == 2004:
+                self.bracketed_paste = enabled
+        elif mode == 4:
+            self.insert_mode = enabled
+
+    def _set_alternate_screen(self, enabled: bool, save_cursor: bool) -> None:
+        if enabled == self.alternate_screen:
+            return
+        if enabled:
+            if save_cursor:
+                self._saved_main_cursor = self._cursor_state()
+            self.alt_buffer = [Line(self.columns) for _ in range(self.rows)]
+            self.buffer = self.alt_buffer
+        else:
+            self.buffer = self.main_buffer
+            self.alt_buffer = None
+            if save_cursor:
+                self._restore_cursor(self._saved_main_cursor)
+        self.scroll_top, self.scroll_bottom = 0, self.rows - 1
+        self.wrap_next = False
+        self._touch_range(0, self.rows - 1)
+
+    def _sgr(self, params: str) -> None:
+        flags, fg, bg = attr_flags(self.attr), attr_fg(self.attr), attr_bg(self.attr)
+        parts = params.split(";") if params else ["0"]
+        index = 0
+        while index < len(parts):
+            part = parts[index]
+            index += 1
+            if ":" in part:
+                # ISO 8613-6 form: 38:5:n or 38:2:[colorspace]:r:g:b.
+                sub = [int(value) if value.isdigit() else 0 for value in part.split(":")]
+                value = sub[0]
+                color = _extended_color(sub[1:2] + sub[-3:] if sub[1:2] == [2] else sub[1:])
+            else:
+                value = int(part) if part.isdigit() else 0
+                color = None
+                if value in (38, 48):
+                    kind = parts[index] if index < len(parts) else ""
+                    size = 5 if kind == "2" else 2
+                    values = [int(v) if v.isdigit() else 0 for v in parts[index : index + size]]
+                    index += size
+                    color = _extended_color(values)
+            if value == 0:
+                flags, fg, bg = 0, 0, 0
+            elif value in _SGR_FLAGS:
+                flags |= _SGR_FLAGS[value]
+            elif value in _SGR_RESET_FLAGS:
+                flags &= ~_SGR_RESET_FLAGS[value]
+            elif 30 <= value <= 37:
+                fg = value - 29
+            elif 40 <= value <= 47:
+                bg = value - 39
+            elif 90 <= value <= 97:
+                fg = value - 81
+            elif 100 <= value <= 107:
+                bg = value - 91
+            elif value == 39:
+                fg = 0
+            elif value == 49:
+                bg = 0
+            elif value == 38 and color is not None:
+                fg = color
+            elif value == 48 and color is not None:
+                bg = color
+        self.attr = pack_attr(flags, fg, bg)
+
+
+def _run_lengths(values: List[int]) -> List[List[int]]:
+    """Compress a list into ``[value, count]`` pairs."""
+    runs: List[List[int]] = []
+    for value in values:
+        if runs and runs[-1][0] == value:
+            runs[-1][1] += 1
+        else:
+            runs.append([value, 1])
+    return runs
+
+
+def _extended_color(values: List[int]) -> Optional[int]:
+    """Pack the color of an SGR 38/48 sequence from ``[5, n]`` or ``[2, r, g, b]``."""
+    if len(values) == 2 and values[0] == 5:
+        return 1 + (values[1] & 0xFF)
+    if len(values) == 4 and values[0] == 2:
+        red, green, blue = (min(channel, 255) for channel in values[1:])
+        return TRUECOLOR | (red << 16) | (green << 8) | blue
+    return None
@@ -7,7 +7,7 @@ to set specific themes for terminal and chief output.
 # pylint: disable=no-name-in-module
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QColor, QPalette
-from PyQt5.QtWidgets import QApplication, QTextEdit
+from PyQt5.QtWidgets import QApplication
 
 
 class ThemeManager:
@@ -82,23 +82,14 @@ class ThemeManager:
         app.setStyleSheet("")
 
     @staticmethod
-    def set_terminal_theme(terminal: QTextEdit):
+    def set_terminal_theme(terminal):
         """Set the theme for the terminal widget.
 
         Args:
-            terminal (QTextEdit): The terminal widget instance.
+            terminal (TerminalView): The terminal widget instance.
         """
-        terminal.setStyleSheet(
-            """
-            QTextEdit {
-                background-color: #000000;
-                color: #FFFFFF;
-                border: none;
-                font-family: 'Consolas', monospace;
-                font-size: 10pt;
-            }
-        """
-        )
+        terminal.set_colors("#FFFFFF", "#000000")
+        terminal.setStyleSheet("border: none;")
 
     @staticmethod
     def set_chief_output_theme(chief_output):
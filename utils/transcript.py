@@ -0,0 +1,265 @@
+"""Transcript module for Eagle Terminal.
+
+This module records the raw output of a session to compressed, rotating
+transcript files without ever making the reader or renderer wait for the
+disk:
+
+- ``TranscriptWriter`` is an output stage. Each chunk is copied, stamped
+  with the time it arrived and put on a bounded queue; a background
+  thread compresses and writes the queue in batches.
+- When the queue is full (the disk cannot keep up), chunks are dropped
+  instead of blocking, and a marker recording how many bytes were lost is
+  written once the writer catches up.
+- Files are zstd-compressed when ``zstandard`` is installed and gzipped
+  otherwise, and roll over after ``max_bytes`` of output.
+
+Each file is a sequence of records: a ``"<unix time> <length>\\n"`` header,
+the raw chunk and a newline, so ``zcat``/``zstdcat`` shows the session and
+:func:`read_transcript` gives back the exact chunks and their timing.
+"""
+
+import gzip
+import io
+import os
+import queue
+import re
+import threading
+import time
+from typing import Iterator, List, Optional, Tuple
+
+from utils.logger import logger
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_TRANSCRIPT_DIR = os.path.join("logs", "transcripts")
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_FILES = 20
+DEFAULT_QUEUE_SIZE = 4096
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+EXTENSIONS = {"zstd": ".log.zst", "gzip": ".log.gz"}
+
+_UNSAFE_NAME = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def default_compression() -> str:
+    """Return "zstd" if ``zstandard`` is installed, otherwise "gzip"."""
+    return "zstd" if zstandard is not None else "gzip"
+
+
+def _open_compressed(path: str, compression: str):
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is not installed")
+        return zstandard.ZstdCompressor(level=3).stream_writer(open(path, "wb"))
+    return gzip.open(path, "wb", compresslevel=6)
+
+
+def _open_decompressed(path: str):
+    if path.endswith(EXTENSIONS["zstd"]):
+        if zstandard is None:
+            raise RuntimeError("zstandard is not installed")
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+        return io.BufferedReader(reader)
+    return gzip.open(path, "rb")
+
+
+class TranscriptWriter:
+    """Output stage streaming a session's raw output to transcript files."""
+
+    def __init__(
+        self,
+        session_name: str,
+        directory: str = DEFAULT_TRANSCRIPT_DIR,
+        compression: Optional[str] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_files: Optional[int] = DEFAULT_MAX_FILES,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ):
+        """Initialize the writer and start its thread.
+
+        Args:
+            session_name (str): Used in the file names, e.g. the hostname.
+            directory (str, optional): Where transcripts go. Defaults to "logs/transcripts".
+            compression (str, optional): "zstd" or "gzip". Defaults to zstd when available.
+            max_bytes (int, optional): Uncompressed output per file before it
+                rolls over. Defaults to 64 MiB.
+            max_files (int, optional): Files kept per writer; the oldest are
+                deleted. None keeps all of them. Defaults to 20.
+            queue_size (int, optional): Chunks that may wait for the writer
+                thread before new ones are dropped. Defaults to 4096.
+            flush_interval (float, optional): Seconds between flushes to disk,
+                bounding what a crash can lose. Defaults to 1.0.
+        """
+        self.compression = compression or default_compression()
+        if self.compression not in EXTENSIONS:
+            raise ValueError(f"Unknown transcript compression: {self.compression}")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.flush_interval = flush_interval
+        self.prefix = "{}-{}".format(
+            _UNSAFE_NAME.sub("_", session_name) or "session",
+            time.strftime("%Y%m%d-%H%M%S"),
+        )
+        self.files: List[str] = []
+        self.bytes_written = 0
+        self.bytes_dropped = 0
+        self._queue: "queue.Queue[Optional[Tuple[float, bytes]]]" = queue.Queue(
+            queue_size
+        )
+        self._dropped_pending = 0
+        self._drop_lock = threading.Lock()
+        self._file = None
+        self._file_bytes = 0
+        self._sequence = 0
+        self._closed = False
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(
+            target=self._run, name=f"transcript-{self.prefix}", daemon=True
+        )
+        self._thread.start()
+
+    def __call__(self, view: memoryview) -> None:
+        self.write(view)
+
+    def write(self, data) -> bool:
+        """Queue a chunk of output. Never blocks.
+
+        Args:
+            data (bytes-like): The raw chunk.
+
+        Returns:
+            bool: False if the chunk was dropped because the queue is full.
+        """
+        if self._closed or not len(data):
+            return not self._closed
+        try:
+            self._queue.put_nowait((time.time(), bytes(data)))
+            return True
+        except queue.Full:
+            with self._drop_lock:
+                self._dropped_pending += len(data)
+                self.bytes_dropped += len(data)
+            return False
+
+    @property
+    def current_file(self) -> Optional[str]:
+        """str: The file being written, or None before the first chunk."""
+        return self.files[-1] if self.files else None
+
+    def _rotate(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        self._sequence += 1
+        path = os.path.join(
+            self.directory,
+            f"{self.prefix}-{self._sequence:03d}{EXTENSIONS[self.compression]}",
+        )
+        self._file = _open_compressed(path, self.compression)
+        self._file_bytes = 0
+        self.files.append(path)
+        if self.max_files and len(self.files) > self.max_files:
+            for old in self.files[: -self.max_files]:
+                try:
+                    os.remove(old)
+                except OSError as e:
+                    logger.warning(f"Could not remove old transcript {old}: {str(e)}")
+            self.files = self.files[-self.max_files :]
+
+    def _write_record(self, timestamp: float, data: bytes) -> None:
+        if self._file is None or self._file_bytes >= self.max_bytes:
+            self._rotate()
+        self._file.write(b"%.6f %d\n" % (timestamp, len(data)))
+        self._file.write(data)
+        self._file.write(b"\n")
+        self._file_bytes += len(data)
+        self.bytes_written += len(data)
+
+    def _flush(self) -> None:
+        if self._file is None:
+            return
+        if self.compression == "zstd":
+            self._file.flush(zstandard.FLUSH_BLOCK)
+        else:
+            self._file.flush()
+
+    def _run(self) -> None:
+        last_flush = time.monotonic()
+        done = False
+        while not done:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                batch = []
+            # Drain whatever else is waiting so records are written in batches.
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                for record in batch:
+                    if record is None:
+                        done = True
+                        break
+                    self._write_record(*record)
+                with self._drop_lock:
+                    dropped, self._dropped_pending = self._dropped_pending, 0
+                if dropped:
+                    marker = f"\r\n[transcript: {dropped} bytes dropped]\r\n"
+                    self._write_record(time.time(), marker.encode("ascii"))
+                if done or time.monotonic() - last_flush >= self.flush_interval:
+                    self._flush()
+                    last_flush = time.monotonic()
+            except Exception as e:
+                logger.error(f"Transcript {self.prefix} failed: {str(e)}")
+                self._closed = True
+                done = True
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception as e:
+                logger.error(f"Error closing transcript {self.prefix}: {str(e)}")
+            self._file = None
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Write everything queued, close the file and stop the thread.
+
+        Args:
+            timeout (float, optional): Seconds to wait for the writer. Defaults to 5.
+        """
+        if self._closed and not self._thread.is_alive():
+            return
+        self._closed = True
+        # The sentinel must not be dropped, so this put may wait for room.
+        self._queue.put(None)
+        self._thread.join(timeout)
+        logger.info(
+            f"Transcript {self.prefix} closed: {self.bytes_written} bytes written, "
+            f"{self.bytes_dropped} dropped"
+        )
+
+
+def read_transcript(path: str) -> Iterator[Tuple[float, bytes]]:
+    """Read back the chunks of a transcript file.
+
+    Args:
+        path (str): A ``.log.zst`` or ``.log.gz`` transcript.
+
+    Yields:
+        Tuple[float, bytes]: The arrival time and the raw chunk.
+    """
+    with _open_decompressed(path) as f:
+        while True:
+            header = f.readline()
+            if not header.endswith(b"\n"):
+                return
+            timestamp, length = header.split()
+            data = f.read(int(length))
+            f.read(1)
+            yield float(timestamp), data
@@ -0,0 +1,863 @@
+"""Transport pool module for Eagle Terminal.
+
+This module provides a process-wide pool of authenticated SSH transports.
+Terminal tabs, device status sweeps, command execution and the SFTP file
+browser all ask the pool for channels instead of opening their own
+``paramiko.SSHClient``, so a device only pays for one TCP handshake, key
+exchange and authentication no matter how many subsystems talk to it.
+
+Every transport sends SSH keepalives, and keys can be pinned so that their
+transports are kept open while idle (the session supervisor pins favorite
+devices this way). Sockets are tuned with TCP_NODELAY and TCP keepalives,
+and a named connection profile selects the algorithms and compression.
+
+Devices behind jump hosts (ProxyJump) are reached through ``direct-tcpip``
+channels opened on the bastion's own pooled transport. The bastion is
+authenticated once and then tunnels to every device behind it, whichever
+subsystem asks, so reaching hundreds of devices through one bastion costs
+one bastion handshake. Chains of several jump hosts work the same way,
+one pooled transport per hop.
+"""
+
+import hashlib
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+import paramiko
+
+from utils.connection_profiles import paramiko_connect_kwargs, tune_socket
+from utils.logger import logger
+
+DEFAULT_MAX_CHANNELS = 8
+DEFAULT_IDLE_TIMEOUT = 300
+DEFAULT_HEALTH_CHECK_INTERVAL = 30
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_KEEPALIVE_INTERVAL = 30
+# Interactive shells get a larger window than paramiko's 2 MiB default so
+# bulk output (large files, full routing tables) is not throttled by
+# window adjustments on high-latency links.
+SHELL_WINDOW_SIZE = 16 * 1024 * 1024
+SHELL_MAX_PACKET_SIZE = 32768
+# Seconds a slot handed out by acquire() is held for the channel to open.
+RESERVATION_TIMEOUT = DEFAULT_CONNECT_TIMEOUT
+# Host key policy every consumer connects with (see make_pool_params).
+# Keys in known_hosts are still checked, so a changed key is refused.
+DEFAULT_HOST_KEY_POLICY = paramiko.AutoAddPolicy
+
+PoolKey = Tuple[str, int, str, str]
+JumpHosts = Union[None, str, Sequence[Union[str, Dict[str, Any]]]]
+JUMP_HOST_KEYS = (
+    "hostname",
+    "port",
+    "username",
+    "password",
+    "key_filename",
+    "connection_profile",
+)
+
+
+def parse_jump_host(spec: str) -> Dict[str, Any]:
+    """Parse one OpenSSH-style ``[user@]host[:port]`` jump host.
+
+    Args:
+        spec (str): The jump host, e.g. ``"admin@bastion.example.com:2222"``.
+            IPv6 addresses are written in brackets: ``"admin@[2001:db8::1]:22"``.
+
+    Returns:
+        Dict[str, Any]: The hop with ``hostname``, ``port`` and ``username``.
+
+    Raises:
+        ValueError: If the spec has no host or an invalid port.
+    """
+    username, _, address = spec.strip().rpartition("@")
+    port = 22
+    if address.startswith("["):
+        host, _, rest = address[1:].partition("]")
+        if rest.startswith(":"):
+            port = rest[1:]
+    elif address.count(":") == 1:
+        host, port = address.split(":")
+    else:
+        host = address
+    if not host or not str(port).isdigit():
+        raise ValueError(f"Invalid jump host: {spec!r}")
+    return {"hostname": host, "port": int(port), "username": username or None}
+
+
+def normalize_jump_hosts(jump_hosts: JumpHosts) -> List[Dict[str, Any]]:
+    """Turn a ProxyJump setting into a list of hops, nearest first.
+
+    Args:
+        jump_hosts: None, an OpenSSH ``ProxyJump`` string such as
+            ``"admin@bastion,admin@inner:2222"``, or a list whose items are
+            such strings or dicts with ``hostname`` and optionally ``port``,
+            ``username``, ``password``, ``key_filename`` and
+            ``connection_profile``.
+
+    Returns:
+        List[Dict[str, Any]]: One dict per hop; empty for a direct connection.
+    """
+    if not jump_hosts:
+        return []
+    if isinstance(jump_hosts, str):
+        jump_hosts = [hop for hop in jump_hosts.split(",") if hop.strip()]
+    hops = []
+    for hop in jump_hosts:
+        if isinstance(hop, str):
+            hop = parse_jump_host(hop)
+        hop = {key: hop[key] for key in JUMP_HOST_KEYS if key in hop}
+        hop["port"] = int(hop.get("port", 22))
+        hops.append(hop)
+    return hops
+
+
+def make_pool_key(
+    hostname: str,
+    port: int = 22,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    key_filename: Optional[str] = None,
+    jump_hosts: JumpHosts = None,
+    host_key_policy: Optional[paramiko.MissingHostKeyPolicy] = None,
+    allow_agent: bool = True,
+    look_for_keys: bool = True,
+) -> PoolKey:
+    """Build the key under which a transport is pooled.
+
+    The credentials are folded into a short digest so that two consumers
+    with different credentials for the same account never share a
+    transport, without keeping the secret itself in the key. The jump
+    host route is folded in as well: the same address behind two
+    different bastions is two different devices. So are the host key
+    policy and the agent and key file options, so a transport accepted
+    under a lax policy is never handed to a consumer asking for a strict
+    one.
+
+    Args:
+        hostname (str): The hostname or IP address of the SSH server.
+        port (int, optional): The port number of the SSH server. Defaults to 22.
+        username (str, optional): The username to authenticate with.
+        password (str, optional): The password used for authentication.
+        key_filename (str, optional): The private key file used for authentication.
+        jump_hosts (optional): The ProxyJump route, see :func:`normalize_jump_hosts`.
+        host_key_policy (paramiko.MissingHostKeyPolicy, optional): The policy
+            for unknown host keys. Defaults to None (``RejectPolicy``).
+        allow_agent (bool, optional): Whether the SSH agent may be used.
+            Defaults to True.
+        look_for_keys (bool, optional): Whether ``~/.ssh`` keys may be used.
+            Defaults to True.
+
+    Returns:
+        tuple: A ``(hostname, port, username, auth_digest)`` tuple.
+    """
+    policy = type(host_key_policy).__name__ if host_key_policy else "RejectPolicy"
+    auth = f"{password or ''}\0{key_filename or ''}"
+    auth += f"\0{policy}\0{bool(allow_agent)}\0{bool(look_for_keys)}"
+    for hop in normalize_jump_hosts(jump_hosts):
+        auth += f"\0{hop.get('username') or ''}@{hop['hostname']}:{hop['port']}"
+    auth = auth.encode("utf-8")
+    auth_digest = hashlib.sha256(auth).hexdigest()[:16]
+    return (hostname, int(port), username or "", auth_digest)
+
+
+def pool_key(params: Dict[str, Any]) -> PoolKey:
+    """Build the pool key for a dict of :meth:`TransportPool.acquire` arguments."""
+    return make_pool_key(
+        params["hostname"],
+        params.get("port", 22),
+        params.get("username"),
+        params.get("password"),
+        params.get("key_filename"),
+        params.get("jump_hosts"),
+        params.get("host_key_policy"),
+        params.get("allow_agent", True),
+        params.get("look_for_keys", True),
+    )
+
+
+def make_pool_params(
+    hostname: str,
+    port: int = 22,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    key_filename: Optional[str] = None,
+    connection_profile: Optional[str] = None,
+    jump_hosts: JumpHosts = None,
+    timeout: float = DEFAULT_CONNECT_TIMEOUT,
+) -> Dict[str, Any]:
+    """Build the :meth:`TransportPool.acquire` arguments for a device.
+
+    Tabs, status polling, fan-out and the file browser all build their
+    arguments here, so they connect with the same host key policy and
+    auth options and end up with the same pool key: one handshake per
+    device whichever of them gets there first.
+
+    Args:
+        hostname (str): The hostname or IP address of the SSH server.
+        port (int, optional): The port number of the SSH server. Defaults to 22.
+        username (str, optional): The username to authenticate with.
+        password (str, optional): The password used for authentication.
+        key_filename (str, optional): The private key file used for authentication.
+        connection_profile (str, optional): The connection profile to negotiate with.
+        jump_hosts (optional): The ProxyJump route, see :func:`normalize_jump_hosts`.
+        timeout (float, optional): Seconds to wait for a new connection.
+            Defaults to 10.
+
+    Returns:
+        dict: Connection arguments accepted by :meth:`TransportPool.acquire`.
+    """
+    return {
+        "hostname": hostname,
+        "port": int(port),
+        "username": username,
+        "password": password,
+        "key_filename": key_filename,
+        "timeout": timeout,
+        "host_key_policy": DEFAULT_HOST_KEY_POLICY(),
+        "allow_agent": True,
+        "look_for_keys": True,
+        "connection_profile": connection_profile,
+        "jump_hosts": jump_hosts,
+    }
+
+
+class PoolExhaustedError(Exception):
+    """Raised when no pooled transport can accept another channel."""
+
+
+class PooledTransport:
+    """A single authenticated transport and the channels opened over it."""
+
+    def __init__(
+        self,
+        key: PoolKey,
+        client: paramiko.SSHClient,
+        lock: Optional[threading.RLock] = None,
+    ):
+        """Wrap an already connected SSH client.
+
+        Args:
+            key (tuple): The pool key this transport was created for.
+            client (paramiko.SSHClient): The connected client owning the transport.
+            lock (threading.RLock, optional): Guards the channel lists; the
+                pool passes its own lock, so they change atomically with the
+                pool's bookkeeping. Defaults to a new lock.
+        """
+        self.key = key
+        self.client = client
+        self.lock = lock or threading.RLock()
+        self.transport = client.get_transport()
+        self.channels: List[paramiko.Channel] = []
+        self.tunnels: List[paramiko.Channel] = []
+        # Deadlines of the slots handed out for channels not opened yet.
+        self.reservations: List[float] = []
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.last_health_check = self.created_at
+
+    @property
+    def active_channels(self) -> int:
+        """int: The number of channels that are still open on this transport."""
+        with self.lock:
+            self.channels = [chan for chan in self.channels if not chan.closed]
+            return len(self.channels)
+
+    @property
+    def load(self) -> int:
+        """int: Open channels plus slots reserved for channels about to open."""
+        now = time.monotonic()
+        with self.lock:
+            self.reservations = [t for t in self.reservations if t > now]
+            return self.active_channels + len(self.reservations)
+
+    def reserve(self) -> None:
+        """Hold a channel slot until a channel is opened or the slot expires."""
+        with self.lock:
+            self.reservations.append(time.monotonic() + RESERVATION_TIMEOUT)
+
+    def _track(self, channel: Optional[paramiko.Channel]) -> None:
+        # Takes the reservation a channel was opened for, and the channel.
+        with self.lock:
+            if self.reservations:
+                self.reservations.pop(0)
+            if channel is not None:
+                self.channels.append(channel)
+
+    @property
+    def active_tunnels(self) -> int:
+        """int: The number of ``direct-tcpip`` tunnels still open through this transport."""
+        with self.lock:
+            self.tunnels = [chan for chan in self.tunnels if not chan.closed]
+            return len(self.tunnels)
+
+    def is_alive(self) -> bool:
+        """Check whether the underlying transport is still usable.
+
+        Returns:
+            bool: True if the transport is active and authenticated.
+        """
+        return bool(
+            self.transport
+            and self.transport.is_active()
+            and self.transport.is_authenticated()
+        )
+
+    def health_check(self) -> bool:
+        """Probe the transport with an SSH_MSG_IGNORE packet.
+
+        Returns:
+            bool: True if the probe could be sent, False if the transport is dead.
+        """
+        self.last_health_check = time.monotonic()
+        if not self.is_alive():
+            return False
+        try:
+            self.transport.send_ignore()
+            return True
+        except Exception as e:
+            logger.warning(f"Health check failed for {self.key[0]}: {str(e)}")
+            return False
+
+    def open_session(
+        self,
+        window_size: Optional[int] = None,
+        max_packet_size: Optional[int] = None,
+        **kwargs,
+    ) -> paramiko.Channel:
+        """Open a new session channel and track it.
+
+        Args:
+            window_size (int, optional): The channel window in bytes. Defaults to
+                None, which uses paramiko's default.
+            max_packet_size (int, optional): The largest data packet the server
+                may send. Defaults to None, which uses paramiko's default.
+            **kwargs: Keyword arguments passed to ``Transport.open_session``.
+
+        Returns:
+            paramiko.Channel: The newly opened channel.
+        """
+        channel = None
+        try:
+            channel = self.transport.open_session(
+                window_size=window_size, max_packet_size=max_packet_size, **kwargs
+            )
+        finally:
+            self._track(channel)
+        self.last_used = time.monotonic()
+        return channel
+
+    def open_shell(
+        self,
+        term: str = "xterm",
+        width: int = 80,
+        height: int = 24,
+        window_size: Optional[int] = SHELL_WINDOW_SIZE,
+        max_packet_size: Optional[int] = SHELL_MAX_PACKET_SIZE,
+        **kwargs,
+    ) -> paramiko.Channel:
+        """Open an interactive shell channel with a pseudo-terminal.
+
+        Args:
+            term (str, optional): The terminal type to request. Defaults to "xterm".
+            width (int, optional): The terminal width in characters. Defaults to 80.
+            height (int, optional): The terminal height in characters. Defaults to 24.
+            window_size (int, optional): The channel window in bytes. Defaults to
+                ``SHELL_WINDOW_SIZE``.
+            max_packet_size (int, optional): The largest data packet the server
+                may send. Defaults to ``SHELL_MAX_PACKET_SIZE``.
+            **kwargs: Keyword arguments passed to ``Transport.open_session``.
+
+        Returns:
+            paramiko.Channel: The shell channel.
+        """
+        channel = self.open_session(
+            window_size=window_size, max_packet_size=max_packet_size, **kwargs
+        )
+        channel.get_pty(term=term, width=width, height=height)
+        channel.invoke_shell()
+        return channel
+
+    def open_exec(
+        self, command: str, get_pty: bool = False, **kwargs
+    ) -> paramiko.Channel:
+        """Open a channel running a single non-interactive command.
+
+        Args:
+            command (str): The command to execute.
+            get_pty (bool, optional): Whether to request a pseudo-terminal. Defaults to False.
+            **kwargs: Keyword arguments passed to ``Transport.open_session``.
+
+        Returns:
+            paramiko.Channel: The exec channel.
+        """
+        channel = self.open_session(**kwargs)
+        if get_pty:
+            channel.get_pty()
+        channel.exec_command(command)
+        return channel
+
+    def exec_command(self, command: str, timeout: Optional[float] = None):
+        """Execute a command the way ``SSHClient.exec_command`` does.
+
+        Args:
+            command (str): The command to execute.
+            timeout (float, optional): The channel timeout in seconds.
+
+        Returns:
+            tuple: The ``(stdin, stdout, stderr)`` file-like objects of the channel.
+        """
+        channel = self.open_exec(command)
+        channel.settimeout(timeout)
+        stdin = channel.makefile_stdin("wb")
+        stdout = channel.makefile("r")
+        stderr = channel.makefile_stderr("r")
+        return stdin, stdout, stderr
+
+    def open_tunnel(
+        self, hostname: str, port: int = 22, timeout: Optional[float] = None
+    ) -> paramiko.Channel:
+        """Open a ``direct-tcpip`` channel to a host behind this one.
+
+        Tunnels do not count against the channel limit, since they carry
+        whole transports rather than sessions, but they keep the transport
+        from being evicted as idle.
+
+        Args:
+            hostname (str): The downstream host, resolved by this server.
+            port (int, optional): The downstream port. Defaults to 22.
+            timeout (float, optional): Seconds to wait for the channel to open.
+
+        Returns:
+            paramiko.Channel: A socket-like channel to hand to ``SSHClient.connect``.
+        """
+        channel = self.transport.open_channel(
+            "direct-tcpip", (hostname, int(port)), ("127.0.0.1", 0), timeout=timeout
+        )
+        with self.lock:
+            self.tunnels.append(channel)
+        self.last_used = time.monotonic()
+        return channel
+
+    def open_sftp(self, **kwargs) -> paramiko.SFTPClient:
+        """Open an SFTP session over this transport.
+
+        Args:
+            **kwargs: Keyword arguments passed to ``SFTPClient.from_transport``.
+
+        Returns:
+            paramiko.SFTPClient: The SFTP client.
+        """
+        sftp = None
+        try:
+            sftp = paramiko.SFTPClient.from_transport(self.transport, **kwargs)
+        finally:
+            self._track(sftp.get_channel() if sftp is not None else None)
+        self.last_used = time.monotonic()
+        return sftp
+
+    def close(self) -> None:
+        """Close every channel and the transport itself."""
+        with self.lock:
+            channels = self.channels + self.tunnels
+            self.channels = []
+            self.tunnels = []
+        for channel in channels:
+            try:
+                channel.close()
+            except Exception:
+                pass
+        try:
+            self.client.close()
+        except Exception as e:
+            logger.debug(f"Error closing transport to {self.key[0]}: {str(e)}")
+
+
+class TransportPool:
+    """Process-wide pool of authenticated SSH transports.
+
+    Transports are keyed by ``(host, port, user, auth)``. Each transport
+    carries at most ``max_channels_per_transport`` channels; once every
+    pooled transport for a key is full a new one is opened next to it.
+    Transports to devices behind jump hosts are tunnelled through the
+    pooled transports of the jump hosts.
+    A background janitor health-checks transports and closes the ones
+    that have had no open channels for longer than ``idle_timeout``.
+    """
+
+    def __init__(
+        self,
+        max_channels_per_transport: int = DEFAULT_MAX_CHANNELS,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL,
+        max_transports_per_key: int = 4,
+        keepalive_interval: int = DEFAULT_KEEPALIVE_INTERVAL,
+    ):
+        """Initialize the pool.
+
+        Args:
+            max_channels_per_transport (int, optional): Channel limit per transport.
+            idle_timeout (float, optional): Seconds a transport may sit without
+                channels before it is closed.
+            health_check_interval (float, optional): Seconds between health checks.
+            max_transports_per_key (int, optional): Upper bound on parallel
+                transports opened for the same key.
+            keepalive_interval (int, optional): Seconds between SSH keepalive
+                packets on every transport. 0 disables keepalives.
+        """
+        self.max_channels_per_transport = max_channels_per_transport
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.max_transports_per_key = max_transports_per_key
+        self.keepalive_interval = keepalive_interval
+        self._pinned: Set[PoolKey] = set()
+        self._lock = threading.RLock()
+        self._key_locks: Dict[PoolKey, threading.Lock] = {}
+        self._transports: Dict[PoolKey, List[PooledTransport]] = {}
+        self._janitor: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def _key_lock(self, key: PoolKey) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _open_jump_tunnel(
+        self, hostname: str, port: int, hops: List[Dict[str, Any]], **kwargs
+    ) -> paramiko.Channel:
+        # The last hop is the bastion next to the device; it is itself
+        # pooled, and reached through the hops before it.
+        bastion = self.acquire(
+            **{
+                "host_key_policy": kwargs.get("host_key_policy"),
+                "timeout": kwargs["timeout"],
+                **hops[-1],
+                "jump_hosts": hops[:-1],
+                "reserve": False,
+            }
+        )
+        logger.debug(f"Tunnelling to {hostname}:{port} through {bastion.key[0]}")
+        return bastion.open_tunnel(hostname, port, timeout=kwargs["timeout"])
+
+    def _connect(
+        self,
+        key: PoolKey,
+        hostname: str,
+        port: int,
+        username: str,
+        jump_hosts: JumpHosts = None,
+        **kwargs,
+    ) -> PooledTransport:
+        kwargs.setdefault("timeout", DEFAULT_CONNECT_TIMEOUT)
+        hops = normalize_jump_hosts(jump_hosts)
+        if hops:
+            kwargs["sock"] = self._open_jump_tunnel(hostname, port, hops, **kwargs)
+        host_key_policy = kwargs.pop("host_key_policy", None)
+        kwargs.update(paramiko_connect_kwargs(kwargs.pop("connection_profile", None)))
+
+        client = paramiko.SSHClient()
+        client.load_system_host_keys()
+        client.set_missing_host_key_policy(host_key_policy or paramiko.RejectPolicy())
+
+        logger.debug(f"Opening pooled transport to {username}@{hostname}:{port}")
+        client.connect(hostname=hostname, port=port, username=username, **kwargs)
+        tune_socket(client.get_transport().sock)
+        if self.keepalive_interval:
+            client.get_transport().set_keepalive(self.keepalive_interval)
+        return PooledTransport(key, client, self._lock)
+
+    def acquire(
+        self,
+        hostname: str,
+        port: int = 22,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        key_filename: Optional[str] = None,
+        jump_hosts: JumpHosts = None,
+        reserve: bool = True,
+        **connect_kwargs,
+    ) -> PooledTransport:
+        """Return a healthy pooled transport with room for another channel.
+
+        The slot for that channel is reserved before the transport is
+        returned, so concurrent callers cannot go over the channel limit.
+        Opening a session or SFTP channel on the transport takes the slot;
+        one left unused is freed after ``RESERVATION_TIMEOUT`` seconds.
+
+        Args:
+            hostname (str): The hostname or IP address of the SSH server.
+            port (int, optional): The port number of the SSH server. Defaults to 22.
+            username (str, optional): The username to authenticate with.
+            password (str, optional): The password used for authentication.
+            key_filename (str, optional): The private key file used for authentication.
+            jump_hosts (optional): Jump hosts to reach the server through, see
+                :func:`normalize_jump_hosts`. Defaults to None (direct).
+            reserve (bool, optional): Reserve a channel slot. Pass False when
+                no session channel will be opened, e.g. to warm the pool up.
+                Defaults to True.
+            **connect_kwargs: Extra keyword arguments for ``SSHClient.connect``
+                (``timeout``, ``allow_agent``, ``look_for_keys``,
+                ``host_key_policy``, ``connection_profile``...). Only used
+                when a new transport has to be opened.
+
+        Returns:
+            PooledTransport: A transport that can accept another channel.
+
+        Raises:
+            PoolExhaustedError: If every transport for the key is full and
+                ``max_transports_per_key`` has been reached.
+            paramiko.SSHException: If a new transport cannot be established.
+        """
+        port = int(port)
+        key = make_pool_key(
+            hostname,
+            port,
+            username,
+            password,
+            key_filename,
+            jump_hosts,
+            connect_kwargs.get("host_key_policy"),
+            connect_kwargs.get("allow_agent", True),
+            connect_kwargs.get("look_for_keys", True),
+        )
+        with self._key_lock(key):
+            with self._lock:
+                entries = [t for t in self._transports.get(key, []) if t.is_alive()]
+                self._transports[key] = entries
+                candidates = [
+                    t for t in entries if t.load < self.max_channels_per_transport
+                ]
+                if candidates:
+                    transport = min(candidates, key=lambda t: t.load)
+                    transport.last_used = time.monotonic()
+                    if reserve:
+                        transport.reserve()
+                    return transport
+                if len(entries) >= self.max_transports_per_key:
+                    raise PoolExhaustedError(
+                        f"All {len(entries)} transports to {hostname} are at "
+                        f"{self.max_channels_per_transport} channels"
+                    )
+
+            # Handshake outside the pool lock so other hosts are not held up.
+            transport = self._connect(
+                key,
+                hostname,
+                port,
+                username,
+                password=password,
+                key_filename=key_filename,
+                jump_hosts=jump_hosts,
+                **connect_kwargs,
+            )
+            with self._lock:
+                if reserve:
+                    transport.reserve()
+                self._transports.setdefault(key, []).append(transport)
+            self._ensure_janitor()
+            logger.info(f"Pooled transport established to {hostname}:{port}")
+            return transport
+
+    def open_shell(
+        self,
+        hostname: str,
+        term: str = "xterm",
+        width: int = 80,
+        height: int = 24,
+        **kwargs,
+    ) -> paramiko.Channel:
+        """Open an interactive shell channel on a pooled transport.
+
+        Args:
+            hostname (str): The hostname or IP address of the SSH server.
+            term (str, optional): The terminal type to request. Defaults to "xterm".
+            width (int, optional): The terminal width in characters. Defaults to 80.
+            height (int, optional): The terminal height in characters. Defaults to 24.
+            **kwargs: Connection arguments accepted by :meth:`acquire`.
+
+        Returns:
+            paramiko.Channel: The shell channel.
+        """
+        return self.acquire(hostname, **kwargs).open_shell(
+            term=term, width=width, height=height
+        )
+
+    def open_exec(self, hostname: str, command: str, **kwargs) -> paramiko.Channel:
+        """Open a channel running ``command`` on a pooled transport.
+
+        Args:
+            hostname (str): The hostname or IP address of the SSH server.
+            command (str): The command to execute.
+            **kwargs: Connection arguments accepted by :meth:`acquire`.
+
+        Returns:
+            paramiko.Channel: The exec channel.
+        """
+        return self.acquire(hostname, **kwargs).open_exec(command)
+
+    def exec_command(
+        self, hostname: str, command: str, timeout: Optional[float] = None, **kwargs
+    ):
+        """Run ``command`` on a pooled transport and return its file objects.
+
+        Args:
+            hostname (str): The hostname or IP address of the SSH server.
+            command (str): The command to execute.
+            timeout (float, optional): The channel timeout in seconds.
+            **kwargs: Connection arguments accepted by :meth:`acquire`.
+
+        Returns:
+            tuple: The ``(stdin, stdout, stderr)`` file-like objects of the channel.
+        """
+        return self.acquire(hostname, **kwargs).exec_command(command, timeout=timeout)
+
+    def open_sftp(self, hostname: str, **kwargs) -> paramiko.SFTPClient:
+        """Open an SFTP session on a pooled transport.
+
+        Args:
+            hostname (str): The hostname or IP address of the SSH server.
+            **kwargs: Connection arguments accepted by :meth:`acquire`.
+
+        Returns:
+            paramiko.SFTPClient: The SFTP client.
+        """
+        return self.acquire(hostname, **kwargs).open_sftp()
+
+    def check_health(self) -> None:
+        """Health-check pooled transports and evict dead or idle ones.
+
+        The checks send keepalives, so they run outside the pool lock; only
+        the snapshot and the eviction itself hold it.
+        """
+        with self._lock:
+            snapshot = [
+                (key, transport)
+                for key, entries in self._transports.items()
+                for transport in entries
+            ]
+
+        now = time.monotonic()
+        dead = set()
+        for key, transport in snapshot:
+            if now - transport.last_health_check >= self.health_check_interval:
+                alive = transport.health_check()
+            else:
+                alive = transport.is_alive()
+            if not alive:
+                dead.add(transport)
+
+        evicted = []
+        with self._lock:
+            now = time.monotonic()
+            for key, transport in snapshot:
+                entries = self._transports.get(key)
+                if not entries or transport not in entries:
+                    continue
+                # Channels may have opened while the lock was released.
+                idle = (
+                    key not in self._pinned
+                    and transport.active_channels == 0
+                    and transport.active_tunnels == 0
+                    and now - transport.last_used >= self.idle_timeout
+                )
+                if transport in dead or idle:
+                    entries.remove(transport)
+                    evicted.append(transport)
+                    if not entries:
+                        del self._transports[key]
+
+        for transport in evicted:
+            logger.debug(f"Evicting pooled transport to {transport.key[0]}")
+            transport.close()
+
+    def _ensure_janitor(self) -> None:
+        with self._lock:
+            if self._janitor and self._janitor.is_alive():
+                return
+            self._stop_event.clear()
+            self._janitor = threading.Thread(
+                target=self._janitor_loop, name="transport-pool-janitor", daemon=True
+            )
+            self._janitor.start()
+
+    def _janitor_loop(self) -> None:
+        interval = max(1.0, min(self.health_check_interval, self.idle_timeout))
+        while not self._stop_event.wait(interval):
+            try:
+                self.check_health()
+            except Exception as e:
+                logger.error(f"Transport pool janitor error: {str(e)}")
+            with self._lock:
+                if not self._transports:
+                    self._janitor = None
+                    return
+
+    def pin(self, key: PoolKey) -> None:
+        """Keep the transports for ``key`` open even when they are idle.
+
+        Args:
+            key (tuple): A key built with :func:`make_pool_key` or :func:`pool_key`.
+        """
+        with self._lock:
+            self._pinned.add(key)
+
+    def unpin(self, key: PoolKey) -> None:
+        """Let the transports for ``key`` be evicted once idle again.
+
+        Args:
+            key (tuple): A key built with :func:`make_pool_key` or :func:`pool_key`.
+        """
+        with self._lock:
+            self._pinned.discard(key)
+
+    def is_warm(self, key: PoolKey) -> bool:
+        """Check whether a live transport for ``key`` is already pooled.
+
+        Args:
+            key (tuple): A key built with :func:`make_pool_key` or :func:`pool_key`.
+
+        Returns:
+            bool: True if opening a channel for the key needs no handshake.
+        """
+        with self._lock:
+            return any(t.is_alive() for t in self._transports.get(key, []))
+
+    def close_host(self, hostname: str, port: int = 22) -> None:
+        """Close every pooled transport to the given host.
+
+        Args:
+            hostname (str): The hostname or IP address of the SSH server.
+            port (int, optional): The port number of the SSH server. Defaults to 22.
+        """
+        with self._lock:
+            keys = [
+                k for k in self._transports if k[0] == hostname and k[1] == int(port)
+            ]
+            evicted = [t for k in keys for t in self._transports.pop(k)]
+        for transport in evicted:
+            transport.close()
+
+    def close_all(self) -> None:
+        """Close every pooled transport and stop the janitor."""
+        self._stop_event.set()
+        with self._lock:
+            evicted = [t for entries in self._transports.values() for t in entries]
+            self._transports.clear()
+        for transport in evicted:
+            transport.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Summarize the pool contents.
+
+        Returns:
+            dict: A mapping of ``"user@host:port"`` to a list of open channel
+            counts, one entry per pooled transport.
+        """
+        with self._lock:
+            return {
+                f"{key[2]}@{key[0]}:{key[1]}": [t.active_channels for t in entries]
+                for key, entries in self._transports.items()
+            }
+
+
+# Create and export the shared pool instance
+transport_pool = TransportPool()